@@ -5,9 +5,20 @@ mxgo - AI driven email assistant
 # MXGo - Email Processing Agent
 # Version 0.1.0
 
-from mxgo.agents.email_agent import EmailAgent
+from typing import Any
 
 __version__ = "0.1.0"
 __all__ = [
     "EmailAgent",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The agent pulls in every tool and its dependencies; import it only when asked for,
+    # so that importing any mxgo module (e.g. the API) does not
+    if name == "EmailAgent":
+        from mxgo.agents.email_agent import EmailAgent  # NOQA: PLC0415
+
+        return EmailAgent
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
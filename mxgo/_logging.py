@@ -65,14 +65,57 @@ SENSITIVE_PATTERNS = [
 # Compile regex patterns for case-insensitive matching
 COMPILED_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in SENSITIVE_PATTERNS]
 
-# Pre-compile scrubbing patterns for better performance
-PRECOMPILED_SCRUB_PATTERNS = []
 SCRUBBED_TOKEN = "******"  # noqa: S105
 
-for pattern in COMPILED_PATTERNS:
-    key_value_pattern = re.compile(rf"(\b\w*{pattern.pattern}\w*\s*[:=]\s*)([^\s,}}\]]+)", re.IGNORECASE)
-    quoted_pattern = re.compile(rf'(["\']?\b\w*{pattern.pattern}\w*["\']?\s*[:=]\s*)(["\'])([^"\']*)\2', re.IGNORECASE)
-    PRECOMPILED_SCRUB_PATTERNS.append((key_value_pattern, quoted_pattern))
+# All sensitive key patterns as one alternation, so each message is scanned once
+# instead of twice per pattern
+SENSITIVE_KEY_PATTERN = re.compile("|".join(f"(?:{pattern})" for pattern in SENSITIVE_PATTERNS), re.IGNORECASE)
+
+# A key containing a sensitive word followed by ":" or "=" and either a quoted value
+# ("key": "value", 'key': 'value') or a bare value (key=value)
+SCRUB_PATTERN = re.compile(
+    rf"""(?P<key>["']?\b\w*(?:{SENSITIVE_KEY_PATTERN.pattern})\w*["']?\s*[:=]\s*)"""
+    r"""(?:(?P<quote>["'])[^"']*(?P=quote)|[^\s,}\]]+)""",
+    re.IGNORECASE,
+)
+
+# Lowercase substrings, one of which every sensitive key contains. Text containing
+# none of them (or no ":"/"=") cannot match SCRUB_PATTERN and skips the regex
+PREFILTER_KEYWORDS = (
+    "passw",
+    "pwd",
+    "secret",
+    "auth",
+    "credential",
+    "key",
+    "session",
+    "cookie",
+    "security",
+    "card",
+    "csrf",
+    "xsrf",
+    "jwt",
+    "ssn",
+    "mail",
+    "bearer",
+)
+
+# Set on a loguru record once it has been scrubbed, since every sink runs the filter
+SCRUBBED_RECORD_MARKER = "_scrubbed"
+
+
+def _may_contain_sensitive_data(text: str) -> bool:
+    if "=" not in text and ":" not in text:
+        return False
+    lowered = text.lower()
+    return any(keyword in lowered for keyword in PREFILTER_KEYWORDS)
+
+
+def _replace_sensitive_value(match: re.Match) -> str:
+    quote = match.group("quote")
+    if quote:
+        return f"{match.group('key')}{quote}{SCRUBBED_TOKEN}{quote}"
+    return f"{match.group('key')}{SCRUBBED_TOKEN}"
 
 
 def scrub_sensitive_data(text: str) -> str:
@@ -89,21 +132,20 @@ def scrub_sensitive_data(text: str) -> str:
     if not isinstance(text, str):
         text = str(text)
 
-    # Look for key-value patterns that contain sensitive data
-    for key_value_pattern, quoted_pattern in PRECOMPILED_SCRUB_PATTERNS:
-        # Match key=value or key: value patterns where key contains sensitive words
-        text = key_value_pattern.sub(rf"\1{SCRUBBED_TOKEN}", text)
+    if not _may_contain_sensitive_data(text):
+        return text
 
-        # Match quoted key-value patterns: "key": "value" or 'key': 'value'
-        text = quoted_pattern.sub(rf"\1\2{SCRUBBED_TOKEN}\2", text)
-
-    return text
+    # Match key=value, key: value, "key": "value" and 'key': 'value' where key contains sensitive words
+    return SCRUB_PATTERN.sub(_replace_sensitive_value, text)
 
 
 def loguru_scrubbing_filter(record):
     """
     Filter function for Loguru that scrubs sensitive data from log records.
 
+    The same record is passed to the filter of every sink, so it is only scrubbed
+    the first time.
+
     Args:
         record: The log record to filter
 
@@ -111,6 +153,9 @@ def loguru_scrubbing_filter(record):
         True to keep the record, False to drop it
 
     """
+    if record.get(SCRUBBED_RECORD_MARKER):
+        return True
+
     try:
         # Scrub the message - use dict-style access for loguru records
         if record.get("message"):
@@ -121,8 +166,7 @@ def loguru_scrubbing_filter(record):
             for key, value in record["extra"].items():
                 if isinstance(value, str):
                     # Check if the key itself contains sensitive patterns
-                    key_is_sensitive = any(pattern.search(key) for pattern in COMPILED_PATTERNS)
-                    if key_is_sensitive:
+                    if SENSITIVE_KEY_PATTERN.search(key):
                         record["extra"][key] = SCRUBBED_TOKEN
                     else:
                         # Also scrub the value if it contains key=value patterns
@@ -134,6 +178,7 @@ def loguru_scrubbing_filter(record):
         # If scrubbing fails, log the error and keep the original record to avoid breaking logging
         logger.warning(f"Failed to scrub sensitive data from log record: {e}")
 
+    record[SCRUBBED_RECORD_MARKER] = True
     return True
 
 
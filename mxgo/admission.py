@@ -0,0 +1,288 @@
+"""
+Admission control of /process-email under load.
+
+Without it every accepted email is enqueued however deep the email queue is, so during
+bursts the time to a reply grows without bound and rate limits are the only brake.
+``AdmissionController`` samples the load of the email queue, at most once every
+ADMISSION_SAMPLE_INTERVAL_SECONDS and on a thread of its own, off the event loop:
+
+- its depth, the messages ready in RabbitMQ;
+- the consumer lag, how long the latest messages waited before a worker picked them up,
+  which the workers report to Redis through ``QueueLagTracker``.
+
+Past the busy thresholds, emails to low-priority handles and scheduled tasks go to the
+deferred queue and bulk senders are turned away with 429 and Retry-After. Past the
+overloaded thresholds bulk senders get 503 instead, and the remaining emails are tagged
+to run on the cheaper degraded model group. Emails are admitted as usual while the load
+cannot be sampled.
+"""
+
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from http import HTTPStatus
+from typing import Any
+
+import dramatiq
+import redis
+
+from mxgo import cache
+from mxgo._logging import get_logger
+from mxgo.config import (
+    ADMISSION_BULK_SENDERS,
+    ADMISSION_BUSY_LAG_SECONDS,
+    ADMISSION_BUSY_QUEUE_DEPTH,
+    ADMISSION_CONTROL_ENABLED,
+    ADMISSION_DEGRADED_MODEL_GROUP,
+    ADMISSION_LOW_PRIORITY_HANDLES,
+    ADMISSION_OVERLOADED_LAG_SECONDS,
+    ADMISSION_OVERLOADED_QUEUE_DEPTH,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    ADMISSION_SAMPLE_INTERVAL_SECONDS,
+)
+from mxgo.metrics import ADMISSION_DECISIONS
+
+logger = get_logger(__name__)
+
+QUEUE_LAG_KEY_PREFIX = "admission:queue_lag:"
+# Lag reports older than this are ignored, e.g. once the workers have gone idle
+QUEUE_LAG_TTL_SECONDS = 300
+MAX_RETRY_AFTER_SECONDS = 3600
+# Precedence header values of mailing lists and other bulk mail
+BULK_PRECEDENCE = frozenset({"bulk", "list", "junk"})
+
+
+class LoadLevel(str, Enum):
+    """Load of the email queue."""
+
+    NORMAL = "normal"
+    BUSY = "busy"
+    OVERLOADED = "overloaded"
+
+
+class AdmissionAction(str, Enum):
+    """What to do with an incoming email."""
+
+    ADMIT = "admit"
+    DEFER = "defer"
+    DEGRADE = "degrade"
+    REJECT = "reject"
+
+
+@dataclass(frozen=True)
+class QueueLoad:
+    """A sample of the email queue's load."""
+
+    depth: int
+    lag_seconds: float
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    """Admission decision for one email."""
+
+    action: AdmissionAction
+    level: LoadLevel
+    # Set for rejected emails
+    status_code: int | None = None
+    retry_after_seconds: int | None = None
+    # Set for degraded emails
+    model_group: str | None = None
+
+
+def is_bulk_sender(from_email: str, headers: dict[str, Any] | None = None) -> bool:
+    """
+    Check whether an email comes from a bulk sender.
+
+    Args:
+        from_email: Sender's email address
+        headers: Parsed email headers
+
+    Returns:
+        bool: True for senders in ADMISSION_BULK_SENDERS, by address or domain, and for
+            mailing list or bulk mail
+
+    """
+    sender = from_email.strip().lower()
+    if sender in ADMISSION_BULK_SENDERS or sender.rsplit("@", 1)[-1] in ADMISSION_BULK_SENDERS:
+        return True
+    headers = {str(name).lower(): value for name, value in (headers or {}).items()}
+    precedence = str(headers.get("precedence") or "").strip().lower()
+    return precedence in BULK_PRECEDENCE or bool(headers.get("list-id") or headers.get("list-unsubscribe"))
+
+
+class QueueLagTracker(dramatiq.Middleware):
+    """Dramatiq middleware reporting each queue's latest wait to Redis, for the admission controller."""
+
+    def before_process_message(self, _broker: dramatiq.Broker, message: dramatiq.Message) -> None:
+        """Report the queue wait, measured from enqueue or, for delayed messages, from their ETA."""
+        client = cache.get_redis_client()
+        if client is None:
+            return
+        enqueued_at = message.options.get("eta", message.message_timestamp)
+        wait_seconds = max(0, time.time() * 1000 - enqueued_at) / 1000
+        try:
+            client.set(f"{QUEUE_LAG_KEY_PREFIX}{message.queue_name}", f"{wait_seconds:.3f}", ex=QUEUE_LAG_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.debug(f"Failed to report queue lag of {message.queue_name}: {e}")
+
+
+class AdmissionController:
+    """Decides how /process-email admits emails given the load of the email queue."""
+
+    def __init__(
+        self,
+        broker: dramatiq.Broker,
+        queue_name: str,
+        *,
+        enabled: bool = ADMISSION_CONTROL_ENABLED,
+        sample_interval_seconds: float = ADMISSION_SAMPLE_INTERVAL_SECONDS,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            broker: Broker of the email queue
+            queue_name: Queue the email tasks are enqueued on
+            enabled: Whether to sample the load at all; every email is admitted otherwise
+            sample_interval_seconds: How long a load sample is reused
+
+        """
+        self.broker = broker
+        self.queue_name = queue_name
+        self.enabled = enabled
+        self.sample_interval_seconds = sample_interval_seconds
+        self._load: QueueLoad | None = None
+        self._sampled_at = -math.inf
+        # The broker opens a connection per thread, so every sample runs on this one
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="admission-sample")
+
+    def sample(self) -> QueueLoad:
+        """
+        Sample the depth and consumer lag of the email queue.
+
+        Returns:
+            QueueLoad: The current load
+
+        """
+        try:
+            # A passive declare only reads the queue's counts, and fails if it does not exist
+            declared = self.broker.channel.queue_declare(queue=self.queue_name, passive=True)
+        except Exception:
+            # Also drop the connection, which the broker may have closed; the next sample reconnects
+            del self.broker.connection
+            raise
+
+        lag_seconds = 0.0
+        client = cache.get_redis_client()
+        if client is not None:
+            try:
+                lag_seconds = float(client.get(f"{QUEUE_LAG_KEY_PREFIX}{self.queue_name}") or 0)
+            except (redis.RedisError, ValueError) as e:
+                logger.warning(f"Failed to read the lag of queue {self.queue_name}: {e}")
+        return QueueLoad(depth=declared.method.message_count, lag_seconds=lag_seconds)
+
+    def _refresh(self) -> QueueLoad | None:
+        # Runs on the sampling thread, so refreshes never overlap
+        if time.monotonic() - self._sampled_at < self.sample_interval_seconds:
+            return self._load
+        try:
+            self._load = self.sample()
+        except Exception as e:
+            logger.warning(f"Failed to sample the load of queue {self.queue_name}, admitting emails: {e}")
+            self._load = None
+        self._sampled_at = time.monotonic()
+        return self._load
+
+    async def load(self) -> QueueLoad | None:
+        """
+        Get the load of the email queue, sampling it if the last sample is too old.
+
+        Returns:
+            QueueLoad | None: The load, or None if it could not be sampled
+
+        """
+        if time.monotonic() - self._sampled_at < self.sample_interval_seconds:
+            return self._load
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._refresh)
+
+    @staticmethod
+    def level(load: QueueLoad | None) -> LoadLevel:
+        """Classify a load sample against the configured thresholds."""
+        if load is None:
+            return LoadLevel.NORMAL
+        if load.depth >= ADMISSION_OVERLOADED_QUEUE_DEPTH or load.lag_seconds >= ADMISSION_OVERLOADED_LAG_SECONDS:
+            return LoadLevel.OVERLOADED
+        if load.depth >= ADMISSION_BUSY_QUEUE_DEPTH or load.lag_seconds >= ADMISSION_BUSY_LAG_SECONDS:
+            return LoadLevel.BUSY
+        return LoadLevel.NORMAL
+
+    @classmethod
+    def decide(
+        cls,
+        load: QueueLoad | None,
+        handle: str | None,
+        from_email: str,
+        headers: dict[str, Any] | None = None,
+        *,
+        scheduled: bool = False,
+    ) -> AdmissionDecision:
+        """
+        Decide how to admit an email under a given load.
+
+        Args:
+            load: Load of the email queue, None if unknown
+            handle: Email handle the email was sent to
+            from_email: Sender's email address
+            headers: Parsed email headers
+            scheduled: Whether the email is a scheduled task run
+
+        Returns:
+            AdmissionDecision: The decision
+
+        """
+        level = cls.level(load)
+        if level is LoadLevel.NORMAL:
+            return AdmissionDecision(AdmissionAction.ADMIT, level)
+        if is_bulk_sender(from_email, headers):
+            retry_after = max(ADMISSION_RETRY_AFTER_SECONDS, math.ceil(load.lag_seconds))
+            return AdmissionDecision(
+                AdmissionAction.REJECT,
+                level,
+                status_code=HTTPStatus.TOO_MANY_REQUESTS if level is LoadLevel.BUSY else HTTPStatus.SERVICE_UNAVAILABLE,
+                retry_after_seconds=min(retry_after, MAX_RETRY_AFTER_SECONDS),
+            )
+        if scheduled or (handle or "").lower() in ADMISSION_LOW_PRIORITY_HANDLES:
+            return AdmissionDecision(AdmissionAction.DEFER, level)
+        if level is LoadLevel.OVERLOADED and ADMISSION_DEGRADED_MODEL_GROUP:
+            return AdmissionDecision(AdmissionAction.DEGRADE, level, model_group=ADMISSION_DEGRADED_MODEL_GROUP)
+        return AdmissionDecision(AdmissionAction.ADMIT, level)
+
+    async def admit(
+        self,
+        handle: str | None,
+        from_email: str,
+        headers: dict[str, Any] | None = None,
+        *,
+        scheduled: bool = False,
+    ) -> AdmissionDecision:
+        """
+        Decide how to admit an email under the current load, see ``decide``.
+
+        Returns:
+            AdmissionDecision: The decision
+
+        """
+        if not self.enabled:
+            return AdmissionDecision(AdmissionAction.ADMIT, LoadLevel.NORMAL)
+        decision = self.decide(await self.load(), handle, from_email, headers, scheduled=scheduled)
+        ADMISSION_DECISIONS.labels(action=decision.action.value, level=decision.level.value).inc()
+        if decision.action is not AdmissionAction.ADMIT:
+            logger.info(
+                f"Admission of email from {from_email} to {handle}: {decision.action.value} "
+                f"(queue {self.queue_name} {decision.level.value})"
+            )
+        return decision
@@ -1,4 +1,14 @@
 # Agents package for email processing
-from mxgo.agents.email_agent import EmailAgent
+from typing import Any
 
 __all__ = ["EmailAgent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use, see mxgo/__init__.py
+    if name == "EmailAgent":
+        from mxgo.agents.email_agent import EmailAgent  # NOQA: PLC0415
+
+        return EmailAgent
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
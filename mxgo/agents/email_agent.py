@@ -1,6 +1,8 @@
 import ast
 import json
 import re
+import time
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Union
@@ -8,7 +10,9 @@ from typing import Any, Union
 from dotenv import load_dotenv
 
 # Update imports to use proper classes from smolagents
-from smolagents import Tool, ToolCallingAgent
+from smolagents import Tool
+from smolagents.memory import ActionStep, PlanningStep
+from smolagents.models import parse_json_if_needed
 from smolagents.monitoring import TokenUsage
 
 # Monkey patch TokenUsage to handle None values robustly
@@ -33,10 +37,23 @@ TokenUsage.__post_init__ = patched_post_init
 
 # Add imports for the new default tools
 from mxgo._logging import get_logger, get_smolagents_console
-from mxgo.config import SCHEDULED_TASKS_MAX_PER_EMAIL
+from mxgo.agents.memory_compaction import MemoryCompactor
+from mxgo.agents.parallel_tools import ParallelToolCallingAgent
+from mxgo.agents.step_profiler import AgentStepProfiler, write_trace
+from mxgo.config import (
+    AGENT_CONTEXT_TOKEN_BUDGET,
+    AGENT_MAX_TOOL_THREADS,
+    AGENT_MEMORY_COMPACTION_ENABLED,
+    DIRECT_ANSWER_ENABLED,
+    SCHEDULED_TASKS_MAX_PER_EMAIL,
+    TOOL_MEMO_ENABLED,
+)
 from mxgo.crud import count_active_tasks_for_user, get_task_by_id
 from mxgo.db import init_db_connection
+from mxgo.llm_usage import get_usage_tracker, track_llm_usage
+from mxgo.metrics import instrument_tool
 from mxgo.prompts.base_prompts import (
+    DIRECT_ANSWER_GUIDELINES,
     MARKDOWN_STYLE_GUIDE,
     RESEARCH_GUIDELINES,
     RESPONSE_GUIDELINES,
@@ -70,7 +87,8 @@ from mxgo.schemas import (
 
 # Import citation management and web search tools
 from mxgo.scripts.report_formatter import ReportFormatter
-from mxgo.tools import create_tool_mapping
+from mxgo.task_checkpoints import AgentCheckpoint, TaskCheckpoint
+from mxgo.tools import CITATION_READING_TOOLS, TOOL_CONCURRENCY_LIMITS, ToolResultMemo, create_tool_mapping
 from mxgo.tools.scheduled_tasks_tool import ScheduledTasksTool
 
 # Load environment variables
@@ -94,6 +112,9 @@ ALLOWED_PYTHON_IMPORTS = [
     "urllib.parse",
 ]
 
+# Links in an email body usually mean the task needs the page, so such emails go to the agent
+URL_PATTERN = re.compile(r"https?://|www\.", re.IGNORECASE)
+
 
 class EmailAgent:
     """
@@ -109,6 +130,9 @@ class EmailAgent:
         verbose: bool = False,
         enable_deep_research: bool = False,
         attachment_info: list[dict] | None = None,
+        completed_research: dict[str, Any] | None = None,
+        checkpoint: TaskCheckpoint | None = None,
+        model_group: str | None = None,
     ):
         """
         Initialize the email agent with tools for different operations.
@@ -120,6 +144,11 @@ class EmailAgent:
             verbose: Whether to enable verbose logging
             enable_deep_research: Whether to enable deep research functionality
             attachment_info: Optional list of attachment info to load into memory
+            completed_research: Result of a background research job, served by the deep research
+                tool instead of calling the API (implies enable_deep_research)
+            checkpoint: Checkpoint of the email's processing; the agent's steps are saved to it
+                after every step, and a run checkpointed by an earlier attempt is resumed
+            model_group: Model group to route every model call to instead of the handle's
 
         """
         # Set up logging
@@ -132,7 +161,12 @@ class EmailAgent:
         self.attachment_dir = attachment_dir
         Path(self.attachment_dir).mkdir(parents=True, exist_ok=True)
 
-        self.enable_deep_research = enable_deep_research
+        self.enable_deep_research = enable_deep_research or completed_research is not None
+        self.completed_research = completed_research
+        self.checkpoint = checkpoint
+        self.model_group = model_group
+        # Action steps restored from the checkpoint instead of being run again
+        self.resumed_steps = 0
 
         # Create request context - this replaces the global citation manager
         self.context = RequestContext(email_request, attachment_info)
@@ -141,6 +175,12 @@ class EmailAgent:
         # Initialize report formatter (always needed)
         self.report_formatter = ReportFormatter()
 
+        # Per-step timeline of the agent run, fed by the step callbacks and the wrapped tools
+        self.step_profiler = AgentStepProfiler()
+
+        # Results of the email's tool calls, so repeated identical calls cost nothing
+        self.tool_memo = ToolResultMemo(self.context) if TOOL_MEMO_ENABLED else None
+
         # Initialize tools based on allowed_tools from processing instructions
         self.available_tools = self._initialize_allowed_tools()
 
@@ -149,22 +189,37 @@ class EmailAgent:
         logger.info("Email agent initialized successfully")
 
     def _init_agent(self):
-        """Initialize the smolagents ToolCallingAgent."""
-        # Initialize the routed model with the default model group
-        self.routed_model = RoutedLiteLLMModel()
+        """Initialize the smolagents tool calling agent."""
+        # Initialize the routed model with the default model group, or the one set for this email
+        self.routed_model = RoutedLiteLLMModel(target_model=self.model_group)
 
         # Create agent
-        self.agent = ToolCallingAgent(
+        self.agent = ParallelToolCallingAgent(
             model=self.routed_model,
             tools=self.available_tools,
+            context=self.context,
+            max_tool_threads=AGENT_MAX_TOOL_THREADS,
+            tool_concurrency_limits=TOOL_CONCURRENCY_LIMITS,
+            citation_reading_tools=CITATION_READING_TOOLS,
             max_steps=12,
             verbosity_level=2,  # Increased back to 2 to capture detailed Rich console output
             planning_interval=4,
             name="mxgo_email_processing_agent",
             description="I'm MXGo agent - an intelligent email processing agent that automates email-driven tasks and workflows. I can analyze emails, generate professional summaries and replies, conduct comprehensive research using web search and external APIs, process attachments (documents, images, PDFs), extract and create calendar events, export content to PDF, and execute code for data analysis. I maintain professional communication standards while providing accurate, well-researched responses tailored to your specific email handling requirements.",
             provide_run_summary=True,
+            step_callbacks={
+                ActionStep: [self.step_profiler.on_step, self._checkpoint_step],
+                PlanningStep: [self.step_profiler.on_step, self._checkpoint_step],
+            },
         )
 
+        # Keep older tool observations from being re-sent in full on every step
+        self.memory_compactor = MemoryCompactor(
+            self.processing_instructions.context_token_budget or AGENT_CONTEXT_TOKEN_BUDGET
+        )
+        if AGENT_MEMORY_COMPACTION_ENABLED:
+            self.memory_compactor.wrap_agent(self.agent)
+
         # Set up integrated Rich console that feeds into loguru/logfire pipeline
         # This captures smolagents verbose output and integrates it with our unified logging
         smolagents_console = get_smolagents_console()
@@ -181,6 +236,45 @@ class EmailAgent:
 
         logger.debug("Agent initialized with routed model configuration, loguru-integrated Rich console")
 
+    def _checkpoint_step(self, step: ActionStep | PlanningStep) -> None:
+        """Step callback saving the agent's finished steps, the step being finished included."""
+        if self.checkpoint is None:
+            return
+        # Callbacks run before the step is added to the agent memory
+        self.checkpoint.save_agent_state(
+            [*self.agent.memory.steps, step], self.context.get_citations().sources, self.agent.tool_outputs
+        )
+
+    def _run_agent(self, task: str, agent_state: AgentCheckpoint | None) -> Any:
+        """
+        Run the agent on the task, resuming from the steps checkpointed by an earlier attempt.
+
+        The restored steps are put back into the agent memory with their citations and tool
+        outputs. The task is added after them, and the run's first planning step updates
+        the plan from what was already done.
+
+        Args:
+            task: The task for the agent
+            agent_state: Agent state saved by an earlier attempt, if any
+
+        Returns:
+            Any: The agent's final answer
+
+        """
+        if agent_state is None or not agent_state.steps:
+            return self.agent.run(task)
+
+        logger.info(f"Resuming agent run after {agent_state.action_steps} checkpointed steps")
+        self.context.restore_citations(agent_state.citations)
+        self.agent.tool_outputs.update(agent_state.tool_outputs)
+        self.agent.memory.reset()
+        self.agent.memory.steps.extend(agent_state.steps)
+        self.resumed_steps = agent_state.action_steps
+        if agent_state.final_answer is not None:
+            return agent_state.final_answer
+        remaining_steps = max(1, self.agent.max_steps - agent_state.action_steps)
+        return self.agent.run(task, reset=False, max_steps=remaining_steps)
+
     def _initialize_allowed_tools(self) -> list[Tool]:
         """
         Initialize tools based on the allowed_tools field from processing instructions.
@@ -192,15 +286,13 @@ class EmailAgent:
         # Get allowed tools from processing instructions
         allowed_tools = self.processing_instructions.allowed_tools
 
-        # Create a routed model instance for tools that need it
-        model = RoutedLiteLLMModel()
-
-        # Create mapping of tool names to tool instances
+        # Build only the allowed tools; a model for tools that need one is created on demand
         tool_mapping = create_tool_mapping(
             context=self.context,
             scheduled_tasks_tool_factory=self._create_limited_scheduled_tasks_tool,
             allowed_python_imports=ALLOWED_PYTHON_IMPORTS,
-            model=model,
+            allowed_tools=allowed_tools,
+            tool_memo=self.tool_memo,
         )
 
         # Filter tools based on allowed list
@@ -209,7 +301,11 @@ class EmailAgent:
             if tool_name in tool_mapping:
                 tool_instance = tool_mapping[tool_name]
                 if tool_instance is not None:  # Handle tools that might not be available (e.g., missing API keys)
-                    filtered_tools.append(tool_instance)
+                    if tool_name == ToolName.DEEP_RESEARCH and self.enable_deep_research:
+                        tool_instance.enable_deep_research()
+                        if self.completed_research is not None:
+                            tool_instance.use_completed_research(self.completed_research)
+                    filtered_tools.append(self.step_profiler.wrap_tool(instrument_tool(tool_instance)))
                     logger.debug(f"Added allowed tool: {tool_name.value}")
                 else:
                     logger.warning(
@@ -457,6 +553,103 @@ class EmailAgent:
 
         return "\n\n".join(filter(None, sections))
 
+    def _can_answer_directly(self, email_request: EmailRequest, email_instructions: ProcessingInstructions) -> bool:
+        """
+        Check whether the email can be answered with a single completion instead of an agent run.
+
+        Only handles that opt in qualify, and only for emails with nothing to fetch or process:
+        no attachments, no links, no research and no scheduled task.
+
+        Args:
+            email_request: EmailRequest instance containing email data
+            email_instructions: ProcessingInstructions object containing processing configuration
+
+        Returns:
+            bool: Whether to try a direct answer first
+
+        """
+        body = email_request.textContent or email_request.htmlContent or ""
+        return (
+            DIRECT_ANSWER_ENABLED
+            and email_instructions.direct_answer
+            and not email_instructions.deep_research_mandatory
+            and not self.enable_deep_research
+            and not email_request.attachments
+            and not email_request.scheduled_task_id
+            and not email_request.distilled_processing_instructions
+            and not URL_PATTERN.search(f"{email_request.subject}\n{body}")
+        )
+
+    def _answer_directly(self, task: str) -> str | None:
+        """
+        Answer the task with a single completion, offering the agent's tools.
+
+        Args:
+            task: The task description for the agent
+
+        Returns:
+            str | None: The answer, or None if the model asked for a tool or gave no answer
+
+        """
+        start_time = time.time()
+        chat_message = self.routed_model(
+            messages=[{"role": "user", "content": f"{task}\n\n{DIRECT_ANSWER_GUIDELINES}"}],
+            tools_to_call_from=list(self.agent.tools.values()),
+            tool_choice="auto",
+        )
+        self.step_profiler.on_direct_answer(start_time, time.time(), chat_message.token_usage)
+
+        tool_calls = chat_message.tool_calls or []
+        if [tool_call.function.name for tool_call in tool_calls] == ["final_answer"]:
+            arguments = parse_json_if_needed(tool_calls[0].function.arguments)
+            answer = arguments.get("answer") if isinstance(arguments, dict) else arguments
+        elif tool_calls:
+            logger.info(
+                f"Direct answer asked for tools {[tool_call.function.name for tool_call in tool_calls]}, "
+                "running the agent"
+            )
+            return None
+        else:
+            answer = chat_message.content
+
+        if not answer or not str(answer).strip():
+            logger.info("Direct answer was empty, running the agent")
+            return None
+        return str(answer)
+
+    def _step_tool_outputs(self, step: Any) -> list[tuple[str, Any]]:
+        """
+        Get the name and output of every tool call made in an agent step.
+
+        Args:
+            step: Agent memory step
+
+        Returns:
+            list[tuple[str, Any]]: Tool name and output per call, in call order
+
+        """
+        tool_calls = getattr(step, "tool_calls", None)
+        if not isinstance(tool_calls, list):
+            return []
+
+        step_tool_outputs = []
+        for tool_call in tool_calls:
+            tool_name = getattr(tool_call, "name", None)
+            recorded = self.agent.tool_outputs.get(getattr(tool_call, "id", None))
+            if recorded is not None:
+                tool_output = recorded.output
+            elif len(tool_calls) == 1:
+                # Steps not run by ParallelToolCallingAgent only have the combined observations
+                action_out = getattr(step, "action_output", None)
+                tool_output = action_out if action_out is not None else getattr(step, "observations", None)
+            else:
+                tool_output = None
+            if not tool_name:
+                logger.warning(f"Could not extract tool name from call in step {getattr(step, 'step_number', '?')}")
+            elif tool_output is not None:
+                step_tool_outputs.append((tool_name, tool_output))
+        return step_tool_outputs
+
     def _process_agent_result(  # noqa: PLR0912, PLR0915
         self, final_answer_obj: Any, agent_steps: list, current_email_handle: str
     ) -> DetailedEmailProcessingResult:
@@ -487,21 +680,14 @@ class EmailAgent:
             for i, step in enumerate(agent_steps):
                 logger.debug(f"[Memory Step {i + 1}] Type: {type(step)}")
 
-                tool_name = None
-                tool_output = None
-
-                if hasattr(step, "tool_calls") and isinstance(step.tool_calls, list) and len(step.tool_calls) > 0:
-                    first_tool_call = step.tool_calls[0]
-                    tool_name = getattr(first_tool_call, "name", None)
-                    if not tool_name:
-                        logger.warning(f"[Memory Step {i + 1}] Could not extract tool name from first call.")
-                        tool_name = None
-
-                    action_out = getattr(step, "action_output", None)
-                    obs_out = getattr(step, "observations", None)
-                    tool_output = action_out if action_out is not None else obs_out
+                step_tool_outputs = self._step_tool_outputs(step)
+                if not step_tool_outputs:
+                    logger.debug(
+                        f"[Memory Step {i + 1}] Skipping step (Type: {type(step)}), not a relevant ActionStep or missing output."
+                    )
 
-                if tool_name and tool_output is not None:
+                for tool_name, raw_tool_output in step_tool_outputs:
+                    tool_output = raw_tool_output
                     needs_parsing = tool_name in [
                         "meeting_creator",
                         "attachment_processor",
@@ -648,10 +834,6 @@ class EmailAgent:
                         logger.debug(
                             f"[Memory Step {i + 1}] Tool '{tool_name}' output processed (no specific handler). Output: {str(tool_output)[:200]}..."
                         )
-                else:
-                    logger.debug(
-                        f"[Memory Step {i + 1}] Skipping step (Type: {type(step)}), not a relevant ActionStep or missing output."
-                    )
 
             # Extract final answer from LLM
             if hasattr(final_answer_obj, "text"):
@@ -829,15 +1011,45 @@ class EmailAgent:
             self.routed_model.current_handle = email_instructions
             task = self._create_task(email_request, email_instructions)
 
-            logger.info("Starting agent execution...")
-            final_answer_obj = self.agent.run(task)
-            logger.info("Agent execution completed.")
-
-            agent_steps = list(self.agent.memory.steps)
-            logger.info(f"Captured {len(agent_steps)} steps from agent memory.")
+            # Model time per step comes from the LLM usage tracker, opened by the worker task
+            with (
+                nullcontext()
+                if get_usage_tracker()
+                else track_llm_usage(email_instructions.handle, email_request.from_email)
+            ):
+                agent_state = self.checkpoint.load_agent_state() if self.checkpoint else None
+                final_answer_obj = None
+                if agent_state is None and self._can_answer_directly(email_request, email_instructions):
+                    logger.info("Trying a direct answer...")
+                    try:
+                        final_answer_obj = self._answer_directly(task)
+                    except RuntimeError as e:
+                        logger.warning(f"Direct answer failed, running the agent: {e}")
+
+                if final_answer_obj is None:
+                    logger.info("Starting agent execution...")
+                    final_answer_obj = self._run_agent(task, agent_state)
+                    logger.info("Agent execution completed.")
+                    agent_steps = list(self.agent.memory.steps)
+                    logger.info(f"Captured {len(agent_steps)} steps from agent memory.")
+                else:
+                    logger.info("Email answered directly, without running the agent.")
+                    agent_steps = []
 
             processed_result = self._process_agent_result(final_answer_obj, agent_steps, email_instructions.handle)
 
+            profile = self.step_profiler.build_profile()
+            profile.compaction_saved_chars = self.memory_compactor.saved_chars
+            profile.resumed_steps = self.resumed_steps
+            profile.memoized_tool_calls = self.tool_memo.hits if self.tool_memo else 0
+            processed_result.metadata.agent_profile = profile
+            logger.info(
+                f"Agent run took {profile.wall_time_ms} ms over {profile.action_steps} steps "
+                f"({profile.planning_steps} planning): {profile.model_time_ms} ms in model calls, "
+                f"{profile.tool_time_ms} ms in tools"
+            )
+            write_trace(profile, email_request.messageId or "", email_instructions.handle)
+
         except Exception as e:
             error_msg = f"Critical error in email processing: {e!s}"
             logger.exception(error_msg)
@@ -850,6 +1062,7 @@ class EmailAgent:
                     mode=email_instructions.handle if email_instructions else "unknown",
                     errors=[ProcessingError(message=error_msg, details=str(e))],
                     email_sent=EmailSentStatus(status="error", error=error_msg, timestamp=now_iso),
+                    agent_profile=self.step_profiler.build_profile(),
                 ),
                 email_content=EmailContentDetails(
                     text=self.report_formatter.format_report(
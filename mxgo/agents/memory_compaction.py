@@ -0,0 +1,208 @@
+"""
+Observation compaction for agent memory.
+
+smolagents rebuilds the prompt from the whole agent memory before every model call, so
+search results, visited pages and attachment contents from early steps are re-sent on
+every later step. ``MemoryCompactor`` sits between the agent memory and the model: it
+keeps the most recent observations verbatim, replaces older ones with extractive
+digests (title, headings and the lines carrying citation markers such as ``[#3]``) and,
+if the prompt is still over the handle's token budget, digests or drops observations
+oldest first. Only the messages sent to the model are compacted; the memory steps keep
+the full tool outputs for building the email result.
+"""
+
+import hashlib
+import json
+import re
+
+from smolagents import MultiStepAgent
+from smolagents.models import ChatMessage, MessageRole
+
+from mxgo._logging import get_logger
+from mxgo.config import AGENT_MEMORY_DIGEST_CHARS, AGENT_MEMORY_KEEP_RECENT_OBSERVATIONS
+
+logger = get_logger(__name__)
+
+# Rough token estimate, good enough for a budget that only decides how much to compact
+CHARS_PER_TOKEN = 4
+OBSERVATION_PREFIX = "Observation:\n"
+# Lines kept in digests: citation markers of the citation-aware tools ([#3]), numbered references ([3]) and links
+DIGEST_LINE_PATTERN = re.compile(r"\[#?\d+\]|https?://")
+# Citation markers still listed when an observation is dropped altogether
+CITATION_MARKER_PATTERN = re.compile(r"\[#\d+\]")
+MAX_DIGEST_LINE_CHARS = 300
+
+
+def _message_text(message: ChatMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(part.get("text", "") for part in message.content or [] if part.get("type") == "text")
+
+
+def _is_observation(message: ChatMessage) -> bool:
+    return message.role == MessageRole.TOOL_RESPONSE and _message_text(message).startswith(OBSERVATION_PREFIX)
+
+
+def _tool_output_content(observation: str) -> str:
+    """Get the content of a JSON ``ToolOutputWithCitations`` observation, or the observation itself."""
+    if not observation.startswith("{"):
+        return observation
+    try:
+        output = json.loads(observation)
+    except json.JSONDecodeError:
+        return observation
+    if isinstance(output, dict) and isinstance(output.get("content"), str):
+        return output["content"]
+    return observation
+
+
+def _omission_note(observation: str) -> str:
+    """Stand-in for a dropped observation, listing the citation markers it carried."""
+    markers = dict.fromkeys(CITATION_MARKER_PATTERN.findall(observation))
+    sources = f"; sources {', '.join(markers)}" if markers else ""
+    return f"[Earlier observation of {len(observation)} characters omitted to save context{sources}]"
+
+
+def digest_observation(observation: str, max_chars: int) -> str:
+    """
+    Shorten an observation to an extractive digest that keeps its citation markers.
+
+    The digest keeps the first line, headings and every line with a citation marker or a
+    link, in their original order, until ``max_chars`` is reached. Observations without
+    any of those are cut to their beginning.
+
+    Args:
+        observation: Tool output as shown to the model
+        max_chars: Maximum length of the digest, before its trailing note
+
+    Returns:
+        str: The digest, or the observation itself if it is already short enough
+
+    """
+    if len(observation) <= max_chars:
+        return observation
+
+    content = _tool_output_content(observation)
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    kept: list[str] = []
+    size = 0
+    for i, line in enumerate(lines):
+        if i > 0 and not line.startswith("#") and not DIGEST_LINE_PATTERN.search(line):
+            continue
+        line = line[:MAX_DIGEST_LINE_CHARS]  # noqa: PLW2901
+        if size + len(line) > max_chars:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    digest = "\n".join(kept) if len(kept) > 1 else content[:max_chars]
+    digest = f"{digest}\n[Digest of an earlier observation: {len(digest)} of {len(observation)} characters kept]"
+    return digest if len(digest) < len(observation) else observation
+
+
+class MemoryCompactor:
+    """Compacts the observations in an agent's prompt to stay within a token budget."""
+
+    def __init__(
+        self,
+        token_budget: int,
+        keep_recent: int = AGENT_MEMORY_KEEP_RECENT_OBSERVATIONS,
+        digest_chars: int = AGENT_MEMORY_DIGEST_CHARS,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            token_budget: Prompt size to stay under, in estimated tokens
+            keep_recent: Number of most recent observations kept verbatim while within budget
+            digest_chars: Maximum length of an observation digest
+
+        """
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.digest_chars = digest_chars
+        # Characters left out of the prompts, summed over every model call of the run
+        self.saved_chars = 0
+        self._digests: dict[str, str] = {}
+
+    def wrap_agent(self, agent: MultiStepAgent) -> MultiStepAgent:
+        """
+        Compact the messages the agent builds from its memory before every model call.
+
+        Args:
+            agent: Agent instance, wrapped in place
+
+        Returns:
+            MultiStepAgent: The same agent instance
+
+        """
+        write_memory_to_messages = agent.write_memory_to_messages
+
+        def compacted_write_memory_to_messages(*args, **kwargs) -> list[ChatMessage]:
+            return self.compact(write_memory_to_messages(*args, **kwargs))
+
+        agent.write_memory_to_messages = compacted_write_memory_to_messages
+        return agent
+
+    def _digest(self, observation: str, max_chars: int) -> str:
+        key = f"{max_chars}:{hashlib.sha256(observation.encode()).hexdigest()}"
+        if key not in self._digests:
+            self._digests[key] = digest_observation(observation, max_chars)
+        return self._digests[key]
+
+    def compact(self, messages: list[ChatMessage]) -> list[ChatMessage]:
+        """
+        Compact the observations in a prompt.
+
+        Observations older than the ``keep_recent`` latest are digested. If the prompt is
+        still over budget, the remaining observations but the latest are digested and then
+        cut down to a one-line note, oldest first. The task and the other messages are never
+        changed.
+
+        Args:
+            messages: Messages built from the agent memory
+
+        Returns:
+            list[ChatMessage]: The messages to send to the model
+
+        """
+        observations = {
+            i: _message_text(message).removeprefix(OBSERVATION_PREFIX)
+            for i, message in enumerate(messages)
+            if _is_observation(message)
+        }
+        if not observations:
+            return messages
+
+        compacted = dict(observations)
+        indices = list(observations)
+        for i in indices[: max(0, len(indices) - self.keep_recent)]:
+            compacted[i] = self._digest(observations[i], self.digest_chars)
+
+        other_chars = sum(len(_message_text(message)) for i, message in enumerate(messages) if i not in observations)
+
+        def over_budget() -> bool:
+            chars = other_chars + sum(len(OBSERVATION_PREFIX) + len(text) for text in compacted.values())
+            return chars // CHARS_PER_TOKEN > self.token_budget
+
+        # The latest observation is what the model is about to act on, so it is always kept
+        for i in indices[:-1]:
+            if not over_budget():
+                break
+            compacted[i] = self._digest(observations[i], self.digest_chars)
+        for i in indices[:-1]:
+            if not over_budget():
+                break
+            compacted[i] = min(compacted[i], _omission_note(observations[i]), key=len)
+
+        saved_chars = sum(len(observations[i]) - len(compacted[i]) for i in indices)
+        if saved_chars <= 0:
+            return messages
+        self.saved_chars += saved_chars
+        logger.debug(f"Compacted agent memory by {saved_chars} characters")
+
+        return [
+            ChatMessage(role=message.role, content=[{"type": "text", "text": OBSERVATION_PREFIX + compacted[i]}])
+            if i in compacted and compacted[i] != observations[i]
+            else message
+            for i, message in enumerate(messages)
+        ]
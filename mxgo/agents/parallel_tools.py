@@ -0,0 +1,159 @@
+"""
+Concurrent execution of the tool calls the model makes in one agent step.
+
+``ParallelToolCallingAgent`` is a ``ToolCallingAgent`` that runs the independent calls
+of a step on a bounded thread pool, with a per-tool limit on how many calls of the
+same tool run at once. Each call collects its citations under placeholder IDs; once
+the calls finish, outputs are merged and citations numbered in the order the model
+emitted the calls, so a step's result does not depend on which call finished first.
+Tools that read the collected citations, such as the references generator, are not run
+concurrently: each runs once the calls before it are committed, as it would if the calls
+ran one by one. Every call's output is kept by call ID for the result post-processing.
+"""
+
+import threading
+from collections.abc import Collection, Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any
+
+from rich.panel import Panel
+from rich.text import Text
+from smolagents import ToolCallingAgent
+from smolagents.agent_types import AgentAudio, AgentImage
+from smolagents.agents import ToolOutput
+from smolagents.memory import ActionStep, ToolCall
+from smolagents.models import ChatMessage
+from smolagents.monitoring import LogLevel
+
+from mxgo._logging import get_logger
+from mxgo.request_context import CitationManager, RequestContext, replace_citation_ids
+
+logger = get_logger(__name__)
+
+
+class ParallelToolCallingAgent(ToolCallingAgent):
+    """ToolCallingAgent that runs the tool calls of a step concurrently, merged in call order."""
+
+    def __init__(
+        self,
+        *args: Any,
+        context: RequestContext,
+        tool_concurrency_limits: dict[str, int] | None = None,
+        citation_reading_tools: Collection[str] = (),
+        **kwargs: Any,
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            *args: Positional arguments of ``ToolCallingAgent``
+            context: Request context the tools add their citations to
+            tool_concurrency_limits: Most calls of a tool that may run at once, by tool name;
+                tools not listed are only bounded by ``max_tool_threads``
+            citation_reading_tools: Names of the tools that read the citations collected so
+                far, run after the calls before them instead of concurrently
+            **kwargs: Keyword arguments of ``ToolCallingAgent``; ``max_tool_threads`` of 1
+                runs the calls of a step one after another
+
+        """
+        super().__init__(*args, **kwargs)
+        self.context = context
+        self._tool_semaphores = {
+            name: threading.Semaphore(limit) for name, limit in (tool_concurrency_limits or {}).items()
+        }
+        self.citation_reading_tools = frozenset(citation_reading_tools)
+        # Output of every tool call of the run, by call ID
+        self.tool_outputs: dict[str, ToolOutput] = {}
+
+    def _run_tool_call(self, tool_call: ToolCall) -> ToolOutput:
+        """Run one tool call, within its tool's concurrency limit."""
+        arguments = tool_call.arguments or {}
+        self.logger.log(
+            Panel(Text(f"Calling tool: '{tool_call.name}' with arguments: {arguments}")), level=LogLevel.INFO
+        )
+        semaphore = self._tool_semaphores.get(tool_call.name)
+        if semaphore:
+            with semaphore:
+                result = self.execute_tool_call(tool_call.name, arguments)
+        else:
+            result = self.execute_tool_call(tool_call.name, arguments)
+
+        if isinstance(result, AgentImage | AgentAudio):
+            observation_name = "image.png" if isinstance(result, AgentImage) else "audio.mp3"
+            self.state[observation_name] = result
+            observation = f"Stored '{observation_name}' in memory."
+        else:
+            observation = str(result).strip()
+        self.logger.log(f"Observations: {observation.replace('[', '|')}", level=LogLevel.INFO)
+        return ToolOutput(
+            id=tool_call.id,
+            output=result,
+            is_final_answer=tool_call.name == "final_answer",
+            observation=observation,
+            tool_call=tool_call,
+        )
+
+    def _run_deferred_tool_call(self, tool_call: ToolCall) -> tuple[ToolOutput, CitationManager]:
+        """Run one of several concurrent tool calls, holding back its citations."""
+        with self.context.deferred_citations() as citations:
+            return self._run_tool_call(tool_call), citations
+
+    def _commit_tool_output(self, tool_output: ToolOutput, citations: CitationManager) -> ToolOutput:
+        """Number a concurrent call's citations and put the real IDs in its output."""
+        id_map = self.context.commit_deferred_citations(citations)
+        if id_map:
+            tool_output.observation = replace_citation_ids(tool_output.observation, id_map)
+            if isinstance(tool_output.output, str):
+                tool_output.output = replace_citation_ids(tool_output.output, id_map)
+        return tool_output
+
+    def process_tool_calls(
+        self, chat_message: ChatMessage, memory_step: ActionStep
+    ) -> Generator[ToolCall | ToolOutput]:
+        """
+        Run the tool calls of a step and record their observations in the step.
+
+        Args:
+            chat_message: Model output holding the tool calls
+            memory_step: Step to record the calls and observations in
+
+        Yields:
+            ToolCall | ToolOutput: Every tool call, then every output, in call order
+
+        """
+        tool_calls = [
+            ToolCall(name=tool_call.function.name, arguments=tool_call.function.arguments, id=tool_call.id)
+            for tool_call in chat_message.tool_calls or []
+        ]
+        yield from tool_calls
+
+        outputs: list[ToolOutput] = []
+        if len(tool_calls) == 1 or (self.max_tool_threads or 0) == 1:
+            for tool_call in tool_calls:
+                outputs.append(self._run_tool_call(tool_call))
+                yield outputs[-1]
+        else:
+            logger.debug(f"Running {len(tool_calls)} tool calls concurrently")
+            concurrent = [tool_call.name not in self.citation_reading_tools for tool_call in tool_calls]
+            workers = min(sum(concurrent) or 1, self.max_tool_threads or len(tool_calls))
+            with ThreadPoolExecutor(workers) as executor:
+                futures = [
+                    executor.submit(copy_context().run, self._run_deferred_tool_call, tool_call)
+                    if is_concurrent
+                    else None
+                    for tool_call, is_concurrent in zip(tool_calls, concurrent, strict=True)
+                ]
+                # Collected in call order, so citations are numbered as if the calls ran one by one
+                for tool_call, future in zip(tool_calls, futures, strict=True):
+                    if future is None:
+                        # Sees the citations of the calls before it, which are committed by now
+                        outputs.append(self._run_tool_call(tool_call))
+                    else:
+                        outputs.append(self._commit_tool_output(*future.result()))
+                    yield outputs[-1]
+
+        self.tool_outputs.update((tool_output.id, tool_output) for tool_output in outputs)
+        memory_step.tool_calls = tool_calls
+        observations = (memory_step.observations or "") + "".join(f"{output.observation}\n" for output in outputs)
+        memory_step.observations = observations.rstrip("\n")
@@ -0,0 +1,204 @@
+"""
+Per-step profiler for agent runs.
+
+``AgentStepProfiler`` is registered as a ``ToolCallingAgent`` step callback and wraps
+the agent's tools. For every planning and action step, and for the single completion
+tried first for handles that can answer directly, it records wall time, time spent in
+model calls (from the LLM usage tracker), each tool call with a hash of its arguments
+and its duration, observation size and token counts. The resulting
+``AgentRunProfile`` is stored in the email's ``ProcessingMetadata``, and a sample of
+runs is appended to JSONL trace files read by ``mxgo.scripts.agent_profile_report``.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from smolagents import AgentMaxStepsError, Tool
+from smolagents.memory import ActionStep, MemoryStep, PlanningStep
+from smolagents.monitoring import TokenUsage
+
+from mxgo._logging import get_logger
+from mxgo.config import AGENT_PROFILE_SAMPLE_RATE, AGENT_PROFILE_TRACE_DIR
+from mxgo.llm_usage import get_usage_tracker
+from mxgo.schemas import AgentRunProfile, AgentStepProfile, ToolCallProfile
+
+logger = get_logger(__name__)
+
+
+def hash_tool_arguments(arguments: Any) -> str:
+    """Hash tool call arguments, so repeated identical calls can be spotted without storing them."""
+    payload = json.dumps(arguments, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+class AgentStepProfiler:
+    """Collects a per-step timeline of one agent run."""
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self.max_steps_reached = False
+        self.steps: list[AgentStepProfile] = []
+        self._run_start: float | None = None
+        self._pending_tool_calls: list[ToolCallProfile] = []
+        self._llm_calls_seen = 0
+        self._tool_llm_ms = 0
+        self._lock = threading.Lock()
+
+    def wrap_tool(self, tool: Tool) -> Tool:
+        """
+        Time every call to a tool for the step it is made in.
+
+        Args:
+            tool: Tool instance, wrapped in place
+
+        Returns:
+            Tool: The same tool instance
+
+        """
+        forward = tool.forward
+
+        @wraps(forward)
+        def profiled_forward(*args: Any, **kwargs: Any) -> Any:
+            tracker = get_usage_tracker()
+            llm_calls_before = len(tracker.calls) if tracker else 0
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = forward(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                call = ToolCallProfile(
+                    name=tool.name,
+                    args_hash=hash_tool_arguments(kwargs or list(args)),
+                    duration_ms=round((time.perf_counter() - start) * 1000),
+                    error=failed,
+                )
+                # LLM calls made by the tool count as tool time, not model time
+                tool_llm_ms = sum(c.latency_ms for c in tracker.calls[llm_calls_before:]) if tracker else 0
+                with self._lock:
+                    self._pending_tool_calls.append(call)
+                    self._tool_llm_ms += tool_llm_ms
+
+        tool.forward = profiled_forward
+        return tool
+
+    def _take_model_time_ms(self) -> int:
+        tracker = get_usage_tracker()
+        if tracker is None:
+            return 0
+        calls = tracker.calls[self._llm_calls_seen :]
+        self._llm_calls_seen += len(calls)
+        return sum(call.latency_ms for call in calls)
+
+    def on_step(self, step: MemoryStep) -> None:
+        """Step callback recording a finished planning or action step."""
+        if not isinstance(step, ActionStep | PlanningStep):
+            return
+        if self._run_start is None:
+            self._run_start = step.timing.start_time
+
+        with self._lock:
+            tool_calls, self._pending_tool_calls = self._pending_tool_calls, []
+            tool_llm_ms, self._tool_llm_ms = self._tool_llm_ms, 0
+        model_time_ms = max(0, self._take_model_time_ms() - tool_llm_ms)
+
+        observation_chars = 0
+        error = None
+        if isinstance(step, ActionStep):
+            timed_names = [call.name for call in tool_calls]
+            for tool_call in step.tool_calls or []:
+                if tool_call.name in timed_names:
+                    timed_names.remove(tool_call.name)
+                else:
+                    tool_calls.append(
+                        ToolCallProfile(name=tool_call.name, args_hash=hash_tool_arguments(tool_call.arguments))
+                    )
+            observation_chars = len(step.observations or "")
+            error = str(step.error) if step.error else None
+            self.max_steps_reached = self.max_steps_reached or isinstance(step.error, AgentMaxStepsError)
+
+        token_usage = step.token_usage
+        self.steps.append(
+            AgentStepProfile(
+                step_number=step.step_number if isinstance(step, ActionStep) else None,
+                step_type="action" if isinstance(step, ActionStep) else "planning",
+                started_at_ms=round((step.timing.start_time - self._run_start) * 1000),
+                wall_time_ms=round((step.timing.duration or 0) * 1000),
+                model_time_ms=model_time_ms,
+                tool_time_ms=sum(call.duration_ms or 0 for call in tool_calls),
+                tool_calls=tool_calls,
+                observation_chars=observation_chars,
+                input_tokens=token_usage.input_tokens if token_usage else 0,
+                output_tokens=token_usage.output_tokens if token_usage else 0,
+                error=error,
+            )
+        )
+
+    def on_direct_answer(self, start_time: float, end_time: float, token_usage: TokenUsage | None) -> None:
+        """Record the single completion tried before running the agent."""
+        if self._run_start is None:
+            self._run_start = start_time
+        self.steps.append(
+            AgentStepProfile(
+                step_type="direct",
+                started_at_ms=round((start_time - self._run_start) * 1000),
+                wall_time_ms=round((end_time - start_time) * 1000),
+                model_time_ms=self._take_model_time_ms(),
+                tool_time_ms=0,
+                input_tokens=token_usage.input_tokens if token_usage else 0,
+                output_tokens=token_usage.output_tokens if token_usage else 0,
+            )
+        )
+
+    def build_profile(self) -> AgentRunProfile:
+        """Build the run's timeline from the recorded steps."""
+        action_steps = [step for step in self.steps if step.step_type == "action"]
+        planning_steps = [step for step in self.steps if step.step_type == "planning"]
+        wall_time_ms = max((step.started_at_ms + step.wall_time_ms for step in self.steps), default=0)
+        return AgentRunProfile(
+            wall_time_ms=wall_time_ms,
+            model_time_ms=sum(step.model_time_ms for step in self.steps),
+            tool_time_ms=sum(step.tool_time_ms for step in self.steps),
+            action_steps=len(action_steps),
+            planning_steps=len(planning_steps),
+            max_steps_reached=self.max_steps_reached,
+            answered_directly=any(step.step_type == "direct" for step in self.steps) and not action_steps,
+            steps=self.steps,
+        )
+
+
+def write_trace(profile: AgentRunProfile, email_id: str, handle: str) -> Path | None:
+    """
+    Append a run's timeline to the day's trace file, for a sample of runs.
+
+    Args:
+        profile: The run's timeline
+        email_id: ID of the processed email
+        handle: Handle the email was processed with
+
+    Returns:
+        Path | None: The trace file written to, or None if the run was not sampled
+
+    """
+    if AGENT_PROFILE_SAMPLE_RATE <= 0 or random.random() >= AGENT_PROFILE_SAMPLE_RATE:  # noqa: S311
+        return None
+
+    now = datetime.now(timezone.utc)
+    record = {"email_id": email_id, "handle": handle, "recorded_at": now.isoformat(), **profile.model_dump()}
+    trace_file = Path(AGENT_PROFILE_TRACE_DIR) / f"agent-profile-{now:%Y%m%d}.jsonl"
+    try:
+        trace_file.parent.mkdir(parents=True, exist_ok=True)
+        with trace_file.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to write agent trace to {trace_file}: {e}")
+        return None
+    return trace_file
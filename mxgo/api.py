@@ -1,6 +1,8 @@
+import asyncio
 import json
 import os
 import shutil
+import time
 import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
@@ -10,25 +12,42 @@ from typing import Annotated, Any
 import aiofiles
 import redis.asyncio as aioredis
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, File, Form, HTTPException, Response, UploadFile, status
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, Response, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader, HTTPBearer
 from sqlalchemy import text
 
 from mxgo import crud, user, validators, whitelist
 from mxgo._logging import get_logger
+from mxgo.admission import AdmissionAction, AdmissionController, AdmissionDecision
 from mxgo.auth import AuthInfo, get_current_user
-from mxgo.config import ATTACHMENTS_DIR, NEWSLETTER_LIMITS_BY_PLAN, RATE_LIMITS_BY_PLAN, SKIP_EMAIL_DELIVERY
+from mxgo.broker import rabbitmq_broker
+from mxgo.config import (
+    ATTACHMENTS_DIR,
+    METRICS_ENABLED,
+    NEWSLETTER_LIMITS_BY_PLAN,
+    RATE_LIMITS_BY_PLAN,
+    REDIS_URL,
+    SKIP_EMAIL_DELIVERY,
+)
 from mxgo.db import init_db_connection
 from mxgo.dependencies import processing_instructions_resolver
 from mxgo.email_sender import (
     generate_email_id,
     send_email_reply,
 )
+from mxgo.metrics import (
+    API_STAGE_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_RESPONSE_BYTES,
+    observe_latency,
+    render_metrics,
+    time_stage,
+)
 from mxgo.models import TaskStatus
 from mxgo.prompts.template_prompts import NEWSLETTER_TEMPLATE
 from mxgo.reply_generation import generate_replies
-from mxgo.routed_litellm_model import RoutedLiteLLMModel
+from mxgo.research_jobs import get_research_progress
 from mxgo.scheduling.scheduled_task_executor import execute_scheduled_task
 from mxgo.scheduling.scheduler import Scheduler, is_one_time_task
 from mxgo.schemas import (
@@ -42,6 +61,7 @@ from mxgo.schemas import (
     HandlerAlias,
     NewsletterUsageInfo,
     ReplyCandidate,
+    ResearchJobProgress,
     ScheduleType,
     UsageInfo,
     UsagePeriod,
@@ -49,11 +69,12 @@ from mxgo.schemas import (
     UserPlan,
 )
 from mxgo.suggestions import generate_suggestions, get_suggestions_model
-from mxgo.tasks import process_email_task, rabbitmq_broker
+from mxgo.task_client import deferred_email_task, process_email_task
 from mxgo.utils import calculate_cron_interval, convert_schedule_to_cron_list
 from mxgo.validators import (
     check_rate_limit_redis,
     get_current_usage_redis,
+    release_idempotency_claim,
     validate_api_key,
     validate_attachments,
     validate_email_handle,
@@ -65,18 +86,6 @@ from mxgo.validators import (
 # Load environment variables
 load_dotenv()
 
-# Redis Configuration
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = os.getenv("REDIS_PORT", "6379")
-REDIS_DB = os.getenv("REDIS_DB", "0")
-REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
-
-if REDIS_PASSWORD:
-    REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
-else:
-    REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
-
-
 # Constants
 MAX_FILENAME_LENGTH = 100
 FILENAME_TRUNCATE_BUFFER = 5
@@ -84,6 +93,9 @@ FILENAME_TRUNCATE_BUFFER = 5
 # Configure logging
 logger = get_logger(__name__)
 
+# Admission of /process-email emails given the load of the email queue
+admission_controller = AdmissionController(rabbitmq_broker, process_email_task.queue_name)
+
 
 # Lifespan manager for app startup and shutdown
 @asynccontextmanager
@@ -152,6 +164,26 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record latency and response size per route."""
+    start = time.perf_counter()
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        # Label by route template, so path parameters like email IDs do not create new series
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_SECONDS.labels(method=request.method, route=route_path, status=str(status_code)).observe(
+            time.perf_counter() - start
+        )
+    if content_length := response.headers.get("content-length"):
+        HTTP_RESPONSE_BYTES.labels(method=request.method, route=route_path).observe(int(content_length))
+    return response
+
+
 if os.getenv("IS_PROD", "false").lower() == "true":
     app.openapi_url = None
 
@@ -199,6 +231,15 @@ async def health_check():
     return health_status
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
 # Function to cleanup attachment files and directory
 def cleanup_attachments(directory_path: str) -> bool:
     """
@@ -280,6 +321,31 @@ def create_error_response(summary: str, attachment_info: list[dict[str, Any]], e
     )
 
 
+def create_admission_rejection_response(decision: AdmissionDecision) -> Response:
+    """
+    Create the response turning an email away while the email queue is backed up
+
+    Args:
+        decision (AdmissionDecision): The admission decision rejecting the email
+
+    Returns:
+        Response: FastAPI Response object with a Retry-After header
+
+    """
+    return Response(
+        content=json.dumps(
+            {
+                "message": "Too many emails are waiting to be processed. Please try again later.",
+                "status": "error",
+                "retry_after": decision.retry_after_seconds,
+            }
+        ),
+        status_code=decision.status_code,
+        headers={"Retry-After": str(decision.retry_after_seconds)},
+        media_type="application/json",
+    )
+
+
 # Helper function to handle uploaded files
 async def handle_file_attachments(  # noqa: PLR0912
     attachments: list[EmailAttachment], email_id: str, email_data: EmailRequest
@@ -627,18 +693,20 @@ async def process_email(  # noqa: PLR0912, PLR0915
             media_type="application/json",
         )
     # Validate API key
-    elif response := await validate_api_key(api_key):
+    elif response := await time_stage("api_key", validate_api_key(api_key)):
         pass  # response already set
     else:
         # Get actual user plan for rate limiting
         try:
-            user_plan = await user.get_user_plan(from_email)
+            user_plan = await time_stage("user_plan", user.get_user_plan(from_email))
         except Exception as e:
             logger.warning(f"Could not determine user plan for {from_email}, falling back to BETA: {e}")
             user_plan = UserPlan.BETA
 
         # Apply rate limits based on actual user plan
-        if response := await validate_rate_limits(from_email, to, subject, message_id, plan=user_plan):
+        if response := await time_stage(
+            "rate_limits", validate_rate_limits(from_email, to, subject, message_id, plan=user_plan)
+        ):
             pass  # response already set
         else:
             # Initialize variables
@@ -655,10 +723,14 @@ async def process_email(  # noqa: PLR0912, PLR0915
                         # Continue processing even if headers are malformed
 
                 # Validate email whitelist
-                if response := await validate_email_whitelist(from_email, to, subject, message_id):
+                if response := await time_stage(
+                    "whitelist", validate_email_whitelist(from_email, to, subject, message_id)
+                ):
                     pass  # response already set
                 # Validate email handle
-                handle_result = await validate_email_handle(to, from_email, subject, message_id)
+                handle_result = await time_stage(
+                    "email_handle", validate_email_handle(to, from_email, subject, message_id)
+                )
                 response, handle = handle_result
                 if response:
                     pass  # response already set
@@ -697,22 +769,33 @@ async def process_email(  # noqa: PLR0912, PLR0915
                         )
 
                 # Validate attachments
-                if response := await validate_attachments(
-                    attachments_for_validation, from_email, to, subject, message_id
+                if response := await time_stage(
+                    "attachments", validate_attachments(attachments_for_validation, from_email, to, subject, message_id)
                 ):
                     pass  # response already set
+                # Check the email queue can take the email; bulk senders are turned away while it is backed up
+                elif (
+                    admission := await time_stage(
+                        "admission",
+                        admission_controller.admit(handle, from_email, parsed_headers, scheduled=is_scheduled_task),
+                    )
+                ).action is AdmissionAction.REJECT:
+                    response = create_admission_rejection_response(admission)
                 else:
                     try:
                         # Check for idempotency (duplicate processing)
-                        idempotency_response = await validate_idempotency(
-                            from_email=from_email,
-                            to=to,
-                            subject=subject or "",
-                            date=date or "",
-                            html_content=html_content or "",
-                            text_content=text_content or "",
-                            files_count=len(files) if files is not None else 0,
-                            message_id=message_id,
+                        idempotency_response = await time_stage(
+                            "idempotency",
+                            validate_idempotency(
+                                from_email=from_email,
+                                to=to,
+                                subject=subject or "",
+                                date=date or "",
+                                html_content=html_content or "",
+                                text_content=text_content or "",
+                                files_count=len(files) if files is not None else 0,
+                                message_id=message_id,
+                            ),
                         )
                         if idempotency_response:
                             response_obj, message_id = idempotency_response
@@ -757,8 +840,9 @@ async def process_email(  # noqa: PLR0912, PLR0915
                             email_attachments_dir = ""
                             attachment_info = []
                             if email_instructions.process_attachments and email_attachments:
-                                email_attachments_dir, attachment_info = await handle_file_attachments(
-                                    email_attachments, email_id, email_request
+                                email_attachments_dir, attachment_info = await time_stage(
+                                    "attachment_write",
+                                    handle_file_attachments(email_attachments, email_id, email_request),
                                 )
                                 logger.info(f"Processed {len(attachment_info)} attachments successfully")
                                 logger.info(f"Attachments directory: {email_attachments_dir}")
@@ -778,13 +862,21 @@ async def process_email(  # noqa: PLR0912, PLR0915
                                     f"(type: {processed_info['type']}, size: {processed_info['size']} bytes)"
                                 )
 
-                            # Enqueue the task for async processing
-                            process_email_task.send(
-                                email_request.model_dump(),
-                                email_attachments_dir,
-                                processed_attachment_info,
-                                scheduled_task_id,
+                            # Enqueue the task for async processing. Under load, low-priority emails go to
+                            # the deferred queue and the others may be tagged for a cheaper model group
+                            email_task = (
+                                deferred_email_task if admission.action is AdmissionAction.DEFER else process_email_task
                             )
+                            with observe_latency(API_STAGE_SECONDS, stage="enqueue"):
+                                email_task.send(
+                                    email_request.model_dump(),
+                                    email_attachments_dir,
+                                    processed_attachment_info,
+                                    scheduled_task_id,
+                                    email_id,
+                                    user_plan=user_plan.value,
+                                    model_group=admission.model_group,
+                                )
                             logger.info(
                                 f"Enqueued email {email_id} for processing with {len(processed_attachment_info)} attachments"
                                 f"{f' (scheduled task: {scheduled_task_id})' if scheduled_task_id else ''}"
@@ -806,6 +898,9 @@ async def process_email(  # noqa: PLR0912, PLR0915
 
                     except Exception as e:
                         logger.error(f"Error processing email request: {e}")
+                        if message_id and not response:
+                            # The email was claimed but not enqueued; accept its redelivery
+                            await release_idempotency_claim(message_id)
                         response = create_error_response(
                             summary="Error processing email",
                             attachment_info=[],
@@ -835,6 +930,31 @@ async def process_email(  # noqa: PLR0912, PLR0915
     )
 
 
+@app.get("/research-jobs/{email_id}")
+async def get_research_job(
+    email_id: str,
+    api_key: Annotated[str, Depends(api_auth_scheme)] = ...,
+) -> ResearchJobProgress:
+    """
+    Get the progress of the background deep research job for an email.
+
+    Args:
+        email_id: The email ID returned by /process-email
+        api_key: API key for authentication
+
+    Returns:
+        ResearchJobProgress: Job status, partial findings and visited URLs so far
+
+    """
+    if response := await validate_api_key(api_key):
+        return response
+
+    progress = await asyncio.to_thread(get_research_progress, email_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No research job for email {email_id}")
+    return progress
+
+
 @app.post("/suggestions")
 async def process_suggestions(
     requests: list[EmailSuggestionRequest],
@@ -921,6 +1041,8 @@ async def _generate_newsletter_subject(prompt: str, *, is_sample: bool = False)
 
     """
     try:
+        # Imported here to keep LiteLLM and smolagents out of the API's import time
+        from mxgo.routed_litellm_model import RoutedLiteLLMModel  # NOQA: PLC0415
 
         model = RoutedLiteLLMModel(
             target_model=os.getenv("LITELLM_SUGGESTIONS_MODEL_GROUP", "gpt-4"),
@@ -0,0 +1,45 @@
+"""
+The RabbitMQ broker shared by the API, which enqueues tasks, and the workers, which run them.
+
+Importing this module sets the broker as Dramatiq's global broker. It stays light on
+purpose: the API imports it without importing the task code in ``mxgo.tasks``.
+"""
+
+import os
+
+import dramatiq
+from dotenv import load_dotenv
+from dramatiq.brokers.rabbitmq import RabbitmqBroker
+from dramatiq.middleware import CurrentMessage
+from dramatiq.middleware.prometheus import Prometheus
+
+from mxgo.admission import QueueLagTracker
+from mxgo.config import ADMISSION_CONTROL_ENABLED, METRICS_ENABLED
+from mxgo.metrics import QueueWaitMetrics
+
+# Load environment variables
+load_dotenv()
+
+# Build RabbitMQ URL from environment variables (Broker)
+# Include heartbeat as a query parameter in the URL
+RABBITMQ_HEARTBEAT = os.getenv("RABBITMQ_HEARTBEAT", "5")
+RABBITMQ_URL = f"amqp://{os.getenv('RABBITMQ_USER', 'guest')}:{os.getenv('RABBITMQ_PASSWORD', 'guest')}@{os.getenv('RABBITMQ_HOST', 'localhost')}:{os.getenv('RABBITMQ_PORT', '5672')}{os.getenv('RABBITMQ_VHOST', '/')}?heartbeat={RABBITMQ_HEARTBEAT}"
+
+# Initialize RabbitMQ broker
+rabbitmq_broker = RabbitmqBroker(
+    url=RABBITMQ_URL,
+    confirm_delivery=True,  # Ensures messages are delivered
+)
+# Lets tasks see their message, e.g. how many retries it has left
+rabbitmq_broker.add_middleware(CurrentMessage())
+if METRICS_ENABLED:
+    # Prometheus exports the worker metrics (including mxgo's) on dramatiq_prom_port. It is
+    # part of Dramatiq's default middleware; a second instance would double-count the
+    # dramatiq_* metrics and try to serve them on the same port
+    if not any(isinstance(middleware, Prometheus) for middleware in rabbitmq_broker.middleware):
+        rabbitmq_broker.add_middleware(Prometheus())
+    rabbitmq_broker.add_middleware(QueueWaitMetrics())
+if ADMISSION_CONTROL_ENABLED:
+    # Workers report the queue wait the API's admission controller reads as consumer lag
+    rabbitmq_broker.add_middleware(QueueLagTracker())
+dramatiq.set_broker(rabbitmq_broker)
@@ -0,0 +1,274 @@
+"""
+Shared two-level TTL cache.
+
+Values live in a small in-process LRU for the hot path and in Redis so that
+entries are shared across worker processes. Redis is strictly best-effort: if it
+is unreachable the cache keeps working from the local layer alone.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+import redis
+
+from mxgo._logging import get_logger
+from mxgo.config import REDIS_URL
+
+logger = get_logger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+REDIS_RETRY_BACKOFF_SECONDS = 30
+REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+
+_redis_client: redis.Redis | None = None
+_redis_unavailable_until = 0.0
+_redis_lock = threading.Lock()
+
+
+def get_redis_client() -> redis.Redis | None:
+    """
+    Get the process-wide synchronous Redis client used by caches.
+
+    Returns:
+        redis.Redis | None: The client, or None while Redis is considered unavailable
+
+    """
+    global _redis_client, _redis_unavailable_until  # noqa: PLW0603
+
+    if _redis_client is not None:
+        return _redis_client
+    if time.monotonic() < _redis_unavailable_until:
+        return None
+
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        try:
+            client = redis.Redis.from_url(
+                REDIS_URL,
+                decode_responses=True,
+                socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+            client.ping()
+        except redis.RedisError as e:
+            logger.warning(f"Redis unavailable for caching, using in-process cache only: {e}")
+            _redis_unavailable_until = time.monotonic() + REDIS_RETRY_BACKOFF_SECONDS
+            return None
+        _redis_client = client
+        return _redis_client
+
+
+def _mark_redis_unavailable(error: Exception) -> None:
+    """Drop the shared client after an error so the next call reconnects after the backoff."""
+    global _redis_client, _redis_unavailable_until  # noqa: PLW0603
+    logger.warning(f"Redis cache operation failed: {error}")
+    _redis_client = None
+    _redis_unavailable_until = time.monotonic() + REDIS_RETRY_BACKOFF_SECONDS
+
+
+class TTLCache:
+    """
+    In-process LRU with per-entry TTL, backed by Redis.
+
+    Values must be JSON-serializable so they can be shared through Redis.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 512, *, max_bytes: int | None = None, use_redis: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Prefix for Redis keys, e.g. "search"
+            max_entries: Maximum number of entries held in the in-process layer
+            max_bytes: Maximum total serialized size of entries held in the in-process layer (None for no limit)
+            use_redis: Whether to read from and write to Redis
+
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                self._pop_local(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _pop_local(self, key: str) -> None:
+        """Remove a local entry. Caller must hold the lock."""
+        del self._entries[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _set_local(self, key: str, value: Any, expires_at: float, size: int = 0) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop_local(key)
+            self._entries[key] = (expires_at, value)
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                self._pop_local(next(iter(self._entries)))
+
+    def get(self, key: str) -> Any | None:
+        """
+        Look up a value, checking the local layer before Redis.
+
+        Args:
+            key: Cache key within this namespace
+
+        Returns:
+            Any | None: The cached value, or None on a miss
+
+        """
+        value = self._get_local(key)
+        if value is not None:
+            return value
+
+        entry = self._get_remote(key)
+        if entry is None:
+            return None
+        expires_at, value, size = entry
+        if expires_at <= time.time():
+            return None
+        self._set_local(key, value, expires_at, size)
+        return value
+
+    def _get_remote(self, key: str) -> tuple[float, Any, int] | None:
+        client = get_redis_client() if self.use_redis else None
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(self._redis_key(key))
+        except redis.RedisError as e:
+            _mark_redis_unavailable(e)
+            return None
+        if raw is None:
+            return None
+
+        try:
+            entry = json.loads(raw)
+            return entry["expires_at"], entry["value"], len(raw)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding malformed cache entry {self._redis_key(key)}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        """
+        Store a value in both layers.
+
+        Args:
+            key: Cache key within this namespace
+            value: JSON-serializable value
+            ttl_seconds: Time to live in seconds
+
+        """
+        if ttl_seconds <= 0:
+            return
+        expires_at = time.time() + ttl_seconds
+        client = get_redis_client() if self.use_redis else None
+        if client is None and self.max_bytes is None:
+            self._set_local(key, value, expires_at)
+            return
+
+        try:
+            raw = json.dumps({"expires_at": expires_at, "value": value})
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Value for cache key {self._redis_key(key)} is not JSON-serializable: {e}")
+            self._set_local(key, value, expires_at)
+            return
+
+        self._set_local(key, value, expires_at, len(raw))
+        if client is None:
+            return
+        try:
+            client.set(self._redis_key(key), raw, ex=ttl_seconds)
+        except redis.RedisError as e:
+            _mark_redis_unavailable(e)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        ttl_seconds: int,
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> tuple[Any, bool]:
+        """
+        Look up a value, calling ``fetch`` on a miss and caching its result.
+
+        Concurrent misses for the same key in this process are coalesced: one caller
+        fetches and the others wait for its result (or its exception). Errors are
+        never cached.
+
+        Args:
+            key: Cache key within this namespace
+            fetch: Callable producing the value on a miss
+            ttl_seconds: Time to live in seconds
+            cacheable: Optional predicate; results for which it returns False are not cached
+
+        Returns:
+            tuple[Any, bool]: The value and whether it was served without calling ``fetch`` in this call
+
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            return future.result(), True
+
+        try:
+            # A previous leader may have stored the value between our miss and taking the lead
+            value = self.get(key)
+            hit = value is not None
+            if not hit:
+                value = fetch()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, ttl_seconds)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, hit
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Clear the in-process layer. Entries in Redis expire on their own."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
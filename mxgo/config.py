@@ -98,3 +98,159 @@ PERIOD_EXPIRY = {
 DODO_API_KEY = os.getenv("DODO_API_KEY")
 PRO_PLAN_PRODUCT_ID = os.getenv("PRO_PLAN_PRODUCT_ID")
 DODO_API_BASE_URL = "https://live.dodopayments.com"
+
+# Redis Configuration
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = os.getenv("REDIS_PORT", "6379")
+REDIS_DB = os.getenv("REDIS_DB", "0")
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+
+if REDIS_PASSWORD:
+    REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+else:
+    REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+
+# Search result cache configuration
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(6 * 3600)))
+SEARCH_CACHE_NEWS_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_NEWS_TTL_SECONDS", str(15 * 60)))
+# TTL per freshness filter; filters narrower than a day expire fastest
+SEARCH_CACHE_FRESHNESS_TTL_SECONDS = {
+    "pd": 15 * 60,
+    "pw": 3600,
+    "pm": 6 * 3600,
+    "py": 24 * 3600,
+}
+
+# Webpage cache for the visit tools. Pages are served without a request for
+# PAGE_CACHE_MAX_AGE_SECONDS, then revalidated with a conditional GET until the
+# entry is dropped after PAGE_CACHE_RETENTION_SECONDS
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+PAGE_CACHE_MAX_AGE_SECONDS = int(os.getenv("PAGE_CACHE_MAX_AGE_SECONDS", "3600"))
+PAGE_CACHE_RETENTION_SECONDS = int(os.getenv("PAGE_CACHE_RETENTION_SECONDS", str(24 * 3600)))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PAGE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("PAGE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+
+# LinkedIn entity cache (raw RapidAPI responses for profiles, companies and searches)
+LINKEDIN_CACHE_ENABLED = os.getenv("LINKEDIN_CACHE_ENABLED", "true").lower() == "true"
+LINKEDIN_CACHE_MAX_ENTRIES = int(os.getenv("LINKEDIN_CACHE_MAX_ENTRIES", "1024"))
+LINKEDIN_CACHE_TTL_SECONDS = int(os.getenv("LINKEDIN_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+LINKEDIN_CACHE_SEARCH_TTL_SECONDS = int(os.getenv("LINKEDIN_CACHE_SEARCH_TTL_SECONDS", str(24 * 3600)))
+
+# Background deep research jobs, off unless enabled. When enabled, every research-mandatory
+# email runs a paid Jina deep research call (JINA_API_KEY) as a job on its own Dramatiq
+# queue and is resumed once the job finishes, instead of leaving research to the agent
+DEEP_RESEARCH_JOBS_ENABLED = os.getenv("DEEP_RESEARCH_JOBS_ENABLED", "false").lower() == "true"
+DEEP_RESEARCH_QUEUE = os.getenv("DEEP_RESEARCH_QUEUE", "deep_research")
+DEEP_RESEARCH_JOB_TIMEOUT_SECONDS = int(os.getenv("DEEP_RESEARCH_JOB_TIMEOUT_SECONDS", "900"))
+DEEP_RESEARCH_JOB_TTL_SECONDS = int(os.getenv("DEEP_RESEARCH_JOB_TTL_SECONDS", str(24 * 3600)))
+
+# Image preprocessing and answer cache for the vision tools. Images are downscaled
+# to the resolution the model uses (high detail: long side 2048, short side 768)
+VISION_IMAGE_MAX_LONG_SIDE = int(os.getenv("VISION_IMAGE_MAX_LONG_SIDE", "2048"))
+VISION_IMAGE_MAX_SHORT_SIDE = int(os.getenv("VISION_IMAGE_MAX_SHORT_SIDE", "768"))
+VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "85"))
+VISION_CACHE_ENABLED = os.getenv("VISION_CACHE_ENABLED", "true").lower() == "true"
+VISION_CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", "2048"))
+VISION_CACHE_TTL_SECONDS = int(os.getenv("VISION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Hedged web search: start the fallback provider if the primary is slower than its
+# recent SEARCH_HEDGE_PERCENTILE latency, clamped to the min/max delay below
+SEARCH_HEDGING_ENABLED = os.getenv("SEARCH_HEDGING_ENABLED", "true").lower() == "true"
+SEARCH_HEDGE_PERCENTILE = float(os.getenv("SEARCH_HEDGE_PERCENTILE", "90"))
+SEARCH_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_DEFAULT_DELAY_SECONDS", "2.0"))
+SEARCH_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_MIN_DELAY_SECONDS", "0.5"))
+SEARCH_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_MAX_DELAY_SECONDS", "5.0"))
+
+# Shared outbound HTTP client (mxgo.http_client)
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.5"))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "8"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+HTTP_MAX_CONCURRENCY_PER_HOST = int(os.getenv("HTTP_MAX_CONCURRENCY_PER_HOST", "8"))
+
+# Prometheus metrics. The API serves them at /metrics, workers through Dramatiq's
+# Prometheus middleware and the scheduler on SCHEDULER_METRICS_PORT
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SCHEDULER_METRICS_PORT = int(os.getenv("SCHEDULER_METRICS_PORT", "9193"))
+
+# LLM token accounting. Per-email totals are added to hourly Redis buckets per user
+# and per plan, kept for LLM_USAGE_RETENTION_DAYS
+LLM_USAGE_TIMESERIES_ENABLED = os.getenv("LLM_USAGE_TIMESERIES_ENABLED", "true").lower() == "true"
+LLM_USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "30"))
+
+# Agent step profiles. Every run's timeline is stored in the result metadata; this
+# fraction of runs is also appended to daily JSONL files in AGENT_PROFILE_TRACE_DIR
+AGENT_PROFILE_SAMPLE_RATE = float(os.getenv("AGENT_PROFILE_SAMPLE_RATE", "0.05"))
+AGENT_PROFILE_TRACE_DIR = os.getenv("AGENT_PROFILE_TRACE_DIR", "agent_traces")
+
+# Agent memory compaction. Before every model call, observations older than the
+# AGENT_MEMORY_KEEP_RECENT_OBSERVATIONS latest are replaced by digests of at most
+# AGENT_MEMORY_DIGEST_CHARS characters, and more is compacted while the prompt is over the
+# handle's token budget (AGENT_CONTEXT_TOKEN_BUDGET unless the handle sets its own)
+AGENT_MEMORY_COMPACTION_ENABLED = os.getenv("AGENT_MEMORY_COMPACTION_ENABLED", "true").lower() == "true"
+AGENT_MEMORY_KEEP_RECENT_OBSERVATIONS = int(os.getenv("AGENT_MEMORY_KEEP_RECENT_OBSERVATIONS", "2"))
+AGENT_MEMORY_DIGEST_CHARS = int(os.getenv("AGENT_MEMORY_DIGEST_CHARS", "1500"))
+AGENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "24000"))
+
+# Tool calls the model makes in one agent step run concurrently on up to
+# AGENT_MAX_TOOL_THREADS threads; 1 runs them one after another
+AGENT_MAX_TOOL_THREADS = int(os.getenv("AGENT_MAX_TOOL_THREADS", "4"))
+
+# Handles that opt in (summarize, simplify, translate) answer plain emails with no
+# attachments, links or research with a single completion, and run the full agent only
+# when that completion asks for a tool
+DIRECT_ANSWER_ENABLED = os.getenv("DIRECT_ANSWER_ENABLED", "true").lower() == "true"
+
+# Checkpoints of process_email_task, so Dramatiq retries resume the agent run from its
+# last finished step, or only send a reply that was already generated. They are kept in
+# Redis, or in TASK_CHECKPOINT_DIR while Redis is unavailable, for TASK_CHECKPOINT_TTL_SECONDS
+TASK_CHECKPOINT_ENABLED = os.getenv("TASK_CHECKPOINT_ENABLED", "true").lower() == "true"
+TASK_CHECKPOINT_TTL_SECONDS = int(os.getenv("TASK_CHECKPOINT_TTL_SECONDS", str(6 * 3600)))
+TASK_CHECKPOINT_DIR = os.getenv("TASK_CHECKPOINT_DIR", "task_checkpoints")
+
+# Tool results are memoized per email, so repeated identical calls in a run are served
+# without calling the tool. With TOOL_MEMO_PERSIST they are also kept in Redis for
+# TOOL_MEMO_TTL_SECONDS, so retries of the email reuse them
+TOOL_MEMO_ENABLED = os.getenv("TOOL_MEMO_ENABLED", "true").lower() == "true"
+TOOL_MEMO_PERSIST = os.getenv("TOOL_MEMO_PERSIST", "true").lower() == "true"
+TOOL_MEMO_TTL_SECONDS = int(os.getenv("TOOL_MEMO_TTL_SECONDS", str(6 * 3600)))
+
+# Admission control of /process-email. The depth of the email queue and the consumer lag
+# (how long the latest messages waited for a worker) are sampled at most every
+# ADMISSION_SAMPLE_INTERVAL_SECONDS. Past the busy thresholds, emails to
+# ADMISSION_LOW_PRIORITY_HANDLES and scheduled tasks go to ADMISSION_DEFERRED_QUEUE and bulk
+# senders get 429 with Retry-After; past the overloaded thresholds bulk senders get 503 and
+# the other emails run on ADMISSION_DEGRADED_MODEL_GROUP, if set
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+ADMISSION_SAMPLE_INTERVAL_SECONDS = float(os.getenv("ADMISSION_SAMPLE_INTERVAL_SECONDS", "5"))
+ADMISSION_BUSY_QUEUE_DEPTH = int(os.getenv("ADMISSION_BUSY_QUEUE_DEPTH", "200"))
+ADMISSION_BUSY_LAG_SECONDS = float(os.getenv("ADMISSION_BUSY_LAG_SECONDS", "120"))
+ADMISSION_OVERLOADED_QUEUE_DEPTH = int(os.getenv("ADMISSION_OVERLOADED_QUEUE_DEPTH", "1000"))
+ADMISSION_OVERLOADED_LAG_SECONDS = float(os.getenv("ADMISSION_OVERLOADED_LAG_SECONDS", "600"))
+ADMISSION_LOW_PRIORITY_HANDLES = [
+    handle.strip().lower()
+    for handle in os.getenv("ADMISSION_LOW_PRIORITY_HANDLES", "background-research").split(",")
+    if handle.strip()
+]
+ADMISSION_BULK_SENDERS = [
+    sender.strip().lower() for sender in os.getenv("ADMISSION_BULK_SENDERS", "").split(",") if sender.strip()
+]
+ADMISSION_DEFERRED_QUEUE = os.getenv("ADMISSION_DEFERRED_QUEUE", "email_deferred")
+ADMISSION_DEGRADED_MODEL_GROUP = os.getenv("ADMISSION_DEGRADED_MODEL_GROUP") or None
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "60"))
+
+# Rejection and verification notices are sent by low-priority workers on NOTICE_QUEUE instead
+# of on the request path, at most once per sender and reason every NOTICE_DEDUP_WINDOW_SECONDS
+NOTICE_QUEUE = os.getenv("NOTICE_QUEUE", "notices")
+NOTICE_DEDUP_WINDOW_SECONDS = int(os.getenv("NOTICE_DEDUP_WINDOW_SECONDS", "3600"))
+
+# Idempotency of email processing. /process-email claims each email as queued for
+# IDEMPOTENCY_QUEUED_TTL_SECONDS; the worker running it holds a lease of
+# IDEMPOTENCY_LEASE_SECONDS, renewed while it runs, and marks it done for IDEMPOTENCY_DONE_TTL_SECONDS
+IDEMPOTENCY_QUEUED_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_QUEUED_TTL_SECONDS", "3600"))
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+IDEMPOTENCY_DONE_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_DONE_TTL_SECONDS", "86400"))
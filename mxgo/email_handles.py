@@ -25,6 +25,7 @@ NEWS_TOOLS = [
 
 # Research tools for handles that need deep research capabilities
 RESEARCH_TOOLS = [
+    ToolName.CITATION_AWARE_BATCH_VISIT,
     ToolName.DEEP_RESEARCH,
     ToolName.LINKEDIN_FRESH_DATA,
     ToolName.LINKEDIN_DATA_API,
@@ -41,6 +42,7 @@ DEFAULT_EMAIL_HANDLES = [
         target_model="gpt-4",
         task_template=template_prompts.SUMMARIZE_TEMPLATE,
         output_template=output_prompts.SUMMARIZE_OUTPUT_GUIDELINES,
+        direct_answer=True,
     ),
     ProcessingInstructions(
         handle=HandlerAlias.RESEARCH.value,
@@ -52,6 +54,7 @@ DEFAULT_EMAIL_HANDLES = [
         target_model="gpt-4",
         task_template=template_prompts.RESEARCH_TEMPLATE,
         output_template=output_prompts.RESEARCH_OUTPUT_GUIDELINES,
+        context_token_budget=48000,
     ),
     ProcessingInstructions(
         handle=HandlerAlias.SIMPLIFY.value,
@@ -62,6 +65,7 @@ DEFAULT_EMAIL_HANDLES = [
         target_model="gpt-4",
         task_template=template_prompts.SIMPLIFY_TEMPLATE,
         output_template=output_prompts.SIMPLIFY_OUTPUT_GUIDELINES,
+        direct_answer=True,
     ),
     ProcessingInstructions(
         handle=HandlerAlias.ASK.value,
@@ -106,6 +110,7 @@ DEFAULT_EMAIL_HANDLES = [
         target_model="gpt-4",
         task_template=template_prompts.TRANSLATE_TEMPLATE,
         output_template=output_prompts.TRANSLATION_OUTPUT_GUIDELINES,
+        direct_answer=True,
     ),
     ProcessingInstructions(
         handle=HandlerAlias.MEETING.value,
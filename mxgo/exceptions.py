@@ -26,3 +26,8 @@ class ModelConfigFileNotFoundError(Exception):
 class EmailProcessingError(Exception):
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class EmailInProgressError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
@@ -0,0 +1,174 @@
+"""
+Shared HTTP client for outbound tool calls.
+
+All tools go through one ``requests.Session`` per process so connections to the
+same host are pooled and kept alive instead of paying a TCP and TLS handshake on
+every call. The module also applies default timeouts, retries 429/5xx responses
+with jittered exponential backoff, and caps concurrent requests per host.
+
+The ``get``/``post`` helpers mirror the ``requests`` call signature and raise the
+usual ``requests`` exceptions, so callers keep their existing error handling.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mxgo._logging import get_logger
+from mxgo.config import (
+    HTTP_BACKOFF_BASE_SECONDS,
+    HTTP_BACKOFF_MAX_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_MAX_CONCURRENCY_PER_HOST,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_MAXSIZE,
+    HTTP_READ_TIMEOUT_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+# Statuses meaning the request was not processed, safe to retry for any method
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+# Statuses only retried for idempotent methods
+RETRYABLE_IDEMPOTENT_STATUSES = {500}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+_host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the pooled session for the current process.
+
+    A new session is created after a fork, since pooled sockets must not be shared
+    between processes.
+
+    Returns:
+        requests.Session: The shared session
+
+    """
+    global _session, _session_pid  # noqa: PLW0603
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_pid = pid
+            _host_semaphores.clear()
+    return _session
+
+
+def _get_host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(HTTP_MAX_CONCURRENCY_PER_HOST)
+            _host_semaphores[host] = semaphore
+        return semaphore
+
+
+def _retry_delay(attempt: int, response: requests.Response | None = None) -> float:
+    """Full-jitter exponential backoff, honouring a Retry-After header when present."""
+    if response is not None and (retry_after := response.headers.get("Retry-After")):
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), HTTP_BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX_SECONDS, HTTP_BACKOFF_BASE_SECONDS * 2**attempt))  # noqa: S311
+
+
+def _should_retry_status(method: str, status_code: int) -> bool:
+    if status_code in RETRYABLE_STATUSES:
+        return True
+    return status_code in RETRYABLE_IDEMPOTENT_STATUSES and method in IDEMPOTENT_METHODS
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    timeout: float | tuple[float, float] | None = None,
+    retries: int = HTTP_MAX_RETRIES,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the shared session.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        timeout: Read timeout in seconds, or a (connect, read) tuple. Defaults to the configured timeouts
+        retries: How many times to retry connection errors and retryable statuses (0 disables retries)
+        **kwargs: Passed through to ``requests.Session.request`` (headers, params, json, data, stream, ...)
+
+    Returns:
+        requests.Response: The final response. Statuses are not raised; call ``raise_for_status`` as usual
+
+    Raises:
+        requests.RequestException: If the request still fails after all retries
+
+    """
+    method = method.upper()
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS)
+    elif not isinstance(timeout, tuple):
+        timeout = (min(HTTP_CONNECT_TIMEOUT_SECONDS, timeout), timeout)
+
+    session = get_session()
+    semaphore = _get_host_semaphore(url)
+    attempt = 0
+    while True:
+        # Streaming responses release their slot once headers arrive; the pool still bounds open connections
+        with semaphore:
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.ConnectionError as e:
+                # Connection failures are retried; read timeouts are not, the server may still be working
+                if attempt >= retries:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"{method} {urlsplit(url).netloc} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if attempt >= retries or not _should_retry_status(method, response.status_code):
+                    return response
+                delay = _retry_delay(attempt, response)
+                logger.warning(
+                    f"{method} {urlsplit(url).netloc} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+                response.close()
+
+        time.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the shared session. See ``request`` for arguments."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Send a POST request through the shared session. See ``request`` for arguments."""
+    return request("POST", url, **kwargs)
@@ -0,0 +1,235 @@
+"""
+Idempotency of email processing.
+
+An email can be delivered to /process-email more than once, and Dramatiq can deliver a
+task more than once. Each email has a single Redis key, by message ID, holding its state:
+
+- ``queued``: claimed by /process-email, for IDEMPOTENCY_QUEUED_TTL_SECONDS;
+- ``processing:<token>``: leased to the worker running the task. The lease lasts
+  IDEMPOTENCY_LEASE_SECONDS and is renewed while the task runs, so another delivery only
+  takes over once the worker holding it has crashed;
+- ``done``: the reply was sent, for IDEMPOTENCY_DONE_TTL_SECONDS.
+
+The API claims an email with SET NX PX and the worker moves it between states with
+compare-and-set Lua scripts, so of concurrent duplicate deliveries only one wins and each
+check is a single round trip. The API uses its async client, the workers the shared
+synchronous client. Redis is best-effort: emails are processed while it is unavailable.
+"""
+
+import secrets
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import Enum
+
+import redis
+import redis.asyncio as aioredis
+
+from mxgo import cache
+from mxgo._logging import get_logger
+from mxgo.config import IDEMPOTENCY_DONE_TTL_SECONDS, IDEMPOTENCY_LEASE_SECONDS, IDEMPOTENCY_QUEUED_TTL_SECONDS
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_KEY_PREFIX = "email_state:"
+
+# Claims an unclaimed email as queued, returning the state it already had otherwise
+QUEUE_SCRIPT = """
+if redis.call('SET', KEYS[1], 'queued', 'NX', 'PX', ARGV[1]) then
+    return false
+end
+return redis.call('GET', KEYS[1])
+"""
+# Leases a queued or unclaimed email to a worker, returning the state it had
+LEASE_SCRIPT = """
+local state = redis.call('GET', KEYS[1])
+if not state or state == 'queued' then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+end
+return state
+"""
+# Moves an email out of the expected state, deleting its key if the new state is empty
+TRANSITION_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+end
+return 1
+"""
+
+
+class EmailState(str, Enum):
+    """Processing state of an email."""
+
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+
+
+def email_state_key(message_id: str) -> str:
+    """Get the Redis key holding an email's state."""
+    return f"{IDEMPOTENCY_KEY_PREFIX}{message_id}"
+
+
+def _parse_state(value: str | bytes | None) -> EmailState | None:
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode()
+    # Leases are stored as processing:<token>
+    return EmailState(value.partition(":")[0])
+
+
+async def claim_queued(client: aioredis.Redis, message_id: str) -> EmailState | None:
+    """
+    Claim an email for processing on receipt.
+
+    Args:
+        client: The API's Redis client
+        message_id: The email's message ID
+
+    Returns:
+        EmailState | None: None if the email was claimed, otherwise the state of the
+            delivery that claimed it first
+
+    Raises:
+        redis.RedisError: If Redis is unavailable
+
+    """
+    script = client.register_script(QUEUE_SCRIPT)
+    return _parse_state(await script(keys=[email_state_key(message_id)], args=[IDEMPOTENCY_QUEUED_TTL_SECONDS * 1000]))
+
+
+async def release_queued(client: aioredis.Redis, message_id: str) -> None:
+    """
+    Release the claim on an email that could not be enqueued, so a redelivery is accepted.
+
+    Args:
+        client: The API's Redis client
+        message_id: The email's message ID
+
+    Raises:
+        redis.RedisError: If Redis is unavailable
+
+    """
+    script = client.register_script(TRANSITION_SCRIPT)
+    await script(keys=[email_state_key(message_id)], args=[EmailState.QUEUED.value, "", 0])
+
+
+class EmailClaim:
+    """A worker's lease on processing an email."""
+
+    def __init__(self, message_id: str | None, lease_seconds: float = IDEMPOTENCY_LEASE_SECONDS):
+        """
+        Initialize the claim.
+
+        Args:
+            message_id: The email's message ID; emails without one are never deduplicated
+            lease_seconds: How long the lease lasts without being renewed
+
+        """
+        self.message_id = message_id
+        self.lease_seconds = lease_seconds
+        self.leased = False
+        self._lock = threading.Lock()
+        self._token = f"{EmailState.PROCESSING.value}:{secrets.token_hex(8)}"
+
+    def acquire(self) -> EmailState | None:
+        """
+        Lease the email to this worker, if it is queued or was never claimed.
+
+        Returns:
+            EmailState | None: None if the email may be processed, including while Redis is
+                unavailable, otherwise PROCESSING or DONE as held by another delivery
+
+        """
+        client = cache.get_redis_client()
+        if client is None or not self.message_id:
+            return None
+        script = client.register_script(LEASE_SCRIPT)
+        try:
+            state = _parse_state(
+                script(keys=[email_state_key(self.message_id)], args=[self._token, int(self.lease_seconds * 1000)])
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Failed to lease email {self.message_id}, processing it anyway: {e}")
+            return None
+        if state in {None, EmailState.QUEUED}:
+            self.leased = True
+            return None
+        return state
+
+    def _transition(self, state: str, ttl_seconds: float) -> bool | None:
+        """
+        Move the email out of this worker's lease.
+
+        Only the first move to another state is attempted, even if Redis could not be
+        reached, so a failed completion is never followed by a release.
+
+        Returns:
+            bool | None: Whether the lease was held, None if Redis could not be reached
+
+        """
+        with self._lock:
+            if not self.leased:
+                return False
+            if state != self._token:
+                self.leased = False
+            client = cache.get_redis_client()
+            if client is None:
+                return None
+            script = client.register_script(TRANSITION_SCRIPT)
+            try:
+                return bool(
+                    script(keys=[email_state_key(self.message_id)], args=[self._token, state, int(ttl_seconds * 1000)])
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Failed to update the state of email {self.message_id}: {e}")
+                return None
+
+    def renew(self) -> bool | None:
+        """
+        Extend the lease by its full duration.
+
+        Returns:
+            bool | None: Whether the lease is still held, None if Redis could not be reached
+
+        """
+        return self._transition(self._token, self.lease_seconds)
+
+    def complete(self) -> None:
+        """Mark the email as done, so later deliveries are skipped."""
+        if self._transition(EmailState.DONE.value, IDEMPOTENCY_DONE_TTL_SECONDS):
+            logger.info(f"Marked email {self.message_id} as processed")
+
+    def release(self) -> None:
+        """Hand the email back as queued, for a retry or a resumed run to lease it again."""
+        self._transition(EmailState.QUEUED.value, IDEMPOTENCY_QUEUED_TTL_SECONDS)
+
+    @contextmanager
+    def renewing(self) -> Iterator[None]:
+        """Renew the lease every third of its duration while the block runs, and release it afterwards."""
+        stop = threading.Event()
+
+        def renew_until_stopped() -> None:
+            while not stop.wait(self.lease_seconds / 3):
+                if self.renew() is False:
+                    if self.leased:
+                        logger.warning(f"Lost the lease on email {self.message_id} to another delivery")
+                    return
+
+        renewer = threading.Thread(target=renew_until_stopped, name="email-lease", daemon=True)
+        if self.leased:
+            renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            if renewer.is_alive():
+                renewer.join()
+            # No-op once the email is done
+            self.release()
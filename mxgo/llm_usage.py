@@ -0,0 +1,252 @@
+"""
+Token and latency accounting for LLM calls.
+
+Every completion made through ``RoutedLiteLLMModel`` is recorded with its prompt,
+completion and cached tokens, latency, model group, deployment, handle and user.
+Calls are exported as metrics and, while an email is processed inside
+``track_llm_usage``, collected into a per-email summary. The summary is added to
+``ProcessingMetadata`` and to hourly Redis buckets per user and per plan, which
+``get_llm_usage`` reads back, e.g. to check a plan's token budget.
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import redis
+
+from mxgo import cache
+from mxgo._logging import get_logger
+from mxgo.config import LLM_USAGE_RETENTION_DAYS, LLM_USAGE_TIMESERIES_ENABLED
+from mxgo.metrics import LLM_TOKENS
+from mxgo.schemas import LLMCallUsage, LLMUsageSummary
+
+logger = get_logger(__name__)
+
+LLM_USAGE_KEY_PREFIX = "llm_usage:"
+BUCKET_FORMAT = "%Y%m%d%H"
+USAGE_FIELDS = ("call_count", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_ms")
+
+_current_tracker: ContextVar["LLMUsageTracker | None"] = ContextVar("llm_usage_tracker", default=None)
+
+
+class LLMUsageTracker:
+    """Collects the LLM calls made while processing one email."""
+
+    def __init__(self, handle: str, user_email: str | None = None, plan: str | None = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            handle: Email handle being processed
+            user_email: Email address of the user the calls are made for
+            plan: The user's plan
+
+        """
+        self.handle = handle
+        self.user_email = user_email
+        self.plan = plan
+        self.calls: list[LLMCallUsage] = []
+        self._lock = threading.Lock()
+
+    def add(self, call: LLMCallUsage) -> None:
+        """Add a recorded call."""
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> LLMUsageSummary:
+        """Get the totals over all recorded calls."""
+        with self._lock:
+            calls = list(self.calls)
+        return LLMUsageSummary(
+            call_count=len(calls),
+            prompt_tokens=sum(call.prompt_tokens for call in calls),
+            completion_tokens=sum(call.completion_tokens for call in calls),
+            cached_tokens=sum(call.cached_tokens for call in calls),
+            latency_ms=sum(call.latency_ms for call in calls),
+            calls=calls,
+        )
+
+
+@contextmanager
+def track_llm_usage(handle: str, user_email: str | None = None, plan: str | None = None) -> Iterator[LLMUsageTracker]:
+    """
+    Collect the LLM calls made inside the block.
+
+    Args:
+        handle: Email handle being processed
+        user_email: Email address of the user the calls are made for
+        plan: The user's plan
+
+    Yields:
+        LLMUsageTracker: The tracker receiving the calls
+
+    """
+    tracker = LLMUsageTracker(handle, user_email, plan)
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+def get_usage_tracker() -> LLMUsageTracker | None:
+    """Get the tracker of the email being processed, if any."""
+    return _current_tracker.get()
+
+
+def _get_field(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _as_int(value: Any) -> int:
+    # Providers leave counts they do not report as None
+    return value if isinstance(value, int) else 0
+
+
+def extract_token_usage(response: Any) -> tuple[int, int, int]:
+    """
+    Get the token counts from a LiteLLM completion response.
+
+    Cached prompt tokens are read from OpenAI-style ``prompt_tokens_details`` or
+    Anthropic-style ``cache_read_input_tokens``.
+
+    Args:
+        response: LiteLLM ``ModelResponse``
+
+    Returns:
+        tuple[int, int, int]: Prompt, completion and cached prompt tokens
+
+    """
+    usage = _get_field(response, "usage")
+    prompt_details = _get_field(usage, "prompt_tokens_details")
+    cached_tokens = _as_int(_get_field(prompt_details, "cached_tokens"))
+    cached_tokens = cached_tokens or _as_int(_get_field(usage, "cache_read_input_tokens"))
+    prompt_tokens = _as_int(_get_field(usage, "prompt_tokens"))
+    return prompt_tokens, _as_int(_get_field(usage, "completion_tokens")), cached_tokens
+
+
+def resolve_handle(default: str | None = None) -> str:
+    """Get the handle LLM calls are attributed to: the tracked email's, else ``default``."""
+    tracker = get_usage_tracker()
+    return (tracker.handle if tracker else None) or default or "unknown"
+
+
+def record_llm_call(response: Any, model_group: str, latency_seconds: float, handle: str | None = None) -> LLMCallUsage:
+    """
+    Record the usage of one LLM call.
+
+    Args:
+        response: LiteLLM completion response
+        model_group: Router model group the call was made to
+        latency_seconds: Call latency
+        handle: Handle to attribute the call to when no email is being tracked
+
+    Returns:
+        LLMCallUsage: The recorded call
+
+    """
+    tracker = get_usage_tracker()
+    prompt_tokens, completion_tokens, cached_tokens = extract_token_usage(response)
+    deployment = _get_field(response, "model")
+    call = LLMCallUsage(
+        model_group=model_group,
+        deployment=deployment if isinstance(deployment, str) else None,
+        handle=resolve_handle(handle),
+        user=tracker.user_email if tracker else None,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cached_tokens=cached_tokens,
+        latency_ms=round(latency_seconds * 1000),
+    )
+
+    LLM_TOKENS.labels(model_group=model_group, handle=call.handle, type="prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(model_group=model_group, handle=call.handle, type="completion").inc(completion_tokens)
+    LLM_TOKENS.labels(model_group=model_group, handle=call.handle, type="cached").inc(cached_tokens)
+    if tracker is not None:
+        tracker.add(call)
+
+    logger.debug(
+        f"LLM call to {model_group} ({call.deployment}) for {call.handle}: {prompt_tokens} prompt "
+        f"({cached_tokens} cached) + {completion_tokens} completion tokens in {call.latency_ms} ms"
+    )
+    return call
+
+
+def _usage_key(scope: str, identifier: str, bucket: datetime) -> str:
+    return f"{LLM_USAGE_KEY_PREFIX}{scope}:{identifier}:{bucket.strftime(BUCKET_FORMAT)}"
+
+
+def store_llm_usage(tracker: LLMUsageTracker) -> None:
+    """
+    Add an email's LLM usage to the current hourly buckets of its user and plan.
+
+    Failures are logged, since the time series is informational.
+
+    Args:
+        tracker: Tracker of the processed email
+
+    """
+    if not LLM_USAGE_TIMESERIES_ENABLED or not tracker.calls:
+        return
+    client = cache.get_redis_client()
+    if client is None:
+        return
+
+    summary = tracker.summary()
+    now = datetime.now(timezone.utc)
+    retention_seconds = LLM_USAGE_RETENTION_DAYS * 24 * 3600
+    scopes = [("user", tracker.user_email), ("plan", tracker.plan)]
+    try:
+        pipe = client.pipeline(transaction=False)
+        for scope, identifier in scopes:
+            if not identifier:
+                continue
+            key = _usage_key(scope, identifier, now)
+            for field in USAGE_FIELDS:
+                pipe.hincrby(key, field, getattr(summary, field))
+            pipe.expire(key, retention_seconds)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to store LLM usage for {tracker.user_email}: {e}")
+
+
+def get_llm_usage(scope: str, identifier: str, hours: int = 24) -> dict[str, int]:
+    """
+    Get LLM usage totals for a user or plan over the last hours.
+
+    Args:
+        scope: "user" or "plan"
+        identifier: User email or plan name
+        hours: Number of hourly buckets to add up, including the current one
+
+    Returns:
+        dict[str, int]: Totals for ``call_count``, tokens and ``latency_ms`` (zero without Redis)
+
+    """
+    totals = dict.fromkeys(USAGE_FIELDS, 0)
+    client = cache.get_redis_client()
+    if client is None:
+        return totals
+
+    now = datetime.now(timezone.utc)
+    try:
+        pipe = client.pipeline(transaction=False)
+        for hour in range(hours):
+            pipe.hgetall(_usage_key(scope, identifier, now - timedelta(hours=hour)))
+        buckets = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read LLM usage for {scope} {identifier}: {e}")
+        return totals
+
+    for bucket in buckets:
+        for field in USAGE_FIELDS:
+            totals[field] += int(bucket.get(field, 0))
+    return totals
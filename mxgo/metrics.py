@@ -0,0 +1,210 @@
+"""
+Prometheus metrics for the API, the Dramatiq workers and the scheduler.
+
+Metrics are plain ``prometheus_client`` collectors on the default registry. The API
+serves them at ``/metrics``; workers are exported by Dramatiq's Prometheus middleware
+(port ``dramatiq_prom_port``, 9191 by default) and the scheduler by its own server on
+``SCHEDULER_METRICS_PORT``.
+
+Dramatiq runs each worker in its own process, so worker metrics are only aggregated
+when ``PROMETHEUS_MULTIPROC_DIR`` points at Dramatiq's metrics directory
+(``dramatiq_prom_db``). prometheus_client picks single- or multi-process storage when it
+is first imported, so the variable must be set in the environment before the worker
+starts (the worker image does this).
+"""
+
+import os
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+
+import dramatiq
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+from mxgo._logging import get_logger
+
+if TYPE_CHECKING:
+    from smolagents import Tool
+
+logger = get_logger(__name__)
+
+# Buckets in seconds, from fast Redis checks up to long agent runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "mxgo_http_request_seconds",
+    "API request latency.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "mxgo_http_response_bytes",
+    "API response body size.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+API_STAGE_SECONDS = Histogram(
+    "mxgo_api_stage_seconds",
+    "Time spent in each stage of /process-email (validations, attachment writes, enqueue).",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_DECISIONS = Counter(
+    "mxgo_admission_decisions",
+    "Admission decisions of /process-email by action (admit, defer, degrade, reject) and queue load level.",
+    ["action", "level"],
+)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "mxgo_task_queue_wait_seconds",
+    "Time a Dramatiq message waited in its queue before a worker picked it up.",
+    ["queue", "actor"],
+    buckets=LATENCY_BUCKETS,
+)
+AGENT_RUN_SECONDS = Histogram(
+    "mxgo_agent_run_seconds",
+    "Email agent run time per handle.",
+    ["handle"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_CALL_SECONDS = Histogram(
+    "mxgo_tool_call_seconds",
+    "Agent tool call latency.",
+    ["tool", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_CALL_SECONDS = Histogram(
+    "mxgo_llm_call_seconds",
+    "LLM completion latency per model group and handle.",
+    ["model_group", "handle", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "mxgo_llm_tokens",
+    "LLM tokens per model group and handle, by type (prompt, completion, cached).",
+    ["model_group", "handle", "type"],
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "mxgo_email_send_seconds",
+    "Reply email send latency.",
+    ["status"],
+    buckets=LATENCY_BUCKETS,
+)
+SCHEDULER_DISPATCH_LAG_SECONDS = Histogram(
+    "mxgo_scheduler_dispatch_lag_seconds",
+    "Delay between a scheduled task's run time and its dispatch by the scheduler.",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+
+@contextmanager
+def observe_latency(histogram: Histogram, **labels: str) -> Iterator[dict[str, str]]:
+    """
+    Time a block and record it in a histogram.
+
+    The yielded dict holds the labels and may be updated inside the block, e.g. to set
+    the outcome. A ``status`` label, if given, is set to ``error`` when the block raises.
+
+    Args:
+        histogram: Histogram to record into
+        **labels: Label values
+
+    Yields:
+        dict[str, str]: The labels, updatable until the block exits
+
+    """
+    start = time.perf_counter()
+    try:
+        yield labels
+    except BaseException:
+        if "status" in labels:
+            labels["status"] = "error"
+        raise
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+async def time_stage(stage: str, awaitable: Awaitable[Any]) -> Any:
+    """Await one stage of /process-email, recording its duration."""
+    with observe_latency(API_STAGE_SECONDS, stage=stage):
+        return await awaitable
+
+
+def instrument_tool(tool: "Tool") -> "Tool":
+    """
+    Record the latency of every call to a tool.
+
+    The tool's ``forward`` is wrapped in place, so the instance can be handed to the
+    agent as is.
+
+    Args:
+        tool: Tool instance
+
+    Returns:
+        Tool: The same tool instance
+
+    """
+    forward = tool.forward
+
+    @wraps(forward)
+    def timed_forward(*args: Any, **kwargs: Any) -> Any:
+        with observe_latency(TOOL_CALL_SECONDS, tool=tool.name, status="ok"):
+            return forward(*args, **kwargs)
+
+    tool.forward = timed_forward
+    return tool
+
+
+def record_dispatch_lag(scheduled_run_times: list[datetime]) -> None:
+    """Record how late the scheduler dispatched a job's scheduled runs."""
+    now = datetime.now(timezone.utc)
+    for run_time in scheduled_run_times:
+        SCHEDULER_DISPATCH_LAG_SECONDS.observe(max(0.0, (now - run_time).total_seconds()))
+
+
+class QueueWaitMetrics(dramatiq.Middleware):
+    """Dramatiq middleware recording how long each message waited in its queue."""
+
+    def before_process_message(self, _broker: dramatiq.Broker, message: dramatiq.Message) -> None:
+        """Record the queue wait, measured from enqueue or, for delayed messages, from their ETA."""
+        enqueued_at = message.options.get("eta", message.message_timestamp)
+        wait_seconds = max(0, time.time() * 1000 - enqueued_at) / 1000
+        TASK_QUEUE_WAIT_SECONDS.labels(queue=message.queue_name, actor=message.actor_name).observe(wait_seconds)
+
+
+def get_registry() -> CollectorRegistry:
+    """Get the registry to export, aggregating all processes in multiprocess mode."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        tuple[bytes, str]: The exposition payload and its content type
+
+    """
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve metrics over HTTP from a background thread, for processes without an API."""
+    start_http_server(port, registry=get_registry())
+    logger.info(f"Serving metrics on port {port}")
@@ -58,3 +58,11 @@ CRITICAL SECURITY REQUIREMENTS:
 - If a tool fails or returns no results, simply state that information is "temporarily unavailable" without technical details
 - Present information professionally without exposing backend system operations
 """
+
+# Appended to the task when it is first tried as a single completion
+DIRECT_ANSWER_GUIDELINES = """
+DIRECT ANSWER REQUIREMENTS:
+- Everything needed for this task is in the email above, so answer it directly
+- Reply with the final response only, following the output format above
+- Call a tool only if the task truly cannot be completed without one
+"""
@@ -5,6 +5,11 @@ Centralizes email request data, citations management, and processing context
 to provide clean architecture and request isolation.
 """
 
+import re
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -17,6 +22,11 @@ logger = get_logger(__name__)
 # Constants
 MIN_TITLE_LENGTH = 3
 
+# Citation managers that take the citations added in the current context instead of a
+# request's own manager, by id() of the RequestContext. A context variable rather than a
+# thread-local, so that work handed to other threads with copy_context() stays in scope.
+_active_citation_managers: ContextVar[dict[int, "CitationManager"]] = ContextVar("active_citation_managers")
+
 
 def _sanitize_api_title(title: str) -> str:
     """
@@ -94,11 +104,18 @@ class AttachmentService:
 class CitationManager:
     """Per-request citation manager without threading complexity."""
 
-    def __init__(self):
+    def __init__(self, id_prefix: str = ""):
         self._citations = CitationCollection()
         self._counter = 0
+        self._id_prefix = id_prefix  # Set for deferred managers, whose IDs are placeholders
         self._url_to_id = {}  # Track URL to ID mapping for deduplication
         self._filename_to_id = {}  # Track filename to ID mapping for deduplication
+        self._base_counter: int | None = None  # Counter at fork time, set only on forks
+        self._parent: CitationManager | None = None  # Manager forked from, set only on forks
+
+    def _next_id(self) -> str:
+        self._counter += 1
+        return f"{self._id_prefix}{self._counter}"
 
     def add_web_source(self, url: str, title: str, description: str | None = None, *, visited: bool = False) -> str:
         """Add a web source and return its citation ID."""
@@ -111,8 +128,7 @@ class CitationManager:
             return self._url_to_id[url]
 
         # Generate sequential ID
-        self._counter += 1
-        citation_id = str(self._counter)
+        citation_id = self._next_id()
 
         # Store URL mapping
         self._url_to_id[url] = citation_id
@@ -140,8 +156,7 @@ class CitationManager:
             return self._filename_to_id[filename]
 
         # Generate sequential ID
-        self._counter += 1
-        citation_id = str(self._counter)
+        citation_id = self._next_id()
 
         # Store filename mapping
         self._filename_to_id[filename] = citation_id
@@ -161,8 +176,7 @@ class CitationManager:
     def add_api_source(self, title: str, description: str | None = None) -> str:
         """Add an API source and return its citation ID."""
         # Generate sequential ID (API sources are always unique)
-        self._counter += 1
-        citation_id = str(self._counter)
+        citation_id = self._next_id()
 
         # Sanitize the title to remove internal implementation details
         sanitized_title = _sanitize_api_title(title)
@@ -224,6 +238,73 @@ class CitationManager:
         """Check if there are any citations."""
         return len(self._citations.sources) > 0
 
+    def fork(self) -> "CitationManager":
+        """Create an independent copy that collects citations speculatively."""
+        forked = CitationManager(self._id_prefix)
+        forked._citations = CitationCollection(
+            sources=[source.model_copy() for source in self._citations.sources],
+            references_section=self._citations.references_section,
+        )
+        forked._counter = self._counter
+        forked._url_to_id = self._url_to_id.copy()
+        forked._filename_to_id = self._filename_to_id.copy()
+        forked._base_counter = self._counter
+        forked._parent = self
+        return forked
+
+    def merge(self, forked: "CitationManager") -> bool:
+        """
+        Adopt the citations collected by a fork.
+
+        Citation IDs handed out by the fork are only valid if nothing else was added
+        since the fork was created, so the merge is refused in that case.
+
+        Returns:
+            bool: True if the fork's citations were adopted
+
+        """
+        base_counter = forked._base_counter  # noqa: SLF001
+        if base_counter is None or self._counter != base_counter:
+            return False
+        self._citations = forked._citations  # noqa: SLF001
+        self._counter = forked._counter  # noqa: SLF001
+        self._url_to_id = forked._url_to_id  # noqa: SLF001
+        self._filename_to_id = forked._filename_to_id  # noqa: SLF001
+        return True
+
+    def replay(self, deferred: "CitationManager") -> dict[str, str]:
+        """
+        Add the citations collected by a deferred manager, in the order they were collected.
+
+        Returns:
+            dict[str, str]: The deferred manager's placeholder IDs mapped to their IDs here
+
+        """
+        id_map = {}
+        for source in deferred._citations.sources:  # noqa: SLF001
+            if source.source_type == "web":
+                citation_id = self.add_web_source(
+                    source.url, source.title, source.description, visited=source.description == "visited"
+                )
+            elif source.source_type == "attachment":
+                citation_id = self.add_attachment_source(source.filename, source.description)
+            else:
+                citation_id = self.add_api_source(source.title, source.description)
+            id_map[source.id] = citation_id
+        return id_map
+
+    def restore(self, sources: list[CitationSource]) -> None:
+        """Replace all citations with sources saved earlier, keeping their IDs."""
+        self.reset()
+        for source in sources:
+            self._citations.add_source(source.model_copy())
+            if source.url:
+                self._url_to_id[source.url] = source.id
+            if source.filename:
+                self._filename_to_id[source.filename] = source.id
+            if source.id.isdigit():
+                self._counter = max(self._counter, int(source.id))
+
     def reset(self) -> None:
         """Reset all citations."""
         self._citations = CitationCollection()
@@ -272,21 +353,69 @@ class RequestContext:
             return []
         return [att.path for att in self.email_request.attachments if att.path]
 
+    def _active_citation_manager(self) -> CitationManager:
+        """Get the citation manager for the current context, honouring speculative and deferred scopes."""
+        return _active_citation_managers.get({}).get(id(self)) or self.citation_manager
+
+    @contextmanager
+    def _citation_scope(self, manager: CitationManager) -> Iterator[CitationManager]:
+        token = _active_citation_managers.set({**_active_citation_managers.get({}), id(self): manager})
+        try:
+            yield manager
+        finally:
+            _active_citation_managers.reset(token)
+
+    @contextmanager
+    def speculative_citations(self) -> Iterator[CitationManager]:
+        """
+        Collect citations added in the current context into a fork of the active citation manager.
+
+        Used when a tool call may be discarded, e.g. the losing side of a hedged search.
+        Pass the yielded fork to ``commit_citations`` to keep its citations.
+        """
+        with self._citation_scope(self._active_citation_manager().fork()) as forked:
+            yield forked
+
+    def commit_citations(self, forked: CitationManager) -> bool:
+        """Adopt citations from a speculative scope. Returns False if other citations were added meanwhile."""
+        parent = forked._parent or self.citation_manager  # noqa: SLF001
+        return parent.merge(forked)
+
+    @contextmanager
+    def deferred_citations(self) -> Iterator[CitationManager]:
+        """
+        Collect citations added in the current context under placeholder IDs.
+
+        Used for tool calls that run concurrently, so that their citations can be numbered
+        in call order rather than completion order. Pass the yielded manager to
+        ``commit_deferred_citations`` to add its citations and get their real IDs.
+        """
+        with self._citation_scope(CitationManager(id_prefix=f"pending-{uuid.uuid4().hex[:8]}-")) as deferred:
+            yield deferred
+
+    def commit_deferred_citations(self, deferred: CitationManager) -> dict[str, str]:
+        """Add the citations of a deferred scope, returning their placeholder IDs mapped to the real ones."""
+        return self._active_citation_manager().replay(deferred)
+
     def add_web_citation(self, url: str, title: str, description: str | None = None, *, visited: bool = False) -> str:
         """Add a web citation and return its ID."""
-        return self.citation_manager.add_web_source(url, title, description, visited=visited)
+        return self._active_citation_manager().add_web_source(url, title, description, visited=visited)
 
     def add_attachment_citation(self, filename: str, description: str | None = None) -> str:
         """Add an attachment citation and return its ID."""
-        return self.citation_manager.add_attachment_source(filename, description)
+        return self._active_citation_manager().add_attachment_source(filename, description)
 
     def add_api_citation(self, title: str, description: str | None = None) -> str:
         """Add an API citation and return its ID."""
-        return self.citation_manager.add_api_source(title, description)
+        return self._active_citation_manager().add_api_source(title, description)
+
+    def restore_citations(self, sources: list[CitationSource]) -> None:
+        """Restore the citations collected by an earlier attempt at the request."""
+        self.citation_manager.restore(sources)
 
     def has_citations(self) -> bool:
         """Check if any citations have been collected."""
-        return self.citation_manager.has_citations()
+        return self._active_citation_manager().has_citations()
 
     def get_references_section(self) -> str:
         """Get the formatted references section."""
@@ -294,4 +423,12 @@ class RequestContext:
 
     def get_citations(self) -> CitationCollection:
         """Get the citation collection."""
-        return self.citation_manager.get_citations()
+        return self._active_citation_manager().get_citations()
+
+
+def replace_citation_ids(text: str, id_map: dict[str, str]) -> str:
+    """Replace the placeholder citation IDs of a deferred scope in a tool's output."""
+    if not id_map:
+        return text
+    pattern = re.compile("|".join(re.escape(placeholder) for placeholder in sorted(id_map, key=len, reverse=True)))
+    return pattern.sub(lambda match: id_map[match.group()], text)
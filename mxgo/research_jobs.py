@@ -0,0 +1,157 @@
+"""
+Background deep research jobs.
+
+Research-mandatory emails submit a job instead of running deep research inside the
+email worker thread. The job runs on its own Dramatiq queue (``deep_research_task``
+in ``mxgo.tasks``), persists partial findings here while the research streams and
+re-enqueues the email with the result when it finishes. Job state is keyed by email
+ID, so progress can be queried while the research runs.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+import redis
+
+from mxgo import cache
+from mxgo._logging import get_logger
+from mxgo.config import DEEP_RESEARCH_JOB_TTL_SECONDS, DEEP_RESEARCH_JOBS_ENABLED
+from mxgo.schemas import EmailRequest, ResearchJobProgress, ResearchJobStatus
+
+logger = get_logger(__name__)
+
+RESEARCH_JOB_KEY_PREFIX = "research_job:"
+# Email body sent to the research API as context
+MAX_RESEARCH_CONTEXT_CHARS = 8000
+
+
+def _job_key(email_id: str) -> str:
+    return f"{RESEARCH_JOB_KEY_PREFIX}{email_id}"
+
+
+def research_jobs_available() -> bool:
+    """Check whether research can run as a background job (enabled and Redis reachable)."""
+    return DEEP_RESEARCH_JOBS_ENABLED and cache.get_redis_client() is not None
+
+
+def build_research_query(email_request: EmailRequest) -> tuple[str, str | None]:
+    """
+    Build the research query and context for an email.
+
+    Args:
+        email_request: The email being researched
+
+    Returns:
+        tuple[str, str | None]: The query and the email body as additional context
+
+    """
+    query = email_request.distilled_processing_instructions or email_request.subject or ""
+    body = (email_request.textContent or email_request.htmlContent or "").strip()
+    if not query:
+        return body[:MAX_RESEARCH_CONTEXT_CHARS], None
+    return query, body[:MAX_RESEARCH_CONTEXT_CHARS] or None
+
+
+def create_research_job(email_id: str, query: str) -> bool:
+    """
+    Record a new queued research job for an email.
+
+    Args:
+        email_id: ID of the email the research belongs to
+        query: The research query
+
+    Returns:
+        bool: True if the job was created, False if the email already has one
+
+    Raises:
+        redis.RedisError: If Redis is unavailable
+
+    """
+    client = cache.get_redis_client()
+    if client is None:
+        msg = "Redis is not available for research jobs"
+        raise redis.ConnectionError(msg)
+
+    now = datetime.now(timezone.utc).isoformat()
+    job = {
+        "email_id": email_id,
+        "status": ResearchJobStatus.QUEUED.value,
+        "query": query,
+        "created_at": now,
+        "updated_at": now,
+    }
+    created = client.set(_job_key(email_id), json.dumps(job), nx=True, ex=DEEP_RESEARCH_JOB_TTL_SECONDS)
+    if created:
+        logger.info(f"Created research job for email {email_id}")
+    return bool(created)
+
+
+def get_research_job(email_id: str) -> dict[str, Any] | None:
+    """
+    Get the stored state of an email's research job.
+
+    Args:
+        email_id: ID of the email
+
+    Returns:
+        dict | None: The job state, or None if there is no job or Redis is unavailable
+
+    """
+    client = cache.get_redis_client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(_job_key(email_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read research job for email {email_id}: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def update_research_job(email_id: str, **fields: Any) -> None:
+    """
+    Update an email's research job. Failures are logged, since job state is informational.
+
+    Args:
+        email_id: ID of the email
+        **fields: Job fields to set, e.g. ``status`` or ``partial_findings``
+
+    """
+    client = cache.get_redis_client()
+    if client is None:
+        return
+    job = get_research_job(email_id) or {"email_id": email_id, "created_at": datetime.now(timezone.utc).isoformat()}
+    if isinstance(fields.get("status"), ResearchJobStatus):
+        fields["status"] = fields["status"].value
+    job.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+    try:
+        client.set(_job_key(email_id), json.dumps(job), ex=DEEP_RESEARCH_JOB_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update research job for email {email_id}: {e}")
+
+
+def get_research_progress(email_id: str) -> ResearchJobProgress | None:
+    """
+    Get the progress of an email's research job.
+
+    Args:
+        email_id: ID of the email
+
+    Returns:
+        ResearchJobProgress | None: Job progress, or None if the email has no research job
+
+    """
+    job = get_research_job(email_id)
+    if job is None:
+        return None
+    return ResearchJobProgress(
+        email_id=job["email_id"],
+        status=job["status"],
+        query=job.get("query", ""),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        partial_findings=job.get("partial_findings"),
+        visited_urls=job.get("visited_urls", []),
+        error=job.get("error"),
+    )
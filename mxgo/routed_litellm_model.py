@@ -1,14 +1,18 @@
 import os
+import time
 import tomllib
 from pathlib import Path
 from typing import Any
 
 from dotenv import load_dotenv
 from smolagents import ChatMessage, LiteLLMRouterModel, Tool
+from smolagents.monitoring import TokenUsage
 
 import mxgo.schemas
 from mxgo import exceptions
 from mxgo._logging import get_logger
+from mxgo.llm_usage import record_llm_call, resolve_handle
+from mxgo.metrics import LLM_CALL_SECONDS, observe_latency
 from mxgo.schemas import ProcessingInstructions
 
 load_dotenv()
@@ -234,11 +238,16 @@ class RoutedLiteLLMModel(LiteLLMRouterModel):
         if self.model_id == "thinking":
             completion_kwargs.pop("stop", None)
 
-        response = self.client.completion(**completion_kwargs)
+        handle = resolve_handle(self.current_handle.handle if self.current_handle else None)
+        start = time.perf_counter()
+        with observe_latency(LLM_CALL_SECONDS, model_group=self.model_id, handle=handle, status="ok"):
+            response = self.client.completion(**completion_kwargs)
+        usage = record_llm_call(response, self.model_id, time.perf_counter() - start, handle=handle)
 
         return ChatMessage.from_dict(
             response.choices[0].message.model_dump(include={"role", "content", "tool_calls"}),
             raw=response,
+            token_usage=TokenUsage(input_tokens=usage.prompt_tokens, output_tokens=usage.completion_tokens),
         )
 
     def __call__(
@@ -10,8 +10,10 @@ import sys
 import time
 
 from mxgo._logging import get_logger
+from mxgo.config import METRICS_ENABLED, SCHEDULER_METRICS_PORT
 from mxgo.crud import get_tasks_by_status
 from mxgo.db import init_db_connection
+from mxgo.metrics import start_metrics_server
 from mxgo.models import TERMINAL_TASK_STATUSES
 from mxgo.scheduling.scheduler import Scheduler
 
@@ -86,6 +88,9 @@ def main():
 
     logger.info("Starting standalone APScheduler process...")
 
+    if METRICS_ENABLED:
+        start_metrics_server(SCHEDULER_METRICS_PORT)
+
     try:
         scheduler_instance.start()
         logger.info("APScheduler started successfully, ready to execute scheduled tasks")
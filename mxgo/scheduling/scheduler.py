@@ -8,7 +8,7 @@ in different processes while sharing the same PostgreSQL jobstore.
 import os
 from datetime import datetime, timezone
 
-from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -18,6 +18,7 @@ from croniter import croniter
 from sqlalchemy import create_engine
 
 from mxgo._logging import get_logger
+from mxgo.metrics import record_dispatch_lag
 
 logger = get_logger("scheduling")
 
@@ -101,6 +102,7 @@ class Scheduler:
         scheduler.add_listener(self._job_executed_listener, EVENT_JOB_EXECUTED)
         scheduler.add_listener(self._job_error_listener, EVENT_JOB_ERROR)
         scheduler.add_listener(self._job_missed_listener, EVENT_JOB_MISSED)
+        scheduler.add_listener(self._job_submitted_listener, EVENT_JOB_SUBMITTED)
 
         return scheduler
 
@@ -116,6 +118,10 @@ class Scheduler:
         """Log missed job executions."""
         logger.warning(f"Job {event.job_id} missed its scheduled time")
 
+    def _job_submitted_listener(self, event):
+        """Record how late the job was dispatched relative to its scheduled run time."""
+        record_dispatch_lag(event.scheduled_run_times)
+
     def get_scheduler(self) -> BackgroundScheduler:
         """
         Get the scheduling instance, creating it if necessary.
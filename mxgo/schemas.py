@@ -29,6 +29,7 @@ class ToolName(str, Enum):
     # Common tools available to most handles
     ATTACHMENT_PROCESSOR = "attachment_processor"
     CITATION_AWARE_VISIT = "citation_aware_visit"
+    CITATION_AWARE_BATCH_VISIT = "citation_aware_batch_visit"
     PYTHON_INTERPRETER = "python_interpreter"
     WIKIPEDIA_SEARCH = "wikipedia_search"
     REFERENCES_GENERATOR = "references_generator"
@@ -170,11 +171,78 @@ class ProcessingError(BaseModel):
     details: str | None = None
 
 
+class LLMCallUsage(BaseModel):
+    """Token usage and latency of a single LLM call."""
+
+    model_group: str
+    deployment: str | None = None
+    handle: str | None = None
+    user: str | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: int = 0
+
+
+class LLMUsageSummary(BaseModel):
+    """LLM token usage and latency totals for processing one email."""
+
+    call_count: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: int = 0
+    calls: list[LLMCallUsage] = []
+
+
+class ToolCallProfile(BaseModel):
+    """A tool call made during an agent step."""
+
+    name: str
+    args_hash: str
+    duration_ms: int | None = None  # None for tools that are not timed, e.g. final_answer
+    error: bool = False
+
+
+class AgentStepProfile(BaseModel):
+    """Timing and size of one agent step."""
+
+    step_number: int | None = None
+    step_type: str  # "action", "planning" or "direct" (single-completion answer)
+    started_at_ms: int  # Offset from the start of the run
+    wall_time_ms: int
+    model_time_ms: int
+    tool_time_ms: int
+    tool_calls: list[ToolCallProfile] = []
+    observation_chars: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    error: str | None = None
+
+
+class AgentRunProfile(BaseModel):
+    """Per-step timeline of an agent run."""
+
+    wall_time_ms: int = 0
+    model_time_ms: int = 0
+    tool_time_ms: int = 0
+    action_steps: int = 0
+    planning_steps: int = 0
+    max_steps_reached: bool = False
+    answered_directly: bool = False
+    compaction_saved_chars: int = 0  # Characters left out of model prompts by memory compaction
+    resumed_steps: int = 0  # Action steps restored from the checkpoint of an earlier attempt
+    memoized_tool_calls: int = 0  # Tool calls served from the email's memoized results
+    steps: list[AgentStepProfile] = []
+
+
 class ProcessingMetadata(BaseModel):
     processed_at: str
     mode: str | None = None
     errors: list[ProcessingError] = []
     email_sent: EmailSentStatus
+    llm_usage: LLMUsageSummary | None = None
+    agent_profile: AgentRunProfile | None = None
 
 
 class EmailContentDetails(BaseModel):
@@ -218,6 +286,28 @@ class AgentResearchOutput(BaseModel):
     metadata: AgentResearchMetadata | None = None
 
 
+class ResearchJobStatus(str, Enum):
+    """Lifecycle of a background deep research job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ResearchJobProgress(BaseModel):
+    """Progress of a background deep research job, as exposed by the API."""
+
+    email_id: str
+    status: ResearchJobStatus
+    query: str
+    created_at: str
+    updated_at: str
+    partial_findings: str | None = None
+    visited_urls: list[str] = []
+    error: str | None = None
+
+
 class PDFExportResult(BaseModel):
     """Model for PDF export results."""
 
@@ -259,6 +349,10 @@ class ProcessingInstructions(BaseModel):
     requires_schedule_extraction: bool = False
     target_model: str | None = "gpt-4"
     output_instructions: str | None = None
+    # Plain emails (no attachments, links or research) are answered with one completion
+    direct_answer: bool = False
+    # Estimated prompt tokens the agent's memory is compacted to, None for AGENT_CONTEXT_TOKEN_BUDGET
+    context_token_budget: int | None = None
 
 
 class LiteLLMParams(BaseModel):
@@ -0,0 +1,163 @@
+"""
+Aggregate report over sampled agent run traces.
+
+Reads the daily JSONL files written by ``mxgo.agents.step_profiler.write_trace`` and
+summarizes them per handle (wall time percentiles, steps, share of model and tool
+time, runs that hit the step limit) and per tool (call latency, observation size,
+calls repeated with identical arguments within a run).
+
+Usage:
+    python -m mxgo.scripts.agent_profile_report [trace files or directories]
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from mxgo.config import AGENT_PROFILE_TRACE_DIR
+
+
+def percentile(values: list[int], pct: float) -> int:
+    """Get the nearest-rank percentile of a list of values (0 when empty)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def load_traces(paths: Iterable[Path]) -> list[dict[str, Any]]:
+    """
+    Load trace records from files and directories of ``*.jsonl`` files.
+
+    Args:
+        paths: Trace files or directories
+
+    Returns:
+        list[dict[str, Any]]: One record per profiled run; unreadable lines are skipped
+
+    """
+    records = []
+    for path in paths:
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        for trace_file in files:
+            with trace_file.open() as f:
+                for raw_line in f:
+                    line = raw_line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+    return records
+
+
+def summarize_traces(records: list[dict[str, Any]]) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Aggregate trace records per handle and per tool.
+
+    Args:
+        records: Trace records as returned by ``load_traces``
+
+    Returns:
+        dict: ``{"handles": {handle: stats}, "tools": {tool: stats}}``
+
+    """
+    runs_by_handle: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    tool_durations: dict[str, list[int]] = defaultdict(list)
+    tool_observation_chars: dict[str, list[int]] = defaultdict(list)
+    tool_errors: Counter[str] = Counter()
+    tool_repeats: Counter[str] = Counter()
+
+    for record in records:
+        runs_by_handle[record.get("handle", "unknown")].append(record)
+        seen_calls: set[tuple[str, str]] = set()
+        for step in record.get("steps", []):
+            tool_calls = step.get("tool_calls", [])
+            for call in tool_calls:
+                name = call["name"]
+                if call.get("duration_ms") is not None:
+                    tool_durations[name].append(call["duration_ms"])
+                else:
+                    tool_durations.setdefault(name, [])
+                tool_observation_chars[name].append(step.get("observation_chars", 0) // len(tool_calls))
+                tool_errors[name] += bool(call.get("error"))
+                if (name, call.get("args_hash")) in seen_calls:
+                    tool_repeats[name] += 1
+                seen_calls.add((name, call.get("args_hash")))
+
+    handles = {}
+    for handle, runs in sorted(runs_by_handle.items()):
+        wall_times = [run.get("wall_time_ms", 0) for run in runs]
+        total_wall = sum(wall_times) or 1
+        handles[handle] = {
+            "runs": len(runs),
+            "p50_wall_ms": percentile(wall_times, 50),
+            "p95_wall_ms": percentile(wall_times, 95),
+            "avg_steps": round(sum(run.get("action_steps", 0) for run in runs) / len(runs), 1),
+            "model_share": round(sum(run.get("model_time_ms", 0) for run in runs) / total_wall, 2),
+            "tool_share": round(sum(run.get("tool_time_ms", 0) for run in runs) / total_wall, 2),
+            "max_steps_reached": sum(bool(run.get("max_steps_reached")) for run in runs),
+        }
+
+    tools = {}
+    for name, durations in sorted(tool_durations.items()):
+        observations = tool_observation_chars[name]
+        tools[name] = {
+            "calls": len(observations),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "avg_observation_chars": round(sum(observations) / len(observations)) if observations else 0,
+            "errors": tool_errors[name],
+            "repeated_calls": tool_repeats[name],
+        }
+
+    return {"handles": handles, "tools": tools}
+
+
+def _format_table(title: str, key_name: str, rows: dict[str, dict[str, Any]]) -> str:
+    if not rows:
+        return f"{title}\n  (none)"
+    columns = [key_name, *next(iter(rows.values())).keys()]
+    table = [columns] + [[key, *(str(value) for value in stats.values())] for key, stats in rows.items()]
+    widths = [max(len(str(row[i])) for row in table) for i in range(len(columns))]
+    lines = ["  ".join(str(cell).ljust(width) for cell, width in zip(row, widths, strict=True)) for row in table]
+    return "\n".join([title, *("  " + line.rstrip() for line in lines)])
+
+
+def format_report(summary: dict[str, dict[str, dict[str, Any]]], run_count: int) -> str:
+    """Render a summary as plain-text tables."""
+    return "\n\n".join(
+        [
+            f"Agent profile report over {run_count} runs",
+            _format_table("Per handle:", "handle", summary["handles"]),
+            _format_table("Per tool:", "tool", summary["tools"]),
+        ]
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print the report for the given trace files, by default the configured trace directory."""
+    parser = argparse.ArgumentParser(description="Summarize sampled agent run traces.")
+    parser.add_argument(
+        "paths", nargs="*", type=Path, default=[Path(AGENT_PROFILE_TRACE_DIR)], help="Trace files or directories"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    records = load_traces(path for path in args.paths if path.exists())
+    summary = summarize_traces(records)
+    if args.json:
+        sys.stdout.write(json.dumps(summary, indent=2) + "\n")
+    else:
+        sys.stdout.write(format_report(summary, len(records)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
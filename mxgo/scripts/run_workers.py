@@ -1,4 +1,6 @@
 #!/usr/bin/env python
+import gc
+import importlib
 import os
 import subprocess
 import sys
@@ -12,48 +14,95 @@ load_dotenv()
 # Constants
 DRAMATIQ_CONNECTION_ERROR_CODE = 3
 
+# Modules that declare Dramatiq actors, the only modules the workers import at boot.
+# Add a module here when it declares a new actor.
+ACTOR_MODULES = ["mxgo.tasks"]
 
-def find_tasks_modules():
-    """Find all task modules in the project."""
-    base_dir = Path(__file__).parent.parent  # mxgo directory
-    tasks_modules = []
+# Heavy third-party dependencies of the actors. They are imported once in the parent
+# process before the worker processes are forked, so copy-on-write shares them instead
+# of every worker importing its own copy. mxgo's own modules are left to the workers:
+# importing them sets up logging, whose queue and exporter threads do not survive a fork.
+PRELOAD_MODULES = [
+    "litellm",
+    "smolagents",
+    "sqlmodel",
+    "boto3",
+    "supabase",
+    "apscheduler.schedulers.background",
+    # Document conversion for attachments
+    "pandas",
+    "pdfminer.high_level",
+    "pptx",
+    "mammoth",
+    "markdownify",
+    "bs4",
+    "pydub",
+    "speech_recognition",
+    "PIL.Image",
+    # PDF export
+    "weasyprint",
+]
 
-    # Look for any Python files that might contain tasks
-    for path in base_dir.rglob("*.py"):
-        if path.is_file():
-            # Convert path to module notation
-            relative_path = path.relative_to(base_dir.parent)
-            module_path = str(relative_path).replace("/", ".").replace(".py", "")
-            tasks_modules.append(module_path)
 
-    return tasks_modules
-
-
-if __name__ == "__main__":
-    # Get all task modules
-    modules = find_tasks_modules()
-
-    for _module in modules:
-        pass
-
-    # Construct the dramatiq command
-    cmd = [
-        "dramatiq",
-        *modules,
+def build_dramatiq_args() -> list[str]:
+    """Build the Dramatiq command line arguments from the environment."""
+    args = [
+        *ACTOR_MODULES,
         "--processes",
         str(os.getenv("DRAMATIQ_PROCESSES", "8")),
         "--threads",
         str(os.getenv("DRAMATIQ_THREADS", "8")),
-        "--watch",
-        str(Path(__file__).parent.parent),  # Watch the mxgo directory
     ]
 
+    # Restarting the workers on source changes is for local development only
+    if os.getenv("DRAMATIQ_WATCH", "false").lower() == "true":
+        args.extend(["--watch", str(Path(__file__).parent.parent)])  # Watch the mxgo directory
+
     # Add any queues if specified
     queues = os.getenv("DRAMATIQ_QUEUES")
     if queues:
-        cmd.extend(["--queues", *queues.split(",")])
+        args.extend(["--queues", *queues.split(",")])
+    return args
+
+
+def preload_modules(modules: list[str]) -> list[str]:
+    """
+    Import modules ahead of forking the workers.
+
+    A module that fails to import is skipped; the worker reports the error if it needs it.
+
+    Returns:
+        list[str]: The modules that could not be imported
+
+    """
+    failed = []
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            sys.stderr.write(f"Could not preload {module}: {e}\n")
+            failed.append(module)
+    return failed
+
+
+def serve(dramatiq_args: list[str]) -> int:
+    """Preload the heavy dependencies, then run Dramatiq in this process so its forked workers share them."""
+    from dramatiq.cli import main, make_argument_parser  # NOQA: PLC0415
+
+    preload_modules(PRELOAD_MODULES)
+    # Keep the garbage collector from touching, and so copying, the preloaded objects in every worker
+    gc.freeze()
+    # Dramatiq re-executes sys.argv to reload on SIGHUP or, with --watch, on source changes
+    sys.argv = [sys.executable, "-m", "mxgo.scripts.run_workers", "serve", *dramatiq_args]
+    return main(make_argument_parser().parse_args(dramatiq_args))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["serve"]:
+        sys.exit(serve(sys.argv[2:]))
 
     # Run dramatiq with connection retry logic
+    cmd = [sys.executable, "-m", "mxgo.scripts.run_workers", "serve", *build_dramatiq_args()]
     delay = 1
     while True:
         try:
@@ -1,4 +1,5 @@
 import base64
+import hashlib
 import mimetypes
 import os
 import uuid
@@ -6,13 +7,22 @@ from io import BytesIO
 from pathlib import Path
 from typing import Any, ClassVar
 
-import requests
 from dotenv import load_dotenv
 from huggingface_hub import InferenceClient
-from PIL import Image
+from PIL import Image, ImageOps, UnidentifiedImageError
 from smolagents import Tool, tool
 
+from mxgo import http_client
 from mxgo._logging import get_logger
+from mxgo.cache import TTLCache
+from mxgo.config import (
+    VISION_CACHE_ENABLED,
+    VISION_CACHE_MAX_ENTRIES,
+    VISION_CACHE_TTL_SECONDS,
+    VISION_IMAGE_MAX_LONG_SIDE,
+    VISION_IMAGE_MAX_SHORT_SIDE,
+    VISION_IMAGE_QUALITY,
+)
 
 
 # Lazy import for transformers to avoid torch import issues during test discovery
@@ -32,6 +42,22 @@ load_dotenv(override=True)
 # Configure logger
 logger = get_logger("visual_qa")
 
+# Answers keyed by the exact pixels of the image, the question and the model, shared across
+# emails and workers
+vision_cache = TTLCache("vision", max_entries=VISION_CACHE_MAX_ENTRIES)
+
+
+def _read_image_bytes(image_path: str) -> bytes:
+    """Read an image from a local path or URL."""
+    if image_path.startswith("http"):
+        # Remote image
+        response = http_client.get(image_path, timeout=30)
+        response.raise_for_status()
+        return response.content
+    # Local image
+    with Path(image_path).open("rb") as image_file:
+        return image_file.read()
+
 
 def encode_image(image_path: str) -> str:
     """
@@ -44,14 +70,98 @@ def encode_image(image_path: str) -> str:
         str: Base64 encoded image string
 
     """
-    if image_path.startswith("http"):
-        # Remote image
-        response = requests.get(image_path, timeout=30)
-        response.raise_for_status()
-        return base64.b64encode(response.content).decode("utf-8")
-    # Local image
-    with Path(image_path).open("rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+    return base64.b64encode(_read_image_bytes(image_path)).decode("utf-8")
+
+
+def image_digest(image: Image.Image) -> str:
+    """
+    Compute a digest of an image's decoded pixels.
+
+    Copies of an image that only differ in metadata or lossless encoding (e.g. a logo
+    re-attached as PNG without its EXIF data) get the same digest; any change to the
+    pixels, however small, gives another one.
+
+    Args:
+        image: The image to hash, with its EXIF orientation applied
+
+    Returns:
+        str: Hex-encoded SHA-256 digest
+
+    """
+    normalized = image.convert("RGBA")
+    digest = hashlib.sha256(f"{normalized.width}x{normalized.height}:".encode())
+    digest.update(normalized.tobytes())
+    return digest.hexdigest()
+
+
+def prepare_image(image_path: str) -> tuple[str, str, str]:
+    """
+    Downscale and re-encode an image for a vision model.
+
+    The image is scaled to the largest size the model actually uses (long side
+    VISION_IMAGE_MAX_LONG_SIDE, short side VISION_IMAGE_MAX_SHORT_SIDE), rotated
+    according to its EXIF orientation and re-encoded without metadata: JPEG for opaque
+    images, WebP for images with transparency.
+
+    Args:
+        image_path: Path to the image file or URL
+
+    Returns:
+        tuple[str, str, str]: Base64 encoded image, its MIME type and the digest of its pixels
+
+    Raises:
+        OSError: If the image cannot be read or decoded
+
+    """
+    with Image.open(BytesIO(_read_image_bytes(image_path))) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    width, height = image.size
+    image_hash = image_digest(image)
+
+    scale = min(1.0, VISION_IMAGE_MAX_LONG_SIDE / max(width, height), VISION_IMAGE_MAX_SHORT_SIDE / min(width, height))
+    if scale < 1.0:
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        image.convert("RGBA").save(buffer, "WEBP", quality=VISION_IMAGE_QUALITY, method=4)
+        mime_type = "image/webp"
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=VISION_IMAGE_QUALITY, optimize=True)
+        mime_type = "image/jpeg"
+
+    logger.debug(f"Prepared image {image_path}: {width}x{height} -> {image.size[0]}x{image.size[1]} {mime_type}")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8"), mime_type, image_hash
+
+
+def _try_prepare_image(image_path: str) -> tuple[str, str, str] | None:
+    """Preprocess an image, returning None if it cannot be decoded."""
+    try:
+        return prepare_image(image_path)
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.debug(f"Could not preprocess image {image_path}, sending original: {e}")
+        return None
+
+
+def _encode_original_image(image_path: str) -> tuple[str, str]:
+    """Encode an image as-is, guessing its MIME type from the path."""
+    mime_type, _ = mimetypes.guess_type(image_path)
+    # Default to JPEG if can't determine
+    return encode_image(image_path), mime_type or "image/jpeg"
+
+
+def _add_caption_note(output: str) -> str:
+    """Explain that a caption was returned because no question was asked."""
+    return f"You did not provide a particular question, so here is a detailed caption for the image: {output}"
+
+
+def build_vision_cache_key(image_hash: str, question: str, model_id: str) -> str:
+    """Build the cache key for a model's answer about an image, by the image's pixel digest."""
+    question_digest = hashlib.sha256(f"{model_id}\n{' '.join(question.casefold().split())}".encode()).hexdigest()
+    return f"{image_hash}:{question_digest}"
 
 
 def resize_image(image_path: str, max_dimension: int = 1024) -> str:
@@ -191,14 +301,19 @@ class AzureVisualizerTool(Tool):
             add_note = True
             question = "Please write a detailed caption for this image."
 
-        try:
-            # Get image MIME type
-            mime_type, _ = mimetypes.guess_type(image_path)
-            if not mime_type:
-                mime_type = "image/jpeg"  # Default to JPEG if can't determine
+        # Downscale before the first call; fall back to sending the file as-is if it can't be decoded
+        prepared = _try_prepare_image(image_path)
+        cache_key = (
+            build_vision_cache_key(prepared[2], question, str(getattr(self.model, "model_id", "")))
+            if prepared and VISION_CACHE_ENABLED
+            else None
+        )
+        if cache_key and (cached_output := vision_cache.get(cache_key)) is not None:
+            logger.info("Vision cache hit, skipping Azure OpenAI call")
+            return _add_caption_note(cached_output) if add_note else cached_output
 
-            # Encode the image to base64
-            base64_image = encode_image(image_path)
+        try:
+            base64_image, mime_type = prepared[:2] if prepared else _encode_original_image(image_path)
 
             # Format the content for the Azure OpenAI API
             content = [
@@ -221,11 +336,11 @@ class AzureVisualizerTool(Tool):
                 msg = "Empty response from Azure OpenAI"
                 raise ValueError(msg)
 
+            if cache_key:
+                vision_cache.set(cache_key, output, VISION_CACHE_TTL_SECONDS)
+
             # Add note if no question was provided
-            if add_note:
-                output = (
-                    f"You did not provide a particular question, so here is a detailed caption for the image: {output}"
-                )
+            output = _add_caption_note(output) if add_note else output
 
         except Exception as e:
             # Handle image too large error by resizing and retrying
@@ -255,8 +370,7 @@ class AzureVisualizerTool(Tool):
                         msg = "Empty response from Azure OpenAI after resize"
                         raise ValueError(msg)
 
-                    if add_note:
-                        output = f"You did not provide a particular question, so here is a detailed caption for the image: {output}"
+                    output = _add_caption_note(output) if add_note else output
 
                 except Exception as retry_e:
                     logger.error(f"Error in azure_visualizer retry: {retry_e}")
@@ -402,7 +516,7 @@ class OpenAIVisualizerTool(Tool):
             "max_tokens": 1000,
         }
 
-        response = requests.post(
+        response = http_client.post(
             "https://api.openai.com/v1/chat/completions", headers=self.headers, json=payload, timeout=30
         )
 
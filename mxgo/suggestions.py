@@ -7,12 +7,13 @@ from typing import TYPE_CHECKING
 from mxgo._logging import get_logger
 from mxgo.config import SYSTEM_CAPABILITIES
 from mxgo.email_handles import DEFAULT_EMAIL_HANDLES
-from mxgo.routed_litellm_model import RoutedLiteLLMModel
 from mxgo.schemas import EmailSuggestionRequest, EmailSuggestionResponse, RiskAnalysisResponse, SuggestionDetail
 
 if TYPE_CHECKING:
     from smolagents import ChatMessage
 
+    from mxgo.routed_litellm_model import RoutedLiteLLMModel
+
 logger = get_logger(__name__)
 
 # Constants for suggestion limits
@@ -238,7 +239,7 @@ def validate_suggestion_to_email(suggestion_to_email: str) -> str:
     return "ask@mxgo.ai"
 
 
-def get_suggestions_model() -> RoutedLiteLLMModel:
+def get_suggestions_model() -> "RoutedLiteLLMModel":
     """
     FastAPI dependency to get the suggestions model.
 
@@ -246,6 +247,9 @@ def get_suggestions_model() -> RoutedLiteLLMModel:
         RoutedLiteLLMModel: Configured model for generating suggestions
 
     """
+    # Imported here to keep LiteLLM and smolagents out of the API's import time
+    from mxgo.routed_litellm_model import RoutedLiteLLMModel  # NOQA: PLC0415
+
     # Get the suggestions model group from environment
     suggestions_model_group = os.getenv("LITELLM_SUGGESTIONS_MODEL_GROUP", "gpt-4")
 
@@ -336,7 +340,7 @@ User input (JSON):
 
 async def analyse_risk(
     request: EmailSuggestionRequest,
-    model: RoutedLiteLLMModel | None = None,
+    model: "RoutedLiteLLMModel | None" = None,
 ) -> RiskAnalysisResponse:
     """
     Analyze risk and spam probability for an email using the LLM model.
@@ -385,7 +389,7 @@ async def analyse_risk(
 
 async def generate_suggestions(
     request: EmailSuggestionRequest,
-    model: RoutedLiteLLMModel | None = None,
+    model: "RoutedLiteLLMModel | None" = None,
 ) -> EmailSuggestionResponse:
     """
     Generate suggestions and risk analysis for an email using the LLM model.
@@ -450,7 +454,7 @@ async def generate_suggestions(
 
 async def _generate_suggestions_only(
     request: EmailSuggestionRequest,
-    model: RoutedLiteLLMModel | None,
+    model: "RoutedLiteLLMModel | None",
 ) -> tuple[str, list[SuggestionDetail]]:
     """
     Internal function to generate only suggestions (not risk analysis).
@@ -0,0 +1,320 @@
+"""
+Checkpoints of email processing, so a retried task resumes instead of starting over.
+
+``process_email_task`` is retried by Dramatiq after it fails, for instance when it hits
+its time limit or the worker is restarted. Without checkpoints every retry rebuilds the
+agent and repeats every model call, search and conversion of the run. ``TaskCheckpoint``
+saves, keyed by the email's message ID:
+
+- the agent's finished planning and action steps after every step, together with the
+  citations and the tool outputs they refer to, so a retry restores them into the agent
+  memory and continues the run from the last finished step;
+- the processing result once the reply is generated, so a retry only sends it.
+
+Checkpoints are stored in Redis, or on local disk while Redis is unavailable, and are
+deleted once the task finishes.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import redis
+from smolagents import utils as smolagents_utils
+from smolagents.agents import ToolOutput
+from smolagents.memory import ActionStep, MemoryStep, PlanningStep, ToolCall
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import AgentLogger, LogLevel, Timing, TokenUsage
+
+from mxgo import cache
+from mxgo._logging import get_logger
+from mxgo.config import TASK_CHECKPOINT_DIR, TASK_CHECKPOINT_TTL_SECONDS
+from mxgo.schemas import CitationSource, DetailedEmailProcessingResult
+
+logger = get_logger(__name__)
+
+TASK_CHECKPOINT_KEY_PREFIX = "task_checkpoint:"
+# Restored step errors are only shown to the model again, not logged a second time
+_SILENT_LOGGER = AgentLogger(level=LogLevel.OFF)
+
+
+@dataclass
+class AgentCheckpoint:
+    """Agent state restored from a checkpoint."""
+
+    steps: list[ActionStep | PlanningStep] = field(default_factory=list)
+    citations: list[CitationSource] = field(default_factory=list)
+    tool_outputs: dict[str, ToolOutput] = field(default_factory=dict)
+
+    @property
+    def action_steps(self) -> int:
+        """Number of finished action steps."""
+        return sum(isinstance(step, ActionStep) for step in self.steps)
+
+    @property
+    def final_answer(self) -> Any | None:
+        """The final answer, if the run already produced one."""
+        last_step = self.steps[-1] if self.steps else None
+        if not isinstance(last_step, ActionStep) or not last_step.is_final_answer:
+            return None
+        if last_step.action_output is not None:
+            return last_step.action_output
+        # Tool calling steps keep the answer as the output of their final_answer call
+        for tool_call in last_step.tool_calls or []:
+            tool_output = self.tool_outputs.get(tool_call.id)
+            if tool_output is not None and tool_output.is_final_answer:
+                return tool_output.output
+        return None
+
+
+def _json_safe(value: Any) -> Any:
+    """Keep JSON-serializable values as they are and fall back to their string form."""
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return value
+
+
+def _token_usage_dict(token_usage: TokenUsage | None) -> dict[str, int] | None:
+    if token_usage is None:
+        return None
+    return {"input_tokens": token_usage.input_tokens, "output_tokens": token_usage.output_tokens}
+
+
+def _token_usage(data: dict[str, int] | None) -> TokenUsage | None:
+    return TokenUsage(**data) if data else None
+
+
+def _step_to_dict(step: ActionStep | PlanningStep) -> dict[str, Any]:
+    """Serialize the parts of a memory step the agent builds its prompts and results from."""
+    timing = {"start_time": step.timing.start_time, "end_time": step.timing.end_time}
+    if isinstance(step, PlanningStep):
+        return {
+            "type": "planning",
+            "plan": step.plan,
+            "timing": timing,
+            "token_usage": _token_usage_dict(step.token_usage),
+        }
+    return {
+        "type": "action",
+        "step_number": step.step_number,
+        "timing": timing,
+        "tool_calls": [
+            {"name": tool_call.name, "arguments": _json_safe(tool_call.arguments), "id": tool_call.id}
+            for tool_call in step.tool_calls or []
+        ],
+        "error": {"type": type(step.error).__name__, "message": str(step.error.message)} if step.error else None,
+        "model_output": _json_safe(step.model_output),
+        "observations": step.observations,
+        "action_output": _json_safe(step.action_output),
+        "token_usage": _token_usage_dict(step.token_usage),
+        "is_final_answer": step.is_final_answer,
+    }
+
+
+def _step_from_dict(data: dict[str, Any]) -> ActionStep | PlanningStep:
+    timing = Timing(**data["timing"])
+    if data["type"] == "planning":
+        return PlanningStep(
+            model_input_messages=[],
+            model_output_message=ChatMessage(role=MessageRole.ASSISTANT, content=data["plan"]),
+            plan=data["plan"],
+            timing=timing,
+            token_usage=_token_usage(data["token_usage"]),
+        )
+
+    error = None
+    if data["error"]:
+        error_type = getattr(smolagents_utils, data["error"]["type"], smolagents_utils.AgentError)
+        if not (isinstance(error_type, type) and issubclass(error_type, smolagents_utils.AgentError)):
+            error_type = smolagents_utils.AgentError
+        error = error_type(data["error"]["message"], _SILENT_LOGGER)
+    return ActionStep(
+        step_number=data["step_number"],
+        timing=timing,
+        tool_calls=[ToolCall(**tool_call) for tool_call in data["tool_calls"]] or None,
+        error=error,
+        model_output=data["model_output"],
+        observations=data["observations"],
+        action_output=data["action_output"],
+        token_usage=_token_usage(data["token_usage"]),
+        is_final_answer=data["is_final_answer"],
+    )
+
+
+class TaskCheckpoint:
+    """Checkpoints of one email's processing, keyed by its message ID."""
+
+    def __init__(
+        self,
+        message_id: str,
+        ttl_seconds: int = TASK_CHECKPOINT_TTL_SECONDS,
+        directory: str | Path = TASK_CHECKPOINT_DIR,
+    ):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            message_id: Message ID of the email being processed
+            ttl_seconds: How long checkpoints are kept
+            directory: Directory for checkpoints written while Redis is unavailable
+
+        """
+        self.message_id = message_id
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory)
+
+    def _key(self, kind: str) -> str:
+        return f"{TASK_CHECKPOINT_KEY_PREFIX}{self.message_id}:{kind}"
+
+    def _path(self, kind: str) -> Path:
+        digest = hashlib.sha256(self.message_id.encode()).hexdigest()[:32]
+        return self.directory / f"{digest}.{kind}.json"
+
+    def _write(self, kind: str, payload: str) -> None:
+        client = cache.get_redis_client()
+        if client is not None:
+            try:
+                client.set(self._key(kind), payload, ex=self.ttl_seconds)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to write {kind} checkpoint to Redis, writing it to disk: {e}")
+            else:
+                return
+
+        path = self._path(kind)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_text(payload)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write {kind} checkpoint to {path}: {e}")
+
+    def _read(self, kind: str) -> str | None:
+        client = cache.get_redis_client()
+        if client is not None:
+            try:
+                payload = client.get(self._key(kind))
+            except redis.RedisError as e:
+                logger.warning(f"Failed to read {kind} checkpoint from Redis: {e}")
+            else:
+                if payload is not None:
+                    return payload
+
+        path = self._path(kind)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_text()
+        except OSError:
+            return None
+
+    def save_agent_state(
+        self,
+        steps: list[MemoryStep],
+        citations: list[CitationSource],
+        tool_outputs: dict[str, ToolOutput],
+    ) -> None:
+        """
+        Save the agent's finished steps, replacing the previous agent checkpoint.
+
+        Args:
+            steps: Agent memory steps; only planning and action steps are saved
+            citations: Citations of the request so far
+            tool_outputs: Output of every tool call so far, by call ID
+
+        """
+        state = {
+            "steps": [_step_to_dict(step) for step in steps if isinstance(step, ActionStep | PlanningStep)],
+            "citations": [citation.model_dump(mode="json") for citation in citations],
+            "tool_outputs": {
+                call_id: {
+                    "output": _json_safe(tool_output.output),
+                    "observation": tool_output.observation,
+                    "is_final_answer": tool_output.is_final_answer,
+                    "tool_call": {
+                        "name": tool_output.tool_call.name,
+                        "arguments": _json_safe(tool_output.tool_call.arguments),
+                        "id": tool_output.tool_call.id,
+                    },
+                }
+                for call_id, tool_output in tool_outputs.items()
+                if tool_output.tool_call is not None
+            },
+        }
+        self._write("agent", json.dumps(state))
+
+    def load_agent_state(self) -> AgentCheckpoint | None:
+        """
+        Load the agent's finished steps.
+
+        Returns:
+            AgentCheckpoint | None: The saved state, or None if there is no usable checkpoint
+
+        """
+        payload = self._read("agent")
+        if payload is None:
+            return None
+        try:
+            state = json.loads(payload)
+            return AgentCheckpoint(
+                steps=[_step_from_dict(step) for step in state["steps"]],
+                citations=[CitationSource(**citation) for citation in state["citations"]],
+                tool_outputs={
+                    call_id: ToolOutput(
+                        id=call_id,
+                        output=tool_output["output"],
+                        is_final_answer=tool_output["is_final_answer"],
+                        observation=tool_output["observation"],
+                        tool_call=ToolCall(**tool_output["tool_call"]),
+                    )
+                    for call_id, tool_output in state["tool_outputs"].items()
+                },
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable agent checkpoint for {self.message_id}: {e}")
+            return None
+
+    def save_result(self, result: DetailedEmailProcessingResult) -> None:
+        """
+        Save the processing result of the email, once its reply is generated.
+
+        Args:
+            result: The processing result
+
+        """
+        self._write("result", result.model_dump_json())
+
+    def load_result(self) -> DetailedEmailProcessingResult | None:
+        """
+        Load the processing result of the email.
+
+        Returns:
+            DetailedEmailProcessingResult | None: The saved result, or None if the reply was not generated yet
+
+        """
+        payload = self._read("result")
+        if payload is None:
+            return None
+        try:
+            return DetailedEmailProcessingResult.model_validate_json(payload)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable result checkpoint for {self.message_id}: {e}")
+            return None
+
+    def clear(self) -> None:
+        """Delete the checkpoints of the email."""
+        kinds = ("agent", "result")
+        client = cache.get_redis_client()
+        if client is not None:
+            try:
+                client.delete(*(self._key(kind) for kind in kinds))
+            except redis.RedisError as e:
+                logger.warning(f"Failed to delete checkpoints from Redis: {e}")
+        for kind in kinds:
+            self._path(kind).unlink(missing_ok=True)
@@ -0,0 +1,70 @@
+"""
+Enqueue-only handles for the worker actors in ``mxgo.tasks``.
+
+Publishing a message only takes the actor's name and queue. Importing ``mxgo.tasks``
+for them would load the email agent, every tool and their dependencies into each API
+process, so the API sends through these stubs instead. Their names and queues must
+match the actors in ``mxgo.tasks``.
+"""
+
+from datetime import timedelta
+from typing import Any
+
+import dramatiq
+
+from mxgo.broker import rabbitmq_broker
+from mxgo.config import ADMISSION_DEFERRED_QUEUE, NOTICE_QUEUE
+
+
+class ActorStub:
+    """Sends messages to an actor declared elsewhere, like ``dramatiq.Actor`` without the function."""
+
+    def __init__(self, actor_name: str, queue_name: str = "default", broker: dramatiq.Broker | None = None):
+        """
+        Initialize the stub.
+
+        Args:
+            actor_name: Name of the actor the workers run
+            queue_name: Queue the actor consumes
+            broker: Broker to enqueue on, the shared RabbitMQ broker by default
+
+        """
+        self.actor_name = actor_name
+        self.queue_name = queue_name
+        self.broker = broker or rabbitmq_broker
+
+    def message_with_options(
+        self, *, args: tuple = (), kwargs: dict[str, Any] | None = None, **options: Any
+    ) -> dramatiq.Message:
+        """Build a message for the actor, see ``dramatiq.Actor.message_with_options``."""
+        return dramatiq.Message(
+            queue_name=self.queue_name,
+            actor_name=self.actor_name,
+            args=args,
+            kwargs=kwargs or {},
+            options=options,
+        )
+
+    def send_with_options(
+        self,
+        *,
+        args: tuple = (),
+        kwargs: dict[str, Any] | None = None,
+        delay: timedelta | int | None = None,
+        **options: Any,
+    ) -> dramatiq.Message:
+        """Enqueue a message for the actor, see ``dramatiq.Actor.send_with_options``."""
+        if isinstance(delay, timedelta):
+            delay = int(delay.total_seconds() * 1000)
+        message = self.message_with_options(args=args, kwargs=kwargs, **options)
+        return self.broker.enqueue(message, delay=delay)
+
+    def send(self, *args: Any, **kwargs: Any) -> dramatiq.Message:
+        """Enqueue a message for the actor with the given arguments."""
+        return self.send_with_options(args=args, kwargs=kwargs)
+
+
+process_email_task = ActorStub("process_email_task")
+deferred_email_task = ActorStub("process_deferred_email_task", ADMISSION_DEFERRED_QUEUE)
+send_notice_task = ActorStub("send_notice_task", NOTICE_QUEUE)
+verify_sender_task = ActorStub("verify_sender_task", NOTICE_QUEUE)
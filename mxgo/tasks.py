@@ -6,15 +6,29 @@ from pathlib import Path
 from typing import Any, Union
 
 import dramatiq
+import redis
 from dotenv import load_dotenv
-from dramatiq.brokers.rabbitmq import RabbitmqBroker
+from dramatiq.middleware import CurrentMessage
 
 from mxgo import exceptions
 from mxgo._logging import get_logger
 from mxgo.agents.email_agent import EmailAgent
-from mxgo.config import SKIP_EMAIL_DELIVERY
+
+# The actors below are declared on the shared broker, which importing it sets as the global one
+from mxgo.broker import rabbitmq_broker  # noqa: F401
+from mxgo.config import (
+    ADMISSION_DEFERRED_QUEUE,
+    DEEP_RESEARCH_JOB_TIMEOUT_SECONDS,
+    DEEP_RESEARCH_QUEUE,
+    NOTICE_QUEUE,
+    SKIP_EMAIL_DELIVERY,
+    TASK_CHECKPOINT_ENABLED,
+)
 from mxgo.dependencies import processing_instructions_resolver
 from mxgo.email_sender import EmailSender
+from mxgo.idempotency import EmailClaim, EmailState
+from mxgo.llm_usage import store_llm_usage, track_llm_usage
+from mxgo.metrics import AGENT_RUN_SECONDS, EMAIL_SEND_SECONDS, observe_latency
 from mxgo.schemas import (
     AttachmentsProcessingResult,
     DetailedEmailProcessingResult,
@@ -22,33 +36,35 @@ from mxgo.schemas import (
     EmailRequest,
     EmailSentStatus,
     HandlerAlias,
+    PDFExportResult,
     ProcessingError,
     ProcessingInstructions,
     ProcessingMetadata,
+    ResearchJobStatus,
+    ToolName,
 )
 from mxgo.crud import get_task_by_id
 from mxgo.db import init_db_connection
+from mxgo.research_jobs import (
+    build_research_query,
+    create_research_job,
+    research_jobs_available,
+    update_research_job,
+)
 from mxgo.scheduling.scheduler import is_one_time_task
-from mxgo.validators import check_task_idempotency, mark_email_as_processed
+from mxgo.task_checkpoints import TaskCheckpoint
+from mxgo.tools.deep_research_tool import DeepResearchTool
+from mxgo.validators import build_verification_notice
+from mxgo.whitelist import trigger_automatic_verification
 
 # Load environment variables
 load_dotenv()
 
 logger = get_logger(__name__)
 
-# Build RabbitMQ URL from environment variables (Broker)
-# Include heartbeat as a query parameter in the URL
-RABBITMQ_HEARTBEAT = os.getenv("RABBITMQ_HEARTBEAT", "5")
-RABBITMQ_URL = f"amqp://{os.getenv('RABBITMQ_USER', 'guest')}:{os.getenv('RABBITMQ_PASSWORD', 'guest')}@{os.getenv('RABBITMQ_HOST', 'localhost')}:{os.getenv('RABBITMQ_PORT', '5672')}{os.getenv('RABBITMQ_VHOST', '/')}?heartbeat={RABBITMQ_HEARTBEAT}"
-
-# Initialize RabbitMQ broker
-rabbitmq_broker = RabbitmqBroker(
-    url=RABBITMQ_URL,
-    confirm_delivery=True,  # Ensures messages are delivered
-)
-dramatiq.set_broker(rabbitmq_broker)
-
 MAX_RETRIES = 3
+# Headroom for the research job to record its result and resume the email after the API call
+DEEP_RESEARCH_JOB_GRACE_SECONDS = 60
 
 
 def cleanup_attachments(email_attachments_dir: str) -> None:
@@ -74,6 +90,35 @@ def cleanup_attachments(email_attachments_dir: str) -> None:
         logger.exception("Error cleaning up attachments")
 
 
+def cleanup_pdf_export(pdf_export: PDFExportResult) -> None:
+    """
+    Clean up the temporary PDF file of a sent reply and the PDF tool's directory.
+
+    Args:
+        pdf_export: The reply's PDF export
+
+    """
+    try:
+        # Clean up the temporary PDF file
+        Path(pdf_export.file_path).unlink(missing_ok=True)
+        logger.info(f"Cleaned up temporary PDF file: {pdf_export.file_path}")
+
+        # Clean up the PDF tool's temporary directory using tracked temp_dir
+        if pdf_export.temp_dir:
+            pdf_temp_dir = pdf_export.temp_dir
+            if pdf_temp_dir and Path(pdf_temp_dir).exists():
+                shutil.rmtree(pdf_temp_dir, ignore_errors=True)
+                logger.info(f"Cleaned up PDF tool temp directory: {pdf_temp_dir}")
+        else:
+            # Fallback: extract parent directory from the PDF file path
+            pdf_temp_dir = Path(pdf_export.file_path).parent
+            if pdf_temp_dir.exists():
+                shutil.rmtree(pdf_temp_dir, ignore_errors=True)
+                logger.info(f"Cleaned up PDF tool temp directory (fallback): {pdf_temp_dir}")
+    except Exception as pdf_error:
+        logger.error(f"Failed to clean up PDF file: {pdf_error}")
+
+
 def should_retry(retries_so_far: int, exception: Exception) -> bool:
     """
     Determine if a task should be retried based on the number of retries and exception type.
@@ -90,94 +135,96 @@ def should_retry(retries_so_far: int, exception: Exception) -> bool:
     return retries_so_far < MAX_RETRIES
 
 
-@dramatiq.actor(retry_when=should_retry, min_backoff=60 * 1000, time_limit=600000)
-def process_email_task(  # noqa: PLR0912, PLR0915
-    email_data: dict[str, Any],
-    email_attachments_dir: str,
+def _retries_remain() -> bool:
+    """Whether Dramatiq will retry the message being processed if it fails, see ``should_retry``."""
+    message = CurrentMessage.get_current_message()
+    retries_so_far = message.options.get("retries", 0) if message else 0
+    return retries_so_far < MAX_RETRIES
+
+
+def _defer_to_research_job(
+    email_request: EmailRequest,
+    email_instructions: ProcessingInstructions,
+    email_id: str | None,
+    continuation: dict[str, Any],
+) -> bool:
+    """
+    Hand the deep research for a research-mandatory email to a background job.
+
+    Args:
+        email_request: The email being processed
+        email_instructions: Processing instructions for the email's handle
+        email_id: ID used to track the research job
+        continuation: Arguments to resume ``process_email_task`` with once research finishes
+
+    Returns:
+        bool: True if the email will be resumed by a research job, False to process it now
+
+    """
+    if not (
+        email_id
+        and email_instructions.deep_research_mandatory
+        and ToolName.DEEP_RESEARCH in email_instructions.allowed_tools
+        and os.getenv("JINA_API_KEY")
+        and research_jobs_available()
+    ):
+        return False
+
+    query, context = build_research_query(email_request)
+    try:
+        if not create_research_job(email_id, query):
+            logger.info(f"Research job for email {email_id} already submitted")
+            return True
+        deep_research_task.send(email_id, query, context, continuation)
+    except (redis.RedisError, dramatiq.errors.DramatiqError) as e:
+        logger.error(f"Could not submit research job for email {email_id}, processing without it: {e}")
+        update_research_job(email_id, status=ResearchJobStatus.FAILED, error=str(e))
+        return False
+
+    logger.info(f"Submitted research job for email {email_id}")
+    return True
+
+
+def _generate_reply(  # noqa: PLR0912, PLR0917
+    email_request: EmailRequest,
+    email_instructions: ProcessingInstructions,
     attachment_info: list[dict[str, Any]],
-    scheduled_task_id: str | None = None,
+    scheduled_task_id: str | None,
+    email_id: str | None,
+    research_result: dict[str, Any] | None,
+    user_plan: str | None,
+    checkpoint: TaskCheckpoint | None,
+    model_group: str | None = None,
 ) -> DetailedEmailProcessingResult:
     """
-    Dramatiq task for processing emails asynchronously.
+    Run the agent on an email and build the reply to send.
 
     Args:
-        email_data: Dictionary containing email request data
-        email_attachments_dir: Directory containing email attachments
+        email_request: The email being processed
+        email_instructions: Processing instructions for the email's handle
         attachment_info: List of attachment information dictionaries
         scheduled_task_id: Optional task ID if this is a scheduled task
+        email_id: ID assigned to the email on receipt
+        research_result: Result of the email's background research job, if any
+        user_plan: The sender's plan, used to account LLM usage per plan
+        checkpoint: Checkpoint the agent saves its steps to and resumes from
+        model_group: Model group to run the agent on instead of the handle's, if set
 
     Returns:
-        DetailedEmailProcessingResult: The result of the email processing.
+        DetailedEmailProcessingResult: The processing result, with the reply to send
 
     """
-    email_request = EmailRequest(**email_data)
-
-    # Check for duplicate processing using Redis (idempotency check)
-    message_id = email_request.messageId
-
-    if check_task_idempotency(message_id):
-        # Return a minimal result indicating it was already processed
-        now_iso = datetime.now(timezone.utc).isoformat()
-        return DetailedEmailProcessingResult(
-            metadata=ProcessingMetadata(
-                processed_at=now_iso,
-                mode="duplicate",
-                errors=[ProcessingError(message="Email already processed (duplicate)")],
-                email_sent=EmailSentStatus(
-                    status="duplicate",
-                    message_id="duplicate",
-                    timestamp=now_iso,
-                ),
-            ),
-            email_content=EmailContentDetails(text=None, html=None, enhanced=None),
-            attachments=AttachmentsProcessingResult(processed=[]),
-            calendar_data=None,
-            research=None,
-            pdf_export=None,
-        )
-
-    # For scheduled tasks, use distilled_alias if available, otherwise fall back to email handle
-    if scheduled_task_id:
-        handle = email_request.distilled_alias.value if email_request.distilled_alias else HandlerAlias.ASK.value
-        logger.info(f"Processing scheduled task {scheduled_task_id} using distilled alias: {handle}")
-    else:
-        raw_handle = email_request.to.split("@")[0].lower()
-
-        # Strip everything after '+' if present
-        if "+" in raw_handle:
-            handle = raw_handle.split("+")[0]
-            logger.info(f"Stripped handle suffix: '{raw_handle}' -> '{handle}'")
-        else:
-            handle = raw_handle
-        if scheduled_task_id:
-            logger.info(f"Processing scheduled task {scheduled_task_id} for handle: {handle}")
-        else:
-            logger.info(f"Processing regular email for handle: {handle}")
-
-    now_iso = datetime.now(timezone.utc).isoformat()
-
-    try:
-        email_instructions: Union[ProcessingInstructions, None] = processing_instructions_resolver(handle)
-    except exceptions.UnspportedHandleError as e:  # Catch specific exception
-        logger.error(f"Unsupported email handle: {handle}. Error: {e!s}")
-        return DetailedEmailProcessingResult(
-            metadata=ProcessingMetadata(
-                processed_at=now_iso,
-                mode=handle,
-                errors=[ProcessingError(message=f"Unsupported email handle: {handle}", details=str(e))],
-                email_sent=EmailSentStatus(
-                    status="error", error=f"Unsupported email handle: {handle} - {e!s}", timestamp=now_iso
-                ),
-            ),
-            email_content=EmailContentDetails(text=None, html=None, enhanced=None),
-            attachments=AttachmentsProcessingResult(processed=[]),
-            calendar_data=None,
-            research=None,
-            pdf_export=None,
-        )
+    if research_result is not None and "error" in research_result:
+        logger.warning(f"Research job for email {email_id} failed, continuing without it: {research_result['error']}")
+        research_result = None
 
     email_agent = EmailAgent(
-        email_request=email_request, processing_instructions=email_instructions, attachment_info=attachment_info
+        email_request=email_request,
+        processing_instructions=email_instructions,
+        attachment_info=attachment_info,
+        completed_research=research_result,
+        checkpoint=checkpoint,
+        model_group=model_group,
     )
 
     if email_request.attachments and attachment_info:
@@ -202,7 +249,18 @@ def process_email_task(  # noqa: PLR0912, PLR0915
         # Add the task ID to the email data for the agent to process
         email_request.scheduled_task_id = scheduled_task_id
 
-    processing_result = email_agent.process_email(email_request, email_instructions)
+    with (
+        track_llm_usage(email_instructions.handle, email_request.from_email, user_plan) as llm_usage,
+        observe_latency(AGENT_RUN_SECONDS, handle=email_instructions.handle),
+    ):
+        processing_result = email_agent.process_email(email_request, email_instructions)
+    usage_summary = llm_usage.summary()
+    processing_result.metadata.llm_usage = usage_summary
+    store_llm_usage(llm_usage)
+    logger.info(
+        f"LLM usage for email {email_id}: {usage_summary.call_count} calls, {usage_summary.prompt_tokens} prompt "
+        f"({usage_summary.cached_tokens} cached) and {usage_summary.completion_tokens} completion tokens"
+    )
 
     # Add Knowsletter-branded footer to email content if this is a scheduled task
     if scheduled_task_id and processing_result.email_content:
@@ -243,6 +301,113 @@ def process_email_task(  # noqa: PLR0912, PLR0915
             else:
                 processing_result.email_content.html += task_id_note_html
 
+    return processing_result
+
+
+def _process_email(  # noqa: PLR0912, PLR0915, PLR0917
+    email_request: EmailRequest,
+    email_data: dict[str, Any],
+    email_attachments_dir: str,
+    attachment_info: list[dict[str, Any]],
+    scheduled_task_id: str | None,
+    email_id: str | None,
+    research_result: dict[str, Any] | None,
+    user_plan: str | None,
+    model_group: str | None,
+    claim: EmailClaim,
+) -> DetailedEmailProcessingResult:
+    """Process an email leased to this worker by ``claim``, see ``process_email_task``."""
+    message_id = email_request.messageId
+
+    # For scheduled tasks, use distilled_alias if available, otherwise fall back to email handle
+    if scheduled_task_id:
+        handle = email_request.distilled_alias.value if email_request.distilled_alias else HandlerAlias.ASK.value
+        logger.info(f"Processing scheduled task {scheduled_task_id} using distilled alias: {handle}")
+    else:
+        raw_handle = email_request.to.split("@")[0].lower()
+
+        # Strip everything after '+' if present
+        if "+" in raw_handle:
+            handle = raw_handle.split("+")[0]
+            logger.info(f"Stripped handle suffix: '{raw_handle}' -> '{handle}'")
+        else:
+            handle = raw_handle
+        if scheduled_task_id:
+            logger.info(f"Processing scheduled task {scheduled_task_id} for handle: {handle}")
+        else:
+            logger.info(f"Processing regular email for handle: {handle}")
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+
+    try:
+        email_instructions: Union[ProcessingInstructions, None] = processing_instructions_resolver(handle)
+    except exceptions.UnspportedHandleError as e:  # Catch specific exception
+        logger.error(f"Unsupported email handle: {handle}. Error: {e!s}")
+        return DetailedEmailProcessingResult(
+            metadata=ProcessingMetadata(
+                processed_at=now_iso,
+                mode=handle,
+                errors=[ProcessingError(message=f"Unsupported email handle: {handle}", details=str(e))],
+                email_sent=EmailSentStatus(
+                    status="error", error=f"Unsupported email handle: {handle} - {e!s}", timestamp=now_iso
+                ),
+            ),
+            email_content=EmailContentDetails(text=None, html=None, enhanced=None),
+            attachments=AttachmentsProcessingResult(processed=[]),
+            calendar_data=None,
+            research=None,
+            pdf_export=None,
+        )
+
+    email_id = email_id or message_id
+    checkpoint = TaskCheckpoint(message_id) if TASK_CHECKPOINT_ENABLED and message_id else None
+    processing_result = checkpoint.load_result() if checkpoint else None
+    if processing_result is not None:
+        logger.info(f"Reply to email {email_id} was generated by an earlier attempt, only sending it")
+    elif research_result is None and _defer_to_research_job(
+        email_request,
+        email_instructions,
+        email_id,
+        continuation={
+            "email_data": email_data,
+            "email_attachments_dir": email_attachments_dir,
+            "attachment_info": attachment_info,
+            "scheduled_task_id": scheduled_task_id,
+            "email_id": email_id,
+            "user_plan": user_plan,
+            "model_group": model_group,
+        },
+    ):
+        # Attachments are kept for the resumed run
+        return DetailedEmailProcessingResult(
+            metadata=ProcessingMetadata(
+                processed_at=now_iso,
+                mode=handle,
+                email_sent=EmailSentStatus(status="research_pending", timestamp=now_iso),
+            ),
+            email_content=EmailContentDetails(text=None, html=None, enhanced=None),
+            attachments=AttachmentsProcessingResult(processed=[]),
+            calendar_data=None,
+            research=None,
+            pdf_export=None,
+        )
+
+    if processing_result is None:
+        processing_result = _generate_reply(
+            email_request,
+            email_instructions,
+            attachment_info,
+            scheduled_task_id,
+            email_id,
+            research_result,
+            user_plan,
+            checkpoint,
+            model_group,
+        )
+        if checkpoint and processing_result.email_content and processing_result.email_content.text:
+            # A retry after this point only sends the reply
+            checkpoint.save_result(processing_result)
+
     if processing_result.email_content and processing_result.email_content.text:
         if email_request.from_email in SKIP_EMAIL_DELIVERY:
             logger.info(f"Skipping email delivery for test email: {email_request.from_email}")
@@ -250,7 +415,7 @@ def process_email_task(  # noqa: PLR0912, PLR0915
             processing_result.metadata.email_sent.message_id = "skipped"
 
             # Mark as processed in Redis even for skipped emails
-            mark_email_as_processed(message_id)
+            claim.complete()
         else:
             attachments_to_send = []
             if processing_result.calendar_data and processing_result.calendar_data.ics_content:
@@ -279,23 +444,6 @@ def process_email_task(  # noqa: PLR0912, PLR0915
                     )
                     logger.info(f"Prepared {processing_result.pdf_export.filename} for attachment in task.")
 
-                    # Clean up the temporary PDF file
-                    Path(processing_result.pdf_export.file_path).unlink()
-                    logger.info(f"Cleaned up temporary PDF file: {processing_result.pdf_export.file_path}")
-
-                    # Clean up the PDF tool's temporary directory using tracked temp_dir
-                    if processing_result.pdf_export.temp_dir:
-                        pdf_temp_dir = processing_result.pdf_export.temp_dir
-                        if pdf_temp_dir and Path(pdf_temp_dir).exists():
-                            shutil.rmtree(pdf_temp_dir, ignore_errors=True)
-                            logger.info(f"Cleaned up PDF tool temp directory: {pdf_temp_dir}")
-                    else:
-                        # Fallback: extract parent directory from the PDF file path
-                        pdf_temp_dir = Path(processing_result.pdf_export.file_path).parent
-                        if pdf_temp_dir.exists():
-                            shutil.rmtree(pdf_temp_dir, ignore_errors=True)
-                            logger.info(f"Cleaned up PDF tool temp directory (fallback): {pdf_temp_dir}")
-
                 except Exception as pdf_error:
                     logger.error(f"Failed to attach PDF file: {pdf_error}")
                     # Continue without the PDF attachment rather than failing the entire email
@@ -318,14 +466,17 @@ def process_email_task(  # noqa: PLR0912, PLR0915
             }
             try:
                 sender = EmailSender()
-                email_sent_response = asyncio.run(
-                    sender.send_reply(
-                        original_email_details,
-                        reply_text=processing_result.email_content.text,
-                        reply_html=processing_result.email_content.html,
-                        attachments=attachments_to_send,
+                with observe_latency(EMAIL_SEND_SECONDS, status="ok") as send_labels:
+                    email_sent_response = asyncio.run(
+                        sender.send_reply(
+                            original_email_details,
+                            reply_text=processing_result.email_content.text,
+                            reply_html=processing_result.email_content.html,
+                            attachments=attachments_to_send,
+                        )
                     )
-                )
+                    if email_sent_response.get("status") == "error":
+                        send_labels["status"] = "error"
                 processing_result.metadata.email_sent.status = email_sent_response.get(
                     "status", "sent"
                 )  # Or map more carefully
@@ -334,14 +485,21 @@ def process_email_task(  # noqa: PLR0912, PLR0915
                     processing_result.metadata.email_sent.error = email_sent_response.get("error", "Unknown send error")
                 # Mark as processed in Redis after successful email sending
                 else:
-                    mark_email_as_processed(message_id)
+                    claim.complete()
 
             except Exception as send_err:
                 logger.exception("Error initializing EmailSender or sending reply")
+                if checkpoint and _retries_remain():
+                    # The reply is checkpointed with its PDF kept, so the retry only sends it. The
+                    # last attempt falls through to report the error and clean up instead
+                    raise
                 processing_result.metadata.email_sent.status = "error"
                 processing_result.metadata.email_sent.error = str(send_err)
                 processing_result.metadata.email_sent.message_id = "error"
 
+            if processing_result.pdf_export and processing_result.pdf_export.file_path:
+                cleanup_pdf_export(processing_result.pdf_export)
+
     # Log the processing result (consider converting Pydantic model to dict for json.dumps if needed)
     try:
         # Attempt to dump the Pydantic model directly, or convert to dict if complex logging is needed
@@ -351,7 +509,231 @@ def process_email_task(  # noqa: PLR0912, PLR0915
         logger.error(f"Error serializing processing_result for logging: {log_e!s}")
         logger.info(f"Email processed. Status: {processing_result.metadata.email_sent.status}")  # Fallback basic log
 
+    if checkpoint:
+        checkpoint.clear()
     if email_attachments_dir:
         cleanup_attachments(email_attachments_dir)
 
     return processing_result
+
+
+@dramatiq.actor(retry_when=should_retry, min_backoff=60 * 1000, time_limit=600000)
+def process_email_task(  # noqa: PLR0917
+    email_data: dict[str, Any],
+    email_attachments_dir: str,
+    attachment_info: list[dict[str, Any]],
+    scheduled_task_id: str | None = None,
+    email_id: str | None = None,
+    research_result: dict[str, Any] | None = None,
+    user_plan: str | None = None,
+    model_group: str | None = None,
+) -> DetailedEmailProcessingResult:
+    """
+    Dramatiq task for processing emails asynchronously.
+
+    The email is leased to the worker for the duration of the run, so duplicate deliveries
+    of an email being processed are retried later and those of a processed email skipped.
+
+    Args:
+        email_data: Dictionary containing email request data
+        email_attachments_dir: Directory containing email attachments
+        attachment_info: List of attachment information dictionaries
+        scheduled_task_id: Optional task ID if this is a scheduled task
+        email_id: ID assigned to the email on receipt, used to track research jobs
+        research_result: Result of the email's background research job, set when resuming after it
+        user_plan: The sender's plan, used to account LLM usage per plan
+        model_group: Cheaper model group the API tagged the email for under load, if any
+
+    Returns:
+        DetailedEmailProcessingResult: The result of the email processing.
+
+    """
+    email_request = EmailRequest(**email_data)
+
+    # Check for duplicate processing using Redis (idempotency check)
+    message_id = email_request.messageId
+    claim = EmailClaim(message_id)
+    held_by = claim.acquire()
+
+    if held_by is EmailState.PROCESSING:
+        # Retried once the other delivery is done, or its lease has expired
+        msg = f"Email with messageId {message_id} is being processed by another worker"
+        raise exceptions.EmailInProgressError(msg)
+    if held_by is EmailState.DONE:
+        logger.warning(f"Email with messageId {message_id} already processed, skipping duplicate processing")
+        # Return a minimal result indicating it was already processed
+        now_iso = datetime.now(timezone.utc).isoformat()
+        return DetailedEmailProcessingResult(
+            metadata=ProcessingMetadata(
+                processed_at=now_iso,
+                mode="duplicate",
+                errors=[ProcessingError(message="Email already processed (duplicate)")],
+                email_sent=EmailSentStatus(
+                    status="duplicate",
+                    message_id="duplicate",
+                    timestamp=now_iso,
+                ),
+            ),
+            email_content=EmailContentDetails(text=None, html=None, enhanced=None),
+            attachments=AttachmentsProcessingResult(processed=[]),
+            calendar_data=None,
+            research=None,
+            pdf_export=None,
+        )
+
+    # Unless the reply is sent, the email is handed back as queued for a retry or the resumed run
+    with claim.renewing():
+        return _process_email(
+            email_request,
+            email_data,
+            email_attachments_dir,
+            attachment_info,
+            scheduled_task_id,
+            email_id,
+            research_result,
+            user_plan,
+            model_group,
+            claim,
+        )
+
+
+@dramatiq.actor(
+    queue_name=ADMISSION_DEFERRED_QUEUE,
+    # Run after the regular emails a worker has already fetched
+    priority=100,
+    retry_when=should_retry,
+    min_backoff=60 * 1000,
+    time_limit=600000,
+)
+def process_deferred_email_task(  # noqa: PLR0917
+    email_data: dict[str, Any],
+    email_attachments_dir: str,
+    attachment_info: list[dict[str, Any]],
+    scheduled_task_id: str | None = None,
+    email_id: str | None = None,
+    user_plan: str | None = None,
+    model_group: str | None = None,
+) -> DetailedEmailProcessingResult:
+    """
+    Dramatiq task processing an email the API deferred while the email queue was busy.
+
+    The email is processed like by ``process_email_task``, only from its own queue, which
+    can be consumed by dedicated workers (``DRAMATIQ_QUEUES``).
+
+    Args:
+        email_data: Dictionary containing email request data
+        email_attachments_dir: Directory containing email attachments
+        attachment_info: List of attachment information dictionaries
+        scheduled_task_id: Optional task ID if this is a scheduled task
+        email_id: ID assigned to the email on receipt, used to track research jobs
+        user_plan: The sender's plan, used to account LLM usage per plan
+        model_group: Model group to run the agent on instead of the handle's, if set
+
+    Returns:
+        DetailedEmailProcessingResult: The result of the email processing.
+
+    """
+    return process_email_task.fn(
+        email_data,
+        email_attachments_dir,
+        attachment_info,
+        scheduled_task_id,
+        email_id,
+        user_plan=user_plan,
+        model_group=model_group,
+    )
+
+
+@dramatiq.actor(
+    queue_name=DEEP_RESEARCH_QUEUE,
+    max_retries=0,
+    time_limit=(DEEP_RESEARCH_JOB_TIMEOUT_SECONDS + DEEP_RESEARCH_JOB_GRACE_SECONDS) * 1000,
+)
+def deep_research_task(email_id: str, query: str, context: str | None, continuation: dict[str, Any]) -> None:
+    """
+    Dramatiq task running deep research for an email in the background.
+
+    Partial findings are persisted while the research streams. When it finishes, or
+    fails, the email is resumed by re-enqueuing ``process_email_task`` with the result.
+
+    Args:
+        email_id: ID of the email the research belongs to
+        query: The research query
+        context: Additional context for the research, e.g. the email body
+        continuation: Arguments to resume ``process_email_task`` with
+
+    """
+    update_research_job(email_id, status=ResearchJobStatus.RUNNING)
+    result: dict[str, Any] = {"query": query, "error": "Research job did not complete"}
+
+    def report_progress(partial_findings: str, visited_urls: list[str]) -> None:
+        update_research_job(email_id, partial_findings=partial_findings, visited_urls=visited_urls)
+
+    try:
+        result = DeepResearchTool().research(
+            query,
+            context,
+            stream=True,
+            timeout=DEEP_RESEARCH_JOB_TIMEOUT_SECONDS,
+            on_progress=report_progress,
+        )
+    except Exception as e:
+        logger.exception(f"Research job for email {email_id} failed")
+        result = {"query": query, "error": str(e)}
+    finally:
+        if "error" in result:
+            update_research_job(email_id, status=ResearchJobStatus.FAILED, error=result["error"])
+        else:
+            update_research_job(
+                email_id,
+                status=ResearchJobStatus.COMPLETED,
+                partial_findings=result["findings"],
+                visited_urls=result.get("visited_urls", []),
+            )
+        process_email_task.send(**continuation, research_result=result)
+        logger.info(f"Research job for email {email_id} finished, resuming email processing")
+
+
+@dramatiq.actor(queue_name=NOTICE_QUEUE, priority=100, max_retries=3, min_backoff=30 * 1000, time_limit=60 * 1000)
+def send_notice_task(email_dict: dict[str, Any], reply_text: str, reply_html: str) -> None:
+    """
+    Dramatiq task sending a rejection notice in reply to an email the API turned away.
+
+    Args:
+        email_dict: The rejected email, in the format of ``EmailSender.send_reply``
+        reply_text: The plain text notice
+        reply_html: The HTML notice
+
+    """
+    response = asyncio.run(EmailSender().send_reply(email_dict, reply_text=reply_text, reply_html=reply_html))
+    if response.get("status") == "error":
+        msg = f"Failed to send notice to {email_dict['from']}: {response.get('error', 'Unknown send error')}"
+        raise RuntimeError(msg)
+    logger.info(f"Sent notice to {email_dict['from']} (subject: {email_dict.get('subject')})")
+
+
+@dramatiq.actor(queue_name=NOTICE_QUEUE, priority=100, max_retries=0, time_limit=60 * 1000)
+def verify_sender_task(email_dict: dict[str, Any]) -> None:
+    """
+    Dramatiq task starting the whitelist verification of a sender whose email was rejected.
+
+    The notice explaining the next steps is sent as its own task, so retrying it does not
+    start another verification.
+
+    Args:
+        email_dict: The rejected email, in the format of ``EmailSender.send_reply``
+
+    """
+    from_email = email_dict["from"]
+    verification_triggered = False
+    try:
+        verification_triggered = asyncio.run(trigger_automatic_verification(from_email))
+        if verification_triggered:
+            logger.info(f"Successfully triggered automatic verification for {from_email}")
+        else:
+            logger.warning(f"Failed to trigger automatic verification for {from_email}")
+    except Exception as e:
+        logger.error(f"Error triggering automatic verification for {from_email}: {e}")
+
+    rejection_msg, html_rejection = build_verification_notice(from_email, verification_triggered=verification_triggered)
+    send_notice_task.send(email_dict, rejection_msg, html_rejection)
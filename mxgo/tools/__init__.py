@@ -1,6 +1,9 @@
 # Tools package for email processing
+import copy
 import os
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
 
 from smolagents import Tool
 from smolagents.default_tools import PythonInterpreterTool, WikipediaSearchTool
@@ -12,13 +15,14 @@ from mxgo.schemas import ToolName
 from mxgo.scripts.visual_qa import AzureVisualizerTool, HuggingFaceVisualizerTool, OpenAIVisualizerTool
 from mxgo.tools.attachment_processing_tool import AttachmentProcessingTool
 from mxgo.tools.cancel_subscription_tool import CancelSubscriptionTool
-from mxgo.tools.citation_aware_visit_tool import CitationAwareVisitTool
+from mxgo.tools.citation_aware_visit_tool import CitationAwareBatchVisitTool, CitationAwareVisitTool
 from mxgo.tools.deep_research_tool import DeepResearchTool
 from mxgo.tools.delete_scheduled_tasks_tool import DeleteScheduledTasksTool
 from mxgo.tools.external_data.linkedin.fresh_data import LinkedInFreshDataTool
 from mxgo.tools.external_data.linkedin.linkedin_data_api import LinkedInDataAPITool
 from mxgo.tools.fallback_search_tool import FallbackWebSearchTool
 from mxgo.tools.meeting_tool import MeetingTool
+from mxgo.tools.memoization import ToolResultMemo
 from mxgo.tools.news_tool import NewsTool
 from mxgo.tools.pdf_export_tool import PDFExportTool
 from mxgo.tools.references_generator_tool import ReferencesGeneratorTool
@@ -30,6 +34,7 @@ __all__ = [
     "AzureVisualizerTool",
     "BraveSearchTool",
     "CancelSubscriptionTool",
+    "CitationAwareBatchVisitTool",
     "CitationAwareVisitTool",
     "DDGSearchTool",
     "DeepResearchTool",
@@ -45,62 +50,196 @@ __all__ = [
     "PDFExportTool",
     "ReferencesGeneratorTool",
     "ScheduledTasksTool",
+    "ToolResultMemo",
     "create_tool_mapping",
 ]
 
 
-def _initialize_search_tools(context: RequestContext) -> dict[ToolName, Tool | None]:
-    """Initialize search tools."""
-    tool_mapping = {}
-    tool_mapping[ToolName.DDG_SEARCH] = DDGSearchTool(context=context, max_results=10)
+# Tools without per-request state, built once per process and keyed by their construction arguments
+STATELESS_TOOLS = frozenset(
+    {
+        ToolName.PYTHON_INTERPRETER,
+        ToolName.WIKIPEDIA_SEARCH,
+        ToolName.MEETING_CREATOR,
+        ToolName.CANCEL_SUBSCRIPTION_TOOL,
+    }
+)
 
-    if os.getenv("BRAVE_SEARCH_API_KEY"):
-        tool_mapping[ToolName.BRAVE_SEARCH] = BraveSearchTool(context=context, max_results=5)
-        tool_mapping[ToolName.NEWS_SEARCH] = NewsTool(context=context, max_results=10)
-    else:
-        tool_mapping[ToolName.BRAVE_SEARCH] = None
-        tool_mapping[ToolName.NEWS_SEARCH] = None
+# Most calls of a tool the agent runs at once when a step makes several. Tools with side
+# effects or per-email state run one at a time, and costly or rate-limited ones are kept
+# low; tools not listed are only bounded by AGENT_MAX_TOOL_THREADS
+TOOL_CONCURRENCY_LIMITS: dict[ToolName, int] = {
+    ToolName.PYTHON_INTERPRETER: 1,
+    ToolName.MEETING_CREATOR: 1,
+    ToolName.PDF_EXPORT: 1,
+    ToolName.SCHEDULED_TASKS: 1,
+    ToolName.DELETE_SCHEDULED_TASKS: 1,
+    ToolName.CANCEL_SUBSCRIPTION_TOOL: 1,
+    ToolName.DEEP_RESEARCH: 1,
+    ToolName.ATTACHMENT_PROCESSOR: 2,
+    ToolName.AZURE_VISUALIZER: 2,
+    ToolName.CITATION_AWARE_BATCH_VISIT: 2,
+    ToolName.LINKEDIN_FRESH_DATA: 2,
+    ToolName.LINKEDIN_DATA_API: 2,
+}
 
-    primary_search_tool = tool_mapping.get(ToolName.BRAVE_SEARCH) or tool_mapping.get(ToolName.DDG_SEARCH)
+# Tools that read the citations collected so far, by the name the model calls them with.
+# The agent runs them after the other calls of a step instead of concurrently
+CITATION_READING_TOOLS = frozenset({ReferencesGeneratorTool.name})
 
-    if primary_search_tool:
-        try:
-            fallback_search_tool = FallbackWebSearchTool(
-                primary_tool=primary_search_tool,
-                secondary_tool=tool_mapping.get(ToolName.DDG_SEARCH)
-                if primary_search_tool == tool_mapping.get(ToolName.BRAVE_SEARCH)
-                else None,
-            )
-            tool_mapping[ToolName.WEB_SEARCH] = fallback_search_tool
-        except Exception:
-            tool_mapping[ToolName.WEB_SEARCH] = primary_search_tool
-    else:
-        tool_mapping[ToolName.WEB_SEARCH] = None
-
-    if os.getenv("SERPAPI_API_KEY") or os.getenv("SERPER_API_KEY"):
-        tool_mapping[ToolName.GOOGLE_SEARCH] = GoogleSearchTool(context=context)
-    else:
-        tool_mapping[ToolName.GOOGLE_SEARCH] = None
-    return tool_mapping
-
-
-def _initialize_linkedin_tools(context: RequestContext) -> dict[ToolName, Tool | None]:
-    """Initialize LinkedIn tools."""
-    tool_mapping = {}
-    rapidapi_key = os.getenv("RAPIDAPI_KEY")
-    if rapidapi_key:
-        try:
-            tool_mapping[ToolName.LINKEDIN_FRESH_DATA] = LinkedInFreshDataTool(api_key=rapidapi_key, context=context)
-        except Exception:
-            tool_mapping[ToolName.LINKEDIN_FRESH_DATA] = None
+# Tools whose results are never memoized: calls with side effects that must happen every
+# time, the stateful Python interpreter, PDF exports (a new file per call) and the
+# references generator, whose output depends on the citations collected so far
+UNMEMOIZED_TOOLS = frozenset(
+    {
+        ToolName.SCHEDULED_TASKS,
+        ToolName.DELETE_SCHEDULED_TASKS,
+        ToolName.CANCEL_SUBSCRIPTION_TOOL,
+        ToolName.PYTHON_INTERPRETER,
+        ToolName.PDF_EXPORT,
+        ToolName.REFERENCES_GENERATOR,
+    }
+)
+
+_shared_tools: dict[Hashable, Tool] = {}
+_shared_tools_lock = threading.Lock()
+
+
+def _shared_tool(key: Hashable, factory: Callable[[], Tool]) -> Tool:
+    """
+    Get a process-wide tool instance, building it on first use.
+
+    Callers get a shallow copy: the agent wraps ``forward`` in place for metrics and
+    profiling, and those wrappers must stay with one email. The copy shares everything
+    expensive (HTTP sessions, interpreter tool tables) with the cached instance.
+    """
+    with _shared_tools_lock:
+        tool = _shared_tools.get(key)
+        if tool is None:
+            tool = _shared_tools[key] = factory()
+    return copy.copy(tool)
+
+
+@dataclass
+class _ToolBuilder:
+    """Builds the tools of one email on demand, each at most once."""
+
+    context: RequestContext
+    scheduled_tasks_tool_factory: Callable[[], Tool]
+    allowed_python_imports: list[str]
+    model: RoutedLiteLLMModel | None = None
+    built: dict[ToolName, Tool | None] = field(default_factory=dict)
+
+    def get_model(self) -> RoutedLiteLLMModel:
+        """Get the model for tools that need one, creating it on first use."""
+        if self.model is None:
+            self.model = RoutedLiteLLMModel()
+        return self.model
+
+    def build(self, name: ToolName) -> Tool | None:
+        """Build a tool, or return the instance already built for this email."""
+        if name not in self.built:
+            self.built[name] = TOOL_FACTORIES[name](self)
+        return self.built[name]
+
+
+def _build_python_interpreter(builder: _ToolBuilder) -> Tool:
+    imports = builder.allowed_python_imports
+    return _shared_tool(
+        (ToolName.PYTHON_INTERPRETER, tuple(sorted(imports))),
+        lambda: PythonInterpreterTool(authorized_imports=imports),
+    )
+
+
+def _build_azure_visualizer(builder: _ToolBuilder) -> Tool | None:
+    try:
+        return AzureVisualizerTool(model=builder.get_model())
+    except Exception as e:
+        logger = get_logger("tools")
+        logger.warning(f"Failed to initialize AzureVisualizerTool: {e}")
+        return None
+
+
+def _build_brave_search(builder: _ToolBuilder) -> Tool | None:
+    if not os.getenv("BRAVE_SEARCH_API_KEY"):
+        return None
+    return BraveSearchTool(context=builder.context, max_results=5)
+
+
+def _build_news_search(builder: _ToolBuilder) -> Tool | None:
+    if not os.getenv("BRAVE_SEARCH_API_KEY"):
+        return None
+    return NewsTool(context=builder.context, max_results=10)
+
+
+def _build_web_search(builder: _ToolBuilder) -> Tool | None:
+    brave_search_tool = builder.build(ToolName.BRAVE_SEARCH)
+    ddg_search_tool = builder.build(ToolName.DDG_SEARCH)
+    primary_search_tool = brave_search_tool or ddg_search_tool
+    if not primary_search_tool:
+        return None
+    try:
+        return FallbackWebSearchTool(
+            primary_tool=primary_search_tool,
+            secondary_tool=ddg_search_tool if primary_search_tool == brave_search_tool else None,
+        )
+    except Exception:
+        return primary_search_tool
+
+
+def _build_google_search(builder: _ToolBuilder) -> Tool | None:
+    if not (os.getenv("SERPAPI_API_KEY") or os.getenv("SERPER_API_KEY")):
+        return None
+    return GoogleSearchTool(context=builder.context)
+
+
+def _linkedin_tool_factory(tool_class: type[Tool]) -> Callable[[_ToolBuilder], Tool | None]:
+    def build(builder: _ToolBuilder) -> Tool | None:
+        rapidapi_key = os.getenv("RAPIDAPI_KEY")
+        if not rapidapi_key:
+            return None
         try:
-            tool_mapping[ToolName.LINKEDIN_DATA_API] = LinkedInDataAPITool(api_key=rapidapi_key, context=context)
+            return tool_class(api_key=rapidapi_key, context=builder.context)
         except Exception:
-            tool_mapping[ToolName.LINKEDIN_DATA_API] = None
-    else:
-        tool_mapping[ToolName.LINKEDIN_FRESH_DATA] = None
-        tool_mapping[ToolName.LINKEDIN_DATA_API] = None
-    return tool_mapping
+            return None
+
+    return build
+
+
+def _build_deep_research(_builder: _ToolBuilder) -> Tool | None:
+    # Not shared: the agent enables deep research and hands over completed research per email
+    if not os.getenv("JINA_API_KEY"):
+        return None
+    return DeepResearchTool()
+
+
+# Lazy factories for every tool a handle can allow. A factory returns None when the
+# tool is not available, e.g. because its API key is missing.
+TOOL_FACTORIES: dict[ToolName, Callable[[_ToolBuilder], Tool | None]] = {
+    ToolName.ATTACHMENT_PROCESSOR: lambda b: AttachmentProcessingTool(context=b.context),
+    ToolName.CITATION_AWARE_VISIT: lambda b: CitationAwareVisitTool(context=b.context),
+    ToolName.CITATION_AWARE_BATCH_VISIT: lambda b: CitationAwareBatchVisitTool(context=b.context),
+    ToolName.PYTHON_INTERPRETER: _build_python_interpreter,
+    ToolName.WIKIPEDIA_SEARCH: lambda _b: _shared_tool(ToolName.WIKIPEDIA_SEARCH, WikipediaSearchTool),
+    ToolName.REFERENCES_GENERATOR: lambda b: ReferencesGeneratorTool(context=b.context),
+    ToolName.AZURE_VISUALIZER: _build_azure_visualizer,
+    ToolName.DDG_SEARCH: lambda b: DDGSearchTool(context=b.context, max_results=10),
+    ToolName.BRAVE_SEARCH: _build_brave_search,
+    ToolName.NEWS_SEARCH: _build_news_search,
+    ToolName.WEB_SEARCH: _build_web_search,
+    ToolName.GOOGLE_SEARCH: _build_google_search,
+    ToolName.LINKEDIN_FRESH_DATA: _linkedin_tool_factory(LinkedInFreshDataTool),
+    ToolName.LINKEDIN_DATA_API: _linkedin_tool_factory(LinkedInDataAPITool),
+    ToolName.DEEP_RESEARCH: _build_deep_research,
+    ToolName.MEETING_CREATOR: lambda _b: _shared_tool(ToolName.MEETING_CREATOR, MeetingTool),
+    # A new temp directory per email; the task removes it once the reply is sent
+    ToolName.PDF_EXPORT: lambda _b: PDFExportTool(),
+    ToolName.SCHEDULED_TASKS: lambda b: b.scheduled_tasks_tool_factory(),
+    ToolName.DELETE_SCHEDULED_TASKS: lambda b: DeleteScheduledTasksTool(context=b.context),
+    ToolName.CANCEL_SUBSCRIPTION_TOOL: lambda _b: _shared_tool(
+        ToolName.CANCEL_SUBSCRIPTION_TOOL, CancelSubscriptionTool
+    ),
+}
 
 
 def create_tool_mapping(
@@ -108,50 +247,39 @@ def create_tool_mapping(
     scheduled_tasks_tool_factory: Callable[[], Tool],
     allowed_python_imports: list[str],
     model: RoutedLiteLLMModel | None = None,
+    allowed_tools: Iterable[ToolName] | None = None,
+    *,
+    tool_memo: ToolResultMemo | None = None,
 ) -> dict[ToolName, Tool | None]:
     """
     Create a mapping of ToolName enums to actual tool instances.
 
+    Only the requested tools are built. Tools in ``STATELESS_TOOLS`` are built once
+    per process and shared across emails. With a ``tool_memo``, the results of every
+    tool but those in ``UNMEMOIZED_TOOLS`` are memoized for the email.
+
     Args:
         context: Request context for tools that need it
         scheduled_tasks_tool_factory: Factory function to create limited scheduled tasks tool
         allowed_python_imports: List of allowed Python imports for the interpreter
-        model: Optional RoutedLiteLLMModel instance for tools that need it
+        model: Optional RoutedLiteLLMModel instance for tools that need it, created on demand if not given
+        allowed_tools: Tools to build, all tools if not given
+        tool_memo: Memo of the email's tool results, the tools are not memoized if not given
 
     Returns:
         dict[ToolName, Tool | None]: Mapping of tool names to instances
 
     """
-    if model is None:
-        model = RoutedLiteLLMModel()
-
-    tool_mapping = {
-        ToolName.ATTACHMENT_PROCESSOR: AttachmentProcessingTool(context=context),
-        ToolName.CITATION_AWARE_VISIT: CitationAwareVisitTool(context=context),
-        ToolName.PYTHON_INTERPRETER: PythonInterpreterTool(authorized_imports=allowed_python_imports),
-        ToolName.WIKIPEDIA_SEARCH: WikipediaSearchTool(),
-        ToolName.REFERENCES_GENERATOR: ReferencesGeneratorTool(context=context),
-    }
-
-    try:
-        tool_mapping[ToolName.AZURE_VISUALIZER] = AzureVisualizerTool(model=model)
-    except Exception as e:
-        tool_mapping[ToolName.AZURE_VISUALIZER] = None
-        logger = get_logger("tools")
-        logger.warning(f"Failed to initialize AzureVisualizerTool: {e}")
-
-    tool_mapping.update(_initialize_search_tools(context))
-    tool_mapping.update(_initialize_linkedin_tools(context))
-
-    if os.getenv("JINA_API_KEY"):
-        tool_mapping[ToolName.DEEP_RESEARCH] = DeepResearchTool()
-    else:
-        tool_mapping[ToolName.DEEP_RESEARCH] = None
-
-    tool_mapping[ToolName.MEETING_CREATOR] = MeetingTool()
-    tool_mapping[ToolName.PDF_EXPORT] = PDFExportTool()
-    tool_mapping[ToolName.SCHEDULED_TASKS] = scheduled_tasks_tool_factory()
-    tool_mapping[ToolName.DELETE_SCHEDULED_TASKS] = DeleteScheduledTasksTool(context=context)
-    tool_mapping[ToolName.CANCEL_SUBSCRIPTION_TOOL] = CancelSubscriptionTool()
-
-    return tool_mapping
+    builder = _ToolBuilder(
+        context=context,
+        scheduled_tasks_tool_factory=scheduled_tasks_tool_factory,
+        allowed_python_imports=allowed_python_imports,
+        model=model,
+    )
+    names = TOOL_FACTORIES if allowed_tools is None else allowed_tools
+    mapping = {name: builder.build(name) for name in names if name in TOOL_FACTORIES}
+    if tool_memo is not None:
+        for name, tool in mapping.items():
+            if tool is not None and name not in UNMEMOIZED_TOOLS:
+                tool_memo.wrap_tool(tool)
+    return mapping
@@ -14,7 +14,6 @@ import contextlib
 from mxgo._logging import get_logger
 from mxgo.request_context import RequestContext
 from mxgo.schemas import ToolOutputWithCitations
-from scripts.mdconvert import MarkdownConverter
 
 # Configure logger
 logger = get_logger("attachment_tool")
@@ -89,6 +88,9 @@ class AttachmentProcessingTool(Tool):
         self.context = context
         self.model = model
         self.text_limit = text_limit
+        # The converter pulls in pandas, pdfminer, python-pptx, pydub and more; import it with the tool
+        from scripts.mdconvert import MarkdownConverter  # NOQA: PLC0415
+
         self.converter = MarkdownConverter()
 
         # Configure image extensions that should be handled by azure_visualizer
@@ -5,21 +5,38 @@ Citation-aware webpage visit tool that collects citations.
 import json
 import logging
 import re
-from typing import ClassVar
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, ClassVar
 
+import requests
+from markdownify import markdownify
 from smolagents import Tool
-from smolagents.default_tools import VisitWebpageTool
 
+from mxgo import http_client
 from mxgo.request_context import RequestContext
-from mxgo.schemas import ToolOutputWithCitations
+from mxgo.schemas import CitationCollection, ToolOutputWithCitations
+from mxgo.tools.page_cache import cached_page
 
 logger = logging.getLogger(__name__)
 
+# Single page visit limits
+VISIT_TIMEOUT_SECONDS = 20
+MAX_VISIT_CHARS = 40000
+
+# Batch visit limits
+MAX_BATCH_URLS = 10
+BATCH_FETCH_TIMEOUT_SECONDS = 15
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MAX_PAGE_CHARS = 10000
+FETCH_CHUNK_SIZE = 64 * 1024
+
 
 class CitationAwareVisitTool(Tool):
     """
     Visit webpage tool that automatically collects citations.
-    Extends the default VisitWebpageTool to include citation tracking.
+    Fetches pages through the shared page cache and tracks each visit as a citation.
     """
 
     name = "visit_webpage_with_citations"
@@ -37,7 +54,6 @@ class CitationAwareVisitTool(Tool):
         """Initialize the citation-aware visit tool."""
         super().__init__()
         self.context = context
-        self.visit_tool = VisitWebpageTool()
         logger.debug("CitationAwareVisitTool initialized")
 
     def forward(self, url: str) -> str:
@@ -45,17 +61,21 @@ class CitationAwareVisitTool(Tool):
         try:
             logger.info(f"Visiting webpage: {url}")
 
-            # Get the webpage content
-            content = self.visit_tool.forward(url=url)
-
-            # Extract title from content if possible
-            title_match = (
-                re.search(r"<title>(.*?)</title>", content, re.IGNORECASE)
-                or re.search(r"<h1[^>]*>(.*?)</h1>", content, re.IGNORECASE)
-                or re.search(r"# (.*?)$", content, re.MULTILINE)
-            )
+            # Get the webpage content; fetch errors are reported to the agent without a citation
+            try:
+                title, content = fetch_page_as_markdown(url, timeout=VISIT_TIMEOUT_SECONDS)
+            except (requests.Timeout, TimeoutError):
+                return "The request timed out. Please try again later or check the URL."
+            except requests.RequestException as e:
+                return f"Error fetching the webpage: {e!s}"
+            except ValueError as e:
+                return f"Could not read the webpage: {e!s}"
 
-            title = re.sub(r"<[^>]+>", "", title_match.group(1)).strip() if title_match else f"Webpage: {url}"
+            if len(content) > MAX_VISIT_CHARS:
+                content = (
+                    content[:MAX_VISIT_CHARS]
+                    + f"\n..._This content has been truncated to stay below {MAX_VISIT_CHARS} characters_...\n"
+                )
 
             # Add citation for this webpage - mark as visited
             citation_id = self.context.add_web_citation(url, title, visited=True)
@@ -72,3 +92,171 @@ class CitationAwareVisitTool(Tool):
         except Exception as e:
             logger.error(f"Failed to visit webpage {url}: {e}")
             raise
+
+
+def _extract_title(html: str, markdown: str, url: str) -> str:
+    """Get a page title from the HTML title tag, the first heading, or fall back to the URL."""
+    title_match = (
+        re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+        or re.search(r"<h1[^>]*>(.*?)</h1>", html, re.IGNORECASE | re.DOTALL)
+        or re.search(r"^# (.*?)$", markdown, re.MULTILINE)
+    )
+    title = re.sub(r"<[^>]+>", "", title_match.group(1)).strip() if title_match else ""
+    return " ".join(title.split()) or f"Webpage: {url}"
+
+
+def _download_page(url: str, timeout: float, max_bytes: int, headers: dict[str, str]) -> dict[str, Any] | None:
+    """Download and convert a page, returning None if a conditional request reports it unchanged."""
+    deadline = time.monotonic() + timeout
+    response = http_client.get(url, timeout=timeout, stream=True, headers=headers or None)
+    try:
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return None
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "text/html").lower()
+        if not content_type.startswith("text/") and "html" not in content_type and "xml" not in content_type:
+            msg = f"Unsupported content type: {content_type}"
+            raise ValueError(msg)
+
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) >= max_bytes:
+                logger.debug(f"Page {url} exceeded {max_bytes} bytes, truncating")
+                break
+            if time.monotonic() > deadline:
+                msg = f"Page download exceeded {timeout}s"
+                raise TimeoutError(msg)
+    finally:
+        response.close()
+
+    html = bytes(body[:max_bytes]).decode(response.encoding or "utf-8", errors="replace")
+    markdown = re.sub(r"\n{3,}", "\n\n", markdownify(html).strip())
+    return {
+        "title": _extract_title(html, markdown, url),
+        "markdown": markdown,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "cache_control": response.headers.get("Cache-Control"),
+    }
+
+
+def fetch_page_as_markdown(
+    url: str, timeout: float = BATCH_FETCH_TIMEOUT_SECONDS, max_bytes: int = MAX_PAGE_BYTES
+) -> tuple[str, str]:
+    """
+    Fetch a webpage within a time and size budget and convert it to markdown.
+
+    Pages come from the shared page cache when possible; stale copies are revalidated
+    with a conditional request.
+
+    Args:
+        url: The URL to fetch
+        timeout: Total time allowed for the download in seconds
+        max_bytes: Maximum number of bytes read from the response body
+
+    Returns:
+        tuple[str, str]: The page title and its markdown content
+
+    Raises:
+        requests.RequestException: If the request fails
+        TimeoutError: If the download exceeds the time budget
+        ValueError: If the response is not a text document
+
+    """
+    page, _ = cached_page(url, lambda headers: _download_page(url, timeout, max_bytes, headers))
+    return page["title"], page["markdown"]
+
+
+class CitationAwareBatchVisitTool(Tool):
+    """
+    Visit several webpages concurrently and cite each of them.
+    Lets research-heavy handles gather sources in one step instead of one step per page.
+    """
+
+    name = "visit_webpages_with_citations"
+    description = (
+        "Visit several webpages at once (e.g. the most relevant search results) and extract their content "
+        "as markdown. Pages are fetched in parallel and returned in the order given, each with its citation ID. "
+        f"Accepts up to {MAX_BATCH_URLS} URLs; long pages are truncated."
+    )
+    inputs: ClassVar = {
+        "urls": {"type": "array", "description": f"List of webpage URLs to visit (max {MAX_BATCH_URLS})."},
+    }
+    output_type = "object"
+
+    def __init__(self, context: RequestContext, max_page_chars: int = MAX_PAGE_CHARS):
+        """
+        Initialize the batch visit tool.
+
+        Args:
+            context: Request context containing the citation manager
+            max_page_chars: Maximum characters of markdown returned per page
+
+        """
+        super().__init__()
+        self.context = context
+        self.max_page_chars = max_page_chars
+        logger.debug("CitationAwareBatchVisitTool initialized")
+
+    def _fetch(self, url: str) -> tuple[str, str] | Exception:
+        try:
+            return fetch_page_as_markdown(url)
+        except Exception as e:
+            logger.warning(f"Failed to visit webpage {url}: {e}")
+            return e
+
+    def forward(self, urls: list[str]) -> str:
+        """Visit the webpages concurrently and return their content with citations in input order."""
+        unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        if not unique_urls:
+            msg = "At least one URL is required."
+            raise ValueError(msg)
+
+        skipped_urls = unique_urls[MAX_BATCH_URLS:]
+        unique_urls = unique_urls[:MAX_BATCH_URLS]
+        if skipped_urls:
+            logger.warning(f"Batch visit limited to {MAX_BATCH_URLS} URLs, skipping {len(skipped_urls)}")
+
+        logger.info(f"Visiting {len(unique_urls)} webpages concurrently")
+        with ThreadPoolExecutor(max_workers=len(unique_urls), thread_name_prefix="batch-visit") as executor:
+            pages = list(executor.map(self._fetch, unique_urls))
+
+        # Citations are added here, in input order, so IDs do not depend on which page loaded first
+        content_parts = []
+        citation_ids = []
+        failed_urls = []
+        for i, (url, page) in enumerate(zip(unique_urls, pages, strict=True), 1):
+            if isinstance(page, Exception):
+                failed_urls.append(url)
+                content_parts.append(f"## {i}. {url}\nCould not fetch this page: {page}")
+                continue
+
+            title, markdown = page
+            if len(markdown) > self.max_page_chars:
+                markdown = markdown[: self.max_page_chars] + "\n..._Page truncated_..."
+            citation_id = self.context.add_web_citation(url, title, visited=True)
+            citation_ids.append(citation_id)
+            content_parts.append(f"## {i}. **{title}** [#{citation_id}]\nURL: {url}\n\n{markdown}")
+
+        if skipped_urls:
+            content_parts.append(f"Skipped {len(skipped_urls)} URLs over the {MAX_BATCH_URLS} URL limit.")
+
+        local_citations = CitationCollection()
+        sources_by_id = {source.id: source for source in self.context.get_citations().sources}
+        for citation_id in citation_ids:
+            local_citations.add_source(sources_by_id[citation_id])
+
+        result = ToolOutputWithCitations(
+            content="\n\n---\n\n".join(content_parts),
+            citations=local_citations,
+            metadata={
+                "urls": unique_urls,
+                "citation_ids": citation_ids,
+                "failed_urls": failed_urls,
+                "skipped_urls": skipped_urls,
+            },
+        )
+
+        logger.info(f"Visited {len(citation_ids)}/{len(unique_urls)} webpages successfully")
+        return json.dumps(result.model_dump())
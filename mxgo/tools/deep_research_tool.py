@@ -2,18 +2,23 @@ import base64
 import json
 import mimetypes
 import os
+import time
 import urllib.parse
+from collections.abc import Callable
 from typing import Any, ClassVar
 
-import requests
 from smolagents import Tool
 
+from mxgo import http_client
 from mxgo._logging import get_logger
 from mxgo.tools.mock_jina_service import MockJinaService
 
 # Configure logger
 logger = get_logger("research_tool")
 
+# Minimum interval between partial findings reported while streaming
+PROGRESS_INTERVAL_SECONDS = 5
+
 
 class DeepResearchTool(Tool):
     """
@@ -114,6 +119,9 @@ class DeepResearchTool(Tool):
         # Flag to track if deep research is explicitly requested
         self.deep_research_enabled = False
 
+        # Findings from a background research job, returned instead of calling the API
+        self.completed_research: dict[str, Any] | None = None
+
         # Maximum file size for attachments (10MB in bytes)
         self.max_file_size = 10 * 1024 * 1024
 
@@ -241,12 +249,15 @@ class DeepResearchTool(Tool):
         # Return a single message with all content
         return [{"role": "user", "content": message_content}]
 
-    def _process_stream_response(self, response):  # noqa: PLR0912
+    def _process_stream_response(  # noqa: PLR0912
+        self, response, on_progress: Callable[[str, list[str]], None] | None = None
+    ):
         """
         Process a streaming response from the API.
 
         Args:
             response: The streaming response object
+            on_progress: Called at most every PROGRESS_INTERVAL_SECONDS with the partial findings and visited URLs
 
         Returns:
             dict: Processed results containing findings and metadata
@@ -258,12 +269,20 @@ class DeepResearchTool(Tool):
         read_urls = set()
         timestamp = response.headers.get("date")
         current_type = None  # Track current message type (think/text)
+        last_progress = time.monotonic()
 
         try:
             for line in response.iter_lines():
                 if not line:
                     continue
 
+                if on_progress and findings and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                    last_progress = time.monotonic()
+                    try:
+                        on_progress("".join(findings).strip(), list(visited_urls))
+                    except Exception as e:
+                        logger.warning(f"Failed to report research progress: {e!s}")
+
                 try:
                     # Remove 'data: ' prefix if present and decode
                     line_str = line.decode("utf-8")
@@ -453,7 +472,7 @@ class DeepResearchTool(Tool):
         else:
             return result
 
-    def forward(  # noqa: PLR0912, PLR0915
+    def forward(
         self,
         query: str,
         context: dict[str, Any] | None = None,
@@ -478,208 +497,255 @@ class DeepResearchTool(Tool):
             Research results including findings, citations, and sources
 
         """
-        # Ensure parameters are properly initialized
-        context = context if isinstance(context, dict) else {}
-        memory_attachments = memory_attachments if isinstance(memory_attachments, dict) else {}
-        thread_messages = thread_messages if isinstance(thread_messages, list) else []
-
-        # Log memory attachment processing
-        if memory_attachments:
-            total_size = sum(len(content) for content, _ in memory_attachments.values())
-            logger.info(f"Processing {len(memory_attachments)} memory attachments, total size: {total_size} bytes")
-
-        result = {}
-
         if not self.api_key and not self.use_mock_service:
-            result = {
+            return {
                 "query": query,
                 "findings": "Research functionality is not available. JINA_API_KEY is required.",
                 "error": "API key not configured",
             }
-        elif not self.deep_research_enabled:
+        if not self.deep_research_enabled:
             logger.info("Deep research is disabled. Enable it explicitly before use.")
-            result = {
+            return {
                 "query": query,
                 "findings": "Deep research functionality is currently disabled. Enable it explicitly before use.",
                 "error": "Deep research disabled",
             }
-        else:
-            try:
-                if self.use_mock_service:
-                    logger.info("Using mock Jina service for load testing")
-                    response_data = self.mock_service.process_request(
-                        query=query, stream=stream, reasoning_effort=reasoning_effort
-                    )
+        if self.completed_research is not None:
+            # Research already ran as a background job for this email
+            logger.info("Returning findings from completed background research job")
+            return {"query": query, **self.completed_research}
+
+        return self.research(
+            query,
+            context.get("context") if isinstance(context, dict) else None,
+            memory_attachments,
+            thread_messages,
+            stream=stream,
+            reasoning_effort=reasoning_effort,
+        )
+
+    def use_completed_research(self, result: dict[str, Any]) -> None:
+        """
+        Serve findings from a finished background research job instead of calling the API.
 
-                    if stream:
-                        # Process streaming response from mock service
-                        stream_results = self._process_stream_response(response_data)
-                        if "error" in stream_results:
-                            result = {
-                                "query": query,
-                                "findings": f"An error occurred during research: {stream_results['error']}",
-                                "error": stream_results["error"],
-                            }
-                        else:
-                            result = {"query": query, **stream_results}
-                    else:
-                        # Process non-streaming response from mock service
-                        content = response_data["choices"][0]["message"]["content"]
-                        annotations = response_data["choices"][0]["message"]["annotations"]
-
-                        # Format content with proper citations
-                        formatted_content = self._format_research_content(
-                            content=content,
-                            annotations=annotations,
-                            visited_urls=response_data.get("visitedURLs", []),
-                            read_urls=response_data.get("readURLs", []),
-                        )
+        Args:
+            result: Result dict produced by ``research``
+
+        """
+        self.completed_research = {k: v for k, v in result.items() if k != "query"}
+
+    def research(  # noqa: PLR0912
+        self,
+        query: str,
+        context: str | None = None,
+        memory_attachments: dict[str, tuple[bytes, str]] | None = None,
+        thread_messages: list[dict[str, str]] | None = None,
+        *,
+        stream: bool = False,
+        reasoning_effort: str = "medium",
+        timeout: float = 600,
+        on_progress: Callable[[str, list[str]], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run a research request against the API, regardless of the enabled flag.
+
+        Args:
+            query: The research query to investigate
+            context: Optional additional context
+            memory_attachments: Dict mapping filename to (content, mime_type) tuples for in-memory files
+            thread_messages: Previous messages in thread
+            stream: Whether to stream the response
+            reasoning_effort: Level of reasoning effort ('low', 'medium', 'high')
+            timeout: Request timeout in seconds
+            on_progress: Called with the partial findings and visited URLs while streaming
+
+        Returns:
+            dict: Research results, with an ``error`` key if the research failed
+
+        """
+        memory_attachments = memory_attachments if isinstance(memory_attachments, dict) else {}
+        thread_messages = thread_messages if isinstance(thread_messages, list) else []
 
+        # Log memory attachment processing
+        if memory_attachments:
+            total_size = sum(len(content) for content, _ in memory_attachments.values())
+            logger.info(f"Processing {len(memory_attachments)} memory attachments, total size: {total_size} bytes")
+
+        result = {}
+        try:
+            if self.use_mock_service:
+                logger.info("Using mock Jina service for load testing")
+                response_data = self.mock_service.process_request(
+                    query=query, stream=stream, reasoning_effort=reasoning_effort
+                )
+
+                if stream:
+                    # Process streaming response from mock service
+                    stream_results = self._process_stream_response(response_data, on_progress)
+                    if "error" in stream_results:
                         result = {
                             "query": query,
-                            "findings": formatted_content,
-                            "annotations": annotations,
-                            "visited_urls": response_data.get("visitedURLs", []),
-                            "read_urls": response_data.get("readURLs", []),
-                            "timestamp": response_data.get("timestamp"),
-                            "usage": response_data.get("usage", {}),
-                            "num_urls": response_data.get("numURLs", 0),
+                            "findings": f"An error occurred during research: {stream_results['error']}",
+                            "error": stream_results["error"],
                         }
+                    else:
+                        result = {"query": query, **stream_results}
                 else:
-                    # Prepare messages including files and context
-                    messages = self._prepare_messages(
-                        query=query,
-                        context=context.get("context"),
-                        memory_attachments=memory_attachments,
-                        thread_messages=thread_messages,
+                    # Process non-streaming response from mock service
+                    content = response_data["choices"][0]["message"]["content"]
+                    annotations = response_data["choices"][0]["message"]["annotations"]
+
+                    # Format content with proper citations
+                    formatted_content = self._format_research_content(
+                        content=content,
+                        annotations=annotations,
+                        visited_urls=response_data.get("visitedURLs", []),
+                        read_urls=response_data.get("readURLs", []),
                     )
 
-                    # Prepare request data
-                    data = {
-                        "model": "jina-deepsearch-v1",
-                        "messages": messages,
-                        "stream": stream,
-                        "reasoning_effort": reasoning_effort,
-                        "no_direct_answer": False,
+                    result = {
+                        "query": query,
+                        "findings": formatted_content,
+                        "annotations": annotations,
+                        "visited_urls": response_data.get("visitedURLs", []),
+                        "read_urls": response_data.get("readURLs", []),
+                        "timestamp": response_data.get("timestamp"),
+                        "usage": response_data.get("usage", {}),
+                        "num_urls": response_data.get("numURLs", 0),
                     }
+            else:
+                # Prepare messages including files and context
+                messages = self._prepare_messages(
+                    query=query,
+                    context=context,
+                    memory_attachments=memory_attachments,
+                    thread_messages=thread_messages,
+                )
 
-                    # Log the complete request data
-                    logger.info("Request data being sent to Jina AI:")
-                    logger.info(f"URL: {self.api_url}")
-                    logger.info(
-                        f"Headers: {json.dumps({k: v for k, v in self.headers.items() if k != 'Authorization'})}"
-                    )
-                    logger.info(f"Request Body: {json.dumps(data, indent=2)}")
-
-                    logger.info(f"Sending research query to Jina AI: {query}")
+                # Prepare request data
+                data = {
+                    "model": "jina-deepsearch-v1",
+                    "messages": messages,
+                    "stream": stream,
+                    "reasoning_effort": reasoning_effort,
+                    "no_direct_answer": False,
+                }
 
-                    # Make API request
-                    response = requests.post(
-                        self.api_url,
-                        headers=self.headers,
-                        data=json.dumps(data),
-                        stream=stream,
-                        timeout=600,  # 10 minute timeout
-                    )
+                # Log the complete request data
+                logger.info("Request data being sent to Jina AI:")
+                logger.info(f"URL: {self.api_url}")
+                logger.info(f"Headers: {json.dumps({k: v for k, v in self.headers.items() if k != 'Authorization'})}")
+                logger.info(f"Request Body: {json.dumps(data, indent=2)}")
+
+                logger.info(f"Sending research query to Jina AI: {query}")
+
+                # Make API request
+                # Research runs are expensive, so a failed call is reported instead of retried
+                response = http_client.post(
+                    self.api_url,
+                    headers=self.headers,
+                    data=json.dumps(data),
+                    stream=stream,
+                    timeout=timeout,
+                    retries=0,
+                )
 
-                    logger.debug(f"Response status: {response.status_code}")
+                logger.debug(f"Response status: {response.status_code}")
 
-                    if not response.ok:
-                        error_msg = f"API request failed with status {response.status_code}"
+                if not response.ok:
+                    error_msg = f"API request failed with status {response.status_code}"
+                    logger.error(error_msg)
+                    result = {
+                        "query": query,
+                        "findings": f"An error occurred during research: {error_msg}",
+                        "error": error_msg,
+                    }
+                else:
+                    try:
+                        if not stream:
+                            # Process non-streaming response
+                            response_data = response.json()
+                            logger.debug(f"Non-streaming response data: {json.dumps(response_data, indent=2)}")
+
+                            # Check for error in the response content
+                            if (
+                                response_data.get("choices")
+                                and response_data["choices"][0].get("message", {}).get("type") == "error"
+                            ):
+                                error_msg = response_data["choices"][0]["message"].get(
+                                    "content", "Unknown error from API"
+                                )
+                                logger.error(f"API returned error in response: {error_msg}")
+                                result = {
+                                    "query": query,
+                                    "findings": f"An error occurred during research: {error_msg}",
+                                    "error": error_msg,
+                                }
+                            elif not response_data.get("choices") or not response_data["choices"][0].get("message"):
+                                error_msg = "Invalid response format from API"
+                                logger.error(error_msg)
+                                result = {
+                                    "query": query,
+                                    "findings": f"An error occurred during research: {error_msg}",
+                                    "error": error_msg,
+                                }
+                            else:
+                                # Extract message content and annotations
+                                message = response_data["choices"][0]["message"]
+                                content = message.get("content", "")
+                                annotations = message.get("annotations", [])
+
+                                # Format content with proper citations
+                                formatted_content = self._format_research_content(
+                                    content=content,
+                                    annotations=annotations,
+                                    visited_urls=response_data.get("visitedURLs", []),
+                                    read_urls=response_data.get("readURLs", []),
+                                )
+
+                                result = {
+                                    "query": query,
+                                    "findings": formatted_content,
+                                    "annotations": annotations,
+                                    "visited_urls": response_data.get("visitedURLs", []),
+                                    "read_urls": response_data.get("readURLs", []),
+                                    "timestamp": response.headers.get("date"),
+                                    "usage": response_data.get("usage", {}),
+                                    "num_urls": response_data.get("numURLs", len(response_data.get("visitedURLs", []))),
+                                }
+                        else:
+                            # Process streaming response
+                            stream_results = self._process_stream_response(response, on_progress)
+                            if "error" in stream_results:
+                                result = {
+                                    "query": query,
+                                    "findings": f"An error occurred during research: {stream_results['error']}",
+                                    "error": stream_results["error"],
+                                }
+                            else:
+                                result = {
+                                    "query": query,
+                                    "findings": stream_results["findings"],
+                                    "annotations": stream_results.get("annotations", []),
+                                    "visited_urls": stream_results.get("visited_urls", []),
+                                    "read_urls": stream_results.get("read_urls", []),
+                                    "timestamp": stream_results.get("timestamp") or response.headers.get("date"),
+                                }
+                    except Exception as e:
+                        error_msg = f"Error processing response: {e}"
                         logger.error(error_msg)
                         result = {
                             "query": query,
                             "findings": f"An error occurred during research: {error_msg}",
                             "error": error_msg,
                         }
-                    else:
-                        try:
-                            if not stream:
-                                # Process non-streaming response
-                                response_data = response.json()
-                                logger.debug(f"Non-streaming response data: {json.dumps(response_data, indent=2)}")
-
-                                # Check for error in the response content
-                                if (
-                                    response_data.get("choices")
-                                    and response_data["choices"][0].get("message", {}).get("type") == "error"
-                                ):
-                                    error_msg = response_data["choices"][0]["message"].get(
-                                        "content", "Unknown error from API"
-                                    )
-                                    logger.error(f"API returned error in response: {error_msg}")
-                                    result = {
-                                        "query": query,
-                                        "findings": f"An error occurred during research: {error_msg}",
-                                        "error": error_msg,
-                                    }
-                                elif not response_data.get("choices") or not response_data["choices"][0].get("message"):
-                                    error_msg = "Invalid response format from API"
-                                    logger.error(error_msg)
-                                    result = {
-                                        "query": query,
-                                        "findings": f"An error occurred during research: {error_msg}",
-                                        "error": error_msg,
-                                    }
-                                else:
-                                    # Extract message content and annotations
-                                    message = response_data["choices"][0]["message"]
-                                    content = message.get("content", "")
-                                    annotations = message.get("annotations", [])
-
-                                    # Format content with proper citations
-                                    formatted_content = self._format_research_content(
-                                        content=content,
-                                        annotations=annotations,
-                                        visited_urls=response_data.get("visitedURLs", []),
-                                        read_urls=response_data.get("readURLs", []),
-                                    )
-
-                                    result = {
-                                        "query": query,
-                                        "findings": formatted_content,
-                                        "annotations": annotations,
-                                        "visited_urls": response_data.get("visitedURLs", []),
-                                        "read_urls": response_data.get("readURLs", []),
-                                        "timestamp": response.headers.get("date"),
-                                        "usage": response_data.get("usage", {}),
-                                        "num_urls": response_data.get(
-                                            "numURLs", len(response_data.get("visitedURLs", []))
-                                        ),
-                                    }
-                            else:
-                                # Process streaming response
-                                stream_results = self._process_stream_response(response)
-                                if "error" in stream_results:
-                                    result = {
-                                        "query": query,
-                                        "findings": f"An error occurred during research: {stream_results['error']}",
-                                        "error": stream_results["error"],
-                                    }
-                                else:
-                                    result = {
-                                        "query": query,
-                                        "findings": stream_results["findings"],
-                                        "annotations": stream_results.get("annotations", []),
-                                        "visited_urls": stream_results.get("visited_urls", []),
-                                        "read_urls": stream_results.get("read_urls", []),
-                                        "timestamp": stream_results.get("timestamp") or response.headers.get("date"),
-                                    }
-                        except Exception as e:
-                            error_msg = f"Error processing response: {e}"
-                            logger.error(error_msg)
-                            result = {
-                                "query": query,
-                                "findings": f"An error occurred during research: {error_msg}",
-                                "error": error_msg,
-                            }
-            except Exception as e:
-                error_msg = f"Unexpected error during research: {e}"
-                logger.error(error_msg)
-                result = {
-                    "query": query,
-                    "findings": f"An error occurred during research: {error_msg}",
-                    "error": error_msg,
-                }
+        except Exception as e:
+            error_msg = f"Unexpected error during research: {e}"
+            logger.error(error_msg)
+            result = {
+                "query": query,
+                "findings": f"An error occurred during research: {error_msg}",
+                "error": error_msg,
+            }
 
         return result
@@ -0,0 +1,115 @@
+"""
+Cache for LinkedIn API responses shared by the LinkedIn tools.
+
+Profiles and companies are keyed by normalized LinkedIn URL or username, searches
+by their normalized parameters. The raw API JSON is cached so each tool keeps
+building its output (and citations) exactly as for a fresh response.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urlsplit
+
+from mxgo._logging import get_logger
+from mxgo.cache import TTLCache
+from mxgo.config import (
+    LINKEDIN_CACHE_ENABLED,
+    LINKEDIN_CACHE_MAX_ENTRIES,
+    LINKEDIN_CACHE_SEARCH_TTL_SECONDS,
+    LINKEDIN_CACHE_TTL_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+linkedin_cache = TTLCache("linkedin", max_entries=LINKEDIN_CACHE_MAX_ENTRIES)
+
+
+def normalize_linkedin_url(url: str) -> str:
+    """
+    Normalize a LinkedIn profile or company URL.
+
+    Country subdomains, scheme, query string, fragment, trailing slash and case are
+    dropped, so "https://uk.linkedin.com/in/Jane-Doe/?trk=x" and
+    "linkedin.com/in/jane-doe" map to the same entity.
+
+    Args:
+        url: LinkedIn URL as given to the tool
+
+    Returns:
+        str: Normalized URL, e.g. "linkedin.com/in/jane-doe"
+
+    """
+    url = url.strip()
+    parts = urlsplit(url if "//" in url else f"//{url}")
+    host = (parts.hostname or "").lower()
+    if host.endswith(".linkedin.com"):
+        host = "linkedin.com"
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def normalize_linkedin_username(username: str) -> str:
+    """Normalize a LinkedIn username or company slug."""
+    return username.strip().strip("/").lstrip("@").lower()
+
+
+def build_linkedin_cache_key(provider: str, endpoint: str, params: dict[str, Any]) -> str:
+    """
+    Build the cache key for a LinkedIn API call.
+
+    Args:
+        provider: API name, e.g. "fresh_data" or "data_api"
+        endpoint: API endpoint path
+        params: Normalized request parameters
+
+    Returns:
+        str: Stable cache key
+
+    """
+    key_data = {k: v for k, v in params.items() if v not in (None, "", [])}
+    digest = hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{provider}{endpoint}:{digest}"
+
+
+def _is_cacheable(payload: Any) -> bool:
+    # RapidAPI providers report some failures (e.g. profile not found) with a 200 status
+    if not payload:
+        return False
+    return not (isinstance(payload, dict) and payload.get("success") is False)
+
+
+def cached_linkedin_lookup(
+    provider: str,
+    endpoint: str,
+    params: dict[str, Any],
+    fetch: Callable[[], Any],
+    *,
+    search: bool = False,
+) -> Any:
+    """
+    Return the raw API response for a LinkedIn lookup, calling the API only on a cache miss.
+
+    Concurrent identical lookups in a process share a single API call. Errors raised
+    by ``fetch`` propagate and are never cached.
+
+    Args:
+        provider: API name, e.g. "fresh_data" or "data_api"
+        endpoint: API endpoint path
+        params: Normalized request parameters identifying the entity or search
+        fetch: Callable performing the API request and returning the JSON payload
+        search: Whether this is a search, which uses the shorter search TTL
+
+    Returns:
+        Any: The API response payload
+
+    """
+    if not LINKEDIN_CACHE_ENABLED:
+        return fetch()
+
+    ttl = LINKEDIN_CACHE_SEARCH_TTL_SECONDS if search else LINKEDIN_CACHE_TTL_SECONDS
+    key = build_linkedin_cache_key(provider, endpoint, params)
+    payload, cache_hit = linkedin_cache.get_or_fetch(key, fetch, ttl, cacheable=_is_cacheable)
+    if cache_hit:
+        logger.info(f"LinkedIn cache hit for {provider}{endpoint}")
+    return payload
@@ -10,8 +10,10 @@ import os
 import requests
 from smolagents import Tool
 
+from mxgo import http_client
 from mxgo.request_context import RequestContext
 from mxgo.schemas import CitationCollection, CitationSource, ToolOutputWithCitations
+from mxgo.tools.external_data.linkedin.entity_cache import cached_linkedin_lookup, normalize_linkedin_url
 
 logger = logging.getLogger(__name__)
 
@@ -300,9 +302,13 @@ class LinkedInFreshDataTool(Tool):
             "include_company_public_url": str(include_company_public_url).lower(),
         }
 
-        response = requests.get(f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.get(f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=30)
+            response.raise_for_status()
+            return response.json()
+
+        cache_params = {**params, "linkedin_url": normalize_linkedin_url(linkedin_url)}
+        return cached_linkedin_lookup("fresh_data", endpoint, cache_params, fetch)
 
     def get_company_by_linkedin_url(self, linkedin_url: str) -> dict:
         """
@@ -318,9 +324,14 @@ class LinkedInFreshDataTool(Tool):
         endpoint = "/get-company-by-linkedinurl"
         params = {"linkedin_url": linkedin_url}
 
-        response = requests.get(f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.get(f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=30)
+            response.raise_for_status()
+            return response.json()
+
+        return cached_linkedin_lookup(
+            "fresh_data", endpoint, {"linkedin_url": normalize_linkedin_url(linkedin_url)}, fetch
+        )
 
 
 def initialize_linkedin_fresh_tool() -> LinkedInFreshDataTool | None:
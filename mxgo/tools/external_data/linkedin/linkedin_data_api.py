@@ -11,8 +11,14 @@ from typing import Any
 import requests
 from smolagents import Tool
 
+from mxgo import http_client
 from mxgo.request_context import RequestContext
 from mxgo.schemas import CitationCollection, ToolOutputWithCitations
+from mxgo.tools.external_data.linkedin.entity_cache import (
+    cached_linkedin_lookup,
+    normalize_linkedin_url,
+    normalize_linkedin_username,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -364,11 +370,15 @@ class LinkedInDataAPITool(Tool):
         """
         endpoint = "/get-profile-data"
         params = {"username": username}
-        response = requests.post(
-            f"{self.base_url}{endpoint}", params=params, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+
+        def fetch() -> dict:
+            response = http_client.post(
+                f"{self.base_url}{endpoint}", params=params, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return cached_linkedin_lookup("data_api", endpoint, {"username": normalize_linkedin_username(username)}, fetch)
 
     def get_profile_by_url(self, profile_url: str) -> dict:
         """
@@ -384,11 +394,14 @@ class LinkedInDataAPITool(Tool):
         endpoint = "/get-profile-data-by-url"
         payload = {"url": profile_url}
 
-        response = requests.post(
-            f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.post(
+                f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return cached_linkedin_lookup("data_api", endpoint, {"url": normalize_linkedin_url(profile_url)}, fetch)
 
     def search_people(
         self,
@@ -443,11 +456,15 @@ class LinkedInDataAPITool(Tool):
         if company:
             params["company"] = company
 
-        response = requests.get(
-            f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.get(
+                f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        cache_params = {k: " ".join(v.casefold().split()) if isinstance(v, str) else v for k, v in params.items()}
+        return cached_linkedin_lookup("data_api", endpoint, cache_params, fetch, search=True)
 
     def search_people_by_url(self, search_url: str) -> dict:
         """
@@ -468,11 +485,14 @@ class LinkedInDataAPITool(Tool):
         endpoint = "/search-people-by-url"
         payload = {"url": search_url}
 
-        response = requests.post(
-            f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.post(
+                f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return cached_linkedin_lookup("data_api", endpoint, {"url": search_url.strip()}, fetch, search=True)
 
     def get_company_details(self, username: str) -> dict:
         """
@@ -488,11 +508,14 @@ class LinkedInDataAPITool(Tool):
         endpoint = "/get-company-details"
         params = {"username": username}
 
-        response = requests.post(
-            f"{self.base_url}{endpoint}", params=params, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.post(
+                f"{self.base_url}{endpoint}", params=params, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return cached_linkedin_lookup("data_api", endpoint, {"username": normalize_linkedin_username(username)}, fetch)
 
     def search_companies(
         self,
@@ -533,11 +556,15 @@ class LinkedInDataAPITool(Tool):
         if industries:
             payload["industries"] = industries
 
-        response = requests.post(
-            f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        def fetch() -> dict:
+            response = http_client.post(
+                f"{self.base_url}{endpoint}", json=payload, headers=self.headers, timeout=LINKEDIN_API_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        cache_params = {**payload, "keyword": " ".join(payload["keyword"].casefold().split())}
+        return cached_linkedin_lookup("data_api", endpoint, cache_params, fetch, search=True)
 
 
 def initialize_linkedin_data_api_tool() -> LinkedInDataAPITool | None:
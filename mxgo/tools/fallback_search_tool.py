@@ -1,19 +1,115 @@
 import logging
-from typing import ClassVar
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, ClassVar
 
 from smolagents import Tool
 
+from mxgo.config import (
+    SEARCH_HEDGE_DEFAULT_DELAY_SECONDS,
+    SEARCH_HEDGE_MAX_DELAY_SECONDS,
+    SEARCH_HEDGE_MIN_DELAY_SECONDS,
+    SEARCH_HEDGE_PERCENTILE,
+    SEARCH_HEDGING_ENABLED,
+)
+from mxgo.request_context import CitationManager, RequestContext
+
 logger = logging.getLogger(__name__)
 
+# Losing hedged requests keep running until their own timeout, so leave headroom for them
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search-hedge")
+
 
 class FallbackSearchError(Exception):
     """Base exception for fallback search tool errors."""
 
 
+class LatencyTracker:
+    """Rolling window of successful call latencies per search provider."""
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """
+        Initialize the tracker.
+
+        Args:
+            window_size: Number of most recent samples kept per provider
+            min_samples: Samples required before percentiles are reported
+
+        """
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self.window_size)).append(seconds)
+
+    def percentile(self, provider: str, percentile: float) -> float | None:
+        """Get a latency percentile for a provider, or None if there are too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def clear(self) -> None:
+        """Drop all recorded samples."""
+        with self._lock:
+            self._samples.clear()
+
+
+latency_tracker = LatencyTracker()
+
+
+def get_hedge_delay(provider: str) -> float:
+    """
+    Get how long to wait for a provider before hedging with the fallback provider.
+
+    Args:
+        provider: Name of the primary search tool
+
+    Returns:
+        float: Delay in seconds
+
+    """
+    delay = latency_tracker.percentile(provider, SEARCH_HEDGE_PERCENTILE)
+    if delay is None:
+        return SEARCH_HEDGE_DEFAULT_DELAY_SECONDS
+    return min(max(delay, SEARCH_HEDGE_MIN_DELAY_SECONDS), SEARCH_HEDGE_MAX_DELAY_SECONDS)
+
+
+def _run_search(tool: Tool, query: str) -> tuple[Any, CitationManager | None]:
+    """
+    Run a search tool, collecting its citations speculatively so a losing call leaves no trace.
+
+    Returns:
+        tuple: The tool result and the forked citation manager (None if the tool has no request context)
+
+    """
+    context = getattr(tool, "context", None)
+    start = time.monotonic()
+    if isinstance(context, RequestContext):
+        with context.speculative_citations() as citations:
+            result = tool.forward(query=query)
+    else:
+        result, citations = tool.forward(query=query), None
+    latency_tracker.record(tool.name, time.monotonic() - start)
+    return result, citations
+
+
 class FallbackWebSearchTool(Tool):
     """
     A web search tool that attempts a primary search tool (e.g., Google Search)
     and falls back to a secondary tool (e.g., DuckDuckGo) if the primary fails.
+
+    With hedging enabled, the secondary search also starts when the primary is slower than
+    its usual latency, and whichever finishes first wins.
     """
 
     name = "web_search"
@@ -27,6 +123,8 @@ class FallbackWebSearchTool(Tool):
         self,
         primary_tool: Tool | None = None,
         secondary_tool: Tool | None = None,
+        *,
+        hedging: bool = SEARCH_HEDGING_ENABLED,
     ):
         """
         Initialize the FallbackWebSearchTool.
@@ -34,6 +132,7 @@ class FallbackWebSearchTool(Tool):
         Args:
             primary_tool: The primary search tool to use (e.g., GoogleSearchTool).
             secondary_tool: The secondary search tool to use if the primary fails (e.g., DuckDuckGoSearchTool).
+            hedging: Start the secondary search early when the primary is slow.
 
         """
         if not primary_tool and not secondary_tool:
@@ -42,6 +141,7 @@ class FallbackWebSearchTool(Tool):
 
         self.primary_tool = primary_tool
         self.secondary_tool = secondary_tool
+        self.hedging = hedging
 
         super().__init__()
 
@@ -56,6 +156,9 @@ class FallbackWebSearchTool(Tool):
             str: The search results from the successful tool.
 
         """
+        if self.primary_tool and self.secondary_tool and self.hedging:
+            return self._hedged_forward(query)
+
         if self.primary_tool:
             try:
                 logger.debug(f"Attempting search with primary tool: {self.primary_tool.name}")
@@ -66,6 +169,10 @@ class FallbackWebSearchTool(Tool):
             else:
                 return result
 
+        return self._secondary_forward(query)
+
+    def _secondary_forward(self, query: str) -> str:
+        """Run the secondary tool after the primary failed or is not configured."""
         if self.secondary_tool:
             try:
                 logger.debug(f"Attempting search with secondary tool: {self.secondary_tool.name}")
@@ -82,3 +189,62 @@ class FallbackWebSearchTool(Tool):
             logger.error("Primary search tool failed and no secondary tool is available.")
             msg = "Primary search tool failed and no fallback tool is configured."
             raise FallbackSearchError(msg)
+
+    def _hedged_forward(self, query: str) -> str:
+        """Run the primary tool, hedging with the secondary tool if it exceeds its usual latency."""
+        logger.debug(f"Attempting search with primary tool: {self.primary_tool.name}")
+        # Copy the context so the search's citations land in the caller's citation scope
+        primary = _hedge_executor.submit(copy_context().run, _run_search, self.primary_tool, query)
+        delay = get_hedge_delay(self.primary_tool.name)
+        wait([primary], timeout=delay)
+
+        if not primary.done():
+            logger.info(
+                f"Primary search tool ({self.primary_tool.name}) exceeded hedge delay of {delay:.2f}s, "
+                f"starting {self.secondary_tool.name} in parallel"
+            )
+            return self._race(primary, query)
+
+        try:
+            outcome = primary.result()
+        except Exception as e:
+            logger.warning(f"Primary search tool ({self.primary_tool.name}) failed: {e!s}. Attempting fallback.")
+            return self._secondary_forward(query)
+
+        logger.debug("Primary search tool succeeded.")
+        return self._commit(self.primary_tool, outcome, query)
+
+    def _race(self, primary: Future, query: str) -> str:
+        """Return the first successful result of the in-flight primary and a new secondary search."""
+        logger.debug(f"Attempting search with secondary tool: {self.secondary_tool.name}")
+        secondary = _hedge_executor.submit(copy_context().run, _run_search, self.secondary_tool, query)
+        pending = {primary: self.primary_tool, secondary: self.secondary_tool}
+        last_error: Exception | None = None
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                tool = pending.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.warning(f"Search tool ({tool.name}) failed during hedged search: {e!s}")
+                    last_error = e
+                    continue
+                # The loser keeps running in the background; its citations are never committed
+                logger.debug(f"Hedged search won by {tool.name}")
+                return self._commit(tool, outcome, query)
+
+        logger.error(f"Both hedged search tools failed: {last_error!s}")
+        msg = f"Both primary and secondary search tools failed. Last error: {last_error!s}"
+        raise FallbackSearchError(msg) from last_error
+
+    def _commit(self, tool: Tool, outcome: tuple[Any, CitationManager | None], query: str) -> str:
+        """Commit the winning call's citations, re-running it if other citations were added meanwhile."""
+        result, citations = outcome
+        if citations is None or tool.context.commit_citations(citations):
+            return result
+
+        # Citation IDs in the result are stale; search tools serve the repeat from the search cache
+        logger.info(f"Citations changed during hedged search, re-running {tool.name} to register them")
+        return tool.forward(query=query)
@@ -0,0 +1,145 @@
+"""
+Per-email memoization of tool results.
+
+Agents often repeat a tool call with identical arguments within a run: the same search
+after replanning, the same attachment read twice, the same page visited again. A retry
+of the email repeats all of them. ``ToolResultMemo`` keeps the result of every call of
+an email, keyed by tool name and arguments, in process and, for emails with a message
+ID, in Redis so that a retried task finds them too. Concurrent identical calls are
+coalesced into one.
+
+A tool's citations are a side effect of calling it, so each call runs in a deferred
+citation scope and its citations are stored with the result under placeholder IDs.
+Whenever a result is served, fresh or memoized, its citations are added to the request
+again and the placeholders in the output are replaced with the IDs they get.
+"""
+
+import hashlib
+import json
+import threading
+from functools import wraps
+from typing import Any
+
+from smolagents import Tool
+
+from mxgo._logging import get_logger
+from mxgo.cache import TTLCache
+from mxgo.config import TOOL_MEMO_PERSIST, TOOL_MEMO_TTL_SECONDS
+from mxgo.request_context import CitationManager, RequestContext, replace_citation_ids
+from mxgo.schemas import CitationSource
+
+logger = get_logger(__name__)
+
+TOOL_MEMO_NAMESPACE = "tool_memo"
+# Error values some tools return instead of raising; those are not memoized
+ERROR_STATUSES = frozenset({"error", "failed"})
+
+
+def _is_error(output: Any) -> bool:
+    if isinstance(output, str):
+        return output.lstrip().lower().startswith("error")
+    if isinstance(output, dict):
+        return bool(output.get("error")) or output.get("success") is False or output.get("status") in ERROR_STATUSES
+    return False
+
+
+def _is_memoizable(entry: dict[str, Any]) -> bool:
+    if _is_error(entry["output"]):
+        return False
+    try:
+        json.dumps(entry)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _replace_ids(value: Any, id_map: dict[str, str]) -> Any:
+    """Replace placeholder citation IDs throughout an output, copying its containers."""
+    if isinstance(value, str):
+        return replace_citation_ids(value, id_map)
+    if isinstance(value, list):
+        return [_replace_ids(item, id_map) for item in value]
+    if isinstance(value, dict):
+        return {key: _replace_ids(item, id_map) for key, item in value.items()}
+    return value
+
+
+def memo_key(tool_name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    """Key of a tool call: the tool name and a hash of its arguments."""
+    payload = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
+    return f"{tool_name}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+class ToolResultMemo:
+    """Memoized tool results of one email."""
+
+    def __init__(
+        self,
+        context: RequestContext,
+        *,
+        persist: bool = TOOL_MEMO_PERSIST,
+        ttl_seconds: int = TOOL_MEMO_TTL_SECONDS,
+    ):
+        """
+        Initialize the memo.
+
+        Args:
+            context: Request context of the email, which memoized citations are added to
+            persist: Whether to keep results in Redis for retries of the email; only
+                emails with a message ID are persisted
+            ttl_seconds: How long results are kept
+
+        """
+        self.context = context
+        self.ttl_seconds = ttl_seconds
+        message_id = context.email_request.messageId
+        self._cache = TTLCache(
+            f"{TOOL_MEMO_NAMESPACE}:{message_id or 'local'}",
+            max_entries=256,
+            use_redis=persist and bool(message_id),
+        )
+        # Calls served without running the tool
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def wrap_tool(self, tool: Tool) -> Tool:
+        """
+        Memoize every call to a tool.
+
+        Args:
+            tool: Tool instance, wrapped in place
+
+        Returns:
+            Tool: The same tool instance
+
+        """
+        forward = tool.forward
+
+        @wraps(forward)
+        def memoized_forward(*args: Any, **kwargs: Any) -> Any:
+            def call_tool() -> dict[str, Any]:
+                with self.context.deferred_citations() as citations:
+                    output = forward(*args, **kwargs)
+                sources = citations.get_citations().sources
+                return {"output": output, "citations": [source.model_dump(mode="json") for source in sources]}
+
+            entry, hit = self._cache.get_or_fetch(
+                memo_key(tool.name, args, kwargs), call_tool, self.ttl_seconds, cacheable=_is_memoizable
+            )
+            if hit:
+                with self._lock:
+                    self.hits += 1
+                logger.debug(f"Served {tool.name} call from the tool memo")
+            return self._replay(entry)
+
+        tool.forward = memoized_forward
+        return tool
+
+    def _replay(self, entry: dict[str, Any]) -> Any:
+        """Add a result's citations to the request and put their IDs in its output."""
+        if not entry["citations"]:
+            return _replace_ids(entry["output"], {})
+        citations = CitationManager()
+        citations.restore([CitationSource(**source) for source in entry["citations"]])
+        id_map = self.context.commit_deferred_citations(citations)
+        return _replace_ids(entry["output"], id_map)
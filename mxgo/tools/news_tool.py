@@ -12,9 +12,11 @@ from typing import ClassVar
 import requests
 from smolagents import Tool
 
+from mxgo import http_client
 from mxgo._logging import get_logger
 from mxgo.request_context import RequestContext
 from mxgo.schemas import CitationCollection, ToolOutputWithCitations
+from mxgo.tools.web_search.search_cache import cached_search
 
 logger = get_logger(__name__)
 
@@ -146,15 +148,18 @@ class NewsTool(Tool):
                 "spellcheck": True,
             }
 
-            response = requests.get(
-                "https://api.search.brave.com/res/v1/news/search",
-                headers=headers,
-                params=params,
-                timeout=15,
-            )
-            response.raise_for_status()
+            def fetch() -> dict:
+                response = http_client.get(
+                    "https://api.search.brave.com/res/v1/news/search",
+                    headers=headers,
+                    params=params,
+                    timeout=15,
+                )
+                response.raise_for_status()
+                return response.json()
 
-            data = response.json()
+            cache_params = {k: v for k, v in params.items() if k != "q"}
+            data, cache_hit = cached_search("brave_news", query, cache_params, fetch, freshness=freshness)
             logger.debug(f"News API response received: {data.get('type', 'unknown')} type")
 
             # Process news results
@@ -242,6 +247,7 @@ class NewsTool(Tool):
                     "citations_added": citations_added,
                     "search_engine": "Brave News",
                     "api_endpoint": "news/search",
+                    "cache_hit": cache_hit,
                 },
             )
 
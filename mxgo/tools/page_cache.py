@@ -0,0 +1,149 @@
+"""
+Webpage cache shared by the visit tools.
+
+Pages are keyed by canonical URL and stored after conversion to markdown, together
+with the response validators (ETag / Last-Modified). Fresh entries are served
+without contacting the site; stale entries are revalidated with a conditional GET,
+so an unchanged page costs a 304 instead of a full download and conversion.
+"""
+
+import hashlib
+import re
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from mxgo._logging import get_logger
+from mxgo.cache import TTLCache
+from mxgo.config import (
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_MAX_AGE_SECONDS,
+    PAGE_CACHE_MAX_BYTES,
+    PAGE_CACHE_MAX_ENTRY_BYTES,
+    PAGE_CACHE_RETENTION_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+page_cache = TTLCache("page", max_entries=4096, max_bytes=PAGE_CACHE_MAX_BYTES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a URL so trivially different links to the same page share a cache entry.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    parameters, and sorts the remaining query parameters.
+
+    Args:
+        url: The URL as given to the tool
+
+    Returns:
+        str: Canonical URL
+
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def build_page_cache_key(url: str) -> str:
+    """Build the cache key for a page from its canonical URL."""
+    return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
+
+
+def get_page_max_age(cache_control: str | None) -> int | None:
+    """
+    Get how long a page may be served from the cache, honouring the site's Cache-Control header.
+
+    Args:
+        cache_control: The response Cache-Control header, if any
+
+    Returns:
+        int | None: Max age in seconds, or None if the page must not be cached
+
+    """
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+
+    max_age = PAGE_CACHE_MAX_AGE_SECONDS
+    for directive in directives:
+        if match := re.fullmatch(r"(?:s-)?max-age=(\d+)", directive):
+            max_age = min(max_age, int(match.group(1)))
+    return max_age
+
+
+def _store(key: str, page: dict[str, Any]) -> None:
+    if len(page["markdown"]) > PAGE_CACHE_MAX_ENTRY_BYTES:
+        logger.debug(f"Page {page['url']} too large to cache ({len(page['markdown'])} chars)")
+        return
+    page_cache.set(key, page, PAGE_CACHE_RETENTION_SECONDS)
+
+
+def cached_page(url: str, fetch: Callable[[dict[str, str]], dict[str, Any] | None]) -> tuple[dict[str, Any], bool]:
+    """
+    Return a converted page, downloading it only when the cached copy is missing or changed.
+
+    ``fetch`` receives conditional request headers (empty when there is no cached copy)
+    and returns ``None`` when the site answers 304 Not Modified, or otherwise a page dict
+    with ``title``, ``markdown``, ``etag``, ``last_modified`` and ``cache_control``.
+    Errors raised by ``fetch`` propagate and are never cached.
+
+    Args:
+        url: The page URL
+        fetch: Callable performing the (conditional) download
+
+    Returns:
+        tuple[dict, bool]: The page and whether it was served from the cache
+
+    """
+    if not PAGE_CACHE_ENABLED:
+        return fetch({}), False
+
+    key = build_page_cache_key(url)
+    cached = page_cache.get(key)
+    now = time.time()
+
+    if cached is not None and now - cached["checked_at"] < cached["max_age"]:
+        logger.debug(f"Page cache hit for {url}")
+        return cached, True
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    page = fetch(headers)
+    if page is None:
+        if cached is None:
+            msg = f"Received 304 Not Modified for {url} without a cached copy"
+            raise ValueError(msg)
+        logger.debug(f"Page {url} not modified, refreshing cache entry")
+        cached["checked_at"] = now
+        _store(key, cached)
+        return cached, True
+
+    max_age = get_page_max_age(page.pop("cache_control", None))
+    page.update(url=canonicalize_url(url), checked_at=now, max_age=max_age or 0)
+    # A page with validators stays useful after it goes stale, since revalidating it is cheap
+    if max_age is not None and (max_age > 0 or page.get("etag") or page.get("last_modified")):
+        _store(key, page)
+    return page, False
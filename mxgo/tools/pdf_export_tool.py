@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import Any, ClassVar
 
 from smolagents import Tool
-from weasyprint import CSS, HTML
 
 from mxgo._logging import get_logger
 from mxgo.scripts.report_formatter import ReportFormatter
@@ -123,6 +122,9 @@ class PDFExportTool(Tool):
             filename = self._sanitize_filename(doc_title) + ".pdf"
             pdf_path = self.temp_dir / filename
 
+            # WeasyPrint loads Pango and its font stack on import; only pay for it when exporting
+            from weasyprint import CSS, HTML  # NOQA: PLC0415
+
             HTML(string=pdf_html).write_pdf(pdf_path, stylesheets=[CSS(string=self._get_pdf_styles())])
 
             file_size = pdf_path.stat().st_size
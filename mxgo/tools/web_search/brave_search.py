@@ -7,11 +7,12 @@ import logging
 import os
 from typing import ClassVar
 
-import requests
 from smolagents import Tool
 
+from mxgo import http_client
 from mxgo.request_context import RequestContext
 from mxgo.schemas import CitationCollection, ToolOutputWithCitations
+from mxgo.tools.web_search.search_cache import cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -129,15 +130,18 @@ class BraveSearchTool(Tool):
             if freshness:
                 params["freshness"] = freshness
 
-            response = requests.get(
-                "https://api.search.brave.com/res/v1/web/search",
-                headers=headers,
-                params=params,
-                timeout=10,
-            )
-            response.raise_for_status()
+            def fetch() -> dict:
+                response = http_client.get(
+                    "https://api.search.brave.com/res/v1/web/search",
+                    headers=headers,
+                    params=params,
+                    timeout=10,
+                )
+                response.raise_for_status()
+                return response.json()
 
-            data = response.json()
+            cache_params = {k: v for k, v in params.items() if k != "q"}
+            data, cache_hit = cached_search("brave", query, cache_params, fetch, freshness=freshness)
 
             # Process different types of results according to API documentation
             content_parts = []
@@ -397,6 +401,7 @@ class BraveSearchTool(Tool):
                     "search_engine": "Brave",
                     "params": log_params,
                     "citations_added": citations_added,
+                    "cache_hit": cache_hit,
                     "result_types": {
                         "web": web_count,
                         "news": news_count,
@@ -12,6 +12,7 @@ from smolagents.default_tools import WebSearchTool
 
 from mxgo.request_context import RequestContext
 from mxgo.schemas import CitationCollection, ToolOutputWithCitations
+from mxgo.tools.web_search.search_cache import cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,9 @@ class DDGSearchTool(Tool):
         """Execute DuckDuckGo search and return results with citations."""
         try:
             logger.info(f"Performing DDG search for: {query}")
-            raw_result = self.ddg_tool.forward(query=query)
+            raw_result, cache_hit = cached_search(
+                "ddg", query, {"max_results": self.max_results}, lambda: self.ddg_tool.forward(query=query)
+            )
 
             # Log the raw result to understand its format
             logger.debug(f"DDG raw result: {raw_result[:500]}...")  # Log first 500 chars
@@ -126,6 +129,7 @@ class DDGSearchTool(Tool):
                     "total_results": len(formatted_results) if formatted_results else 0,
                     "search_engine": "DuckDuckGo",
                     "citations_added": citations_added,
+                    "cache_hit": cache_hit,
                 },
             )
 
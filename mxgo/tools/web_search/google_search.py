@@ -13,6 +13,7 @@ from smolagents.default_tools import GoogleSearchTool as SmolagentsGoogleSearchT
 
 from mxgo.request_context import RequestContext
 from mxgo.schemas import ToolOutputWithCitations
+from mxgo.tools.web_search.search_cache import cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -74,7 +75,9 @@ class GoogleSearchTool(Tool):
 
         try:
             logger.info(f"Performing Google search for: {query}")
-            raw_result = self.google_tool.forward(query=query)
+            raw_result, cache_hit = cached_search(
+                "google", query, {"provider": self.google_tool.provider}, lambda: self.google_tool.forward(query=query)
+            )
 
             # Parse the raw result to extract URLs and titles
             # Google results typically come in markdown format with links
@@ -90,7 +93,8 @@ class GoogleSearchTool(Tool):
             if not results:
                 # Fallback: treat the whole result as content
                 result = ToolOutputWithCitations(
-                    content=raw_result, metadata={"query": query, "total_results": 0, "search_engine": "Google"}
+                    content=raw_result,
+                    metadata={"query": query, "total_results": 0, "search_engine": "Google", "cache_hit": cache_hit},
                 )
                 logger.info("Google search completed (no structured results found)")
                 return json.dumps(result.model_dump())
@@ -123,6 +127,7 @@ class GoogleSearchTool(Tool):
                     "total_results": len(results),
                     "search_engine": "Google",
                     "citations_added": citations_added,
+                    "cache_hit": cache_hit,
                 },
             )
 
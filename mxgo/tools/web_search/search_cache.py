@@ -0,0 +1,115 @@
+"""
+Search result cache shared by the web and news search tools.
+
+Tools cache the raw provider payload rather than the formatted output, so a cache
+hit goes through the same formatting path as a fresh response and re-registers
+every result with the current request's citation manager.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from typing import Any
+
+from mxgo._logging import get_logger
+from mxgo.cache import TTLCache
+from mxgo.config import (
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_FRESHNESS_TTL_SECONDS,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_NEWS_TTL_SECONDS,
+    SEARCH_CACHE_TTL_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+NEWS_PROVIDERS = {"brave_news"}
+
+search_cache = TTLCache("search", max_entries=SEARCH_CACHE_MAX_ENTRIES)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+def build_search_cache_key(provider: str, query: str, params: dict[str, Any] | None = None) -> str:
+    """
+    Build the cache key for a search.
+
+    Args:
+        provider: Search provider name, e.g. "brave" or "ddg"
+        query: The raw search query
+        params: Provider parameters that change the result set (country, freshness, count, ...)
+
+    Returns:
+        str: Stable cache key
+
+    """
+    key_data = {
+        "provider": provider,
+        "query": normalize_query(query),
+        "params": {k: v for k, v in (params or {}).items() if v is not None},
+    }
+    digest = hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{provider}:{digest}"
+
+
+def get_search_cache_ttl(provider: str, freshness: str | None = None) -> int:
+    """
+    Get the TTL for a search result.
+
+    News results and narrow freshness windows go stale quickly, so they get shorter TTLs.
+
+    Args:
+        provider: Search provider name
+        freshness: Freshness filter passed to the provider, if any
+
+    Returns:
+        int: TTL in seconds
+
+    """
+    ttl = SEARCH_CACHE_TTL_SECONDS
+    # Custom date ranges ("YYYY-MM-DDtoYYYY-MM-DD") describe a fixed window and keep the default TTL
+    if freshness in SEARCH_CACHE_FRESHNESS_TTL_SECONDS:
+        ttl = min(ttl, SEARCH_CACHE_FRESHNESS_TTL_SECONDS[freshness])
+    if provider in NEWS_PROVIDERS:
+        ttl = min(ttl, SEARCH_CACHE_NEWS_TTL_SECONDS)
+    return ttl
+
+
+def cached_search(
+    provider: str,
+    query: str,
+    params: dict[str, Any] | None,
+    fetch: Callable[[], Any],
+    freshness: str | None = None,
+) -> tuple[Any, bool]:
+    """
+    Return the raw provider payload for a search, calling the provider only on a cache miss.
+
+    Errors raised by ``fetch`` propagate and are never cached.
+
+    Args:
+        provider: Search provider name
+        query: The raw search query
+        params: Provider parameters that change the result set
+        fetch: Callable performing the provider request and returning a JSON-serializable payload
+        freshness: Freshness filter, used to pick the TTL
+
+    Returns:
+        tuple[Any, bool]: The payload and whether it came from the cache
+
+    """
+    if not SEARCH_CACHE_ENABLED:
+        return fetch(), False
+
+    key = build_search_cache_key(provider, query, params)
+    payload = search_cache.get(key)
+    if payload is not None:
+        logger.info(f"Search cache hit for {provider} query: {query}")
+        return payload, True
+
+    payload = fetch()
+    search_cache.set(key, payload, get_search_cache_ttl(provider, freshness))
+    return payload, False
@@ -1,7 +1,8 @@
-import asyncio
 import json
 import os
 from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
 
 import redis.asyncio as aioredis
 from fastapi import Response, status
@@ -12,15 +13,18 @@ from mxgo.config import (
     MAX_ATTACHMENT_SIZE_MB,
     MAX_ATTACHMENTS_COUNT,
     MAX_TOTAL_ATTACHMENTS_SIZE_MB,
+    NOTICE_DEDUP_WINDOW_SECONDS,
     PERIOD_EXPIRY,
     RATE_LIMIT_PER_DOMAIN_HOUR,
     RATE_LIMITS_BY_PLAN,
 )
 from mxgo.dependencies import processing_instructions_resolver
-from mxgo.email_sender import generate_message_id, send_email_reply
+from mxgo.email_sender import generate_message_id
+from mxgo.idempotency import EmailState, claim_queued, release_queued
 from mxgo.schemas import UserPlan
+from mxgo.task_client import ActorStub, send_notice_task, verify_sender_task
 from mxgo.user import get_domain_from_email, normalize_email
-from mxgo.whitelist import get_whitelist_signup_url, is_email_whitelisted, trigger_automatic_verification
+from mxgo.whitelist import get_whitelist_signup_url, is_email_whitelisted
 
 logger = get_logger(__name__)
 
@@ -28,6 +32,8 @@ logger = get_logger(__name__)
 redis_client: aioredis.Redis | None = None
 email_provider_domain_set: set[str] = set()  # Still useful for the domain check logic
 
+NOTICE_KEY_PREFIX = "notice_sent:"
+
 
 def get_current_timestamp_for_period(period_name: str, dt: datetime) -> str:
     if period_name == "hour":
@@ -164,10 +170,79 @@ async def get_current_usage_redis(
     return usage_info
 
 
+class NoticeStatus(str, Enum):
+    """Outcome of enqueueing a notice for a sender."""
+
+    QUEUED = "queued"
+    # One was enqueued for the same reason within the dedup window
+    ALREADY_PENDING = "already_pending"
+    FAILED = "failed"
+
+
+async def _enqueue_notice_once(reason: str, from_email: str, actor: ActorStub, *args: object) -> NoticeStatus:
+    """
+    Enqueue a notice for a sender, unless one was enqueued for the same reason within the dedup window.
+
+    The window is claimed with a single SET NX, so a burst of rejected emails from one
+    sender results in one notice. Without Redis every notice is enqueued.
+
+    Args:
+        reason: Why the sender is notified, e.g. "handle" or "rate_limit:email hour"
+        from_email: Sender the notice goes to
+        actor: Actor sending the notice
+        *args: Arguments of the actor
+
+    Returns:
+        NoticeStatus: Whether the notice was enqueued, already pending or could not be enqueued
+
+    """
+    redis_key = f"{NOTICE_KEY_PREFIX}{reason}:{normalize_email(from_email)}"
+    if redis_client is not None:
+        try:
+            if not await redis_client.set(redis_key, "1", nx=True, ex=NOTICE_DEDUP_WINDOW_SECONDS):
+                logger.info(f"Skipping {reason} notice to {from_email}, one was already sent recently")
+                return NoticeStatus.ALREADY_PENDING
+        except Exception as e:
+            logger.error(f"Redis error during notice dedup for key {redis_key}: {e}")
+
+    try:
+        actor.send(*args)
+    except Exception as e:
+        logger.error(f"Failed to enqueue {reason} notice to {from_email}: {e}")
+        if redis_client is not None:
+            try:
+                # Let the next rejection try again
+                await redis_client.delete(redis_key)
+            except Exception as redis_error:
+                logger.error(f"Redis error releasing notice dedup key {redis_key}: {redis_error}")
+        return NoticeStatus.FAILED
+    return NoticeStatus.QUEUED
+
+
+async def queue_notice(email_dict: dict[str, Any], reply_text: str, reply_html: str, reason: str) -> bool:
+    """
+    Queue a rejection notice in reply to an email, sent by the workers off the request path.
+
+    Args:
+        email_dict: The rejected email, in the format of ``EmailSender.send_reply``
+        reply_text: The plain text notice
+        reply_html: The HTML notice
+        reason: Why the email was rejected; one notice per sender and reason is sent per dedup window
+
+    Returns:
+        bool: True if the notice was queued, False if it was deduplicated or could not be queued
+
+    """
+    notice_status = await _enqueue_notice_once(
+        reason, email_dict["from"], send_notice_task, email_dict, reply_text, reply_html
+    )
+    return notice_status is NoticeStatus.QUEUED
+
+
 async def send_rate_limit_rejection_email(
     from_email: str, to: str, subject: str | None, message_id: str | None, limit_type: str, plan: UserPlan | None = None
 ) -> None:
-    """Send a rejection email for rate limit exceeded."""
+    """Queue a rejection email for rate limit exceeded."""
     rejection_subject = f"Re: {subject}" if subject else "Usage Limit Exceeded"
     rejection_text = f"""Your email could not be processed because the usage limit has been exceeded ({limit_type}).
 Please try again after some time.
@@ -212,11 +287,8 @@ Upgrade now to continue using MXGo without interruption!"""
         "inReplyTo": message_id,
         "cc": None,
     }
-    try:
-        await send_email_reply(email_dict, rejection_text, html_rejection_text)
-        logger.info(f"Sent rate limit ({limit_type}) rejection email to {from_email}")
-    except Exception as e:
-        logger.error(f"Failed to send rate limit rejection email to {from_email}: {e}")
+    if await queue_notice(email_dict, rejection_text, html_rejection_text, reason=f"rate_limit:{limit_type}"):
+        logger.info(f"Queued rate limit ({limit_type}) rejection email to {from_email}")
 
 
 async def validate_rate_limits(
@@ -325,101 +397,58 @@ async def validate_idempotency(
         )
         logger.info(f"Generated deterministic message ID: {message_id}")
 
-    # Check for duplicate processing using Redis (idempotency check)
-    redis_key_queued = f"email_queued:{message_id}"
-    redis_key_processed = f"email_processed:{message_id}"
-
+    # Claim the email, unless another delivery of it is queued, running or done
     if redis_client:
         try:
-            # Check if already queued
-            if await redis_client.get(redis_key_queued):
-                logger.warning(f"Email with messageId {message_id} already queued for processing")
-                return Response(
-                    content=json.dumps(
-                        {
-                            "message": "Email already queued for processing",
-                            "messageId": message_id,
-                            "status": "duplicate_queued",
-                        }
-                    ),
-                    status_code=status.HTTP_409_CONFLICT,
-                    media_type="application/json",
-                ), message_id
-
-            # Check if already processed
-            if await redis_client.get(redis_key_processed):
-                logger.warning(f"Email with messageId {message_id} already processed")
-                return Response(
-                    content=json.dumps(
-                        {"message": "Email already processed", "messageId": message_id, "status": "duplicate_processed"}
-                    ),
-                    status_code=status.HTTP_409_CONFLICT,
-                    media_type="application/json",
-                ), message_id
-
-            # Mark as queued (expires in 1 hour)
-            await redis_client.setex(redis_key_queued, 3600, "1")
-            logger.info(f"Marked email {message_id} as queued in Redis")
-
+            state = await claim_queued(redis_client, message_id)
         except Exception as redis_error:
             logger.error(f"Redis idempotency check failed: {redis_error}")
             # Continue processing even if Redis fails
+            return None, message_id
+
+        if state is EmailState.DONE:
+            logger.warning(f"Email with messageId {message_id} already processed")
+            return Response(
+                content=json.dumps(
+                    {"message": "Email already processed", "messageId": message_id, "status": "duplicate_processed"}
+                ),
+                status_code=status.HTTP_409_CONFLICT,
+                media_type="application/json",
+            ), message_id
+        if state is not None:
+            logger.warning(f"Email with messageId {message_id} already queued for processing")
+            return Response(
+                content=json.dumps(
+                    {
+                        "message": "Email already queued for processing",
+                        "messageId": message_id,
+                        "status": "duplicate_queued",
+                    }
+                ),
+                status_code=status.HTTP_409_CONFLICT,
+                media_type="application/json",
+            ), message_id
+        logger.info(f"Marked email {message_id} as queued in Redis")
     else:
         logger.warning("Redis not available for idempotency checks")
 
     return None, message_id
 
 
-def check_task_idempotency(message_id: str) -> bool:
+async def release_idempotency_claim(message_id: str) -> None:
     """
-    Check if an email task has already been processed.
+    Release the claim taken by ``validate_idempotency`` on an email that could not be enqueued.
 
     Args:
-        message_id: The message ID to check
-
-    Returns:
-        True if already processed, False if not processed
+        message_id: The message ID of the email
 
     """
-    if not redis_client or not message_id:
-        return False
-
-    redis_key_processed = f"email_processed:{message_id}"
-
-    try:
-        # Check if already processed
-        if asyncio.run(redis_client.get(redis_key_processed)):
-            logger.warning(f"Email with messageId {message_id} already processed, skipping duplicate processing")
-            return True
-    except Exception as redis_error:
-        logger.error(f"Redis idempotency check failed in task: {redis_error}")
-        # Continue processing even if Redis fails
-
-    return False
-
-
-def mark_email_as_processed(message_id: str) -> None:
-    """
-    Mark an email as successfully processed in Redis.
-
-    Args:
-        message_id: The message ID to mark as processed
-
-    """
-    if not redis_client or not message_id:
+    if not redis_client:
         return
-
-    redis_key_processed = f"email_processed:{message_id}"
-    redis_key_queued = f"email_queued:{message_id}"
-
     try:
-        # Mark as processed (expires in 24 hours)
-        asyncio.run(
-            asyncio.gather(redis_client.setex(redis_key_processed, 86400, "1"), redis_client.delete(redis_key_queued))
-        )
-        logger.info(f"Marked email {message_id} as processed in Redis")
+        await release_queued(redis_client, message_id)
     except Exception as redis_error:
-        logger.error(f"Failed to mark email as processed in Redis: {redis_error}")
+        logger.error(f"Failed to release idempotency claim of email {message_id}: {redis_error}")
 
 
 async def validate_api_key(api_key: str) -> Response | None:
@@ -442,55 +471,18 @@ async def validate_api_key(api_key: str) -> Response | None:
     return None
 
 
-async def validate_email_whitelist(from_email: str, to: str, subject: str, message_id: str | None) -> Response | None:
+def build_verification_notice(from_email: str, *, verification_triggered: bool) -> tuple[str, str]:
     """
-    Validate email whitelist to ensure only authorized senders can use the service.
+    Build the notice to a sender whose email was rejected pending whitelist verification.
 
     Args:
         from_email: The sender's email address
-        to: The recipient's email address
-        subject: The email subject
-        message_id: Optional message ID for tracking
+        verification_triggered: Whether the verification email was sent to the sender
 
     Returns:
-        Optional[Response]: Error response if validation fails, None if validation passes
+        tuple[str, str]: The plain text and HTML notice
 
     """
-    # Extract domain from sender's email
-    email_domain = get_domain_from_email(from_email)
-
-    # Check if email is from major email provider
-    is_major_provider = email_domain in email_provider_domain_set
-
-    # Check Supabase whitelist for all emails
-    exists_in_whitelist, is_verified = await is_email_whitelisted(from_email)
-
-    # Allow if email is from major provider OR exists and is verified in the Supabase whitelist.
-    if is_major_provider:
-        logger.info(f"Email allowed from major email provider: {from_email} (domain: {email_domain})")
-        return None
-    if exists_in_whitelist and is_verified:
-        logger.info(f"Email allowed from Supabase whitelist: {from_email} (verified)")
-        return None
-
-    # For non-major providers that are not verified, trigger automatic verification
-    # and STOP email processing until they verify
-    logger.info(
-        f"Triggering automatic verification for {from_email} (exists={exists_in_whitelist}, verified={is_verified})"
-    )
-
-    # Trigger automatic verification in the background
-    verification_triggered = False
-    try:
-        verification_triggered = await trigger_automatic_verification(from_email)
-        if verification_triggered:
-            logger.info(f"Successfully triggered automatic verification for {from_email}")
-        else:
-            logger.warning(f"Failed to trigger automatic verification for {from_email}")
-    except Exception as e:
-        logger.error(f"Error triggering automatic verification for {from_email}: {e}")
-
-    # Determine rejection message based on verification status and outcome
     if verification_triggered:
         # Verification email was sent successfully
         rejection_msg = f"""Your email could not be processed because your domain is not automatically whitelisted.
@@ -554,7 +546,47 @@ MXGo Team"""
 <p>Once your email is verified, you can resend your email for processing.</p>
 <p>Best regards,<br>MXGo Team</p>"""
 
-    # Send rejection email
+    return rejection_msg, html_rejection
+
+
+async def validate_email_whitelist(from_email: str, to: str, subject: str, message_id: str | None) -> Response | None:
+    """
+    Validate email whitelist to ensure only authorized senders can use the service.
+
+    Args:
+        from_email: The sender's email address
+        to: The recipient's email address
+        subject: The email subject
+        message_id: Optional message ID for tracking
+
+    Returns:
+        Optional[Response]: Error response if validation fails, None if validation passes
+
+    """
+    # Extract domain from sender's email
+    email_domain = get_domain_from_email(from_email)
+
+    # Check if email is from major email provider
+    is_major_provider = email_domain in email_provider_domain_set
+
+    # Check Supabase whitelist for all emails
+    exists_in_whitelist, is_verified = await is_email_whitelisted(from_email)
+
+    # Allow if email is from major provider OR exists and is verified in the Supabase whitelist.
+    if is_major_provider:
+        logger.info(f"Email allowed from major email provider: {from_email} (domain: {email_domain})")
+        return None
+    if exists_in_whitelist and is_verified:
+        logger.info(f"Email allowed from Supabase whitelist: {from_email} (verified)")
+        return None
+
+    # For non-major providers that are not verified, trigger automatic verification
+    # and STOP email processing until they verify. The workers trigger it and send the
+    # instructions, at most once per sender within the notice dedup window
+    logger.info(
+        f"Queueing automatic verification for {from_email} (exists={exists_in_whitelist}, verified={is_verified})"
+    )
+
     email_dict = {
         "from": from_email,  # Original sender becomes recipient
         "to": to,  # Original recipient becomes sender
@@ -565,13 +597,7 @@ MXGo Team"""
         "cc": None,
     }
 
-    try:
-        await send_email_reply(email_dict, rejection_msg, html_rejection)
-        logger.info(
-            f"Sent verification instruction email to {from_email} (verification_triggered={verification_triggered})"
-        )
-    except Exception as e:
-        logger.error(f"Failed to send verification instruction email: {e}")
+    verification_status = await _enqueue_notice_once("verification", from_email, verify_sender_task, email_dict)
 
     # Return error response to stop email processing
     return Response(
@@ -579,7 +605,9 @@ MXGo Team"""
             {
                 "message": "Email verification required - check your email for verification instructions",
                 "email": from_email,
-                "verification_triggered": verification_triggered,
+                # Whether this request queued the verification, or an earlier one within the dedup window did
+                "verification_queued": verification_status is NoticeStatus.QUEUED,
+                "verification_already_pending": verification_status is NoticeStatus.ALREADY_PENDING,
                 "exists_in_whitelist": exists_in_whitelist,
                 "is_verified": is_verified,
                 "next_action": "verify_email_then_resend",
@@ -631,14 +659,12 @@ async def validate_email_handle(
             "cc": None,
         }
 
-        try:
-            await send_email_reply(email_dict, rejection_msg, rejection_msg)
-            logger.info(f"Sent handle rejection email to {from_email}")
-        except Exception as e:
-            logger.error(f"Failed to send handle rejection email: {e}")
+        rejection_sent = await queue_notice(email_dict, rejection_msg, rejection_msg, reason="handle")
 
         return Response(
-            content=json.dumps({"message": "Unsupported email handle", "handle": handle, "rejection_sent": True}),
+            content=json.dumps(
+                {"message": "Unsupported email handle", "handle": handle, "rejection_sent": rejection_sent}
+            ),
             status_code=status.HTTP_400_BAD_REQUEST,
             media_type="application/json",
         ), None
@@ -690,11 +716,7 @@ Number of attachments in your email: {len(attachments)}</p>
             "cc": None,
         }
 
-        try:
-            await send_email_reply(email_dict, rejection_msg, html_rejection)
-            logger.info(f"Sent attachment count rejection email to {from_email}")
-        except Exception as e:
-            logger.error(f"Failed to send attachment count rejection email: {e}")
+        rejection_sent = await queue_notice(email_dict, rejection_msg, html_rejection, reason="attachment_count")
 
         return Response(
             content=json.dumps(
@@ -702,7 +724,7 @@ Number of attachments in your email: {len(attachments)}</p>
                     "message": "Too many attachments",
                     "max_allowed": MAX_ATTACHMENTS_COUNT,
                     "received": len(attachments),
-                    "rejection_sent": True,
+                    "rejection_sent": rejection_sent,
                 }
             ),
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -739,11 +761,7 @@ Size of attachment '{attachment.get("filename", "unknown")}': {size_mb:.1f}MB</p
                 "cc": None,
             }
 
-            try:
-                await send_email_reply(email_dict, rejection_msg, html_rejection)
-                logger.info(f"Sent attachment size rejection email to {from_email}")
-            except Exception as e:
-                logger.error(f"Failed to send attachment size rejection email: {e}")
+            rejection_sent = await queue_notice(email_dict, rejection_msg, html_rejection, reason="attachment_size")
 
             return Response(
                 content=json.dumps(
@@ -752,7 +770,7 @@ Size of attachment '{attachment.get("filename", "unknown")}': {size_mb:.1f}MB</p
                         "filename": attachment.get("filename", "unknown"),
                         "size_mb": size_mb,
                         "max_allowed_mb": MAX_ATTACHMENT_SIZE_MB,
-                        "rejection_sent": True,
+                        "rejection_sent": rejection_sent,
                     }
                 ),
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -787,11 +805,7 @@ Total size of your attachments: {total_size_mb:.1f}MB</p>
             "cc": None,
         }
 
-        try:
-            await send_email_reply(email_dict, rejection_msg, html_rejection)
-            logger.info(f"Sent total attachment size rejection email to {from_email}")
-        except Exception as e:
-            logger.error(f"Failed to send total attachment size rejection email: {e}")
+        rejection_sent = await queue_notice(email_dict, rejection_msg, html_rejection, reason="attachment_total_size")
 
         return Response(
             content=json.dumps(
@@ -799,7 +813,7 @@ Total size of your attachments: {total_size_mb:.1f}MB</p>
                     "message": "Total attachment size too large",
                     "total_size_mb": total_size_mb,
                     "max_allowed_mb": MAX_TOTAL_ATTACHMENTS_SIZE_MB,
-                    "rejection_sent": True,
+                    "rejection_sent": rejection_sent,
                 }
             ),
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,4 @@
+# Offline benchmarks; keep LiteLLM from fetching its model cost map over the network
+import os
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
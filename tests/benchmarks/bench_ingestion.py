@@ -0,0 +1,297 @@
+"""
+Microbenchmarks for the /process-email ingestion path, fully in-process.
+
+Requests go through the FastAPI app over httpx's ASGI transport, so multipart parsing,
+the validators, attachment writes, ``generate_email_id``, ``model_dump`` and message
+encoding all run as in production. Around them, Redis is a fakeredis store, the plan
+and whitelist lookups are stubbed, rejection emails are dropped and the broker publish
+stops after Dramatiq has encoded the message.
+
+For each payload and concurrency level it reports requests/sec, p50/p95/p99 latency,
+the mean time per ingestion stage (from ``mxgo_api_stage_seconds``) and, from a
+separate sequential pass under tracemalloc, the peak Python allocation per request.
+Quote the report before and after for any performance change to ``api.py`` or
+``validators.py``; ``--baseline`` compares against an earlier report.
+
+Usage:
+    python -m tests.benchmarks.bench_ingestion --payloads text_only large_html --concurrency 1 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fakeredis import FakeAsyncRedis
+
+from mxgo.api import app
+from mxgo.metrics import API_STAGE_SECONDS
+from mxgo.schemas import UserPlan
+from mxgo.scripts.agent_profile_report import percentile
+from mxgo.task_client import process_email_task, send_notice_task
+from tests.benchmarks.report import check_baseline, write_report
+
+MB = 1024 * 1024
+# Senders on a major provider domain skip the per-domain rate limit and the whitelist rejection
+SENDER_DOMAIN = "gmail.com"
+
+TEXT_BODY = (
+    "Hi,\n\nCould you summarize the attached quarterly update and list the open action items "
+    "for the infrastructure team? Deadlines matter most.\n\n"
+) * 8
+
+
+def _large_html(target_bytes: int = 900 * 1024) -> str:
+    # Starlette rejects form fields over 1 MB, so this is about the largest body that is accepted
+    row = (
+        "<tr><td style='padding:4px;border:1px solid #ddd'>Item</td>"
+        "<td style='padding:4px;border:1px solid #ddd'>Quarterly figures for the region, "
+        "compared with the same quarter last year</td></tr>\n"
+    )
+    return f"<html><body><table>{row * (target_bytes // len(row))}</table></body></html>"
+
+
+@dataclass
+class Payload:
+    """A representative /process-email request."""
+
+    name: str
+    form: dict[str, str]
+    files: list[tuple[str, tuple[str, bytes, str]]] = field(default_factory=list)
+    expected_status: int = 200
+    default_requests: int = 200
+
+
+def _attachments(count: int, size_bytes: int) -> list[tuple[str, tuple[str, bytes, str]]]:
+    content = bytes(range(256)) * (size_bytes // 256)
+    return [("files", (f"report-{i}.pdf", content, "application/pdf")) for i in range(count)]
+
+
+def build_payloads() -> dict[str, Callable[[], Payload]]:
+    """Get builders for the benchmark payloads, by name."""
+    base = {"to": "summarize@mxgo.ai", "subject": "Quarterly update"}
+    return {
+        "text_only": lambda: Payload("text_only", {**base, "textContent": TEXT_BODY}),
+        "large_html": lambda: Payload(
+            "large_html", {**base, "textContent": TEXT_BODY, "htmlContent": _large_html()}, default_requests=50
+        ),
+        # 5 x 10 MB is the most the attachment limits accept
+        "five_10mb_attachments": lambda: Payload(
+            "five_10mb_attachments",
+            {**base, "textContent": TEXT_BODY},
+            files=_attachments(5, 10 * MB),
+            default_requests=10,
+        ),
+        # 5 x 15 MB exceeds the total attachment size limit and measures the rejection path
+        "five_15mb_attachments": lambda: Payload(
+            "five_15mb_attachments",
+            {**base, "textContent": TEXT_BODY},
+            files=_attachments(5, 15 * MB),
+            expected_status=400,
+            default_requests=10,
+        ),
+    }
+
+
+def _encode_message(*args: Any, **kwargs: Any) -> None:
+    # Everything a publish does before the network: build and serialize the message
+    process_email_task.message_with_options(args=args, kwargs=kwargs).encode()
+
+
+def _encode_notice(*args: Any, **kwargs: Any) -> None:
+    send_notice_task.message_with_options(args=args, kwargs=kwargs).encode()
+
+
+@contextmanager
+def stub_ingestion_services(attachments_dir: Path) -> Iterator[None]:
+    """Replace Redis, the plan and whitelist services and the broker."""
+    with ExitStack() as stack:
+        stack.enter_context(patch("mxgo.validators.redis_client", FakeAsyncRedis(decode_responses=True)))
+        stack.enter_context(patch("mxgo.validators.email_provider_domain_set", {SENDER_DOMAIN}))
+        stack.enter_context(patch("mxgo.user.get_user_plan", AsyncMock(return_value=UserPlan.BETA)))
+        stack.enter_context(patch("mxgo.validators.is_email_whitelisted", AsyncMock(return_value=(True, True))))
+        stack.enter_context(patch("mxgo.validators.send_notice_task.send", _encode_notice))
+        stack.enter_context(patch("mxgo.api.process_email_task.send", _encode_message))
+        stack.enter_context(patch("mxgo.api.ATTACHMENTS_DIR", attachments_dir))
+        yield
+
+
+def _stage_totals() -> dict[str, tuple[float, float]]:
+    totals: dict[str, list[float]] = {}
+    for metric in API_STAGE_SECONDS.collect():
+        for sample in metric.samples:
+            stage = sample.labels.get("stage")
+            if sample.name.endswith("_sum"):
+                totals.setdefault(stage, [0.0, 0.0])[0] = sample.value
+            elif sample.name.endswith("_count"):
+                totals.setdefault(stage, [0.0, 0.0])[1] = sample.value
+    return {stage: (total, count) for stage, (total, count) in totals.items()}
+
+
+class IngestionBenchmark:
+    """Sends payloads to the app in-process and measures them."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        """Initialize the benchmark with a client bound to the app."""
+        self.client = client
+        self._senders = itertools.count()
+
+    def _build_request(self, payload: Payload) -> httpx.Request:
+        n = next(self._senders)
+        form = {**payload.form, "from_email": f"bench-{n}@{SENDER_DOMAIN}", "messageId": f"<ingest-{n}@bench>"}
+        # Always multipart, like the email worker's FormData, also for requests without files
+        parts = [(name, (None, value)) for name, value in form.items()] + payload.files
+        return self.client.build_request(
+            "POST", "/process-email", files=parts, headers={"x-api-key": os.environ["X_API_KEY"]}
+        )
+
+    async def _send(self, payload: Payload) -> tuple[float, int]:
+        request = self._build_request(payload)
+        start = time.perf_counter()
+        response = await self.client.send(request)
+        return time.perf_counter() - start, response.status_code
+
+    async def run_level(self, payload: Payload, concurrency: int, requests: int) -> dict[str, Any]:
+        """
+        Send a batch of requests for one payload at one concurrency level.
+
+        Returns:
+            dict[str, Any]: Throughput, latency percentiles, status codes and mean stage times
+
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send_limited() -> tuple[float, int]:
+            async with semaphore:
+                return await self._send(payload)
+
+        stages_before = _stage_totals()
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(send_limited() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        stages_after = _stage_totals()
+
+        latencies_ms = [latency * 1000 for latency, _ in outcomes]
+        status_codes = Counter(code for _, code in outcomes)
+        stage_ms = {}
+        for stage, (total, count) in sorted(stages_after.items()):
+            previous_total, previous_count = stages_before.get(stage, (0.0, 0.0))
+            if count > previous_count:
+                stage_ms[stage] = round((total - previous_total) / (count - previous_count) * 1000, 3)
+
+        return {
+            "payload": payload.name,
+            "concurrency": concurrency,
+            "requests": requests,
+            "failures": requests - status_codes[payload.expected_status],
+            "status_codes": {str(code): n for code, n in sorted(status_codes.items())},
+            "requests_per_second": round(requests / elapsed, 2),
+            "p50_ms": round(percentile(latencies_ms, 50), 2),
+            "p95_ms": round(percentile(latencies_ms, 95), 2),
+            "p99_ms": round(percentile(latencies_ms, 99), 2),
+            "stage_ms": stage_ms,
+        }
+
+    async def peak_allocation_mb(self, payload: Payload, samples: int) -> float:
+        """
+        Measure the peak Python allocation of single requests under tracemalloc.
+
+        The request is built before tracing starts, so the payload itself is not counted;
+        the in-process transport's copy of the body is.
+
+        Returns:
+            float: The highest per-request peak, in MB
+
+        """
+        peak = 0
+        for _ in range(samples):
+            request = self._build_request(payload)
+            tracemalloc.start()
+            try:
+                await self.client.send(request)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        return round(peak / MB, 2)
+
+
+async def run_benchmark_async(
+    payload_names: list[str],
+    concurrency_levels: list[int],
+    requests: int | None = None,
+    tracemalloc_samples: int = 3,
+) -> dict[str, Any]:
+    """
+    Run the benchmark over all payloads and concurrency levels.
+
+    Args:
+        payload_names: Payloads to send, see ``build_payloads``
+        concurrency_levels: Numbers of requests in flight
+        requests: Requests per payload and level, by default each payload's own count
+        tracemalloc_samples: Sequential requests per payload measured under tracemalloc (0 skips)
+
+    Returns:
+        dict[str, Any]: The report, with one result per payload and level
+
+    """
+    builders = build_payloads()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir, stub_ingestion_services(Path(tmp_dir)):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            bench = IngestionBenchmark(client)
+            for name in payload_names:
+                payload = builders[name]()
+                await bench._send(payload)  # warm-up
+                peak_mb = await bench.peak_allocation_mb(payload, tracemalloc_samples) if tracemalloc_samples else None
+                for concurrency in concurrency_levels:
+                    result = await bench.run_level(payload, concurrency, requests or payload.default_requests)
+                    result["peak_alloc_mb"] = peak_mb
+                    results.append(result)
+    return {"benchmark": "ingestion", "results": results}
+
+
+def run_benchmark(*args: Any, **kwargs: Any) -> dict[str, Any]:
+    """Run the benchmark, see ``run_benchmark_async``."""
+    return asyncio.run(run_benchmark_async(*args, **kwargs))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and print or save the JSON report."""
+    parser = argparse.ArgumentParser(description="In-process benchmark of the /process-email ingestion path.")
+    parser.add_argument("--payloads", nargs="+", choices=list(build_payloads()), default=list(build_payloads()))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 16])
+    parser.add_argument("--requests", type=int, help="Requests per payload and level (default depends on payload)")
+    parser.add_argument("--tracemalloc-samples", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.payloads, args.concurrency, args.requests, args.tracemalloc_samples)
+    write_report(report, args.output)
+    if args.baseline:
+        return check_baseline(
+            report,
+            args.baseline,
+            args.max_regression,
+            key_fields=("payload", "concurrency"),
+            throughput_field="requests_per_second",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+End-to-end throughput benchmark for email processing, fully offline.
+
+Drives ``process_email_task`` (or ``EmailAgent.process_email`` alone) from a thread
+pool, like Dramatiq's worker threads, with every external service replaced by the
+stand-ins in ``tests.benchmarks.stubs``. With the default zero model latency the
+numbers measure framework overhead only (agent loop, tools, prompt building, result
+formatting, metrics and usage accounting); ``--model-latency-ms`` adds a fixed delay
+per completion to see how that overhead behaves under realistic model latency.
+
+For each handle and concurrency level it reports emails/sec, p50/p95 latency and the
+process's peak RSS during the run, as JSON. ``--baseline`` compares against an earlier
+report and fails when throughput or p95 latency regressed beyond ``--max-regression``.
+
+Usage:
+    python -m tests.benchmarks.bench_process_email --handles ask summarize --concurrency 1 4 8
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Self
+
+import psutil
+
+from mxgo.agents.email_agent import EmailAgent
+from mxgo.dependencies import processing_instructions_resolver
+from mxgo.schemas import EmailRequest
+from mxgo.scripts.agent_profile_report import percentile
+from mxgo.tasks import process_email_task
+from tests.benchmarks.report import check_baseline, write_report
+from tests.benchmarks.stubs import stub_services
+
+DEFAULT_HANDLES = ["summarize", "ask", "fact-check"]
+DEFAULT_CONCURRENCY = [1, 4, 8]
+# Reply statuses of emails that went through
+SUCCESS_STATUSES = {"sent", "skipped"}
+
+
+def make_email(handle: str, index: int) -> dict[str, Any]:
+    """Build a representative email for a handle."""
+    return EmailRequest(
+        from_email=f"bench-{index}@example.com",
+        to=f"{handle}@mxgo.ai",
+        subject="Home batteries in Europe",
+        textContent=(
+            "Hi,\n\nWe are thinking about adding a home battery to our solar panels. "
+            "How common are they in Europe by now, what drives adoption and is it worth it?\n\nThanks,\nSam"
+        ),
+        messageId=f"<bench-{handle}-{index}@example.com>",
+    ).model_dump()
+
+
+class RSSSampler:
+    """Samples the process's resident set size in the background, keeping the peak."""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        """Initialize the sampler."""
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+            self._stop.wait(self.interval_seconds)
+
+    def __enter__(self) -> Self:
+        """Start sampling."""
+        self.peak_bytes = self._process.memory_info().rss
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+
+def process_one(email_data: dict[str, Any], mode: str) -> tuple[float, bool]:
+    """
+    Process one email.
+
+    Args:
+        email_data: The email
+        mode: "task" for the whole worker task, "agent" for ``EmailAgent.process_email`` only
+
+    Returns:
+        tuple[float, bool]: Latency in seconds and whether the email was answered
+
+    """
+    start = time.perf_counter()
+    if mode == "task":
+        result = process_email_task.fn(email_data, "", [], None, email_data["messageId"])
+        ok = result.metadata.email_sent.status in SUCCESS_STATUSES
+    else:
+        email_request = EmailRequest(**email_data)
+        instructions = processing_instructions_resolver(email_request.to.split("@")[0])
+        agent = EmailAgent(email_request=email_request, processing_instructions=instructions, attachment_info=[])
+        result = agent.process_email(email_request, instructions)
+        ok = not result.metadata.errors and bool(result.email_content.text)
+    return time.perf_counter() - start, ok
+
+
+def run_level(handle: str, concurrency: int, emails: int, mode: str) -> dict[str, Any]:
+    """
+    Process a batch of emails for one handle at one concurrency level.
+
+    Returns:
+        dict[str, Any]: Throughput, latency percentiles, failures and peak RSS
+
+    """
+    batch = [make_email(handle, i) for i in range(emails)]
+    with RSSSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        outcomes = list(pool.map(lambda email: process_one(email, mode), batch))
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = [round(latency * 1000) for latency, _ in outcomes]
+    return {
+        "handle": handle,
+        "concurrency": concurrency,
+        "emails": emails,
+        "failures": sum(not ok for _, ok in outcomes),
+        "emails_per_second": round(emails / elapsed, 2),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "peak_rss_mb": round(rss.peak_bytes / 1024 / 1024, 1),
+    }
+
+
+def run_benchmark(
+    handles: list[str],
+    concurrency_levels: list[int],
+    emails: int,
+    mode: str = "task",
+    model_latency_ms: int = 0,
+) -> dict[str, Any]:
+    """
+    Run the benchmark over all handles and concurrency levels.
+
+    Each handle gets one unmeasured warm-up email first, so imports and lazy
+    initialization do not count towards the first level.
+
+    Args:
+        handles: Email handles to benchmark
+        concurrency_levels: Worker thread counts
+        emails: Emails per handle and level
+        mode: "task" or "agent", see ``process_one``
+        model_latency_ms: Simulated latency per model completion
+
+    Returns:
+        dict[str, Any]: The report, with one result per handle and level
+
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir, stub_services(Path(tmp_dir), model_latency_ms / 1000):
+        for handle in handles:
+            process_one(make_email(handle, -1), mode)
+            results.extend(run_level(handle, concurrency, emails, mode) for concurrency in concurrency_levels)
+    return {
+        "benchmark": "process_email",
+        "mode": mode,
+        "model_latency_ms": model_latency_ms,
+        "emails_per_level": emails,
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and print or save the JSON report."""
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for email processing.")
+    parser.add_argument("--handles", nargs="+", default=DEFAULT_HANDLES)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--emails", type=int, default=20, help="Emails per handle and concurrency level")
+    parser.add_argument("--mode", choices=["task", "agent"], default="task")
+    parser.add_argument("--model-latency-ms", type=int, default=0, help="Simulated latency per model completion")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.handles, args.concurrency, args.emails, args.mode, args.model_latency_ms)
+    write_report(report, args.output)
+    if args.baseline:
+        return check_baseline(report, args.baseline, args.max_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Microbenchmarks for log scrubbing, the single-pass scrubber against the per-pattern one it replaced.
+
+Every log message goes through ``scrub_sensitive_data``, so for each representative
+message this reports the best mean time per call of both scrubbers and the speedup.
+Quote the report before and after for any change to the scrubbing patterns or the
+keyword prefilter in ``mxgo/_logging.py``.
+
+Usage:
+    python -m tests.benchmarks.bench_scrubbing --messages email_with_keys --rounds 10
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from mxgo._logging import COMPILED_PATTERNS, SCRUBBED_TOKEN, scrub_sensitive_data
+from tests.benchmarks.report import write_report
+
+EMAIL_BODY = "Hello team, please find the quarterly report attached. Revenue grew 12% this quarter. " * 200
+
+MESSAGES = {
+    "short_with_keys": "user_email=test@example.com password=secret123 api_key=abc123",
+    "email_with_keys": f"Processing email from_email=alice@example.com subject=Report body: {EMAIL_BODY}",
+    "email_without_keys": f"Agent step 3 finished. Observations: {EMAIL_BODY}",
+}
+
+
+def legacy_scrub_sensitive_data(text: str) -> str:
+    """Previous implementation: two substitutions per sensitive pattern, kept as the baseline."""
+    for pattern in COMPILED_PATTERNS:
+        key_value_pattern = re.compile(rf"(\b\w*{pattern.pattern}\w*\s*[:=]\s*)([^\s,}}\]]+)", re.IGNORECASE)
+        quoted_pattern = re.compile(
+            rf'(["\']?\b\w*{pattern.pattern}\w*["\']?\s*[:=]\s*)(["\'])([^"\']*)\2', re.IGNORECASE
+        )
+        text = key_value_pattern.sub(rf"\1{SCRUBBED_TOKEN}", text)
+        text = quoted_pattern.sub(rf"\1\2{SCRUBBED_TOKEN}\2", text)
+    return text
+
+
+def best_time(func: Callable[[str], str], text: str, rounds: int, repeat: int) -> float:
+    """Return the best mean time of ``func(text)`` in seconds over several rounds."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(text)
+        timings.append((time.perf_counter() - start) / repeat)
+    return min(timings)
+
+
+def run_benchmark(messages: list[str], rounds: int = 5, repeat: int = 5) -> dict[str, Any]:
+    """
+    Time both scrubbers on each message.
+
+    Args:
+        messages: Names of the messages in ``MESSAGES`` to scrub
+        rounds: Timed rounds per scrubber, of which the best is reported
+        repeat: Calls per round
+
+    Returns:
+        dict[str, Any]: The report, with one result per message
+
+    """
+    results = []
+    for name in messages:
+        text = MESSAGES[name]
+        legacy = best_time(legacy_scrub_sensitive_data, text, rounds, repeat)
+        single_pass = best_time(scrub_sensitive_data, text, rounds, repeat)
+        results.append(
+            {
+                "message": name,
+                "chars": len(text),
+                "legacy_us": round(legacy * 1e6, 2),
+                "single_pass_us": round(single_pass * 1e6, 2),
+                "speedup": round(legacy / single_pass, 1) if single_pass else None,
+                "same_output": scrub_sensitive_data(text) == legacy_scrub_sensitive_data(text),
+            }
+        )
+    return {"benchmark": "scrubbing", "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and print or save the JSON report."""
+    parser = argparse.ArgumentParser(description="Microbenchmark of log scrubbing.")
+    parser.add_argument("--messages", nargs="+", choices=list(MESSAGES), default=list(MESSAGES))
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per timed round")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    write_report(run_benchmark(args.messages, args.rounds, args.repeat), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Shared handling of benchmark reports: output and comparison with a baseline."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def write_report(report: dict[str, Any], output: Path | None) -> None:
+    """Write a JSON report to a file, or to stdout without one."""
+    payload = json.dumps(report, indent=2) + "\n"
+    if output:
+        output.write_text(payload)
+    else:
+        sys.stdout.write(payload)
+
+
+def find_regressions(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    max_regression: float,
+    key_fields: tuple[str, ...] = ("handle", "concurrency"),
+    throughput_field: str = "emails_per_second",
+) -> list[str]:
+    """
+    Compare a report with a baseline report.
+
+    Results are matched on ``key_fields``; results without a baseline counterpart are
+    skipped.
+
+    Args:
+        report: The current report
+        baseline: An earlier report
+        max_regression: Tolerated relative drop in throughput or rise in p95 latency
+        key_fields: Result fields identifying the same measurement in both reports
+        throughput_field: Result field holding the throughput
+
+    Returns:
+        list[str]: A description of every regression beyond the tolerance
+
+    """
+    baseline_results = {tuple(r[f] for f in key_fields): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        key = tuple(result[f] for f in key_fields)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        label = " x".join(str(part) for part in key)
+        if result[throughput_field] < previous[throughput_field] * (1 - max_regression):
+            regressions.append(
+                f"{label}: {result[throughput_field]} {throughput_field}, baseline {previous[throughput_field]}"
+            )
+        if result["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{label}: p95 {result['p95_ms']} ms, baseline {previous['p95_ms']} ms")
+    return regressions
+
+
+def check_baseline(report: dict[str, Any], baseline_path: Path, max_regression: float, **kwargs: Any) -> int:
+    """
+    Report regressions against a baseline file on stderr.
+
+    Returns:
+        int: Exit code, 1 if anything regressed
+
+    """
+    regressions = find_regressions(report, json.loads(baseline_path.read_text()), max_regression, **kwargs)
+    for regression in regressions:
+        sys.stderr.write(f"Regression: {regression}\n")
+    return 1 if regressions else 0
@@ -0,0 +1,215 @@
+"""
+Local stand-ins for the services an email touches, for offline benchmarks.
+
+``stub_services`` swaps out everything outside the process: the LiteLLM router behind
+``RoutedLiteLLMModel`` is replaced by ``StubRouter``, which replays a canned
+tool-calling transcript per handle; web searches return fixed results; Redis is a
+fakeredis store; deep research goes to ``MockJinaService`` without its delays and
+replies are delivered to ``LocalSESSender``. Everything between those edges
+(``process_email_task``, ``EmailAgent``, the smolagents loop, the tools and the
+result formatting) runs unmodified.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import fakeredis
+import litellm
+
+from mxgo.llm_usage import resolve_handle
+from mxgo.routed_litellm_model import RoutedLiteLLMModel
+from mxgo.tools.deep_research_tool import DeepResearchTool
+
+STUB_MODEL_CONFIG = """
+[[model]]
+model_name = "gpt-4"
+
+[model.litellm_params]
+model = "openai/stub-gpt-4"
+api_key = "stub"
+weight = 1
+"""
+
+PLAN = "1. Read the email.\n2. Gather what is needed to answer it.\n3. Write the reply.\n<end_plan>"
+
+REPLY = (
+    "## Summary\n\n"
+    "The email asks for an overview of home battery adoption in Europe and what drives it. "
+    "Adoption has grown quickly, led by Germany and Italy, where feed-in tariffs have fallen "
+    "and households store solar power for the evening instead [1].\n\n"
+    "## Key points\n\n"
+    "- Installed capacity roughly doubled over the last two years [1]\n"
+    "- Falling cell prices brought typical payback periods under ten years [2]\n"
+    "- Subsidy schemes differ a lot between countries, which explains most of the spread\n\n"
+    "## Next steps\n\n"
+    "If useful, I can compare specific products or put together the subsidy rules for your region.\n"
+)
+
+# Tool calls the model makes per handle before its final answer; handles not listed answer directly
+TRANSCRIPTS: dict[str, list[tuple[str, dict[str, Any]]]] = {
+    "ask": [("web_search", {"query": "home battery adoption europe"})],
+    "fact-check": [
+        ("web_search", {"query": "home battery installed capacity europe"}),
+        ("web_search", {"query": "home battery payback period"}),
+    ],
+    "research": [("deep_research", {"query": "home battery adoption europe"})],
+}
+
+SEARCH_RESULTS = "\n\n".join(
+    f"[Home batteries in Europe, part {i}](https://example.com/batteries/{i})\n"
+    "Household storage keeps growing as solar owners shift their own production into the evening."
+    for i in range(1, 6)
+)
+
+
+def _approx_tokens(messages: list[Any]) -> int:
+    return len(json.dumps(messages, default=str)) // 4
+
+
+class StubRouter:
+    """
+    Stand-in for the LiteLLM router answering from canned transcripts.
+
+    Every agent gets its own model and therefore its own router, so the router keeps
+    track of how far into the transcript its agent is. Planning calls (made without
+    tools) get a fixed plan.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0):
+        """
+        Initialize the router.
+
+        Args:
+            latency_seconds: Simulated model latency per completion
+
+        """
+        self.latency_seconds = latency_seconds
+        self.tool_turns = 0
+        self._call_ids = itertools.count(1)
+
+    def completion(self, **kwargs: Any) -> litellm.ModelResponse:
+        """Answer a completion request with the next turn of the handle's transcript."""
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        messages = kwargs.get("messages", [])
+        if "tools" not in kwargs:
+            message = litellm.Message(content=PLAN)
+            finish_reason = "stop"
+        else:
+            transcript = TRANSCRIPTS.get(resolve_handle(), [])
+            if self.tool_turns < len(transcript):
+                name, arguments = transcript[self.tool_turns]
+            else:
+                name, arguments = "final_answer", {"answer": REPLY}
+            self.tool_turns += 1
+            tool_call = {
+                "id": f"call_{next(self._call_ids)}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            message = litellm.Message(content=None, tool_calls=[tool_call])
+            finish_reason = "tool_calls"
+
+        return litellm.ModelResponse(
+            model="openai/stub-gpt-4",
+            choices=[litellm.Choices(message=message, finish_reason=finish_reason)],
+            usage=litellm.Usage(
+                prompt_tokens=_approx_tokens(messages),
+                completion_tokens=len(message.content or json.dumps(message.tool_calls, default=str)) // 4,
+            ),
+        )
+
+
+@dataclass
+class LocalSESSender:
+    """Stand-in for ``EmailSender`` that keeps replies in memory instead of sending them."""
+
+    sent: list[dict[str, Any]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __call__(self) -> "LocalSESSender":
+        """Return the shared outbox, in place of constructing a sender."""
+        return self
+
+    async def send_reply(
+        self,
+        original_email: dict[str, Any],
+        reply_text: str,
+        reply_html: str | None = None,
+        attachments: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Record the reply."""
+        with self._lock:
+            self.sent.append(
+                {"to": original_email["from"], "text": reply_text, "html": reply_html, "attachments": attachments}
+            )
+            message_id = f"local-{len(self.sent)}"
+        return {"MessageId": message_id, "status": "sent"}
+
+
+def fake_web_search(_self: Any, query: str) -> str:
+    """Return fixed markdown search results, in place of DuckDuckGo."""
+    return f"## Search Results for {query}\n\n{SEARCH_RESULTS}"
+
+
+def mock_research_tool() -> DeepResearchTool:
+    """Create a deep research tool backed by the mock Jina service, without its simulated delays."""
+    tool = DeepResearchTool(use_mock_service=True)
+    tool.mock_service.min_delay = tool.mock_service.max_delay = 0
+    return tool
+
+
+@dataclass
+class StubServices:
+    """Handles on the stand-ins installed by ``stub_services``."""
+
+    outbox: LocalSESSender
+    redis: fakeredis.FakeRedis
+
+
+@contextmanager
+def stub_services(tmp_dir: Path, model_latency_seconds: float = 0.0) -> Iterator[StubServices]:
+    """
+    Replace every external service with a local stand-in for the duration of the block.
+
+    Args:
+        tmp_dir: Directory for the stub model config
+        model_latency_seconds: Simulated latency of every model completion
+
+    Yields:
+        StubServices: The outbox and Redis store, to inspect after a run
+
+    """
+    config_path = tmp_dir / "model.config.toml"
+    config_path.write_text(STUB_MODEL_CONFIG)
+    outbox = LocalSESSender()
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    env = {
+        "LITELLM_CONFIG_PATH": str(config_path),
+        "LITELLM_DEFAULT_MODEL_GROUP": "gpt-4",
+        "JINA_API_KEY": "stub",
+    }
+    for key in ("BRAVE_SEARCH_API_KEY", "SERPAPI_API_KEY", "SERPER_API_KEY", "RAPIDAPI_KEY"):
+        env[key] = ""
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.dict(os.environ, env))
+        stack.enter_context(
+            patch.object(RoutedLiteLLMModel, "create_client", lambda _self: StubRouter(model_latency_seconds))
+        )
+        stack.enter_context(patch("smolagents.default_tools.WebSearchTool.forward", fake_web_search))
+        stack.enter_context(patch("mxgo.tools.DeepResearchTool", mock_research_tool))
+        stack.enter_context(patch("mxgo.cache.get_redis_client", lambda: redis_client))
+        stack.enter_context(patch("mxgo.research_jobs.DEEP_RESEARCH_JOBS_ENABLED", False))
+        stack.enter_context(patch("mxgo.tasks.EmailSender", outbox))
+        yield StubServices(outbox=outbox, redis=redis_client)
@@ -163,3 +163,23 @@ def clean_database():
     except Exception as e:
         # If database cleanup fails, log but continue with tests
         logger.warning(f"Database cleanup failed: {e}")
+
+
+@pytest.fixture(autouse=True)
+def isolate_search_cache(monkeypatch):
+    """Keep search results, webpages, LinkedIn data and image answers from leaking between tests through the shared caches."""
+    from mxgo.scripts.visual_qa import vision_cache  # noqa: PLC0415
+    from mxgo.tools.external_data.linkedin.entity_cache import linkedin_cache  # noqa: PLC0415
+    from mxgo.tools.page_cache import page_cache  # noqa: PLC0415
+    from mxgo.tools.web_search.search_cache import search_cache  # noqa: PLC0415
+
+    monkeypatch.setattr("mxgo.cache.get_redis_client", lambda: None)
+    search_cache.clear()
+    page_cache.clear()
+    linkedin_cache.clear()
+    vision_cache.clear()
+    yield
+    search_cache.clear()
+    page_cache.clear()
+    linkedin_cache.clear()
+    vision_cache.clear()
@@ -0,0 +1,214 @@
+import asyncio
+import threading
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import dramatiq
+import fakeredis
+import pytest
+
+from mxgo.admission import (
+    AdmissionAction,
+    AdmissionController,
+    LoadLevel,
+    QueueLagTracker,
+    QueueLoad,
+    is_bulk_sender,
+)
+
+BUSY = QueueLoad(depth=300, lag_seconds=90)
+OVERLOADED = QueueLoad(depth=50, lag_seconds=900)
+
+
+class FakeChannel:
+    def __init__(self, depth: int, *, fail: bool = False):
+        self.depth = depth
+        self.fail = fail
+        self.declares = 0
+        self.threads: set[str] = set()
+
+    def queue_declare(self, queue: str, *, passive: bool = False) -> SimpleNamespace:
+        assert passive
+        self.declares += 1
+        self.threads.add(threading.current_thread().name)
+        if self.depth < 0:
+            msg = f"NOT_FOUND - no queue '{queue}'"
+            raise ConnectionError(msg)
+        if self.fail:
+            msg = "Connection closed by the broker"
+            raise ConnectionError(msg)
+        return SimpleNamespace(method=SimpleNamespace(message_count=self.depth, consumer_count=2))
+
+
+class FakeBroker:
+    """Stands in for the RabbitMQ broker, which reconnects after its connection is deleted."""
+
+    def __init__(self, depth: int, *, failures: int = 0):
+        self.depth = depth
+        self.failures = failures
+        self.channels: list[FakeChannel | None] = []
+
+    @property
+    def channel(self) -> FakeChannel:
+        if not self.channels or self.channels[-1] is None:
+            self.channels.append(FakeChannel(self.depth, fail=len(self.channels) < self.failures))
+        return self.channels[-1]
+
+    @property
+    def connection(self) -> None:
+        return None
+
+    @connection.deleter
+    def connection(self) -> None:
+        self.channels.append(None)
+
+
+class TestAdmissionDecisions:
+    """Test how emails are admitted at each load level."""
+
+    def test_everyone_admitted_under_normal_load(self):
+        """Test bulk senders and low-priority handles are admitted while the queue keeps up."""
+        load = QueueLoad(depth=10, lag_seconds=5)
+
+        decision = AdmissionController.decide(
+            load, "background-research", "news@lists.example.com", {"Precedence": "bulk"}
+        )
+
+        assert decision.action is AdmissionAction.ADMIT
+        assert decision.level is LoadLevel.NORMAL
+
+    def test_unknown_load_admits(self):
+        """Test emails are admitted when the load could not be sampled."""
+        decision = AdmissionController.decide(None, "ask", "news@lists.example.com", {"list-id": "<news.example.com>"})
+
+        assert decision.action is AdmissionAction.ADMIT
+
+    def test_bulk_sender_rejected_with_retry_after(self):
+        """Test bulk mail gets 429 while busy and 503 while overloaded, retrying after the lag."""
+        busy = AdmissionController.decide(BUSY, "ask", "news@example.com", {"list-unsubscribe": "<mailto:u@x.com>"})
+        overloaded = AdmissionController.decide(OVERLOADED, "ask", "news@example.com", {"Precedence": "list"})
+
+        assert busy.action is AdmissionAction.REJECT
+        assert busy.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert busy.retry_after_seconds == 90
+        assert overloaded.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert overloaded.retry_after_seconds == 900
+
+    def test_configured_bulk_senders(self):
+        """Test senders are bulk by address or domain when configured."""
+        with patch("mxgo.admission.ADMISSION_BULK_SENDERS", ["digest@example.com", "bulk.example.org"]):
+            assert is_bulk_sender("Digest@Example.com")
+            assert is_bulk_sender("anyone@bulk.example.org")
+            assert not is_bulk_sender("user@example.com", {"precedence": "first-class"})
+
+    def test_low_priority_emails_deferred_while_busy(self):
+        """Test low-priority handles and scheduled tasks are deferred, other emails admitted."""
+        low_priority = AdmissionController.decide(BUSY, "background-research", "user@example.com")
+        scheduled = AdmissionController.decide(BUSY, "ask", "user@example.com", scheduled=True)
+        regular = AdmissionController.decide(BUSY, "ask", "user@example.com")
+
+        assert low_priority.action is AdmissionAction.DEFER
+        assert scheduled.action is AdmissionAction.DEFER
+        assert regular.action is AdmissionAction.ADMIT
+        assert regular.level is LoadLevel.BUSY
+
+    def test_degraded_model_group_while_overloaded(self):
+        """Test regular emails are tagged for the degraded model group once overloaded."""
+        with patch("mxgo.admission.ADMISSION_DEGRADED_MODEL_GROUP", "gpt-4-mini"):
+            busy = AdmissionController.decide(BUSY, "ask", "user@example.com")
+            overloaded = AdmissionController.decide(OVERLOADED, "ask", "user@example.com")
+
+        assert busy.model_group is None
+        assert overloaded.action is AdmissionAction.DEGRADE
+        assert overloaded.model_group == "gpt-4-mini"
+
+
+class TestQueueLoadSampling:
+    """Test the queue load is sampled from the broker and Redis, and cached."""
+
+    @pytest.fixture(autouse=True)
+    def redis_client(self):
+        """Redis shared by the workers' lag reports and the controller."""
+        client = fakeredis.FakeRedis(decode_responses=True)
+        with patch("mxgo.cache.get_redis_client", return_value=client):
+            yield client
+
+    def test_sample_cached_for_interval(self):
+        """Test requests within the sample interval reuse the last sample."""
+        broker = FakeBroker(depth=42)
+        controller = AdmissionController(broker, "default", sample_interval_seconds=60)
+
+        first = asyncio.run(controller.load())
+        second = asyncio.run(controller.load())
+
+        assert first == second == QueueLoad(depth=42, lag_seconds=0.0)
+        assert broker.channels[-1].declares == 1
+
+    def test_lag_reported_by_workers(self):
+        """Test the lag is the queue wait the workers last reported."""
+        message = dramatiq.Message(
+            queue_name="default",
+            actor_name="process_email_task",
+            args=(),
+            kwargs={},
+            options={},
+            message_timestamp=int((time.time() - 30) * 1000),
+        )
+        QueueLagTracker().before_process_message(None, message)
+        controller = AdmissionController(FakeBroker(depth=5), "default")
+
+        load = controller.sample()
+
+        assert load.depth == 5
+        assert 29 < load.lag_seconds < 35
+
+    def test_failed_sample_admits_and_reconnects(self):
+        """Test emails are admitted while the queue cannot be declared, with a fresh connection next time."""
+        broker = FakeBroker(depth=-1)
+        controller = AdmissionController(broker, "default", sample_interval_seconds=0)
+
+        decision = asyncio.run(controller.admit("ask", "news@example.com", {"precedence": "bulk"}))
+        asyncio.run(controller.load())
+
+        assert decision.action is AdmissionAction.ADMIT
+        assert [channel.declares for channel in broker.channels if channel] == [1, 1]
+
+    def test_sample_after_lost_connection_succeeds(self):
+        """Test a sample after the broker dropped the connection reconnects and reads the queue again."""
+        broker = FakeBroker(depth=42, failures=1)
+        controller = AdmissionController(broker, "default", sample_interval_seconds=0)
+
+        first = asyncio.run(controller.load())
+        second = asyncio.run(controller.load())
+
+        assert first is None
+        assert second == QueueLoad(depth=42, lag_seconds=0.0)
+        assert broker.channels[0].fail
+        assert broker.channels[1] is None
+
+    def test_samples_taken_on_one_thread(self):
+        """Test every sample runs on the controller's thread, so the broker opens a single connection."""
+        broker = FakeBroker(depth=42)
+        controller = AdmissionController(broker, "default", sample_interval_seconds=0)
+
+        async def load_concurrently():
+            return await asyncio.gather(*(controller.load() for _ in range(8)))
+
+        asyncio.run(load_concurrently())
+        asyncio.run(controller.load())
+
+        (channel,) = broker.channels
+        assert channel.declares == 9
+        assert len(channel.threads) == 1
+
+    def test_disabled_controller_does_not_sample(self):
+        """Test a disabled controller admits every email without touching the broker."""
+        broker = FakeBroker(depth=10_000)
+        controller = AdmissionController(broker, "default", enabled=False)
+
+        decision = asyncio.run(controller.admit("ask", "news@example.com", {"precedence": "bulk"}))
+
+        assert decision.action is AdmissionAction.ADMIT
+        assert not broker.channels
@@ -12,12 +12,20 @@ import pytest  # For fixtures
 from fakeredis import FakeAsyncRedis
 from fastapi.testclient import TestClient
 from freezegun import freeze_time  # For controlling time in tests
+from prometheus_client import REGISTRY
 
 import mxgo.validators
 from mxgo._logging import get_logger
+from mxgo.admission import AdmissionController, QueueLoad
 from mxgo.api import app
 from mxgo.config import NEWSLETTER_LIMITS_BY_PLAN
-from mxgo.schemas import EmailSuggestionResponse, SuggestionDetail, UserPlan
+from mxgo.schemas import (
+    EmailSuggestionResponse,
+    ResearchJobProgress,
+    ResearchJobStatus,
+    SuggestionDetail,
+    UserPlan,
+)
 from tests.generate_test_jwt import generate_test_jwt
 
 # Set environment variables for testing
@@ -207,6 +215,110 @@ def test_process_email_success_no_attachments_ask_handle(
     validate_send_task(form_data, mock_task_send, expected_attachment_count=0)
 
 
+@patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
+@patch("mxgo.api.process_email_task.send")
+def test_process_email_records_stage_metrics(mock_task_send, mock_validate_email_whitelist, client_with_patched_redis):
+    """Test /process-email stages and the request itself show up in /metrics."""
+    mock_validate_email_whitelist.return_value = None
+
+    def stage_count(stage):
+        return REGISTRY.get_sample_value("mxgo_api_stage_seconds_count", {"stage": stage}) or 0
+
+    before = {stage: stage_count(stage) for stage in ("api_key", "rate_limits", "idempotency", "enqueue")}
+    form_data = prepare_form_data(to="ask@mxgo.ai", from_email="metrics@example.com")
+
+    response = make_post_request_with_client(client_with_patched_redis, form_data, "/process-email")
+    assert_successful_response(response)
+    mock_task_send.assert_called_once()
+
+    for stage, count in before.items():
+        assert stage_count(stage) == count + 1, stage
+    metrics_response = client_with_patched_redis.get("/metrics")
+    assert metrics_response.status_code == 200
+    assert metrics_response.headers["content-type"].startswith("text/plain")
+    assert 'mxgo_http_request_seconds_count{method="POST",route="/process-email",status="200"}' in metrics_response.text
+    assert 'mxgo_http_response_bytes_count{method="POST",route="/process-email"}' in metrics_response.text
+
+
+def test_metrics_route_label_uses_path_template():
+    """Test path parameters are not used as metric labels."""
+    client.get("/research-jobs/email-1", headers={"x-api-key": "wrong-key"})
+
+    metrics_text = client.get("/metrics").text
+
+    assert 'route="/research-jobs/{email_id}"' in metrics_text
+    assert "email-1" not in metrics_text
+
+
+def queue_under_load(load: QueueLoad):
+    """Patch the API's admission controller to see the given email queue load."""
+    controller = AdmissionController(None, "default", enabled=True, sample_interval_seconds=0)
+    return (
+        patch("mxgo.api.admission_controller", controller),
+        patch.object(controller, "sample", return_value=load),
+    )
+
+
+@patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
+@patch("mxgo.api.process_email_task.send")
+def test_bulk_sender_rejected_while_queue_overloaded(
+    mock_task_send, mock_validate_email_whitelist, client_with_patched_redis
+):
+    """Test bulk mail gets 503 with Retry-After, and is not marked as queued, while the queue is overloaded."""
+    mock_validate_email_whitelist.return_value = None
+    form_data = prepare_form_data(
+        from_email="digest@example.com", messageId="<bulk@example.com>", rawHeaders=json.dumps({"precedence": "bulk"})
+    )
+    controller_patch, sample_patch = queue_under_load(QueueLoad(depth=5000, lag_seconds=30))
+
+    with controller_patch, sample_patch:
+        response = make_post_request_with_client(client_with_patched_redis, form_data, "/process-email")
+        retried = make_post_request_with_client(client_with_patched_redis, form_data, "/process-email")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+    assert response.json()["status"] == "error"
+    assert retried.status_code == 503
+    mock_task_send.assert_not_called()
+
+
+@patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
+@patch("mxgo.api.deferred_email_task.send")
+@patch("mxgo.api.process_email_task.send")
+def test_low_priority_email_deferred_while_queue_busy(
+    mock_task_send, mock_deferred_send, mock_validate_email_whitelist, client_with_patched_redis
+):
+    """Test a low-priority handle goes to the deferred queue while the queue is busy."""
+    mock_validate_email_whitelist.return_value = None
+    form_data = prepare_form_data(to="background-research@mxgo.ai", from_email="deferred@example.com")
+    controller_patch, sample_patch = queue_under_load(QueueLoad(depth=300, lag_seconds=0))
+
+    with controller_patch, sample_patch:
+        response = make_post_request_with_client(client_with_patched_redis, form_data, "/process-email")
+
+    assert_successful_response(response)
+    mock_task_send.assert_not_called()
+    mock_deferred_send.assert_called_once()
+    assert mock_deferred_send.call_args.kwargs["model_group"] is None
+
+
+@patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
+@patch("mxgo.api.process_email_task.send")
+def test_email_degraded_while_queue_overloaded(
+    mock_task_send, mock_validate_email_whitelist, client_with_patched_redis
+):
+    """Test a regular email is tagged for the degraded model group while the queue is overloaded."""
+    mock_validate_email_whitelist.return_value = None
+    form_data = prepare_form_data(to="ask@mxgo.ai", from_email="degraded@example.com")
+    controller_patch, sample_patch = queue_under_load(QueueLoad(depth=5000, lag_seconds=0))
+
+    with controller_patch, sample_patch, patch("mxgo.admission.ADMISSION_DEGRADED_MODEL_GROUP", "gpt-4-mini"):
+        response = make_post_request_with_client(client_with_patched_redis, form_data, "/process-email")
+
+    assert_successful_response(response)
+    assert mock_task_send.call_args.kwargs["model_group"] == "gpt-4-mini"
+
+
 # ... (other existing tests - ensure they use client_with_patched_redis and unique from_email if needed) ...
 
 # --- New Rate Limiting Tests ---
@@ -215,7 +327,7 @@ def test_process_email_success_no_attachments_ask_handle(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)  # Still mock this
 @patch("mxgo.api.process_email_task.send")  # And this
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)  # Mock rejection email
+@patch("mxgo.validators.send_notice_task.send")  # Mock rejection email
 def test_email_hourly_rate_limit_exceeded(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -245,7 +357,7 @@ def test_email_hourly_rate_limit_exceeded(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_email_daily_rate_limit_exceeded(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -281,7 +393,7 @@ def test_email_daily_rate_limit_exceeded(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_email_monthly_rate_limit_exceeded(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -320,7 +432,7 @@ def test_email_monthly_rate_limit_exceeded(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_domain_hourly_rate_limit_exceeded_for_unknown_domain(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -353,7 +465,7 @@ def test_domain_hourly_rate_limit_exceeded_for_unknown_domain(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_domain_limit_not_applied_for_known_provider(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -381,7 +493,7 @@ def test_domain_limit_not_applied_for_known_provider(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_email_normalization_for_rate_limiting(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -418,7 +530,7 @@ def test_email_normalization_for_rate_limiting(
 @freeze_time("2024-01-15 10:00:00 UTC")
 @patch("mxgo.api.validate_email_whitelist", new_callable=AsyncMock)
 @patch("mxgo.api.process_email_task.send")
-@patch("mxgo.validators.send_email_reply", new_callable=AsyncMock)
+@patch("mxgo.validators.send_notice_task.send")
 def test_rate_limits_cleared_after_time_period(
     mock_rejection_email, mock_task_send, mock_validate_whitelist, client_with_patched_redis
 ):
@@ -534,6 +646,42 @@ def assert_suggestions_successful_response(response, expected_num_requests=1):
             assert isinstance(suggestion["suggestion_cc_emails"], list)
 
 
+@patch("mxgo.api.get_research_progress")
+def test_research_job_progress(mock_get_progress):
+    """Test research job progress is returned by email ID."""
+    mock_get_progress.return_value = ResearchJobProgress(
+        email_id="email-1",
+        status=ResearchJobStatus.RUNNING,
+        query="home batteries",
+        created_at="2024-01-15T10:00:00+00:00",
+        updated_at="2024-01-15T10:01:00+00:00",
+        partial_findings="The European market",
+        visited_urls=["https://a.com"],
+    )
+
+    response = client.get("/research-jobs/email-1", headers={"x-api-key": API_KEY})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert response.json()["partial_findings"] == "The European market"
+    mock_get_progress.assert_called_once_with("email-1")
+
+
+@patch("mxgo.api.get_research_progress", return_value=None)
+def test_research_job_progress_not_found(_mock_get_progress):  # noqa: PT019
+    """Test an email without a research job returns 404."""
+    response = client.get("/research-jobs/unknown", headers={"x-api-key": API_KEY})
+
+    assert response.status_code == 404
+
+
+def test_research_job_progress_invalid_api_key():
+    """Test the progress endpoint requires a valid API key."""
+    response = client.get("/research-jobs/email-1", headers={"x-api-key": "wrong-key"})
+
+    assert response.status_code == 401
+
+
 def assert_suggestions_error_response(response, expected_status=422):
     """Assert an error response from suggestions API."""
     assert response.status_code == expected_status, f"Expected status {expected_status}, got {response.status_code}"
@@ -66,7 +66,7 @@ class TestProcessEmailIntegration:
     @pytest.fixture
     def mock_email_sender(self):
         """Mock email sender to prevent actual email sending."""
-        with patch("mxgo.validators.send_email_reply"):
+        with patch("mxgo.validators.send_notice_task"):
             yield
 
     @pytest.fixture
@@ -399,7 +399,7 @@ class TestBackwardCompatibility:
         with (
             patch("mxgo.validators.redis_client", None),
             patch("mxgo.validators.is_email_whitelisted", return_value=(True, True)),
-            patch("mxgo.validators.send_email_reply"),
+            patch("mxgo.validators.send_notice_task"),
             patch("mxgo.api.process_email_task"),
             patch("user.get_user_plan", return_value=UserPlan.BETA),
         ):
@@ -0,0 +1,65 @@
+from tests.benchmarks.bench_ingestion import run_benchmark as run_ingestion_benchmark
+from tests.benchmarks.bench_process_email import run_benchmark
+from tests.benchmarks.bench_scrubbing import run_benchmark as run_scrubbing_benchmark
+from tests.benchmarks.report import find_regressions
+
+
+class TestProcessEmailBenchmark:
+    """Test the offline end-to-end benchmark keeps working."""
+
+    def test_emails_processed_offline(self):
+        """Test emails run through the task with the stub services and are all answered."""
+        report = run_benchmark(["ask"], [2], emails=2)
+
+        (result,) = report["results"]
+        assert (result["handle"], result["concurrency"], result["emails"]) == ("ask", 2, 2)
+        assert result["failures"] == 0
+        assert result["emails_per_second"] > 0
+        assert result["p95_ms"] >= result["p50_ms"] > 0
+        assert result["peak_rss_mb"] > 0
+
+    def test_regressions_beyond_tolerance_reported(self):
+        """Test throughput drops and p95 rises beyond the tolerance are reported, smaller changes are not."""
+        baseline = {"results": [{"handle": "ask", "concurrency": 4, "emails_per_second": 10.0, "p95_ms": 500}]}
+        slower = {"results": [{"handle": "ask", "concurrency": 4, "emails_per_second": 7.0, "p95_ms": 700}]}
+        similar = {"results": [{"handle": "ask", "concurrency": 4, "emails_per_second": 9.0, "p95_ms": 550}]}
+
+        assert len(find_regressions(slower, baseline, 0.2)) == 2
+        assert find_regressions(similar, baseline, 0.2) == []
+
+
+class TestIngestionBenchmark:
+    """Test the in-process /process-email benchmark keeps working."""
+
+    def test_text_only_requests_queued(self):
+        """Test requests pass every validator, are encoded for the broker and have their stages timed."""
+        report = run_ingestion_benchmark(["text_only"], [2], requests=4, tracemalloc_samples=1)
+
+        (result,) = report["results"]
+        assert result["failures"] == 0
+        assert result["status_codes"] == {"200": 4}
+        assert {"rate_limits", "idempotency", "enqueue"} <= result["stage_ms"].keys()
+        assert result["peak_alloc_mb"] > 0
+
+    def test_oversized_attachments_rejected(self):
+        """Test five 15 MB attachments are counted as expected rejections, not failures."""
+        report = run_ingestion_benchmark(["five_15mb_attachments"], [1], requests=1, tracemalloc_samples=0)
+
+        (result,) = report["results"]
+        assert result["status_codes"] == {"400": 1}
+        assert result["failures"] == 0
+        assert result["peak_alloc_mb"] is None
+
+
+class TestScrubbingBenchmark:
+    """Test the log scrubbing microbenchmark keeps working."""
+
+    def test_both_scrubbers_timed(self):
+        """Test each message is timed with both scrubbers, which agree on the output."""
+        report = run_scrubbing_benchmark(["short_with_keys", "email_without_keys"], rounds=1, repeat=1)
+
+        assert [result["message"] for result in report["results"]] == ["short_with_keys", "email_without_keys"]
+        for result in report["results"]:
+            assert result["same_output"] is True
+            assert result["legacy_us"] > 0
+            assert result["single_pass_us"] > 0
@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools.citation_aware_visit_tool import CitationAwareBatchVisitTool, fetch_page_as_markdown
+
+
+def create_context():
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    return RequestContext(email_request)
+
+
+def make_page_response(html, content_type="text/html; charset=utf-8", chunk_size=1024):
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.headers = {"Content-Type": content_type}
+    response.encoding = "utf-8"
+    body = html.encode()
+    response.iter_content.side_effect = lambda **_kwargs: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    return response
+
+
+def page_html(title, body="Some content"):
+    return f"<html><head><title>{title}</title></head><body><p>{body}</p></body></html>"
+
+
+class TestFetchPageAsMarkdown:
+    """Test single page fetching with size and type limits."""
+
+    @patch("mxgo.http_client.get")
+    def test_converts_html_to_markdown(self, mock_get):
+        """Test the page title and markdown body are returned."""
+        mock_get.return_value = make_page_response(page_html("Example Page", "<b>Bold</b> text"))
+
+        title, markdown = fetch_page_as_markdown("https://example.com")
+
+        assert title == "Example Page"
+        assert "**Bold** text" in markdown
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_get.return_value.close.assert_called_once()
+
+    @patch("mxgo.http_client.get")
+    def test_stops_reading_at_size_cap(self, mock_get):
+        """Test the body is not read past the byte limit."""
+        response = make_page_response(page_html("Big", "x" * 10000), chunk_size=100)
+        mock_get.return_value = response
+
+        _, markdown = fetch_page_as_markdown("https://example.com", max_bytes=500)
+
+        assert len(markdown) < 500
+
+    @patch("mxgo.http_client.get")
+    def test_rejects_binary_content(self, mock_get):
+        """Test non-text responses are refused."""
+        mock_get.return_value = make_page_response("%PDF-1.7", content_type="application/pdf")
+
+        with pytest.raises(ValueError, match="Unsupported content type"):
+            fetch_page_as_markdown("https://example.com/file.pdf")
+
+
+class TestCitationAwareBatchVisitTool:
+    """Test concurrent multi-URL visits."""
+
+    @patch("mxgo.http_client.get")
+    def test_pages_fetched_concurrently(self, mock_get):
+        """Test total time is close to the slowest page rather than the sum."""
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def slow_get(url, **_kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.2)
+            with lock:
+                in_flight -= 1
+            return make_page_response(page_html(url))
+
+        mock_get.side_effect = slow_get
+        urls = [f"https://example{i}.com" for i in range(5)]
+
+        start = time.monotonic()
+        CitationAwareBatchVisitTool(create_context()).forward(urls)
+
+        assert time.monotonic() - start < 0.8
+        assert max_in_flight == 5
+
+    @patch("mxgo.http_client.get")
+    def test_results_and_citations_in_input_order(self, mock_get):
+        """Test output order and citation IDs follow the input, not completion order."""
+        delays = {"https://slow.com": 0.15, "https://medium.com": 0.05, "https://fast.com": 0}
+
+        def get(url, **_kwargs):
+            time.sleep(delays[url])
+            return make_page_response(page_html(f"Title {url}"))
+
+        mock_get.side_effect = get
+        context = create_context()
+
+        result = json.loads(CitationAwareBatchVisitTool(context).forward(list(delays)))
+
+        assert [source.url for source in context.get_citations().sources] == list(delays)
+        assert result["metadata"]["citation_ids"] == ["1", "2", "3"]
+        assert [source["url"] for source in result["citations"]["sources"]] == list(delays)
+        content = result["content"]
+        assert (
+            content.index("https://slow.com") < content.index("https://medium.com") < content.index("https://fast.com")
+        )
+        assert all(source.description == "visited" for source in context.get_citations().sources)
+
+    @patch("mxgo.http_client.get")
+    def test_failed_page_does_not_block_others(self, mock_get):
+        """Test a failing URL is reported without a citation while the rest succeed."""
+
+        def get(url, **_kwargs):
+            if "broken" in url:
+                msg = "connection refused"
+                raise requests.ConnectionError(msg)
+            return make_page_response(page_html("Working"))
+
+        mock_get.side_effect = get
+        context = create_context()
+
+        result = json.loads(CitationAwareBatchVisitTool(context).forward(["https://broken.com", "https://working.com"]))
+
+        assert result["metadata"]["failed_urls"] == ["https://broken.com"]
+        assert [source.url for source in context.get_citations().sources] == ["https://working.com"]
+        assert "Could not fetch this page: connection refused" in result["content"]
+
+    @patch("mxgo.http_client.get")
+    def test_duplicates_removed_and_url_limit_applied(self, mock_get):
+        """Test duplicate URLs are visited once and extra URLs are skipped."""
+        mock_get.side_effect = lambda url, **_kwargs: make_page_response(page_html(url))
+        urls = ["https://a.com", "https://a.com"] + [f"https://site{i}.com" for i in range(12)]
+
+        with patch("mxgo.tools.citation_aware_visit_tool.MAX_BATCH_URLS", 5):
+            result = json.loads(CitationAwareBatchVisitTool(create_context()).forward(urls))
+
+        assert mock_get.call_count == 5
+        assert result["metadata"]["urls"][0] == "https://a.com"
+        assert len(result["metadata"]["skipped_urls"]) == 8
+
+    @patch("mxgo.http_client.get")
+    def test_long_pages_truncated(self, mock_get):
+        """Test each page is cut to the per-page character budget."""
+        mock_get.return_value = make_page_response(page_html("Long", "word " * 5000))
+
+        result = json.loads(
+            CitationAwareBatchVisitTool(create_context(), max_page_chars=200).forward(["https://a.com"])
+        )
+
+        assert "_Page truncated_" in result["content"]
+        assert len(result["content"]) < 500
+
+    def test_empty_url_list_rejected(self):
+        """Test at least one URL is required."""
+        with pytest.raises(ValueError, match="At least one URL"):
+            CitationAwareBatchVisitTool(create_context()).forward(["", "  "])
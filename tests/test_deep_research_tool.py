@@ -251,7 +251,7 @@ class TestAPIIntegration:
     """Test API integration functionality."""
 
     @patch.dict(os.environ, {"JINA_API_KEY": "test_api_key"})
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     def test_forward_success_non_streaming(self, mock_post):
         """Test successful API call without streaming."""
         tool = DeepResearchTool()
@@ -289,7 +289,7 @@ class TestAPIIntegration:
         assert "AI stands for Artificial Intelligence" in result["findings"]
 
     @patch.dict(os.environ, {"JINA_API_KEY": "test_api_key"})
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     def test_forward_api_error(self, mock_post):
         """Test API call with HTTP error."""
         tool = DeepResearchTool()
@@ -422,6 +422,42 @@ class TestStreamingResponse:
         assert "error" in result
         assert "API Error" in result["error"]
 
+    def test_process_stream_response_reports_progress(self):
+        """Test partial findings and visited URLs are reported while streaming."""
+        tool = DeepResearchTool()
+        mock_response = Mock()
+        mock_response.iter_lines.return_value = [
+            b'data: {"choices": [{"delta": {"content": "First"}}], "visitedURLs": ["https://a.com"]}',
+            b'data: {"choices": [{"delta": {"content": " finding"}}]}',
+            b"data: [DONE]",
+        ]
+        mock_response.headers = {"date": "2024-01-15"}
+        on_progress = Mock()
+
+        with patch("mxgo.tools.deep_research_tool.PROGRESS_INTERVAL_SECONDS", 0):
+            result = tool._process_stream_response(mock_response, on_progress)
+
+        assert result["findings"] == "First finding"
+        on_progress.assert_any_call("First", ["https://a.com"])
+        assert on_progress.call_args.args == ("First finding", ["https://a.com"])
+
+
+class TestCompletedResearch:
+    """Test serving findings from a background research job."""
+
+    @patch.dict(os.environ, {"JINA_API_KEY": "test_key"})
+    @patch("mxgo.http_client.post")
+    def test_forward_returns_completed_research_without_api_call(self, mock_post):
+        """Test a tool given a finished job's result does not call the API again."""
+        tool = DeepResearchTool()
+        tool.enable_deep_research()
+        tool.use_completed_research({"query": "original query", "findings": "Stored findings", "read_urls": []})
+
+        result = tool.forward("agent phrased query")
+
+        mock_post.assert_not_called()
+        assert result == {"query": "agent phrased query", "findings": "Stored findings", "read_urls": []}
+
 
 class TestErrorHandling:
     """Test error handling scenarios."""
@@ -432,7 +468,7 @@ class TestErrorHandling:
         tool = DeepResearchTool()
         tool.enable_deep_research()
 
-        with patch("requests.post") as mock_post:
+        with patch("mxgo.http_client.post") as mock_post:
             mock_response = Mock()
             mock_response.ok = True
             mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
@@ -449,7 +485,7 @@ class TestErrorHandling:
         tool = DeepResearchTool()
         tool.enable_deep_research()
 
-        with patch("requests.post") as mock_post:
+        with patch("mxgo.http_client.post") as mock_post:
             mock_post.side_effect = requests.ConnectionError("Connection failed")
 
             result = tool.forward(query="Test query")
@@ -463,7 +499,7 @@ class TestErrorHandling:
         tool = DeepResearchTool()
         tool.enable_deep_research()
 
-        with patch("requests.post") as mock_post:
+        with patch("mxgo.http_client.post") as mock_post:
             mock_post.side_effect = Exception("Unexpected error")
 
             result = tool.forward(query="Test query")
@@ -487,7 +523,7 @@ class TestIntegrationScenarios:
     """Test integrated workflow scenarios."""
 
     @patch.dict(os.environ, {"JINA_API_KEY": "test_api_key"})
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     def test_complete_research_workflow(self, mock_post):
         """Test complete research workflow with all features."""
         tool = DeepResearchTool()
@@ -549,7 +585,7 @@ class TestIntegrationScenarios:
             Path(temp_path).unlink()
 
     @patch.dict(os.environ, {"JINA_API_KEY": "test_api_key"})
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     def test_streaming_workflow(self, mock_post):
         """Test streaming research workflow."""
         tool = DeepResearchTool()
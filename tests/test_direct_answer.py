@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mxgo.agents.email_agent import EmailAgent
+from mxgo.email_handles import DEFAULT_EMAIL_HANDLES
+from mxgo.schemas import DetailedEmailProcessingResult, EmailAttachment, EmailRequest
+from tests.benchmarks.stubs import REPLY, stub_services
+
+HANDLES = {instructions.handle: instructions for instructions in DEFAULT_EMAIL_HANDLES}
+
+
+@pytest.fixture
+def services(tmp_path):
+    """Local stand-ins for the model and the other external services."""
+    with stub_services(tmp_path) as services:
+        yield services
+
+
+def _email(**kwargs) -> EmailRequest:
+    fields = {
+        "from_email": "user@example.com",
+        "to": "summarize@mxgo.ai",
+        "subject": "Quarterly update",
+        "textContent": "Revenue grew 12% this quarter. Hiring is paused until the budget review in May.",
+    }
+    return EmailRequest(**{**fields, **kwargs})
+
+
+def _process(email_request: EmailRequest, handle: str, tmp_path) -> tuple[DetailedEmailProcessingResult, MagicMock]:
+    instructions = HANDLES[handle]
+    agent = EmailAgent(email_request, instructions, attachment_dir=str(tmp_path / "attachments"))
+    with patch.object(agent.agent, "run", wraps=agent.agent.run) as agent_run:
+        result = agent.process_email(email_request, instructions)
+    return result, agent_run
+
+
+class TestDirectAnswer:
+    """Test plain emails for opted-in handles are answered with a single completion."""
+
+    @pytest.mark.usefixtures("services")
+    @pytest.mark.parametrize("handle", ["summarize", "simplify", "translate"])
+    def test_plain_email_answered_directly(self, handle, tmp_path):
+        """Test the agent does not run and the profile shows one direct completion."""
+        result, agent_run = _process(_email(to=f"{handle}@mxgo.ai"), handle, tmp_path)
+
+        agent_run.assert_not_called()
+        assert REPLY.splitlines()[0].lstrip("# ") in result.email_content.text
+        profile = result.metadata.agent_profile
+        assert profile.answered_directly
+        assert [step.step_type for step in profile.steps] == ["direct"]
+        assert profile.steps[0].input_tokens > 0
+
+    @pytest.mark.usefixtures("services")
+    def test_tool_request_falls_back_to_agent(self, tmp_path):
+        """Test the agent runs when the direct completion asks for a tool."""
+        transcript = [("web_search", {"query": "quarterly revenue"})]
+        with patch.dict("tests.benchmarks.stubs.TRANSCRIPTS", {"summarize": transcript}):
+            result, agent_run = _process(_email(), "summarize", tmp_path)
+
+        agent_run.assert_called_once()
+        profile = result.metadata.agent_profile
+        assert not profile.answered_directly
+        assert profile.steps[0].step_type == "direct"
+        assert profile.action_steps > 0
+        assert result.email_content.text
+
+    @pytest.mark.usefixtures("services")
+    @pytest.mark.parametrize(
+        ("handle", "email_fields"),
+        [
+            ("ask", {}),
+            ("summarize", {"textContent": "Please summarize https://example.com/report"}),
+            ("summarize", {"htmlContent": "<a href='http://example.com'>report</a>", "textContent": None}),
+            (
+                "summarize",
+                {"attachments": [EmailAttachment(filename="report.pdf", contentType="application/pdf", size=10)]},
+            ),
+            ("summarize", {"distilled_processing_instructions": "Summarize the latest news"}),
+        ],
+    )
+    def test_ineligible_emails_use_agent(self, handle, email_fields, tmp_path):
+        """Test other handles and emails with links, attachments or scheduled instructions skip the direct answer."""
+        email_request = _email(**email_fields)
+        agent = EmailAgent(email_request, HANDLES[handle], attachment_dir=str(tmp_path / "attachments"))
+
+        assert not agent._can_answer_directly(email_request, HANDLES[handle])
+
+    @pytest.mark.usefixtures("services")
+    def test_disabled_by_config(self, tmp_path):
+        """Test DIRECT_ANSWER_ENABLED turns the direct answer off."""
+        email_request = _email()
+        agent = EmailAgent(email_request, HANDLES["summarize"], attachment_dir=str(tmp_path / "attachments"))
+
+        with patch("mxgo.agents.email_agent.DIRECT_ANSWER_ENABLED", False):
+            assert not agent._can_answer_directly(email_request, HANDLES["summarize"])
+        assert agent._can_answer_directly(email_request, HANDLES["summarize"])
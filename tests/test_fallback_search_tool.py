@@ -1,8 +1,18 @@
+import threading
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 
-from mxgo.tools.fallback_search_tool import FallbackWebSearchTool
+from mxgo.config import SEARCH_HEDGE_DEFAULT_DELAY_SECONDS, SEARCH_HEDGE_MAX_DELAY_SECONDS
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools.fallback_search_tool import (
+    FallbackSearchError,
+    FallbackWebSearchTool,
+    get_hedge_delay,
+    latency_tracker,
+)
 
 
 class TestFallbackWebSearchTool:
@@ -237,3 +247,144 @@ class TestFallbackWebSearchTool:
             result = tool.forward(query)
             assert result == "Search results"
             primary_tool.forward.assert_called_with(query=query)
+
+
+class SlowSearchTool:
+    """Minimal search tool that waits before answering and cites its result."""
+
+    def __init__(self, name, context, delay=0.0, *, fail=False):
+        self.name = name
+        self.context = context
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def forward(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            msg = f"{self.name} failed"
+            raise RuntimeError(msg)
+        citation_id = self.context.add_web_citation(f"https://{self.name}.example.com", f"{self.name} result")
+        return f"{self.name} results for {query} [#{citation_id}]"
+
+
+def create_context():
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    return RequestContext(email_request)
+
+
+class TestHedgedSearch:
+    """Test hedged primary/secondary searches."""
+
+    @pytest.fixture(autouse=True)
+    def reset_latency_tracker(self):
+        latency_tracker.clear()
+        yield
+        latency_tracker.clear()
+
+    def test_fast_primary_does_not_start_secondary(self):
+        """Test the secondary tool is not used when the primary answers within the hedge delay."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context)
+        secondary = SlowSearchTool("ddg", context)
+
+        with patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=1.0):
+            result = FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary).forward("query")
+
+        assert result == "brave results for query [#1]"
+        assert secondary.calls == 0
+        assert [source.url for source in context.get_citations().sources] == ["https://brave.example.com"]
+
+    def test_slow_primary_is_hedged_and_loser_citations_discarded(self):
+        """Test a slow primary loses to the secondary and its citations never reach the request."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context, delay=0.5)
+        secondary = SlowSearchTool("ddg", context)
+
+        with patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=0.05):
+            start = time.monotonic()
+            result = FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary).forward("query")
+            elapsed = time.monotonic() - start
+
+        assert result == "ddg results for query [#1]"
+        assert elapsed < 0.4
+        time.sleep(0.6)  # Let the losing primary finish
+        assert [source.url for source in context.get_citations().sources] == ["https://ddg.example.com"]
+
+    def test_hedged_primary_can_still_win(self):
+        """Test the primary result is used if it finishes before the hedged secondary."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context, delay=0.1)
+        secondary = SlowSearchTool("ddg", context, delay=1.0)
+
+        with patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=0.05):
+            result = FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary).forward("query")
+
+        assert result == "brave results for query [#1]"
+        assert secondary.calls == 1
+
+    def test_hedged_failure_of_both_tools(self):
+        """Test an error is raised when both hedged searches fail."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context, delay=0.1, fail=True)
+        secondary = SlowSearchTool("ddg", context, fail=True)
+
+        with (
+            patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=0.05),
+            pytest.raises(FallbackSearchError, match="Both primary and secondary search tools failed"),
+        ):
+            FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary).forward("query")
+
+    def test_citations_added_meanwhile_trigger_rerun(self):
+        """Test the winner is re-run when other citations were added while it was in flight."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context)
+        secondary = SlowSearchTool("ddg", context)
+        original_forward = primary.forward
+
+        def forward_with_concurrent_citation(query):
+            if primary.calls == 0:
+                # Simulates another tool citing a source from a different thread
+                other = threading.Thread(target=context.add_web_citation, args=("https://other.example.com", "Other"))
+                other.start()
+                other.join()
+            return original_forward(query)
+
+        primary.forward = forward_with_concurrent_citation
+
+        with patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=1.0):
+            result = FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary).forward("query")
+
+        assert result == "brave results for query [#2]"
+        assert primary.calls == 2
+        assert [source.url for source in context.get_citations().sources] == [
+            "https://other.example.com",
+            "https://brave.example.com",
+        ]
+
+    def test_hedge_delay_adapts_to_latency_percentile(self):
+        """Test the hedge delay follows the provider's recent latency percentile within bounds."""
+        assert get_hedge_delay("brave") == SEARCH_HEDGE_DEFAULT_DELAY_SECONDS
+
+        for latency in [0.1 * i for i in range(1, 31)]:
+            latency_tracker.record("brave", latency)
+        assert get_hedge_delay("brave") == pytest.approx(2.8)
+
+        for _ in range(200):
+            latency_tracker.record("slow", 60.0)
+        assert get_hedge_delay("slow") == SEARCH_HEDGE_MAX_DELAY_SECONDS
+
+    def test_hedging_disabled_runs_sequentially(self):
+        """Test primary and secondary run one after another when hedging is off."""
+        context = create_context()
+        primary = SlowSearchTool("brave", context, delay=0.1)
+        secondary = SlowSearchTool("ddg", context)
+
+        with patch("mxgo.tools.fallback_search_tool.get_hedge_delay", return_value=0.01):
+            result = FallbackWebSearchTool(primary_tool=primary, secondary_tool=secondary, hedging=False).forward("q")
+
+        assert result == "brave results for q [#1]"
+        assert secondary.calls == 0
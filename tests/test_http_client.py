@@ -0,0 +1,161 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from mxgo import http_client
+
+
+def make_response(status_code, headers=None):
+    response = Mock(spec=requests.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def mock_session():
+    """Replace the pooled session's transport and skip backoff sleeps."""
+    session = Mock()
+    with (
+        patch("mxgo.http_client.get_session", return_value=session),
+        patch("mxgo.http_client.time.sleep") as mock_sleep,
+    ):
+        session.sleep = mock_sleep
+        yield session
+
+
+class TestSession:
+    """Test the shared pooled session."""
+
+    def test_session_is_reused(self):
+        """Test calls in the same process share one session."""
+        assert http_client.get_session() is http_client.get_session()
+
+    def test_new_session_after_fork(self):
+        """Test a forked process does not reuse the parent's pooled connections."""
+        parent_session = http_client.get_session()
+        with patch("mxgo.http_client.os.getpid", return_value=-1):
+            child_session = http_client.get_session()
+
+        assert child_session is not parent_session
+
+
+class TestRequest:
+    """Test request retries, timeouts and concurrency caps."""
+
+    def test_default_timeouts_applied(self, mock_session):
+        """Test connect and read timeouts are set when the caller gives none."""
+        mock_session.request.return_value = make_response(200)
+
+        http_client.get("https://api.example.com/data", params={"q": "x"})
+
+        mock_session.request.assert_called_once_with(
+            "GET",
+            "https://api.example.com/data",
+            timeout=(http_client.HTTP_CONNECT_TIMEOUT_SECONDS, http_client.HTTP_READ_TIMEOUT_SECONDS),
+            params={"q": "x"},
+        )
+
+    def test_scalar_timeout_sets_read_timeout(self, mock_session):
+        """Test a scalar timeout keeps the short connect timeout."""
+        mock_session.request.return_value = make_response(200)
+
+        http_client.post("https://api.example.com/data", timeout=600)
+
+        assert mock_session.request.call_args.kwargs["timeout"] == (http_client.HTTP_CONNECT_TIMEOUT_SECONDS, 600)
+
+    def test_retries_on_503_then_succeeds(self, mock_session):
+        """Test a transient 503 is retried with backoff."""
+        mock_session.request.side_effect = [make_response(503), make_response(200)]
+
+        response = http_client.get("https://api.example.com/data")
+
+        assert response.status_code == 200
+        assert mock_session.request.call_count == 2
+        mock_session.sleep.assert_called_once()
+
+    def test_retry_after_header_honoured(self, mock_session):
+        """Test the Retry-After delay from a 429 is used."""
+        mock_session.request.side_effect = [make_response(429, {"Retry-After": "3"}), make_response(200)]
+
+        http_client.get("https://api.example.com/data")
+
+        mock_session.sleep.assert_called_once_with(3.0)
+
+    def test_gives_up_after_max_retries(self, mock_session):
+        """Test the last response is returned once retries are exhausted."""
+        mock_session.request.return_value = make_response(502)
+
+        response = http_client.get("https://api.example.com/data", retries=2)
+
+        assert response.status_code == 502
+        assert mock_session.request.call_count == 3
+
+    def test_post_not_retried_on_500(self, mock_session):
+        """Test a 500 on a non-idempotent request is returned without a retry."""
+        mock_session.request.return_value = make_response(500)
+
+        response = http_client.post("https://api.example.com/data", json={})
+
+        assert response.status_code == 500
+        mock_session.request.assert_called_once()
+
+    def test_retries_disabled(self, mock_session):
+        """Test retries=0 sends exactly one request."""
+        mock_session.request.return_value = make_response(503)
+
+        http_client.post("https://api.example.com/data", retries=0)
+
+        mock_session.request.assert_called_once()
+
+    def test_connection_error_retried_then_raised(self, mock_session):
+        """Test connection errors are retried and re-raised when they persist."""
+        mock_session.request.side_effect = requests.ConnectionError("refused")
+
+        with pytest.raises(requests.ConnectionError, match="refused"):
+            http_client.get("https://api.example.com/data", retries=1)
+
+        assert mock_session.request.call_count == 2
+
+    def test_read_timeout_not_retried(self, mock_session):
+        """Test read timeouts are raised immediately."""
+        mock_session.request.side_effect = requests.ReadTimeout("slow")
+
+        with pytest.raises(requests.ReadTimeout):
+            http_client.get("https://api.example.com/data")
+
+        mock_session.request.assert_called_once()
+
+    def test_per_host_concurrency_cap(self, mock_session):
+        """Test concurrent requests to one host never exceed the cap."""
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def slow_request(*_args, **_kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            threading.Event().wait(0.02)  # time.sleep is patched by the fixture
+            with lock:
+                in_flight -= 1
+            return make_response(200)
+
+        mock_session.request.side_effect = slow_request
+
+        with (
+            patch("mxgo.http_client.HTTP_MAX_CONCURRENCY_PER_HOST", 2),
+            patch.dict("mxgo.http_client._host_semaphores", clear=True),
+        ):
+            threads = [
+                threading.Thread(target=http_client.get, args=("https://capped.example.com/data",)) for _ in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert max_in_flight == 2
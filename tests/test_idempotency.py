@@ -1,14 +1,51 @@
+import asyncio
 import os
+import time
 from unittest.mock import AsyncMock, patch
 
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeRedis as FakeAsyncRedis
 from fastapi import Response, status
 from fastapi.testclient import TestClient
 
+from mxgo import exceptions, validators
 from mxgo.api import app
 from mxgo.email_sender import generate_message_id
+from mxgo.idempotency import EmailClaim, EmailState, claim_queued, email_state_key
 from mxgo.tasks import process_email_task
+from mxgo.validators import release_idempotency_claim, validate_idempotency
 
 API_KEY = os.environ["X_API_KEY"]
+MESSAGE_ID = "<claim@example.com>"
+
+
+@pytest.fixture
+def redis_server():
+    """Redis shared by the API's async client and the workers' sync client."""
+    # fakeredis runs the Lua scripts of the claims with lupa
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    sync_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    with (
+        patch("mxgo.validators.redis_client", FakeAsyncRedis(server=server, decode_responses=True)),
+        patch("mxgo.cache.get_redis_client", return_value=sync_client),
+    ):
+        yield sync_client
+
+
+async def _validate(message_id: str = MESSAGE_ID) -> Response | None:
+    response, _ = await validate_idempotency(
+        from_email="test@example.com",
+        to="ask@mxgo.ai",
+        subject="Test Subject",
+        date="",
+        html_content="",
+        text_content="Test content",
+        files_count=0,
+        message_id=message_id,
+    )
+    return response
 
 
 class TestIdempotency:
@@ -130,11 +167,11 @@ class TestIdempotency:
         # Task should not be called
         mock_task.send.assert_not_called()
 
-    @patch("mxgo.tasks.check_task_idempotency")
-    def test_task_idempotency_already_processed(self, mock_check_idempotency):
+    @patch("mxgo.tasks.EmailClaim.acquire")
+    def test_task_idempotency_already_processed(self, mock_acquire):
         """Test task returns early when email already processed."""
-        # Setup mock to return True (already processed)
-        mock_check_idempotency.return_value = True
+        # Setup mock to return the done state (already processed)
+        mock_acquire.return_value = EmailState.DONE
 
         email_data = {
             "from_email": "test@example.com",
@@ -183,3 +220,91 @@ class TestIdempotency:
 
         assert msg_id_1 == msg_id_2, "Should generate same ID for same content"
         assert len(msg_id_1) > 10, "Generated ID should be reasonable length"
+
+
+class TestEmailClaims:
+    """Test the queued, processing and done claims of an email."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_deliveries_claim_once(self, redis_server):
+        """Test only one of concurrent deliveries of an email claims it."""
+        states = await asyncio.gather(*(claim_queued(validators.redis_client, MESSAGE_ID) for _ in range(5)))
+
+        assert states.count(None) == 1
+        assert set(states) == {None, EmailState.QUEUED}
+
+    @pytest.mark.asyncio
+    async def test_redelivery_rejected_through_lifecycle(self, redis_server):
+        """Test a redelivered email is a duplicate while queued, processing and once done."""
+        assert await _validate() is None
+        queued = await _validate()
+
+        claim = EmailClaim(MESSAGE_ID)
+        assert claim.acquire() is None
+        processing = await _validate()
+        claim.complete()
+        done = await _validate()
+
+        assert [response.status_code for response in (queued, processing, done)] == [409, 409, 409]
+        assert b"duplicate_queued" in queued.body
+        assert b"duplicate_queued" in processing.body
+        assert b"duplicate_processed" in done.body
+
+    @pytest.mark.asyncio
+    async def test_released_claim_accepts_redelivery(self, redis_server):
+        """Test an email that could not be enqueued is accepted when delivered again."""
+        assert await _validate() is None
+        await release_idempotency_claim(MESSAGE_ID)
+
+        assert await _validate() is None
+
+    def test_second_worker_sees_lease(self, redis_server):
+        """Test a duplicate task waits for the worker holding the email, then skips it once done."""
+        first = EmailClaim(MESSAGE_ID)
+        second = EmailClaim(MESSAGE_ID)
+
+        assert first.acquire() is None
+        assert second.acquire() is EmailState.PROCESSING
+        first.complete()
+        assert second.acquire() is EmailState.DONE
+
+    def test_released_lease_acquired_by_retry(self, redis_server):
+        """Test a failed run hands the email back as queued for its retry."""
+        first = EmailClaim(MESSAGE_ID)
+        first.acquire()
+        with pytest.raises(RuntimeError), first.renewing():
+            raise RuntimeError
+
+        assert redis_server.get(email_state_key(MESSAGE_ID)) == "queued"
+        assert EmailClaim(MESSAGE_ID).acquire() is None
+
+    def test_lease_renewed_while_running(self, redis_server):
+        """Test the lease outlives its duration while the run goes on, and expires after a crash."""
+        claim = EmailClaim(MESSAGE_ID, lease_seconds=0.3)
+        claim.acquire()
+        with claim.renewing():
+            time.sleep(0.6)
+            assert EmailClaim(MESSAGE_ID).acquire() is EmailState.PROCESSING
+            claim.complete()
+
+        crashed = EmailClaim("<crashed@example.com>", lease_seconds=0.1)
+        crashed.acquire()
+        time.sleep(0.2)
+        assert EmailClaim("<crashed@example.com>").acquire() is None
+
+    def test_processed_without_redis(self):
+        """Test emails are processed while Redis is unavailable."""
+        client = fakeredis.FakeRedis(connected=False)
+        with patch("mxgo.cache.get_redis_client", return_value=client):
+            claim = EmailClaim(MESSAGE_ID)
+
+            assert claim.acquire() is None
+            claim.complete()
+
+    def test_task_retried_while_email_processing(self, redis_server):
+        """Test a duplicate task raises, to be retried, while another worker processes the email."""
+        EmailClaim(MESSAGE_ID).acquire()
+        email_data = {"from_email": "test@example.com", "to": "ask@mxgo.ai", "subject": "Hi", "messageId": MESSAGE_ID}
+
+        with pytest.raises(exceptions.EmailInProgressError):
+            process_email_task(email_data=email_data, email_attachments_dir="", attachment_info=[])
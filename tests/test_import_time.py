@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+# Modules of the worker's agent and tool graph that the API must not import
+WORKER_ONLY_MODULES = [
+    "mxgo.tasks",
+    "mxgo.agents.email_agent",
+    "mxgo.tools",
+    "smolagents",
+    "litellm",
+    "weasyprint",
+    "pandas",
+    "pdfminer",
+    "pptx",
+    "pydub",
+    "huggingface_hub",
+    "PIL",
+]
+# Import time budget for mxgo.api, as a multiple of FastAPI's own import time so that it
+# holds on slow machines too. At the time of writing mxgo.api takes about 3x.
+API_IMPORT_BUDGET_FASTAPI_MULTIPLE = 4
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Import a module in a fresh interpreter and get the cumulative import time of every module, in us."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+class TestApiImportTime:
+    """Test the API starts without loading the worker's import graph."""
+
+    def test_api_import_graph_and_budget(self):
+        """Test mxgo.api imports none of the agent, tool or model modules and stays within its budget."""
+        times = _import_times("mxgo.api")
+
+        assert [module for module in WORKER_ONLY_MODULES if module in times] == []
+        assert times["mxgo.api"] <= times["fastapi"] * API_IMPORT_BUDGET_FASTAPI_MULTIPLE
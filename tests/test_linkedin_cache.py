@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from mxgo.cache import TTLCache
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools.external_data.linkedin import LinkedInDataAPITool, LinkedInFreshDataTool
+from mxgo.tools.external_data.linkedin.entity_cache import normalize_linkedin_url, normalize_linkedin_username
+
+
+def create_context():
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    return RequestContext(email_request)
+
+
+def mock_json_response(payload):
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = payload
+    return response
+
+
+class TestNormalization:
+    """Test LinkedIn identifier normalization."""
+
+    def test_profile_url_variants_normalize_to_same_entity(self):
+        """Test scheme, subdomain, case, tracking query and trailing slash are ignored."""
+        expected = "linkedin.com/in/jane-doe"
+
+        assert normalize_linkedin_url("https://www.linkedin.com/in/jane-doe/") == expected
+        assert normalize_linkedin_url("https://uk.linkedin.com/in/Jane-Doe?trk=public_profile") == expected
+        assert normalize_linkedin_url("linkedin.com/in/jane-doe") == expected
+
+    def test_username_normalization(self):
+        """Test usernames are case and whitespace insensitive."""
+        assert normalize_linkedin_username(" @Acme-Corp/ ") == "acme-corp"
+
+
+class TestGetOrFetch:
+    """Test cache lookups with request coalescing."""
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """Test concurrent lookups for the same key call the API once."""
+        cache = TTLCache("test", use_redis=False)
+        release = threading.Event()
+        fetch = Mock(side_effect=lambda: release.wait(1) and {"name": "Acme"})
+        results = []
+
+        def lookup():
+            results.append(cache.get_or_fetch("acme", fetch, ttl_seconds=60)[0])
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        fetch.assert_called_once()
+        assert results == [{"name": "Acme"}] * 8
+
+    def test_errors_not_cached(self):
+        """Test a failed fetch is retried on the next lookup."""
+        cache = TTLCache("test", use_redis=False)
+        fetch = Mock(side_effect=[RuntimeError("quota exceeded"), {"name": "Acme"}])
+
+        with pytest.raises(RuntimeError, match="quota exceeded"):
+            cache.get_or_fetch("acme", fetch, ttl_seconds=60)
+
+        assert cache.get_or_fetch("acme", fetch, ttl_seconds=60) == ({"name": "Acme"}, False)
+        assert cache.get_or_fetch("acme", fetch, ttl_seconds=60) == ({"name": "Acme"}, True)
+
+
+class TestLinkedInToolCaching:
+    """Test the LinkedIn tools reuse cached API responses."""
+
+    @patch("mxgo.http_client.get")
+    def test_fresh_data_profile_cached_across_requests(self, mock_get):
+        """Test the same profile via a different URL form is served from the cache."""
+        mock_get.return_value = mock_json_response({"full_name": "Jane Doe"})
+
+        LinkedInFreshDataTool("key", create_context()).forward(
+            "get_linkedin_profile", "https://www.linkedin.com/in/jane-doe/"
+        )
+        context = create_context()
+        LinkedInFreshDataTool("key", context).forward("get_linkedin_profile", "https://linkedin.com/in/Jane-Doe")
+
+        mock_get.assert_called_once()
+        assert context.get_citations().sources[0].title == "Jane Doe - LinkedIn Profile"
+
+    @patch("mxgo.http_client.get")
+    def test_fresh_data_profile_options_are_part_of_key(self, mock_get):
+        """Test requesting extra profile sections is a separate lookup."""
+        mock_get.return_value = mock_json_response({"full_name": "Jane Doe"})
+        tool = LinkedInFreshDataTool("key", create_context())
+
+        tool.get_linkedin_profile("https://www.linkedin.com/in/jane-doe/")
+        tool.get_linkedin_profile("https://www.linkedin.com/in/jane-doe/", include_skills=True)
+
+        assert mock_get.call_count == 2
+
+    @patch("mxgo.http_client.post")
+    def test_data_api_company_details_cached(self, mock_post):
+        """Test company lookups by username are cached."""
+        mock_post.return_value = mock_json_response({"success": True, "data": {"name": "Acme"}})
+        tool = LinkedInDataAPITool("key", create_context())
+
+        tool.get_company_details("Acme")
+        tool.get_company_details("acme")
+
+        mock_post.assert_called_once()
+
+    @patch("mxgo.http_client.get")
+    def test_data_api_search_normalizes_keywords(self, mock_get):
+        """Test people searches differing only in case and spacing share an entry."""
+        mock_get.return_value = mock_json_response({"success": True, "data": {"items": []}})
+        tool = LinkedInDataAPITool("key", create_context())
+
+        tool.search_people(keywords="Chief  Executive", company="Acme")
+        tool.search_people(keywords="chief executive", company="acme")
+        tool.search_people(keywords="chief executive", company="Globex")
+
+        assert mock_get.call_count == 2
+
+    @patch("mxgo.http_client.post")
+    def test_unsuccessful_payload_not_cached(self, mock_post):
+        """Test API responses reporting failure are fetched again."""
+        mock_post.return_value = mock_json_response({"success": False, "message": "Profile not found"})
+        tool = LinkedInDataAPITool("key", create_context())
+
+        tool.get_profile_data("missing-user")
+        tool.get_profile_data("missing-user")
+
+        assert mock_post.call_count == 2
+
+    @patch("mxgo.http_client.get")
+    def test_request_errors_propagate(self, mock_get):
+        """Test API errors still surface as tool request errors."""
+        mock_get.side_effect = requests.ConnectionError("unreachable")
+
+        with pytest.raises(Exception, match="request failed"):
+            LinkedInFreshDataTool("key", create_context()).forward(
+                "get_company_by_linkedin_url", "https://www.linkedin.com/company/acme/"
+            )
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from prometheus_client import REGISTRY
+
+from mxgo.llm_usage import (
+    extract_token_usage,
+    get_llm_usage,
+    get_usage_tracker,
+    record_llm_call,
+    store_llm_usage,
+    track_llm_usage,
+)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr("mxgo.cache.get_redis_client", lambda: client)
+    return client
+
+
+def make_response(prompt_tokens=1200, completion_tokens=300, model="gpt-4o-2024-08-06", **usage_fields):
+    usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, **usage_fields)
+    return SimpleNamespace(usage=usage, model=model)
+
+
+class TestExtractTokenUsage:
+    """Test reading token counts from LiteLLM responses."""
+
+    def test_openai_cached_tokens(self):
+        """Test cached tokens from OpenAI-style prompt token details."""
+        response = make_response(prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+
+        assert extract_token_usage(response) == (1200, 300, 1024)
+
+    def test_anthropic_cached_tokens(self):
+        """Test cached tokens from Anthropic-style cache reads."""
+        response = make_response(prompt_tokens_details=None, cache_read_input_tokens=800)
+
+        assert extract_token_usage(response) == (1200, 300, 800)
+
+    def test_missing_usage(self):
+        """Test responses without usage count as zero tokens."""
+        assert extract_token_usage(SimpleNamespace(usage=None)) == (0, 0, 0)
+        assert extract_token_usage({"usage": {"prompt_tokens": 10, "completion_tokens": None}}) == (10, 0, 0)
+
+
+class TestRecordLLMCall:
+    """Test per-call recording."""
+
+    def test_calls_collected_per_email(self):
+        """Test calls inside a tracked email are attributed to its handle and user and summed up."""
+        with track_llm_usage("research", "user@example.com", "pro") as tracker:
+            record_llm_call(make_response(), "gpt-4", 1.5, handle="other")
+            record_llm_call(make_response(prompt_tokens=800, completion_tokens=100), "thinking", 0.25)
+
+        assert get_usage_tracker() is None
+        summary = tracker.summary()
+        assert summary.call_count == 2
+        assert (summary.prompt_tokens, summary.completion_tokens, summary.latency_ms) == (2000, 400, 1750)
+        assert {call.handle for call in summary.calls} == {"research"}
+        assert summary.calls[0].user == "user@example.com"
+        assert summary.calls[0].deployment == "gpt-4o-2024-08-06"
+
+    def test_untracked_call_exported_as_metrics(self):
+        """Test calls outside an email are still counted, under the given handle."""
+        labels = {"model_group": "gpt-4", "handle": "suggestions", "type": "prompt"}
+        before = REGISTRY.get_sample_value("mxgo_llm_tokens_total", labels) or 0
+
+        call = record_llm_call(make_response(), "gpt-4", 0.1, handle="suggestions")
+
+        assert call.user is None
+        assert REGISTRY.get_sample_value("mxgo_llm_tokens_total", labels) == before + 1200
+
+
+class TestUsageTimeSeries:
+    """Test the per-user and per-plan Redis time series."""
+
+    def test_usage_summed_per_user_and_plan(self, fake_redis):
+        """Test usage from several emails adds up per user and per plan."""
+        for user_email in ("a@example.com", "a@example.com", "b@example.com"):
+            with track_llm_usage("ask", user_email, "beta") as tracker:
+                record_llm_call(make_response(), "gpt-4", 1.0)
+            store_llm_usage(tracker)
+
+        assert get_llm_usage("user", "a@example.com") == {
+            "call_count": 2,
+            "prompt_tokens": 2400,
+            "completion_tokens": 600,
+            "cached_tokens": 0,
+            "latency_ms": 2000,
+        }
+        assert get_llm_usage("plan", "beta")["prompt_tokens"] == 3600
+        assert all(fake_redis.ttl(key) > 0 for key in fake_redis.scan_iter("llm_usage:*"))
+
+    def test_email_without_calls_not_stored(self, fake_redis):
+        """Test emails without LLM calls do not create buckets."""
+        with track_llm_usage("ask", "a@example.com", "beta") as tracker:
+            pass
+        store_llm_usage(tracker)
+
+        assert list(fake_redis.scan_iter("llm_usage:*")) == []
+
+    def test_redis_unavailable(self):
+        """Test usage reads return zeros when Redis is down."""
+        assert get_llm_usage("user", "a@example.com")["prompt_tokens"] == 0
@@ -10,6 +10,7 @@ from mxgo._logging import (
     loguru_scrubbing_filter,
     scrub_sensitive_data,
 )
+from tests.benchmarks.bench_scrubbing import MESSAGES, legacy_scrub_sensitive_data
 
 
 class TestSensitiveDataScrubbing:
@@ -170,6 +171,18 @@ class TestLoguruScrubbingFilter:
         result = loguru_scrubbing_filter(problematic_record)
         assert result is True, "Filter should handle errors gracefully"
 
+    def test_record_scrubbed_once_across_sinks(self):
+        """Test a record passed to the filter of every sink is only scrubbed once."""
+        record = self.create_mock_record("password=secret123", {"note": "api_key=abc"})
+
+        with patch("mxgo._logging.scrub_sensitive_data", wraps=scrub_sensitive_data) as mock_scrub:
+            for _ in range(4):
+                assert loguru_scrubbing_filter(record) is True
+
+        assert mock_scrub.call_count == 2  # message and one extra field, on the first sink only
+        assert record["message"] == "password=******"
+        assert record["extra"]["note"] == "api_key=******"
+
 
 class TestRichConsoleScrubbing:
     """Test the Rich console scrubbing integration."""
@@ -312,3 +325,43 @@ class TestActualLoggingIntegration:
         assert test_record["extra"]["user_email"] == "******", "Email field not ******"
         assert test_record["extra"]["api_key"] == "******", "API key field not ******"
         assert test_record["extra"]["safe_field"] == "normal_value", "Safe field should not be modified"
+
+
+class TestSinglePassScrubbing:
+    """Test the single-pass scrubber against the per-pattern one it replaced; timings are in tests/benchmarks."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "user_email=test@example.com password=secret123 api_key=abc123",
+            "{'from_email': 'a@b.com', 'subject': 'Report', 'api_key': 'abc'}",
+            "headers={'Authorization': 'Bearer abc'} session=xyz",
+            "Password authentication successful for authentic user",
+            *MESSAGES.values(),
+        ],
+    )
+    def test_matches_baseline_output(self, text):
+        """Test the single-pass scrubber produces the same result as the per-pattern one."""
+        assert scrub_sensitive_data(text) == legacy_scrub_sensitive_data(text)
+
+    def test_quoted_value_with_spaces_fully_scrubbed(self):
+        """Test a quoted value after an unquoted key is scrubbed as a whole."""
+        assert scrub_sensitive_data('password: "correct horse"') == 'password: "******"'
+
+    @pytest.mark.parametrize(
+        "text",
+        [MESSAGES["email_without_keys"], "Agent step 3 finished, no separators here password secret"],
+    )
+    def test_message_without_sensitive_keys_skips_regex(self, text):
+        """Test messages without a sensitive keyword, or without ":"/"=", are returned without running the regex."""
+        with patch("mxgo._logging.SCRUB_PATTERN") as mock_pattern:
+            assert scrub_sensitive_data(text) is text
+
+        mock_pattern.sub.assert_not_called()
+
+    def test_message_with_sensitive_keys_runs_regex(self):
+        """Test messages with a sensitive keyword and a separator are scrubbed in one substitution."""
+        with patch("mxgo._logging.SCRUB_PATTERN") as mock_pattern:
+            scrub_sensitive_data(MESSAGES["email_with_keys"])
+
+        mock_pattern.sub.assert_called_once()
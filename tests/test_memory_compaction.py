@@ -0,0 +1,103 @@
+import json
+from unittest.mock import MagicMock
+
+from smolagents import ToolCallingAgent
+from smolagents.memory import ActionStep, TaskStep
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import Timing
+
+from mxgo.agents.memory_compaction import MemoryCompactor, digest_observation
+from mxgo.schemas import ToolOutputWithCitations
+
+
+def search_results(query: str, first_id: int) -> str:
+    """Search results as formatted by the citation-aware search tools, with long snippets."""
+    results = [
+        f"{i}. **{query} result {i}** [#{first_id + i}]\n   {'Snippet text about the result. ' * 20}"
+        for i in range(1, 6)
+    ]
+    return f"## Search Results for {query}\n\n" + "\n\n".join(results)
+
+
+def observation(text: str) -> ChatMessage:
+    return ChatMessage(role=MessageRole.TOOL_RESPONSE, content=[{"type": "text", "text": f"Observation:\n{text}"}])
+
+
+def message_text(message: ChatMessage) -> str:
+    return message.content[0]["text"]
+
+
+class TestDigestObservation:
+    """Test extractive digests of tool observations."""
+
+    def test_citation_lines_kept(self):
+        """Test the digest keeps the heading and every cited line, and drops the snippets."""
+        digest = digest_observation(search_results("batteries", 0), 1500)
+
+        assert digest.startswith("## Search Results for batteries")
+        assert all(f"[#{i}]" in digest for i in range(1, 6))
+        assert "Snippet text" not in digest
+        assert len(digest) < len(search_results("batteries", 0))
+
+    def test_tool_output_with_citations_unwrapped(self):
+        """Test JSON tool outputs are digested from their content, without the JSON around it."""
+        output = ToolOutputWithCitations(content=f"**Battery report** [#4]\n\n{'Plain page text. ' * 200}")
+
+        digest = digest_observation(json.dumps(output.model_dump()), 500)
+
+        assert digest.startswith("**Battery report** [#4]")
+        assert '"citations"' not in digest
+        assert len(digest) < 700
+
+    def test_short_observation_unchanged(self):
+        """Test observations within the digest size are kept as they are."""
+        assert digest_observation("3 results found", 100) == "3 results found"
+
+
+class TestMemoryCompactor:
+    """Test the agent prompt is compacted before model calls."""
+
+    def test_recent_observations_kept_verbatim(self):
+        """Test observations older than the recent ones are digested, and other messages are untouched."""
+        task = ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "New task:\nSummarize"}])
+        messages = [task, *(observation(search_results(f"query {n}", n * 10)) for n in range(3))]
+        compactor = MemoryCompactor(token_budget=100_000, keep_recent=2, digest_chars=1500)
+
+        compacted = compactor.compact(messages)
+
+        assert compacted[0] is task
+        assert "Snippet text" not in message_text(compacted[1])
+        assert "[#1]" in message_text(compacted[1])
+        assert compacted[2:] == messages[2:]
+        assert compactor.saved_chars == len(message_text(messages[1])) - len(message_text(compacted[1]))
+
+    def test_token_budget_enforced(self):
+        """Test older observations are dropped to a note listing their citations when over budget."""
+        messages = [observation(search_results(f"query {n}", n * 10)) for n in range(4)]
+        compactor = MemoryCompactor(token_budget=1_000, keep_recent=2, digest_chars=1500)
+
+        compacted = compactor.compact(messages)
+
+        assert message_text(compacted[0]).startswith("Observation:\n[Earlier observation of")
+        assert "[#1], [#2], [#3], [#4], [#5]" in message_text(compacted[0])
+        assert compacted[-1] == messages[-1]
+
+    def test_agent_prompt_compacted_memory_kept(self):
+        """Test the wrapped agent sends compacted prompts while its memory keeps the full observations."""
+        agent = ToolCallingAgent(tools=[], model=MagicMock())
+        agent.memory.steps.append(TaskStep(task="Summarize"))
+        for n in range(3):
+            agent.memory.steps.append(
+                ActionStep(
+                    step_number=n + 1,
+                    timing=Timing(start_time=0.0, end_time=1.0),
+                    observations=search_results(f"query {n}", n * 10),
+                )
+            )
+        MemoryCompactor(token_budget=100_000, keep_recent=1, digest_chars=1500).wrap_agent(agent)
+
+        prompt = "\n".join(message_text(message) for message in agent.write_memory_to_messages())
+
+        assert prompt.count("Snippet text") == search_results("query 2", 20).count("Snippet text")
+        assert "[#1]" in prompt
+        assert "Snippet text" in agent.memory.steps[1].observations
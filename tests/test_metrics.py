@@ -0,0 +1,147 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from dramatiq import Message
+from prometheus_client import REGISTRY
+from smolagents import Tool
+
+from mxgo.metrics import (
+    EMAIL_SEND_SECONDS,
+    QueueWaitMetrics,
+    instrument_tool,
+    observe_latency,
+    record_dispatch_lag,
+)
+
+
+def sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+class EchoTool(Tool):
+    name = "metrics_echo"
+    description = "Echo the input."
+    inputs = {"text": {"type": "string", "description": "Text to echo"}}  # noqa: RUF012
+    output_type = "string"
+
+    def forward(self, text: str) -> str:
+        if text == "fail":
+            msg = "tool failed"
+            raise ValueError(msg)
+        return text
+
+
+class TestObserveLatency:
+    """Test the latency context manager."""
+
+    def test_records_ok_status(self):
+        """Test a block that completes is recorded with its labels."""
+        before = sample("mxgo_email_send_seconds_count", {"status": "ok"})
+
+        with observe_latency(EMAIL_SEND_SECONDS, status="ok"):
+            pass
+
+        assert sample("mxgo_email_send_seconds_count", {"status": "ok"}) == before + 1
+
+    def test_records_error_status_on_exception(self):
+        """Test a block that raises is recorded as an error."""
+        before = sample("mxgo_email_send_seconds_count", {"status": "error"})
+
+        with pytest.raises(RuntimeError), observe_latency(EMAIL_SEND_SECONDS, status="ok"):
+            raise RuntimeError
+
+        assert sample("mxgo_email_send_seconds_count", {"status": "error"}) == before + 1
+
+    def test_labels_updatable_inside_block(self):
+        """Test the outcome label can be set from inside the block."""
+        before = sample("mxgo_email_send_seconds_count", {"status": "error"})
+
+        with observe_latency(EMAIL_SEND_SECONDS, status="ok") as labels:
+            labels["status"] = "error"
+
+        assert sample("mxgo_email_send_seconds_count", {"status": "error"}) == before + 1
+
+
+class TestInstrumentTool:
+    """Test per-tool call latency."""
+
+    def test_tool_calls_recorded_by_name_and_status(self):
+        """Test successful and failing calls are recorded under the tool name."""
+        tool = instrument_tool(EchoTool())
+        ok = {"tool": "metrics_echo", "status": "ok"}
+        error = {"tool": "metrics_echo", "status": "error"}
+        before_ok, before_error = (
+            sample("mxgo_tool_call_seconds_count", ok),
+            sample("mxgo_tool_call_seconds_count", error),
+        )
+
+        assert tool(text="hello") == "hello"
+        with pytest.raises(ValueError, match="tool failed"):
+            tool(text="fail")
+
+        assert sample("mxgo_tool_call_seconds_count", ok) == before_ok + 1
+        assert sample("mxgo_tool_call_seconds_count", error) == before_error + 1
+
+
+class TestQueueWaitMetrics:
+    """Test the Dramatiq queue wait middleware."""
+
+    def make_message(self, enqueued_seconds_ago, **options):
+        return Message(
+            queue_name="default",
+            actor_name="metrics_actor",
+            args=(),
+            kwargs={},
+            options=options,
+            message_timestamp=int((time.time() - enqueued_seconds_ago) * 1000),
+        )
+
+    def test_wait_measured_from_enqueue(self):
+        """Test the wait is the time since the message was enqueued."""
+        labels = {"queue": "default", "actor": "metrics_actor"}
+        before = sample("mxgo_task_queue_wait_seconds_sum", labels)
+
+        QueueWaitMetrics().before_process_message(Mock(), self.make_message(3))
+
+        assert 2.9 < sample("mxgo_task_queue_wait_seconds_sum", labels) - before < 4
+
+    def test_delayed_message_measured_from_eta(self):
+        """Test a delayed message's wait starts at its ETA, not when it was enqueued."""
+        labels = {"queue": "default", "actor": "metrics_actor"}
+        before = sample("mxgo_task_queue_wait_seconds_sum", labels)
+        eta = int((time.time() - 1) * 1000)
+
+        QueueWaitMetrics().before_process_message(Mock(), self.make_message(60, eta=eta))
+
+        assert 0.9 < sample("mxgo_task_queue_wait_seconds_sum", labels) - before < 2
+
+
+class TestSchedulerDispatchLag:
+    """Test scheduler dispatch lag."""
+
+    def test_lag_recorded_per_scheduled_run(self):
+        """Test each coalesced run time is recorded against the dispatch time."""
+        before = sample("mxgo_scheduler_dispatch_lag_seconds_count")
+        now = datetime.now(timezone.utc)
+
+        record_dispatch_lag([now - timedelta(seconds=30), now + timedelta(seconds=5)])
+
+        assert sample("mxgo_scheduler_dispatch_lag_seconds_count") == before + 2
+        assert sample("mxgo_scheduler_dispatch_lag_seconds_bucket", {"le": "0.1"}) >= 1
+
+
+class TestBrokerMiddleware:
+    """Test the worker metrics middleware on the shared broker."""
+
+    def test_prometheus_exported_once(self):
+        """Test Dramatiq's default Prometheus middleware is not added a second time."""
+        from dramatiq.middleware.prometheus import Prometheus  # NOQA: PLC0415
+
+        from mxgo.broker import rabbitmq_broker  # NOQA: PLC0415
+
+        middleware_types = [type(middleware) for middleware in rabbitmq_broker.middleware]
+
+        assert middleware_types.count(Prometheus) == 1
+        assert middleware_types.count(QueueWaitMetrics) == 1
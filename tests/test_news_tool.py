@@ -85,7 +85,7 @@ class TestNewsTool:
                 tool.forward("test query")
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_success(self, mock_get):
         """Test successful news search execution."""
         mock_response = Mock()
@@ -129,7 +129,7 @@ class TestNewsTool:
         assert call_args[1]["params"]["q"] == "test news query"
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_with_custom_parameters(self, mock_get):
         """Test news search with custom parameters."""
         mock_response = Mock()
@@ -155,7 +155,7 @@ class TestNewsTool:
         assert call_params["count"] == 10
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_no_results(self, mock_get):
         """Test news search when no results are returned."""
         mock_response = Mock()
@@ -172,7 +172,7 @@ class TestNewsTool:
         assert "No news articles found for query: 'no results query'" in content
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_http_error(self, mock_get):
         """Test news search HTTP error handling."""
         mock_response = Mock()
@@ -186,7 +186,7 @@ class TestNewsTool:
             tool.forward("test query")
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_request_exception(self, mock_get):
         """Test news search request exception handling."""
         mock_get.side_effect = requests.RequestException("Network error")
@@ -198,7 +198,7 @@ class TestNewsTool:
             tool.forward("test query")
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_api_integration(self, mock_get):
         """Test that API integration works correctly with all required headers and params."""
         mock_response = Mock()
@@ -0,0 +1,110 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from mxgo.tasks import send_notice_task, verify_sender_task
+from mxgo.validators import queue_notice, validate_attachments, validate_email_whitelist
+
+EMAIL = {"from": "user@example.com", "to": "ask@mxgo.ai", "subject": "Hi", "messageId": "<1@example.com>"}
+
+
+class TestNoticeDedup:
+    """Test notices are queued at most once per sender and reason within the dedup window."""
+
+    @pytest.fixture(autouse=True)
+    def redis_client(self):
+        """Redis holding the dedup claims."""
+        client = FakeRedis(decode_responses=True)
+        with patch("mxgo.validators.redis_client", client):
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_repeated_rejections_queue_one_notice(self):
+        """Test a burst of rejections of one sender, by alias too, queues a single notice."""
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
+            first = await queue_notice(EMAIL, "text", "html", reason="handle")
+            second = await queue_notice({**EMAIL, "from": "user+alias@example.com"}, "text", "html", reason="handle")
+
+        assert first is True
+        assert second is False
+        mock_send.assert_called_once_with(EMAIL, "text", "html")
+
+    @pytest.mark.asyncio
+    async def test_different_reasons_notified_separately(self):
+        """Test a sender rejected for another reason gets that notice too."""
+        attachments = [{"filename": f"f{i}.txt", "contentType": "text/plain", "size": 4} for i in range(10)]
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
+            await queue_notice(EMAIL, "text", "html", reason="handle")
+            response = await validate_attachments(attachments, EMAIL["from"], EMAIL["to"], "Hi", "<2@example.com>")
+
+        assert response.status_code == 400
+        assert mock_send.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_enqueue_releases_claim(self, redis_client):
+        """Test a notice that could not be queued is queued by the next rejection."""
+        with patch("mxgo.validators.send_notice_task.send", side_effect=[ConnectionError("broker down"), None]):
+            first = await queue_notice(EMAIL, "text", "html", reason="handle")
+            second = await queue_notice(EMAIL, "text", "html", reason="handle")
+
+        assert (first, second) == (False, True)
+        assert await redis_client.ttl("notice_sent:handle:user@example.com") > 0
+
+    @pytest.mark.asyncio
+    async def test_notices_queued_without_redis(self):
+        """Test every notice is queued while Redis is unavailable."""
+        with (
+            patch("mxgo.validators.redis_client", None),
+            patch("mxgo.validators.send_notice_task.send") as mock_send,
+        ):
+            await queue_notice(EMAIL, "text", "html", reason="handle")
+            await queue_notice(EMAIL, "text", "html", reason="handle")
+
+        assert mock_send.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_verification_started_once(self):
+        """Test repeated emails of a sender that is not whitelisted start one verification."""
+        with (
+            patch("mxgo.validators.is_email_whitelisted", return_value=(False, False)),
+            patch("mxgo.validators.verify_sender_task.send") as mock_verify,
+        ):
+            first = await validate_email_whitelist(EMAIL["from"], EMAIL["to"], "Hi", "<1@example.com>")
+            second = await validate_email_whitelist(EMAIL["from"], EMAIL["to"], "Hi again", "<2@example.com>")
+
+        assert first.status_code == second.status_code == 403
+        mock_verify.assert_called_once()
+        assert mock_verify.call_args[0][0]["messageId"] == "<1@example.com>"
+
+
+class TestNoticeTasks:
+    """Test the notice queue's worker tasks."""
+
+    def test_send_notice(self):
+        """Test the notice is sent in reply to the email."""
+        with patch("mxgo.tasks.EmailSender") as mock_sender:
+            mock_sender.return_value.send_reply = AsyncMock(return_value={"status": "sent"})
+            send_notice_task.fn(EMAIL, "text", "html")
+
+        mock_sender.return_value.send_reply.assert_awaited_once_with(EMAIL, reply_text="text", reply_html="html")
+
+    def test_failed_send_raises_for_retry(self):
+        """Test a failed send raises so Dramatiq retries the notice."""
+        with patch("mxgo.tasks.EmailSender") as mock_sender:
+            mock_sender.return_value.send_reply = AsyncMock(return_value={"status": "error", "error": "SES down"})
+            with pytest.raises(RuntimeError, match="SES down"):
+                send_notice_task.fn(EMAIL, "text", "html")
+
+    @pytest.mark.parametrize("triggered", [True, False])
+    def test_verify_sender_then_queue_notice(self, triggered):
+        """Test verification is started before the notice, which says whether it was."""
+        with (
+            patch("mxgo.tasks.trigger_automatic_verification", new_callable=AsyncMock, return_value=triggered),
+            patch("mxgo.tasks.send_notice_task.send") as mock_send,
+        ):
+            verify_sender_task.fn(EMAIL)
+
+        email_dict, reply_text, _ = mock_send.call_args[0]
+        assert email_dict == EMAIL
+        assert ("GOOD NEWS" in reply_text) is triggered
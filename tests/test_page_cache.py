@@ -0,0 +1,149 @@
+import json
+from unittest.mock import Mock, patch
+
+import requests
+from freezegun import freeze_time
+
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools.citation_aware_visit_tool import CitationAwareVisitTool, fetch_page_as_markdown
+from mxgo.tools.page_cache import canonicalize_url, get_page_max_age
+
+
+def create_context():
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    return RequestContext(email_request)
+
+
+def make_page_response(title="Cached Page", status_code=200, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.raise_for_status.return_value = None
+    response.headers = {"Content-Type": "text/html", **(headers or {})}
+    response.encoding = "utf-8"
+    html = f"<html><head><title>{title}</title></head><body><p>Body of {title}</p></body></html>".encode()
+    response.iter_content.side_effect = lambda **_kwargs: iter([html])
+    return response
+
+
+class TestCanonicalizeUrl:
+    """Test URL canonicalization for cache keys."""
+
+    def test_equivalent_urls_share_canonical_form(self):
+        """Test case, default ports, fragments, tracking params and param order are ignored."""
+        canonical = canonicalize_url("https://example.com/article?b=2&a=1")
+
+        assert canonicalize_url("HTTPS://Example.com:443/article?a=1&b=2#comments") == canonical
+        assert canonicalize_url("https://example.com/article?a=1&utm_source=mail&b=2&fbclid=xyz") == canonical
+
+    def test_meaningful_differences_kept(self):
+        """Test path, query values and non-default ports still distinguish pages."""
+        canonical = canonicalize_url("https://example.com/article?id=1")
+
+        assert canonicalize_url("https://example.com/article?id=2") != canonical
+        assert canonicalize_url("https://example.com/Article?id=1") != canonical
+        assert canonicalize_url("https://example.com:8443/article?id=1") != canonical
+
+
+class TestPageMaxAge:
+    """Test Cache-Control handling."""
+
+    def test_site_directives_respected(self):
+        """Test no-store and private pages are not cached and shorter max-age wins."""
+        assert get_page_max_age("no-store") is None
+        assert get_page_max_age("private, max-age=600") is None
+        assert get_page_max_age("no-cache") == 0
+        assert get_page_max_age("public, max-age=60") == 60
+        assert get_page_max_age("max-age=99999999") == get_page_max_age(None)
+
+
+class TestPageCache:
+    """Test cached page fetching and revalidation."""
+
+    @patch("mxgo.http_client.get")
+    def test_fresh_page_served_from_cache(self, mock_get):
+        """Test a page is downloaded once while fresh, even through a different URL form."""
+        mock_get.return_value = make_page_response()
+
+        first = fetch_page_as_markdown("https://example.com/article?utm_source=newsletter")
+        second = fetch_page_as_markdown("https://example.com/article")
+
+        assert first == second
+        mock_get.assert_called_once()
+
+    @patch("mxgo.http_client.get")
+    def test_stale_page_revalidated_with_validators(self, mock_get):
+        """Test a stale page sends a conditional GET and a 304 reuses the cached copy."""
+        mock_get.side_effect = [
+            make_page_response(headers={"ETag": '"v1"', "Last-Modified": "Mon, 15 Jan 2024 09:00:00 GMT"}),
+            make_page_response(status_code=304),
+        ]
+
+        with freeze_time("2024-01-15 10:00:00") as frozen:
+            first = fetch_page_as_markdown("https://example.com/article")
+            frozen.tick(7200)
+            second = fetch_page_as_markdown("https://example.com/article")
+
+        assert first == second
+        conditional_headers = mock_get.call_args_list[1].kwargs["headers"]
+        assert conditional_headers == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 15 Jan 2024 09:00:00 GMT",
+        }
+
+    @patch("mxgo.http_client.get")
+    def test_changed_page_replaces_cached_copy(self, mock_get):
+        """Test a 200 response to revalidation replaces the cached page."""
+        mock_get.side_effect = [
+            make_page_response("Old Title", headers={"ETag": '"v1"'}),
+            make_page_response("New Title", headers={"ETag": '"v2"'}),
+            make_page_response(status_code=304),
+        ]
+
+        with freeze_time("2024-01-15 10:00:00") as frozen:
+            fetch_page_as_markdown("https://example.com/article")
+            frozen.tick(7200)
+            title, _ = fetch_page_as_markdown("https://example.com/article")
+            frozen.tick(7200)
+            fetch_page_as_markdown("https://example.com/article")
+
+        assert title == "New Title"
+        assert mock_get.call_args_list[2].kwargs["headers"] == {"If-None-Match": '"v2"'}
+
+    @patch("mxgo.http_client.get")
+    def test_no_store_page_not_cached(self, mock_get):
+        """Test pages marked no-store are downloaded every time."""
+        mock_get.side_effect = lambda *_args, **_kwargs: make_page_response(headers={"Cache-Control": "no-store"})
+
+        fetch_page_as_markdown("https://example.com/account")
+        fetch_page_as_markdown("https://example.com/account")
+
+        assert mock_get.call_count == 2
+        assert mock_get.call_args_list[1].kwargs["headers"] is None
+
+    @patch("mxgo.http_client.get")
+    def test_visit_tool_cites_cached_page_in_each_request(self, mock_get):
+        """Test a cached page is still cited in every request that visits it."""
+        mock_get.return_value = make_page_response("Popular Article")
+
+        CitationAwareVisitTool(create_context()).forward("https://news.example.com/story")
+        context = create_context()
+        result = json.loads(CitationAwareVisitTool(context).forward("https://news.example.com/story"))
+
+        mock_get.assert_called_once()
+        assert result["content"].startswith("**Popular Article** [#1]")
+        assert context.get_citations().sources[0].url == "https://news.example.com/story"
+
+    @patch("mxgo.http_client.get")
+    def test_visit_tool_reports_fetch_error_without_citation(self, mock_get):
+        """Test a failed visit is reported to the agent and not cited."""
+        mock_get.return_value = make_page_response()
+        mock_get.return_value.raise_for_status.side_effect = requests.HTTPError("404 Not Found")
+        context = create_context()
+
+        result = CitationAwareVisitTool(context).forward("https://example.com/missing")
+
+        assert result == "Error fetching the webpage: 404 Not Found"
+        assert not context.has_citations()
@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from smolagents import Tool
+from smolagents.agents import ToolOutput
+from smolagents.memory import ActionStep, ToolCall
+from smolagents.models import ChatMessage, ChatMessageToolCall, ChatMessageToolCallFunction, MessageRole
+from smolagents.monitoring import Timing
+
+from mxgo.agents.email_agent import EmailAgent
+from mxgo.agents.parallel_tools import ParallelToolCallingAgent
+from mxgo.email_handles import DEFAULT_EMAIL_HANDLES
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools import CITATION_READING_TOOLS, ReferencesGeneratorTool
+from tests.benchmarks.stubs import stub_services
+
+
+class CitingSearchTool(Tool):
+    name = "citing_search"
+    description = "Search, citing the given page."
+    inputs = {  # noqa: RUF012
+        "url": {"type": "string", "description": "Page to cite"},
+        "delay": {"type": "number", "description": "Seconds the search takes"},
+    }
+    output_type = "string"
+
+    def __init__(self, context: RequestContext):
+        super().__init__()
+        self.context = context
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def forward(self, url: str, delay: float) -> str:
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(delay)
+        with self._lock:
+            self.running -= 1
+        citation_id = self.context.add_web_citation(url, f"Page {url}")
+        return f"Result from {url} [#{citation_id}]"
+
+
+@pytest.fixture
+def context():
+    """Request context for a test email."""
+    email_request = EmailRequest(from_email="user@example.com", to="ask@mxgo.ai", subject="Test", textContent="Hi")
+    return RequestContext(email_request)
+
+
+def _agent(context, **kwargs) -> tuple[ParallelToolCallingAgent, CitingSearchTool]:
+    tool = CitingSearchTool(context)
+    agent = ParallelToolCallingAgent(tools=[tool], model=MagicMock(), context=context, **kwargs)
+    return agent, tool
+
+
+def _run_step(agent: ParallelToolCallingAgent, calls: list[tuple[str, float]]) -> ActionStep:
+    message = ChatMessage(
+        role=MessageRole.ASSISTANT,
+        tool_calls=[
+            ChatMessageToolCall(
+                id=f"call_{i}",
+                type="function",
+                function=ChatMessageToolCallFunction(name="citing_search", arguments={"url": url, "delay": delay}),
+            )
+            for i, (url, delay) in enumerate(calls)
+        ],
+    )
+    step = ActionStep(step_number=1, timing=Timing(start_time=time.time()))
+    outputs = list(agent.process_tool_calls(message, step))
+    assert [output.id for output in outputs if not isinstance(output, ToolCall)] == [
+        f"call_{i}" for i in range(len(calls))
+    ]
+    return step
+
+
+class TestParallelToolCallingAgent:
+    """Test the tool calls of a step run concurrently and are merged in call order."""
+
+    def test_calls_run_concurrently(self, context):
+        """Test a fan-out step takes about as long as its slowest call."""
+        agent, tool = _agent(context, max_tool_threads=4)
+
+        start = time.perf_counter()
+        step = _run_step(agent, [(f"https://example.com/{i}", 0.2) for i in range(3)])
+
+        assert time.perf_counter() - start < 0.5
+        assert tool.max_running == 3
+        assert [call.id for call in step.tool_calls] == ["call_0", "call_1", "call_2"]
+
+    def test_citations_numbered_in_call_order(self, context):
+        """Test citations follow the order of the calls, not the order they finished in."""
+        context.add_web_citation("https://example.com/earlier", "Earlier page")
+        agent, _ = _agent(context, max_tool_threads=4)
+
+        step = _run_step(agent, [("https://example.com/slow", 0.2), ("https://example.com/fast", 0.0)])
+
+        assert step.observations == (
+            "Result from https://example.com/slow [#2]\nResult from https://example.com/fast [#3]"
+        )
+        sources = context.get_citations().sources
+        assert [(source.id, source.url) for source in sources] == [
+            ("1", "https://example.com/earlier"),
+            ("2", "https://example.com/slow"),
+            ("3", "https://example.com/fast"),
+        ]
+        assert agent.tool_outputs["call_1"].output == "Result from https://example.com/fast [#3]"
+
+    def test_already_cited_page_keeps_its_id(self, context):
+        """Test a concurrent call citing a known page gets the page's existing ID."""
+        context.add_web_citation("https://example.com/known", "Known page")
+        agent, _ = _agent(context, max_tool_threads=4)
+
+        step = _run_step(agent, [("https://example.com/new", 0.0), ("https://example.com/known", 0.0)])
+
+        assert step.observations.endswith("Result from https://example.com/known [#1]")
+        assert len(context.get_citations().sources) == 2
+
+    def test_tool_concurrency_limit(self, context):
+        """Test calls of a limited tool do not run at the same time."""
+        agent, tool = _agent(context, max_tool_threads=4, tool_concurrency_limits={"citing_search": 1})
+
+        _run_step(agent, [(f"https://example.com/{i}", 0.05) for i in range(3)])
+
+        assert tool.max_running == 1
+
+    def test_single_thread_runs_calls_in_order(self, context):
+        """Test max_tool_threads of 1 runs the calls one after another."""
+        agent, tool = _agent(context, max_tool_threads=1)
+
+        step = _run_step(agent, [("https://example.com/a", 0.05), ("https://example.com/b", 0.0)])
+
+        assert tool.max_running == 1
+        assert step.observations == "Result from https://example.com/a [#1]\nResult from https://example.com/b [#2]"
+
+    def test_references_see_citations_of_earlier_calls(self, context):
+        """Test the references generator called alongside a search lists the request's and the search's citations."""
+        context.add_web_citation("https://example.com/earlier", "Earlier page")
+        search = CitingSearchTool(context)
+        search.name = "web_search"
+        agent = ParallelToolCallingAgent(
+            tools=[search, ReferencesGeneratorTool(context)],
+            model=MagicMock(),
+            context=context,
+            max_tool_threads=4,
+            citation_reading_tools=CITATION_READING_TOOLS,
+        )
+        calls = [("web_search", {"url": "https://example.com/new", "delay": 0.1}), ("generate_references", {})]
+        message = ChatMessage(
+            role=MessageRole.ASSISTANT,
+            tool_calls=[
+                ChatMessageToolCall(
+                    id=f"call_{i}",
+                    type="function",
+                    function=ChatMessageToolCallFunction(name=name, arguments=arguments),
+                )
+                for i, (name, arguments) in enumerate(calls)
+            ],
+        )
+
+        list(agent.process_tool_calls(message, ActionStep(step_number=1, timing=Timing(start_time=time.time()))))
+
+        references = json.loads(agent.tool_outputs["call_1"].output)
+        assert references["metadata"]["total_citations"] == 2
+        assert [source["url"] for source in references["metadata"]["citation_sources"]] == [
+            "https://example.com/earlier",
+            "https://example.com/new",
+        ]
+
+
+class TestStepToolOutputs:
+    """Test the email result is built from every tool call of a step."""
+
+    def test_every_call_of_a_step_processed(self, tmp_path):
+        """Test a step calling the meeting and PDF tools together yields both results."""
+        email_request = EmailRequest(
+            from_email="user@example.com", to="meeting@mxgo.ai", subject="Sync", textContent="Hi"
+        )
+        instructions = next(handle for handle in DEFAULT_EMAIL_HANDLES if handle.handle == "meeting")
+        outputs = {
+            "meeting_creator": {"status": "success", "ics_content": "BEGIN:VCALENDAR"},
+            "pdf_export": {"success": True, "filename": "sync.pdf", "file_path": "sync.pdf", "file_size": 10},
+        }
+        with stub_services(tmp_path):
+            agent = EmailAgent(email_request, instructions, attachment_dir=str(tmp_path / "attachments"))
+        tool_calls = [ToolCall(name=name, arguments={}, id=f"call_{name}") for name in outputs]
+        for tool_call in tool_calls:
+            agent.agent.tool_outputs[tool_call.id] = ToolOutput(
+                id=tool_call.id,
+                output=outputs[tool_call.name],
+                is_final_answer=False,
+                observation=str(outputs[tool_call.name]),
+                tool_call=tool_call,
+            )
+        step = ActionStep(step_number=1, timing=Timing(start_time=0.0), tool_calls=tool_calls)
+
+        result = agent._process_agent_result("Meeting invite attached.", [step], instructions.handle)
+
+        assert result.calendar_data.ics_content == "BEGIN:VCALENDAR"
+        assert result.pdf_export.filename == "sync.pdf"
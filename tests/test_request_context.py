@@ -2,7 +2,10 @@
 Tests for RequestContext functionality.
 """
 
-from mxgo.request_context import CitationManager, RequestContext, _sanitize_api_title
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from mxgo.request_context import CitationManager, RequestContext, _sanitize_api_title, replace_citation_ids
 from mxgo.schemas import EmailAttachment, EmailRequest
 
 
@@ -146,3 +149,31 @@ def test_request_context_backward_compatibility():
     context = RequestContext(email_request)
     assert context.attachment_service is not None
     assert len(context.attachment_service.list_attachments()) == 0
+
+
+def test_request_context_deferred_citations():
+    """Test deferred citations get placeholder IDs until committed, including from speculative scopes and threads."""
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    context = RequestContext(email_request)
+    context.add_web_citation("https://example.com/known", "Known")
+
+    with context.deferred_citations() as deferred:
+        placeholder = context.add_web_citation("https://example.com/new", "New")
+        with context.speculative_citations() as forked:
+            speculative_placeholder = context.add_api_citation("Weather API")
+        assert context.commit_citations(forked)
+        with ThreadPoolExecutor(1) as executor:
+            known_placeholder = executor.submit(
+                copy_context().run, context.add_web_citation, "https://example.com/known", "Known"
+            ).result()
+
+    assert placeholder.startswith("pending-")
+    assert len(context.get_citations().sources) == 1
+
+    id_map = context.commit_deferred_citations(deferred)
+
+    assert id_map == {placeholder: "2", speculative_placeholder: "3", known_placeholder: "1"}
+    assert replace_citation_ids(f"[#{placeholder}] [#{speculative_placeholder}]", id_map) == "[#2] [#3]"
+    assert [source.id for source in context.get_citations().sources] == ["1", "2", "3"]
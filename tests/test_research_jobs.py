@@ -0,0 +1,252 @@
+import os
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from mxgo.research_jobs import (
+    build_research_query,
+    create_research_job,
+    get_research_job,
+    get_research_progress,
+    update_research_job,
+)
+from mxgo.schemas import (
+    AttachmentsProcessingResult,
+    DetailedEmailProcessingResult,
+    EmailContentDetails,
+    EmailRequest,
+    EmailSentStatus,
+    ProcessingMetadata,
+    ResearchJobStatus,
+)
+from mxgo.tasks import deep_research_task, process_email_task
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr("mxgo.cache.get_redis_client", lambda: client)
+    return client
+
+
+def make_email_data(to="research@mxgo.ai", message_id="<research-1@example.com>"):
+    return EmailRequest(
+        from_email="sender@example.com",
+        to=to,
+        subject="Market size of home batteries",
+        textContent="What is the market size of home batteries in Europe?",
+        messageId=message_id,
+    ).model_dump()
+
+
+def make_agent_result():
+    return DetailedEmailProcessingResult(
+        metadata=ProcessingMetadata(
+            processed_at="2024-01-15T10:00:00+00:00",
+            mode="research",
+            email_sent=EmailSentStatus(status="pending"),
+        ),
+        email_content=EmailContentDetails(),
+        attachments=AttachmentsProcessingResult(),
+    )
+
+
+class TestResearchJobStore:
+    """Test research job state in Redis."""
+
+    def test_job_created_once_per_email(self, fake_redis):
+        """Test a second submission for the same email does not create another job."""
+        assert create_research_job("email-1", "home batteries") is True
+        assert create_research_job("email-1", "home batteries") is False
+
+        progress = get_research_progress("email-1")
+        assert progress.status == ResearchJobStatus.QUEUED
+        assert progress.query == "home batteries"
+
+    def test_progress_reflects_updates(self, fake_redis):
+        """Test partial findings and visited URLs are visible while the job runs."""
+        create_research_job("email-1", "home batteries")
+        update_research_job(
+            "email-1",
+            status=ResearchJobStatus.RUNNING,
+            partial_findings="The European market",
+            visited_urls=["https://a.com"],
+        )
+
+        progress = get_research_progress("email-1")
+
+        assert progress.status == ResearchJobStatus.RUNNING
+        assert progress.partial_findings == "The European market"
+        assert progress.visited_urls == ["https://a.com"]
+        assert fake_redis.ttl("research_job:email-1") > 0
+
+    def test_unknown_email_has_no_progress(self, fake_redis):
+        """Test emails without a research job return None."""
+        assert get_research_progress("unknown") is None
+
+    def test_redis_unavailable(self):
+        """Test lookups return None and creating a job fails when Redis is down."""
+        assert get_research_job("email-1") is None
+        with pytest.raises(Exception, match="Redis is not available"):
+            create_research_job("email-1", "home batteries")
+
+    def test_query_built_from_subject_and_body(self):
+        """Test the subject is the query and the body is passed as context."""
+        email_request = EmailRequest(**make_email_data())
+
+        assert build_research_query(email_request) == (
+            "Market size of home batteries",
+            "What is the market size of home batteries in Europe?",
+        )
+
+
+@patch.dict(os.environ, {"JINA_API_KEY": "test_key"})
+@patch("mxgo.research_jobs.DEEP_RESEARCH_JOBS_ENABLED", new=True)
+class TestProcessEmailWithResearchJob:
+    """Test research-mandatory emails are handed to a background job."""
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_research_email_deferred_to_job(self, mock_send, mock_agent, fake_redis, tmp_path):
+        """Test the email worker returns immediately and keeps attachments for the resumed run."""
+        attachments_dir = tmp_path / "attachments"
+        attachments_dir.mkdir()
+
+        result = process_email_task.fn(make_email_data(), str(attachments_dir), [], None, "email-1")
+
+        assert result.metadata.email_sent.status == "research_pending"
+        mock_agent.assert_not_called()
+        email_id, query, context, continuation = mock_send.call_args.args
+        assert (email_id, query) == ("email-1", "Market size of home batteries")
+        assert "Europe" in context
+        assert continuation["email_id"] == "email-1"
+        assert continuation["email_attachments_dir"] == str(attachments_dir)
+        assert attachments_dir.exists()
+        assert get_research_progress("email-1").status == ResearchJobStatus.QUEUED
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_redelivered_email_does_not_submit_again(self, mock_send, mock_agent, fake_redis):
+        """Test a redelivered email waits for the existing job."""
+        process_email_task.fn(make_email_data(), "", [], None, "email-1")
+        result = process_email_task.fn(make_email_data(), "", [], None, "email-1")
+
+        assert result.metadata.email_sent.status == "research_pending"
+        mock_send.assert_called_once()
+        mock_agent.assert_not_called()
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_other_handles_processed_inline(self, mock_send, mock_agent, fake_redis):
+        """Test handles that do not require deep research are not deferred."""
+        mock_agent.return_value.process_email.return_value = make_agent_result()
+
+        process_email_task.fn(make_email_data(to="ask@mxgo.ai"), "", [], None, "email-1")
+
+        mock_send.assert_not_called()
+        mock_agent.assert_called_once()
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_processed_inline_without_redis(self, mock_send, mock_agent):
+        """Test research emails are processed directly when job state cannot be stored."""
+        mock_agent.return_value.process_email.return_value = make_agent_result()
+
+        process_email_task.fn(make_email_data(), "", [], None, "email-1")
+
+        mock_send.assert_not_called()
+        mock_agent.assert_called_once()
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_processed_inline_unless_enabled(self, mock_send, mock_agent, fake_redis):
+        """Test research emails are processed directly unless background jobs are enabled."""
+        mock_agent.return_value.process_email.return_value = make_agent_result()
+
+        with patch("mxgo.research_jobs.DEEP_RESEARCH_JOBS_ENABLED", new=False):
+            process_email_task.fn(make_email_data(), "", [], None, "email-1")
+
+        mock_send.assert_not_called()
+        mock_agent.assert_called_once()
+
+    @patch("mxgo.tasks.EmailAgent")
+    @patch("mxgo.tasks.deep_research_task.send")
+    def test_resumed_email_uses_research_result(self, mock_send, mock_agent, fake_redis):
+        """Test the continuation passes the finished research to the agent."""
+        mock_agent.return_value.process_email.return_value = make_agent_result()
+        research_result = {"query": "home batteries", "findings": "Findings"}
+
+        process_email_task.fn(make_email_data(), "", [], None, "email-1", research_result)
+
+        mock_send.assert_not_called()
+        assert mock_agent.call_args.kwargs["completed_research"] == research_result
+
+    @patch("mxgo.tasks.EmailAgent")
+    def test_failed_research_processed_without_findings(self, mock_agent, fake_redis):
+        """Test an email whose research failed is still answered."""
+        mock_agent.return_value.process_email.return_value = make_agent_result()
+
+        process_email_task.fn(make_email_data(), "", [], None, "email-1", {"query": "q", "error": "timeout"})
+
+        assert mock_agent.call_args.kwargs["completed_research"] is None
+
+
+class TestDeepResearchTask:
+    """Test the background research actor."""
+
+    CONTINUATION = {  # noqa: RUF012
+        "email_data": {"subject": "s"},
+        "email_attachments_dir": "",
+        "attachment_info": [],
+        "scheduled_task_id": None,
+        "email_id": "email-1",
+    }
+
+    @patch("mxgo.tasks.process_email_task.send")
+    @patch("mxgo.tasks.DeepResearchTool")
+    def test_progress_persisted_and_email_resumed(self, mock_tool_class, mock_resume, fake_redis):
+        """Test partial findings are stored while streaming and the email is resumed with the result."""
+        result = {"query": "q", "findings": "Full findings", "visited_urls": ["https://a.com"]}
+        seen_progress = []
+
+        def research(*_args, on_progress, **_kwargs):
+            on_progress("Partial", ["https://a.com"])
+            seen_progress.append(get_research_progress("email-1"))
+            return result
+
+        mock_tool_class.return_value.research.side_effect = research
+        create_research_job("email-1", "q")
+
+        deep_research_task.fn("email-1", "q", "context", self.CONTINUATION)
+
+        assert seen_progress[0].status == ResearchJobStatus.RUNNING
+        assert seen_progress[0].partial_findings == "Partial"
+        progress = get_research_progress("email-1")
+        assert progress.status == ResearchJobStatus.COMPLETED
+        assert progress.partial_findings == "Full findings"
+        mock_resume.assert_called_once_with(**self.CONTINUATION, research_result=result)
+        assert mock_tool_class.return_value.research.call_args.kwargs["stream"] is True
+
+    @patch("mxgo.tasks.process_email_task.send")
+    @patch("mxgo.tasks.DeepResearchTool")
+    def test_failed_research_still_resumes_email(self, mock_tool_class, mock_resume, fake_redis):
+        """Test a crashing research job marks the job failed and resumes the email."""
+        mock_tool_class.return_value.research.side_effect = RuntimeError("connection reset")
+
+        deep_research_task.fn("email-1", "q", None, self.CONTINUATION)
+
+        progress = get_research_progress("email-1")
+        assert progress.status == ResearchJobStatus.FAILED
+        assert progress.error == "connection reset"
+        assert mock_resume.call_args.kwargs["research_result"] == {"query": "q", "error": "connection reset"}
+
+    @patch("mxgo.tasks.process_email_task.send")
+    def test_research_api_error_recorded(self, mock_resume, fake_redis):
+        """Test an error returned by the research API is recorded on the job."""
+        with patch("mxgo.tasks.DeepResearchTool") as mock_tool_class:
+            mock_tool_class.return_value.research.return_value = {"query": "q", "error": "status 500"}
+            deep_research_task.fn("email-1", "q", None, self.CONTINUATION)
+
+        assert get_research_progress("email-1").error == "status 500"
+        mock_resume.assert_called_once()
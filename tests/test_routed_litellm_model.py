@@ -3,13 +3,14 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from mxgo.llm_usage import track_llm_usage
 from mxgo.routed_litellm_model import RoutedLiteLLMModel
 
 
 @patch.dict(os.environ, {"LITELLM_DEFAULT_MODEL_GROUP": "gpt-4"})
 @patch("mxgo.routed_litellm_model.LiteLLMRouterModel.__init__")
 @patch("tomllib.load")
-@patch("builtins.open")
+@patch("pathlib.Path.open")
 @patch("pathlib.Path.exists", return_value=True)
 class TestRoutedLiteLLMModel:
     """Test the RoutedLiteLLMModel class functionality."""
@@ -290,3 +291,33 @@ class TestRoutedLiteLLMModel:
 
         # Verify the response
         assert result.content == "Test response"
+
+    def test_usage_recorded_for_tracked_email(
+        self, mock_exists, mock_open, mock_tomllib_load, mock_super_init, mock_config, mock_response
+    ):
+        """Test token usage is returned with the message and collected for the email being processed."""
+        mock_tomllib_load.return_value = mock_config
+        mock_super_init.return_value = None
+        model = RoutedLiteLLMModel()
+        model.api_base = None
+        model.api_key = "test_api_key"
+        model.custom_role_conversions = {}
+        model.client = Mock()
+        model.client.completion.return_value = mock_response
+        model._prepare_completion_kwargs = Mock(return_value={"messages": [], "model": "gpt-4"})
+        model.model_id = "gpt-4"
+        mock_response.model = "azure/gpt-4o"
+
+        with track_llm_usage("summarize", "user@example.com", "pro") as tracker:
+            result = model.generate(messages=[{"role": "user", "content": "test"}])
+
+        assert result.token_usage.input_tokens == 100
+        assert result.token_usage.output_tokens == 50
+        (call,) = tracker.calls
+        assert (call.model_group, call.deployment, call.handle, call.user) == (
+            "gpt-4",
+            "azure/gpt-4o",
+            "summarize",
+            "user@example.com",
+        )
+        assert (call.prompt_tokens, call.completion_tokens) == (100, 50)
@@ -0,0 +1,51 @@
+import re
+import sys
+from pathlib import Path
+
+from mxgo.scripts.run_workers import ACTOR_MODULES, build_dramatiq_args, preload_modules
+
+MXGO_DIR = Path(__file__).parent.parent / "mxgo"
+
+
+class TestRunWorkers:
+    """Test the worker launcher's actor registry and preloading."""
+
+    def test_actor_registry_complete(self):
+        """Test every module declaring a Dramatiq actor is in the registry."""
+        declaring_modules = {
+            ".".join(path.relative_to(MXGO_DIR.parent).with_suffix("").parts)
+            for path in MXGO_DIR.rglob("*.py")
+            if re.search(r"^@dramatiq\.actor", path.read_text(), re.MULTILINE)
+        }
+
+        assert declaring_modules == set(ACTOR_MODULES)
+
+    def test_dramatiq_args_only_import_actor_modules(self, monkeypatch):
+        """Test the workers import only the registry modules and do not watch files by default."""
+        monkeypatch.delenv("DRAMATIQ_WATCH", raising=False)
+        monkeypatch.setenv("DRAMATIQ_PROCESSES", "2")
+        monkeypatch.setenv("DRAMATIQ_QUEUES", "default,deep_research")
+
+        args = build_dramatiq_args()
+
+        assert args[: len(ACTOR_MODULES)] == ACTOR_MODULES
+        assert args[args.index("--processes") + 1] == "2"
+        assert args[args.index("--queues") + 1 :] == ["default", "deep_research"]
+        assert "--watch" not in args
+
+    def test_watch_enabled_from_environment(self, monkeypatch):
+        """Test DRAMATIQ_WATCH turns on restarting on source changes."""
+        monkeypatch.setenv("DRAMATIQ_WATCH", "true")
+
+        args = build_dramatiq_args()
+
+        assert Path(args[args.index("--watch") + 1]) == MXGO_DIR.resolve()
+
+    def test_preload_skips_modules_that_fail_to_import(self):
+        """Test a module that cannot be imported is reported without stopping the others."""
+        sys.modules.pop("colorsys", None)
+
+        failed = preload_modules(["mxgo_missing_module", "colorsys"])
+
+        assert failed == ["mxgo_missing_module"]
+        assert "colorsys" in sys.modules
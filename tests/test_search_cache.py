@@ -0,0 +1,211 @@
+import json
+import os
+from unittest.mock import Mock, patch
+
+import fakeredis
+import pytest
+from freezegun import freeze_time
+
+from mxgo.cache import TTLCache
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest
+from mxgo.tools.news_tool import NewsTool
+from mxgo.tools.web_search import BraveSearchTool, DDGSearchTool
+from mxgo.tools.web_search.search_cache import (
+    build_search_cache_key,
+    cached_search,
+    get_search_cache_ttl,
+)
+
+
+def create_context():
+    email_request = EmailRequest(
+        from_email="test@example.com", to="recipient@example.com", subject="Test Subject", textContent="Test content"
+    )
+    return RequestContext(email_request)
+
+
+def mock_brave_response():
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {
+        "web": {
+            "results": [
+                {"title": "Result 1", "url": "https://example1.com", "description": "First"},
+                {"title": "Result 2", "url": "https://example2.com", "description": "Second"},
+            ]
+        }
+    }
+    return response
+
+
+class TestTTLCache:
+    """Test the two-level TTL cache."""
+
+    def test_set_and_get(self):
+        """Test values round-trip through the local layer."""
+        cache = TTLCache("test", use_redis=False)
+        cache.set("key", {"a": 1}, ttl_seconds=60)
+
+        assert cache.get("key") == {"a": 1}
+        assert cache.get("missing") is None
+
+    def test_entries_expire(self):
+        """Test entries are not returned after their TTL."""
+        cache = TTLCache("test", use_redis=False)
+        with freeze_time("2024-01-15 10:00:00") as frozen:
+            cache.set("key", "value", ttl_seconds=60)
+            frozen.tick(59)
+            assert cache.get("key") == "value"
+            frozen.tick(2)
+            assert cache.get("key") is None
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = TTLCache("test", max_entries=2, use_redis=False)
+        cache.set("a", 1, ttl_seconds=60)
+        cache.set("b", 2, ttl_seconds=60)
+        cache.get("a")
+        cache.set("c", 3, ttl_seconds=60)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_byte_limit_eviction(self):
+        """Test the oldest entries are evicted once the byte budget is exceeded."""
+        cache = TTLCache("test", max_bytes=250, use_redis=False)
+        cache.set("a", "x" * 60, ttl_seconds=60)
+        cache.set("b", "y" * 60, ttl_seconds=60)
+        cache.set("c", "z" * 60, ttl_seconds=60)
+        cache.set("huge", "w" * 500, ttl_seconds=60)
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get("c") is not None
+        assert cache.get("huge") is None
+
+    def test_entries_shared_through_redis(self):
+        """Test an entry written by one process is visible to another through Redis."""
+        fake_redis = fakeredis.FakeRedis(decode_responses=True)
+        worker_a = TTLCache("test")
+        worker_b = TTLCache("test")
+
+        with patch("mxgo.cache.get_redis_client", return_value=fake_redis):
+            worker_a.set("key", ["shared"], ttl_seconds=60)
+            assert worker_b.get("key") == ["shared"]
+
+        assert 0 < fake_redis.ttl("cache:test:key") <= 60
+
+    def test_redis_unavailable_falls_back_to_local(self):
+        """Test the cache keeps working when Redis is down."""
+        cache = TTLCache("test")
+        with patch("mxgo.cache.get_redis_client", return_value=None):
+            cache.set("key", "value", ttl_seconds=60)
+            assert cache.get("key") == "value"
+
+
+class TestSearchCacheKeys:
+    """Test search cache key and TTL selection."""
+
+    def test_key_normalizes_query(self):
+        """Test case and whitespace differences map to the same key."""
+        key_a = build_search_cache_key("brave", "Latest  AI News", {"country": "US"})
+        key_b = build_search_cache_key("brave", " latest ai news ", {"country": "US"})
+
+        assert key_a == key_b
+
+    def test_key_depends_on_provider_and_params(self):
+        """Test provider and parameters are part of the key."""
+        base = build_search_cache_key("brave", "query", {"country": "US", "freshness": "pw"})
+
+        assert base != build_search_cache_key("ddg", "query", {"country": "US", "freshness": "pw"})
+        assert base != build_search_cache_key("brave", "query", {"country": "GB", "freshness": "pw"})
+        assert base != build_search_cache_key("brave", "query", {"country": "US", "freshness": "pd"})
+
+    def test_ttl_is_freshness_aware(self):
+        """Test news and narrow freshness windows get shorter TTLs."""
+        default_ttl = get_search_cache_ttl("brave")
+
+        assert get_search_cache_ttl("brave", "pd") < get_search_cache_ttl("brave", "pw") <= default_ttl
+        assert get_search_cache_ttl("brave_news", "py") < default_ttl
+        assert get_search_cache_ttl("brave", "2024-01-01to2024-02-01") == default_ttl
+
+    def test_fetch_errors_are_not_cached(self):
+        """Test a failing provider call is retried on the next search."""
+        fetch = Mock(side_effect=[RuntimeError("provider down"), {"results": []}])
+
+        with pytest.raises(RuntimeError, match="provider down"):
+            cached_search("brave", "query", {}, fetch)
+        payload, cache_hit = cached_search("brave", "query", {}, fetch)
+
+        assert payload == {"results": []}
+        assert cache_hit is False
+        assert fetch.call_count == 2
+
+
+class TestSearchToolCaching:
+    """Test search tools reuse cached provider results."""
+
+    @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
+    @patch("mxgo.http_client.get")
+    def test_brave_repeat_search_uses_cache_and_replays_citations(self, mock_get):
+        """Test a repeated Brave search skips the API and still cites results in the new request."""
+        mock_get.return_value = mock_brave_response()
+
+        first_context = create_context()
+        BraveSearchTool(first_context).forward("test query")
+
+        second_context = create_context()
+        result = json.loads(BraveSearchTool(second_context).forward("Test  Query"))
+
+        mock_get.assert_called_once()
+        assert result["metadata"]["cache_hit"] is True
+        assert [source.url for source in second_context.get_citations().sources] == [
+            "https://example1.com",
+            "https://example2.com",
+        ]
+        assert len(result["citations"]["sources"]) == 2
+
+    @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
+    @patch("mxgo.http_client.get")
+    def test_brave_different_params_miss_cache(self, mock_get):
+        """Test searches with different parameters are fetched separately."""
+        mock_get.return_value = mock_brave_response()
+
+        tool = BraveSearchTool(create_context())
+        tool.forward("test query", country="US")
+        tool.forward("test query", country="DE")
+
+        assert mock_get.call_count == 2
+
+    @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
+    @patch("mxgo.http_client.get")
+    def test_news_repeat_search_uses_cache(self, mock_get):
+        """Test a repeated news search skips the API."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {
+            "results": [{"title": "Story", "url": "https://news.com/story", "description": "Desc"}]
+        }
+        mock_get.return_value = mock_response
+
+        NewsTool(create_context()).forward("test news", freshness="pd")
+        result = json.loads(NewsTool(create_context()).forward("test news", freshness="pd"))
+
+        mock_get.assert_called_once()
+        assert result["metadata"]["cache_hit"] is True
+
+    @patch("mxgo.tools.web_search.ddg_search.WebSearchTool")
+    def test_ddg_repeat_search_uses_cache(self, mock_web_search_tool):
+        """Test a repeated DDG search skips the provider."""
+        mock_ddg_instance = Mock()
+        mock_ddg_instance.forward.return_value = "[Result](https://example.com)"
+        mock_web_search_tool.return_value = mock_ddg_instance
+
+        DDGSearchTool(create_context()).forward("test query")
+        context = create_context()
+        DDGSearchTool(context).forward("test query")
+
+        mock_ddg_instance.forward.assert_called_once_with(query="test query")
+        assert context.get_citations().sources[0].url == "https://example.com"
@@ -0,0 +1,213 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from smolagents import AgentMaxStepsError, Tool
+from smolagents.memory import ActionStep, PlanningStep, ToolCall
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import Timing, TokenUsage
+
+from mxgo.agents.step_profiler import AgentStepProfiler, hash_tool_arguments, write_trace
+from mxgo.llm_usage import get_usage_tracker, track_llm_usage
+from mxgo.schemas import AgentRunProfile, LLMCallUsage
+from mxgo.scripts.agent_profile_report import load_traces, percentile, summarize_traces
+
+
+class EchoTool(Tool):
+    name = "echo"
+    description = "Echo the text."
+    inputs = {"text": {"type": "string", "description": "Text to echo"}}  # noqa: RUF012
+    output_type = "string"
+
+    def forward(self, text: str) -> str:
+        return text
+
+
+def make_llm_call(latency_ms: int) -> LLMCallUsage:
+    return LLMCallUsage(model_group="gpt-4", handle="ask", latency_ms=latency_ms)
+
+
+def make_action_step(step_number, start, end, **kwargs) -> ActionStep:
+    return ActionStep(step_number=step_number, timing=Timing(start_time=start, end_time=end), **kwargs)
+
+
+def make_planning_step(start, end) -> PlanningStep:
+    message = ChatMessage(role=MessageRole.ASSISTANT, content="plan")
+    return PlanningStep(
+        model_input_messages=[],
+        model_output_message=message,
+        plan="plan",
+        timing=Timing(start_time=start, end_time=end),
+        token_usage=TokenUsage(input_tokens=50, output_tokens=10),
+    )
+
+
+class TestAgentStepProfiler:
+    """Test the per-step timeline of agent runs."""
+
+    def test_action_step_recorded(self):
+        """Test tool calls, model time, observations and tokens are recorded per step."""
+        profiler = AgentStepProfiler()
+        tool = profiler.wrap_tool(EchoTool())
+
+        with track_llm_usage("ask") as tracker:
+            tracker.add(make_llm_call(300))
+            tool(text="hello")
+            profiler.on_step(
+                make_action_step(
+                    1,
+                    100.0,
+                    100.5,
+                    tool_calls=[ToolCall(name="echo", arguments={"text": "hello"}, id="1")],
+                    observations="hello",
+                    token_usage=TokenUsage(input_tokens=120, output_tokens=30),
+                )
+            )
+
+        step = profiler.steps[0]
+        assert step.step_type == "action"
+        assert step.wall_time_ms == 500
+        assert step.model_time_ms == 300
+        assert [call.name for call in step.tool_calls] == ["echo"]
+        assert step.tool_calls[0].args_hash == hash_tool_arguments({"text": "hello"})
+        assert step.tool_calls[0].duration_ms is not None
+        assert step.observation_chars == 5
+        assert (step.input_tokens, step.output_tokens) == (120, 30)
+
+    def test_untimed_tool_calls_listed(self):
+        """Test calls the profiler did not time, like final_answer, are listed without a duration."""
+        profiler = AgentStepProfiler()
+
+        profiler.on_step(
+            make_action_step(1, 0.0, 0.1, tool_calls=[ToolCall(name="final_answer", arguments={"answer": "x"}, id="1")])
+        )
+
+        assert profiler.steps[0].tool_calls[0].name == "final_answer"
+        assert profiler.steps[0].tool_calls[0].duration_ms is None
+
+    def test_llm_time_inside_tools_not_model_time(self):
+        """Test LLM calls made by a tool count towards tool time, not the step's model time."""
+        profiler = AgentStepProfiler()
+
+        class SummarizingTool(EchoTool):
+            def forward(self, text: str) -> str:
+                get_usage_tracker().add(make_llm_call(200))
+                return text
+
+        tool = profiler.wrap_tool(SummarizingTool())
+        with track_llm_usage("ask") as tracker:
+            tracker.add(make_llm_call(100))
+            tool(text="hello")
+            profiler.on_step(make_action_step(1, 0.0, 1.0))
+
+        assert profiler.steps[0].model_time_ms == 100
+
+    def test_failing_tool_marked_as_error(self):
+        """Test a tool call that raises is recorded as failed."""
+        profiler = AgentStepProfiler()
+
+        class FailingTool(EchoTool):
+            def forward(self, text: str) -> str:
+                msg = "boom"
+                raise RuntimeError(msg)
+
+        tool = profiler.wrap_tool(FailingTool())
+        with pytest.raises(RuntimeError):
+            tool(text="hello")
+        profiler.on_step(make_action_step(1, 0.0, 0.1))
+
+        assert profiler.steps[0].tool_calls[0].error is True
+
+    def test_run_profile(self):
+        """Test the run profile adds up steps and flags runs that hit the step limit."""
+        profiler = AgentStepProfiler()
+
+        profiler.on_step(make_planning_step(10.0, 10.2))
+        profiler.on_step(make_action_step(1, 10.2, 11.0))
+        profiler.on_step(make_action_step(2, 11.0, 12.0, error=AgentMaxStepsError("Reached max steps.", MagicMock())))
+        profile = profiler.build_profile()
+
+        assert profile.planning_steps == 1
+        assert profile.action_steps == 2
+        assert profile.wall_time_ms == 2000
+        assert profile.max_steps_reached is True
+        assert profile.steps[0].started_at_ms == 0
+        assert profile.steps[0].input_tokens == 50
+        assert profile.steps[2].error == "Reached max steps."
+
+
+class TestWriteTrace:
+    """Test sampled trace files."""
+
+    def test_sampled_run_appended(self, monkeypatch, tmp_path):
+        """Test sampled runs are appended to the day's trace file."""
+        monkeypatch.setattr("mxgo.agents.step_profiler.AGENT_PROFILE_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr("mxgo.agents.step_profiler.AGENT_PROFILE_TRACE_DIR", str(tmp_path))
+        profile = AgentRunProfile(wall_time_ms=1200, action_steps=2)
+
+        trace_file = write_trace(profile, "email-1", "ask")
+        write_trace(profile, "email-2", "ask")
+
+        records = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [record["email_id"] for record in records] == ["email-1", "email-2"]
+        assert records[0]["wall_time_ms"] == 1200
+
+    def test_sampling_disabled(self, monkeypatch, tmp_path):
+        """Test no trace is written with a sample rate of zero."""
+        monkeypatch.setattr("mxgo.agents.step_profiler.AGENT_PROFILE_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr("mxgo.agents.step_profiler.AGENT_PROFILE_TRACE_DIR", str(tmp_path))
+
+        assert write_trace(AgentRunProfile(), "email-1", "ask") is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestAgentProfileReport:
+    """Test the aggregate report over trace files."""
+
+    def test_summary_per_handle_and_tool(self, tmp_path):
+        """Test runs are aggregated per handle and tool calls per tool, counting repeated arguments."""
+        search = {"name": "web_search", "args_hash": "abc", "duration_ms": 800, "error": False}
+        runs = [
+            {
+                "handle": "ask",
+                "wall_time_ms": 2000,
+                "model_time_ms": 1000,
+                "tool_time_ms": 1600,
+                "action_steps": 3,
+                "max_steps_reached": False,
+                "steps": [
+                    {"tool_calls": [search], "observation_chars": 400},
+                    {"tool_calls": [search], "observation_chars": 600},
+                ],
+            },
+            {
+                "handle": "ask",
+                "wall_time_ms": 6000,
+                "model_time_ms": 5000,
+                "tool_time_ms": 0,
+                "action_steps": 10,
+                "max_steps_reached": True,
+                "steps": [],
+            },
+        ]
+        (tmp_path / "agent-profile-20260101.jsonl").write_text("\n".join(json.dumps(run) for run in runs) + "\n")
+
+        summary = summarize_traces(load_traces([tmp_path]))
+
+        ask = summary["handles"]["ask"]
+        assert ask["runs"] == 2
+        assert ask["p95_wall_ms"] == 6000
+        assert ask["avg_steps"] == 6.5
+        assert ask["model_share"] == 0.75
+        assert ask["max_steps_reached"] == 1
+        web_search = summary["tools"]["web_search"]
+        assert web_search["calls"] == 2
+        assert web_search["p50_ms"] == 800
+        assert web_search["avg_observation_chars"] == 500
+        assert web_search["repeated_calls"] == 1
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        assert percentile([], 95) == 0
+        assert percentile([5, 1, 3], 50) == 3
+        assert percentile(list(range(1, 101)), 95) == 95
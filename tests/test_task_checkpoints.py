@@ -0,0 +1,222 @@
+import os
+import time
+from unittest.mock import Mock, patch
+
+import fakeredis
+import pytest
+from smolagents.agents import ToolOutput
+from smolagents.memory import ActionStep, PlanningStep, ToolCall
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import AgentLogger, LogLevel, Timing, TokenUsage
+from smolagents.utils import AgentExecutionError
+
+from mxgo.agents.email_agent import EmailAgent
+from mxgo.email_handles import DEFAULT_EMAIL_HANDLES
+from mxgo.schemas import CitationSource, EmailRequest
+from mxgo.task_checkpoints import TaskCheckpoint
+from mxgo.tasks import process_email_task
+from tests.benchmarks.stubs import REPLY, stub_services
+
+HANDLES = {instructions.handle: instructions for instructions in DEFAULT_EMAIL_HANDLES}
+MESSAGE_ID = "<checkpoint-test@example.com>"
+
+
+@pytest.fixture
+def services(tmp_path):
+    """Local stand-ins for the model and the other external services."""
+    with stub_services(tmp_path) as services:
+        yield services
+
+
+def _email() -> EmailRequest:
+    return EmailRequest(
+        from_email="user@example.com",
+        to="ask@mxgo.ai",
+        subject="Home batteries",
+        textContent="How fast is home battery adoption growing in Europe?",
+        messageId=MESSAGE_ID,
+    )
+
+
+def _agent(tmp_path, checkpoint: TaskCheckpoint) -> EmailAgent:
+    return EmailAgent(_email(), HANDLES["ask"], attachment_dir=str(tmp_path / "attachments"), checkpoint=checkpoint)
+
+
+def _steps() -> list[ActionStep | PlanningStep]:
+    search_call = ToolCall(name="web_search", arguments={"query": "batteries"}, id="call_1")
+    return [
+        PlanningStep(
+            model_input_messages=[],
+            model_output_message=ChatMessage(role=MessageRole.ASSISTANT, content="1. Search"),
+            plan="1. Search",
+            timing=Timing(start_time=1.0, end_time=2.0),
+            token_usage=TokenUsage(input_tokens=10, output_tokens=5),
+        ),
+        ActionStep(
+            step_number=1,
+            timing=Timing(start_time=2.0, end_time=3.0),
+            tool_calls=[search_call],
+            observations="Batteries are popular [#1]",
+            token_usage=TokenUsage(input_tokens=20, output_tokens=8),
+        ),
+        ActionStep(
+            step_number=2,
+            timing=Timing(start_time=3.0, end_time=4.0),
+            error=AgentExecutionError("Tool failed", AgentLogger(level=LogLevel.OFF)),
+        ),
+    ]
+
+
+def _citation() -> CitationSource:
+    return CitationSource(
+        id="1", title="Batteries", url="https://example.com/batteries", date_accessed="2026-01-01", source_type="web"
+    )
+
+
+class TestTaskCheckpoint:
+    """Test checkpoints are saved to Redis or disk and read back."""
+
+    def test_agent_state_round_trip(self, tmp_path):
+        """Test steps, citations and tool outputs come back as they were saved."""
+        search_call = ToolCall(name="web_search", arguments={"query": "batteries"}, id="call_1")
+        tool_output = ToolOutput(
+            id="call_1", output={"results": 5}, is_final_answer=False, observation="5 results", tool_call=search_call
+        )
+        checkpoint = TaskCheckpoint(MESSAGE_ID, directory=tmp_path)
+        with patch("mxgo.cache.get_redis_client", return_value=fakeredis.FakeRedis(decode_responses=True)):
+            checkpoint.save_agent_state(_steps(), [_citation()], {"call_1": tool_output})
+            state = checkpoint.load_agent_state()
+
+        planning, search, failed = state.steps
+        assert planning.plan == "1. Search"
+        assert planning.token_usage.total_tokens == 15
+        assert search.tool_calls[0].arguments == {"query": "batteries"}
+        assert search.observations == "Batteries are popular [#1]"
+        assert isinstance(failed.error, AgentExecutionError)
+        assert failed.error.message == "Tool failed"
+        assert state.action_steps == 2
+        assert state.final_answer is None
+        assert state.citations == [_citation()]
+        assert state.tool_outputs["call_1"].output == {"results": 5}
+        assert state.tool_outputs["call_1"].tool_call.name == "web_search"
+        assert not list(tmp_path.iterdir())
+
+    def test_disk_used_while_redis_unavailable(self, tmp_path):
+        """Test checkpoints go to disk without Redis and are deleted by clear."""
+        checkpoint = TaskCheckpoint(MESSAGE_ID, directory=tmp_path)
+        with patch("mxgo.cache.get_redis_client", return_value=None):
+            checkpoint.save_agent_state(_steps(), [], {})
+            assert checkpoint.load_agent_state().action_steps == 2
+            assert checkpoint.load_result() is None
+
+            checkpoint.clear()
+
+            assert checkpoint.load_agent_state() is None
+        assert not list(tmp_path.iterdir())
+
+    def test_expired_disk_checkpoint_ignored(self, tmp_path):
+        """Test disk checkpoints older than the TTL are not used."""
+        checkpoint = TaskCheckpoint(MESSAGE_ID, ttl_seconds=60, directory=tmp_path)
+        with patch("mxgo.cache.get_redis_client", return_value=None):
+            checkpoint.save_agent_state(_steps(), [], {})
+            for path in tmp_path.iterdir():
+                os.utime(path, (time.time() - 120, time.time() - 120))
+
+            assert checkpoint.load_agent_state() is None
+
+
+class TestAgentResume:
+    """Test the agent saves its steps and resumes a checkpointed run."""
+
+    @pytest.mark.usefixtures("services")
+    def test_steps_checkpointed_during_run(self, tmp_path):
+        """Test every finished step is saved, up to the final answer."""
+        checkpoint = TaskCheckpoint(MESSAGE_ID)
+
+        _agent(tmp_path, checkpoint).process_email(_email(), HANDLES["ask"])
+
+        state = checkpoint.load_agent_state()
+        assert state.action_steps == 2
+        assert state.steps[1].tool_calls[0].name == "web_search"
+        assert state.final_answer == REPLY
+        assert state.citations
+
+    @pytest.mark.usefixtures("services")
+    def test_run_resumed_from_last_step(self, tmp_path):
+        """Test a retry restores the finished steps and their citations and continues from there."""
+        checkpoint = TaskCheckpoint(MESSAGE_ID)
+        _agent(tmp_path, checkpoint).process_email(_email(), HANDLES["ask"])
+        state = checkpoint.load_agent_state()
+        checkpoint.save_agent_state(state.steps[:-1], state.citations, state.tool_outputs)
+
+        agent = _agent(tmp_path, checkpoint)
+        with patch.dict("tests.benchmarks.stubs.TRANSCRIPTS", {"ask": []}):
+            result = agent.process_email(_email(), HANDLES["ask"])
+
+        assert result.metadata.agent_profile.resumed_steps == 1
+        assert result.metadata.agent_profile.action_steps == 1
+        assert agent.agent.memory.steps[1].tool_calls[0].name == "web_search"
+        assert agent.context.get_citations().sources == state.citations
+        final_prompt = str(agent.agent.memory.steps[-1].model_input_messages)
+        assert "Search Results for home battery adoption europe" in final_prompt
+        assert "Installed capacity roughly doubled" in result.email_content.text
+
+    @pytest.mark.usefixtures("services")
+    def test_finished_run_not_repeated(self, tmp_path):
+        """Test a run checkpointed up to its final answer does not call the model again."""
+        checkpoint = TaskCheckpoint(MESSAGE_ID)
+        _agent(tmp_path, checkpoint).process_email(_email(), HANDLES["ask"])
+
+        agent = _agent(tmp_path, checkpoint)
+        with patch.object(agent.agent, "run") as agent_run:
+            result = agent.process_email(_email(), HANDLES["ask"])
+
+        agent_run.assert_not_called()
+        assert result.metadata.agent_profile.resumed_steps == 2
+        assert "Installed capacity roughly doubled" in result.email_content.text
+
+
+class TestSendOnlyRetry:
+    """Test a retry after the reply was generated only sends it."""
+
+    def test_failed_send_retried_without_agent(self, services):
+        """Test the reply is checkpointed when sending fails, and the retry sends it without the agent."""
+        email_data = _email().model_dump(by_alias=True)
+        checkpoint = TaskCheckpoint(MESSAGE_ID)
+
+        with (
+            patch.object(services.outbox, "send_reply", side_effect=ConnectionError("SES unavailable")),
+            pytest.raises(ConnectionError),
+        ):
+            process_email_task.fn(email_data=email_data, email_attachments_dir="", attachment_info=[])
+        assert checkpoint.load_result() is not None
+
+        with patch("mxgo.tasks.EmailAgent") as email_agent:
+            result = process_email_task.fn(email_data=email_data, email_attachments_dir="", attachment_info=[])
+
+        email_agent.assert_not_called()
+        assert result.metadata.email_sent.status == "sent"
+        assert len(services.outbox.sent) == 1
+        assert "Installed capacity roughly doubled" in services.outbox.sent[0]["text"]
+        assert checkpoint.load_result() is None
+        assert checkpoint.load_agent_state() is None
+
+    def test_last_attempt_reports_failed_send_and_cleans_up(self, services, tmp_path):
+        """Test the last attempt does not raise, and removes the attachments and the checkpoint."""
+        email_data = _email().model_dump(by_alias=True)
+        attachments_dir = tmp_path / "email-attachments"
+        attachments_dir.mkdir()
+        (attachments_dir / "report.txt").write_text("Quarterly report")
+        last_attempt = Mock(options={"retries": 3})
+
+        with (
+            patch.object(services.outbox, "send_reply", side_effect=ConnectionError("SES unavailable")),
+            patch("mxgo.tasks.CurrentMessage.get_current_message", return_value=last_attempt),
+        ):
+            result = process_email_task.fn(
+                email_data=email_data, email_attachments_dir=str(attachments_dir), attachment_info=[]
+            )
+
+        assert result.metadata.email_sent.status == "error"
+        assert not attachments_dir.exists()
+        assert TaskCheckpoint(MESSAGE_ID).load_result() is None
@@ -0,0 +1,49 @@
+import pytest
+from dramatiq.brokers.stub import StubBroker
+
+from mxgo import tasks
+from mxgo.task_client import (
+    ActorStub,
+    deferred_email_task,
+    process_email_task,
+    send_notice_task,
+    verify_sender_task,
+)
+
+
+class TestActorStub:
+    """Test the API's enqueue-only actor stubs."""
+
+    @pytest.mark.parametrize(
+        ("stub", "actor"),
+        [
+            (process_email_task, tasks.process_email_task),
+            (deferred_email_task, tasks.process_deferred_email_task),
+            (send_notice_task, tasks.send_notice_task),
+            (verify_sender_task, tasks.verify_sender_task),
+        ],
+    )
+    def test_stub_matches_worker_actor(self, stub, actor):
+        """Test a stub builds the same message as the worker's actor."""
+        args = ({"from_email": "user@example.com"}, "attachments/email-1", [])
+        kwargs = {"email_id": "email-1"}
+
+        stub_message = stub.message_with_options(args=args, kwargs=kwargs)
+        actor_message = actor.message_with_options(args=args, kwargs=kwargs)
+
+        assert stub_message.actor_name == actor_message.actor_name
+        assert stub_message.queue_name == actor_message.queue_name
+        assert (stub_message.args, stub_message.kwargs) == (actor_message.args, actor_message.kwargs)
+
+    def test_send_enqueues_on_broker(self):
+        """Test sending enqueues a message with the arguments on the stub's queue."""
+        broker = StubBroker()
+        broker.declare_queue("default")
+        stub = ActorStub("process_email_task", broker=broker)
+
+        message = stub.send({"subject": "Hi"}, "", [], email_id="email-1")
+
+        assert broker.queues["default"].qsize() == 1
+        assert message.actor_name == "process_email_task"
+        assert message.args == ({"subject": "Hi"}, "", [])
+        assert message.kwargs == {"email_id": "email-1"}
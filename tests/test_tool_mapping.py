@@ -0,0 +1,88 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mxgo.metrics import instrument_tool
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest, ToolName
+from mxgo.tools import TOOL_FACTORIES, create_tool_mapping
+
+
+@pytest.fixture
+def context():
+    """Request context for a test email."""
+    email_request = EmailRequest(from_email="user@example.com", to="ask@mxgo.ai", subject="Test", textContent="Hi")
+    return RequestContext(email_request)
+
+
+def _mapping(context, allowed_tools=None, scheduled_tasks_tool_factory=None):
+    return create_tool_mapping(
+        context=context,
+        scheduled_tasks_tool_factory=scheduled_tasks_tool_factory or Mock(),
+        allowed_python_imports=["math"],
+        allowed_tools=allowed_tools,
+    )
+
+
+class TestCreateToolMapping:
+    """Test tools are built lazily from the handle's allowed tools."""
+
+    def test_only_allowed_tools_built(self, context):
+        """Test tools outside the allowed list are neither built nor returned."""
+        scheduled_tasks_tool_factory = Mock()
+        with (
+            patch("mxgo.tools.PDFExportTool") as pdf_export_tool,
+            patch("mxgo.tools.RoutedLiteLLMModel") as routed_model,
+        ):
+            mapping = _mapping(
+                context, [ToolName.CITATION_AWARE_VISIT, ToolName.REFERENCES_GENERATOR], scheduled_tasks_tool_factory
+            )
+
+        assert set(mapping) == {ToolName.CITATION_AWARE_VISIT, ToolName.REFERENCES_GENERATOR}
+        pdf_export_tool.assert_not_called()
+        routed_model.assert_not_called()
+        scheduled_tasks_tool_factory.assert_not_called()
+
+    def test_all_tools_built_without_allowed_list(self, context):
+        """Test every known tool is in the mapping when no allowed list is given."""
+        with patch("mxgo.tools.PDFExportTool"), patch("mxgo.tools.RoutedLiteLLMModel"):
+            mapping = _mapping(context)
+
+        assert set(mapping) == set(TOOL_FACTORIES)
+
+    def test_web_search_reuses_allowed_search_tools(self, context, monkeypatch):
+        """Test the fallback search tool wraps the same search instances the email gets."""
+        monkeypatch.setenv("BRAVE_SEARCH_API_KEY", "test-key")
+
+        mapping = _mapping(context, [ToolName.BRAVE_SEARCH, ToolName.DDG_SEARCH, ToolName.WEB_SEARCH])
+
+        assert mapping[ToolName.WEB_SEARCH].primary_tool is mapping[ToolName.BRAVE_SEARCH]
+        assert mapping[ToolName.WEB_SEARCH].secondary_tool is mapping[ToolName.DDG_SEARCH]
+
+    def test_unavailable_tool_mapped_to_none(self, context, monkeypatch):
+        """Test a tool missing its API key is mapped to None."""
+        monkeypatch.delenv("JINA_API_KEY", raising=False)
+
+        assert _mapping(context, [ToolName.DEEP_RESEARCH]) == {ToolName.DEEP_RESEARCH: None}
+
+    def test_stateless_tools_shared_across_emails(self, context):
+        """Test stateless tools are built once, with per-email copies for in-place wrapping."""
+        with (
+            patch.dict("mxgo.tools._shared_tools", clear=True),
+            patch("mxgo.tools.WikipediaSearchTool.__init__", return_value=None) as wikipedia_init,
+        ):
+            first = _mapping(context, [ToolName.WIKIPEDIA_SEARCH])[ToolName.WIKIPEDIA_SEARCH]
+            second = _mapping(context, [ToolName.WIKIPEDIA_SEARCH])[ToolName.WIKIPEDIA_SEARCH]
+
+        wikipedia_init.assert_called_once()
+        assert first is not second
+        instrument_tool(first)
+        assert "forward" in vars(first)
+        assert "forward" not in vars(second)
+
+    def test_context_bound_tools_built_per_email(self, context):
+        """Test tools holding the request context are not shared."""
+        first = _mapping(context, [ToolName.REFERENCES_GENERATOR])[ToolName.REFERENCES_GENERATOR]
+        second = _mapping(context, [ToolName.REFERENCES_GENERATOR])[ToolName.REFERENCES_GENERATOR]
+
+        assert first is not second
@@ -0,0 +1,168 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import fakeredis
+import pytest
+from smolagents import Tool
+
+from mxgo.agents.email_agent import EmailAgent
+from mxgo.email_handles import DEFAULT_EMAIL_HANDLES
+from mxgo.request_context import RequestContext
+from mxgo.schemas import EmailRequest, ToolName
+from mxgo.tools import ToolResultMemo, create_tool_mapping
+from tests.benchmarks.stubs import stub_services
+
+
+@pytest.fixture(autouse=True)
+def _no_redis():
+    """Keep memoized results in process unless a test provides Redis."""
+    with patch("mxgo.cache.get_redis_client", return_value=None):
+        yield
+
+
+class CitingSearchTool(Tool):
+    name = "citing_search"
+    description = "Search, citing the given page."
+    inputs = {  # noqa: RUF012
+        "url": {"type": "string", "description": "Page to cite"},
+        "delay": {"type": "number", "description": "Seconds the search takes", "nullable": True},
+    }
+    output_type = "string"
+
+    def __init__(self, context: RequestContext):
+        super().__init__()
+        self.context = context
+        self.calls = 0
+
+    def forward(self, url: str, delay: float | None = None) -> str:
+        self.calls += 1
+        time.sleep(delay or 0)
+        if "broken" in url:
+            return f"Error: could not load {url}"
+        citation_id = self.context.add_web_citation(url, f"Page {url}")
+        return f"Result from {url} [#{citation_id}]"
+
+
+def _context(message_id: str | None = None) -> RequestContext:
+    email_request = EmailRequest(
+        from_email="user@example.com", to="ask@mxgo.ai", subject="Test", textContent="Hi", messageId=message_id
+    )
+    return RequestContext(email_request)
+
+
+def _memoized_tool(context: RequestContext) -> tuple[ToolResultMemo, CitingSearchTool]:
+    memo = ToolResultMemo(context)
+    tool = CitingSearchTool(context)
+    memo.wrap_tool(tool)
+    return memo, tool
+
+
+class TestToolResultMemo:
+    """Test repeated tool calls of an email are served from memoized results."""
+
+    def test_repeated_call_served_from_memo(self):
+        """Test an identical call does not run the tool and cites the same page again."""
+        context = _context()
+        memo, tool = _memoized_tool(context)
+
+        first = tool(url="https://example.com/a")
+        second = tool(url="https://example.com/a")
+        tool(url="https://example.com/b")
+
+        assert first == second == "Result from https://example.com/a [#1]"
+        assert tool.calls == 2
+        assert memo.hits == 1
+        assert [source.url for source in context.get_citations().sources] == [
+            "https://example.com/a",
+            "https://example.com/b",
+        ]
+
+    def test_retry_reuses_results_with_new_citation_ids(self):
+        """Test a retry of the email gets the results from Redis, its citations numbered for the new run."""
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        with patch("mxgo.cache.get_redis_client", return_value=redis_client):
+            _, first_tool = _memoized_tool(_context("<retry@example.com>"))
+            first_tool(url="https://example.com/a")
+
+            retry_context = _context("<retry@example.com>")
+            retry_context.add_web_citation("https://example.com/other", "Other page")
+            memo, retry_tool = _memoized_tool(retry_context)
+            output = retry_tool(url="https://example.com/a")
+
+        assert retry_tool.calls == 0
+        assert memo.hits == 1
+        assert output == "Result from https://example.com/a [#2]"
+        assert [source.id for source in retry_context.get_citations().sources] == ["1", "2"]
+
+    def test_emails_do_not_share_results(self):
+        """Test results are scoped to the email's message ID."""
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        with patch("mxgo.cache.get_redis_client", return_value=redis_client):
+            _, first_tool = _memoized_tool(_context("<first@example.com>"))
+            first_tool(url="https://example.com/a")
+            _, other_tool = _memoized_tool(_context("<second@example.com>"))
+            other_tool(url="https://example.com/a")
+
+        assert other_tool.calls == 1
+
+    def test_errors_not_memoized(self):
+        """Test a failed call is made again."""
+        _, tool = _memoized_tool(_context())
+
+        tool(url="https://example.com/broken")
+        tool(url="https://example.com/broken")
+
+        assert tool.calls == 2
+
+    def test_concurrent_identical_calls_coalesced(self):
+        """Test identical calls running at the same time run the tool once."""
+        context = _context()
+        _, tool = _memoized_tool(context)
+        outputs = []
+        threads = [
+            threading.Thread(target=lambda: outputs.append(tool(url="https://example.com/a", delay=0.1)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert tool.calls == 1
+        assert outputs == ["Result from https://example.com/a [#1]"] * 3
+        assert len(context.get_citations().sources) == 1
+
+
+class TestMemoizedToolMapping:
+    """Test the tool mapping memoizes every tool but the non-idempotent ones."""
+
+    def test_non_idempotent_tools_not_memoized(self):
+        """Test tools with side effects keep their own forward."""
+        context = _context()
+        mapping = create_tool_mapping(
+            context=context,
+            scheduled_tasks_tool_factory=Mock(),
+            allowed_python_imports=["math"],
+            allowed_tools=[ToolName.CITATION_AWARE_VISIT, ToolName.DELETE_SCHEDULED_TASKS],
+            tool_memo=ToolResultMemo(context),
+        )
+
+        assert "forward" in vars(mapping[ToolName.CITATION_AWARE_VISIT])
+        assert "forward" not in vars(mapping[ToolName.DELETE_SCHEDULED_TASKS])
+
+    def test_agent_repeated_search_memoized(self, tmp_path):
+        """Test an agent repeating a search gets it from the memo, with the same citations."""
+        email_request = EmailRequest(
+            from_email="user@example.com", to="ask@mxgo.ai", subject="Batteries", textContent="Hi"
+        )
+        instructions = next(handle for handle in DEFAULT_EMAIL_HANDLES if handle.handle == "ask")
+        search = ("web_search", {"query": "home battery adoption europe"})
+        with stub_services(tmp_path), patch.dict("tests.benchmarks.stubs.TRANSCRIPTS", {"ask": [search, search]}):
+            agent = EmailAgent(email_request, instructions, attachment_dir=str(tmp_path / "attachments"))
+            result = agent.process_email(email_request, instructions)
+
+        profile = result.metadata.agent_profile
+        assert profile.memoized_tool_calls == 1
+        assert profile.action_steps == 3
+        assert len(agent.context.get_citations().sources) == 5
@@ -1,5 +1,6 @@
+import json
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import pytest
 from fakeredis.aioredis import FakeRedis
@@ -134,7 +135,7 @@ class TestRateLimiting:
     @pytest.mark.asyncio
     async def test_send_rate_limit_rejection_email(self):
         """Test sending rate limit rejection email."""
-        with patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send:
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
             await send_rate_limit_rejection_email(
                 from_email="user@example.com",
                 to="ask@mxgo.ai",
@@ -199,10 +200,10 @@ class TestValidationFunctions:
     async def test_validate_email_whitelist_not_whitelisted(self):
         """Test email whitelist validation for non-whitelisted email."""
         with (
+            patch("mxgo.validators.redis_client", FakeRedis()),
             patch("mxgo.validators.is_email_whitelisted", return_value=(False, False)),
             patch("mxgo.validators.get_whitelist_signup_url", return_value="https://signup.url"),
-            patch("mxgo.validators.trigger_automatic_verification", return_value=True),
-            patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send,
+            patch("mxgo.validators.verify_sender_task.send") as mock_send,
         ):
             result = await validate_email_whitelist(
                 from_email="notlisted@example.com",
@@ -214,6 +215,43 @@ class TestValidationFunctions:
             assert isinstance(result, Response)
             assert result.status_code == 403
             mock_send.assert_called_once()
+            body = json.loads(result.body)
+            assert body["verification_queued"] is True
+            assert body["verification_already_pending"] is False
+            assert "verification_triggered" not in body
+
+    @pytest.mark.asyncio
+    async def test_validate_email_whitelist_verification_already_pending(self):
+        """Test a sender whose verification was queued by an earlier email is told it is pending."""
+        with (
+            patch("mxgo.validators.redis_client", FakeRedis()),
+            patch("mxgo.validators.is_email_whitelisted", return_value=(False, False)),
+            patch("mxgo.validators.verify_sender_task.send") as mock_send,
+        ):
+            await validate_email_whitelist("notlisted@example.com", "ask@mxgo.ai", "Test Subject", "<1@example.com>")
+            result = await validate_email_whitelist(
+                "notlisted@example.com", "ask@mxgo.ai", "Test Subject", "<2@example.com>"
+            )
+
+        mock_send.assert_called_once()
+        body = json.loads(result.body)
+        assert (body["verification_queued"], body["verification_already_pending"]) == (False, True)
+
+    @pytest.mark.asyncio
+    async def test_validate_email_whitelist_verification_not_queued(self):
+        """Test a verification that could not be queued is reported as neither queued nor pending."""
+        with (
+            patch("mxgo.validators.redis_client", FakeRedis()),
+            patch("mxgo.validators.is_email_whitelisted", return_value=(False, False)),
+            patch("mxgo.validators.verify_sender_task.send", side_effect=ConnectionError("broker down")),
+        ):
+            result = await validate_email_whitelist(
+                "notlisted@example.com", "ask@mxgo.ai", "Test Subject", "<1@example.com>"
+            )
+
+        body = json.loads(result.body)
+        assert result.status_code == 403
+        assert (body["verification_queued"], body["verification_already_pending"]) == (False, False)
 
     @pytest.mark.asyncio
     async def test_validate_email_handle_valid_handle(self):
@@ -233,7 +271,7 @@ class TestValidationFunctions:
         """Test email handle validation for invalid handle."""
         with (
             patch("mxgo.validators.processing_instructions_resolver") as mock_resolver,
-            patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send,
+            patch("mxgo.validators.send_notice_task.send") as mock_send,
         ):
             mock_resolver.side_effect = exceptions.UnspportedHandleError("Invalid handle")
 
@@ -284,7 +322,7 @@ class TestValidationFunctions:
             }
         ]
 
-        with patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send:
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
             result = await validate_attachments(
                 attachments=attachments,
                 from_email="user@example.com",
@@ -311,7 +349,7 @@ class TestValidationFunctions:
             for i in range(10)
         ]
 
-        with patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send:
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
             result = await validate_attachments(
                 attachments=attachments,
                 from_email="user@example.com",
@@ -359,7 +397,7 @@ class TestHandleSuffixStripping:
     @pytest.mark.asyncio
     async def test_validate_email_handle_unsupported_with_suffix(self):
         """Test unsupported handle with suffix still fails validation."""
-        with patch("mxgo.validators.send_email_reply", new_callable=AsyncMock) as mock_send:
+        with patch("mxgo.validators.send_notice_task.send") as mock_send:
             result = await validate_email_handle(
                 "unsupported+local@mxgo.ai", "user@example.com", "Test Subject", "test-message"
             )
@@ -1,11 +1,12 @@
 import base64
 import os
 import tempfile
+from io import BytesIO
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from mxgo.scripts.visual_qa import (
     AzureVisualizerTool,
@@ -13,6 +14,7 @@ from mxgo.scripts.visual_qa import (
     OpenAIVisualizerTool,
     azure_visualizer,
     encode_image,
+    prepare_image,
     resize_image,
     visualizer,
 )
@@ -47,7 +49,7 @@ class TestEncodeImage:
             # Clean up
             Path(temp_path).unlink()
 
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_encode_remote_image_url(self, mock_get):
         """Test encoding a remote image URL."""
         # Mock the response
@@ -62,10 +64,10 @@ class TestEncodeImage:
         assert isinstance(result, str)
         assert len(result) > 0
 
-        # Should have called requests.get
+        # Should have fetched the image through the shared HTTP client
         mock_get.assert_called_once_with("https://example.com/image.jpg", timeout=30)
 
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_encode_remote_image_no_extension(self, mock_get):
         """Test encoding a remote image URL without extension."""
         # Mock the response
@@ -117,6 +119,92 @@ class TestResizeImage:
             Path(temp_path).unlink()
 
 
+def save_gradient_image(path, size=(400, 300), mode="RGB", **save_kwargs):
+    """Save an image with some structure, like a logo or a scanned page."""
+    width, height = size
+    image = Image.linear_gradient("L").rotate(30).resize(size).convert(mode)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((width // 8, height // 8, width // 2, height // 2), fill="white")
+    draw.rectangle((width // 2, height // 2, width * 7 // 8, height * 7 // 8), fill="black")
+    image.save(path, **save_kwargs)
+    return path
+
+
+class TestPrepareImage:
+    """Test image preprocessing before the first model call."""
+
+    def test_large_image_downscaled_to_model_resolution(self, tmp_path):
+        """Test the long and short sides are capped."""
+        path = save_gradient_image(tmp_path / "photo.png", size=(4000, 3000))
+
+        base64_image, mime_type, _ = prepare_image(str(path))
+
+        prepared = Image.open(BytesIO(base64.b64decode(base64_image)))
+        assert mime_type == "image/jpeg"
+        assert prepared.size == (1024, 768)
+
+    def test_small_image_not_upscaled(self, tmp_path):
+        """Test images already below the limits keep their size."""
+        path = save_gradient_image(tmp_path / "logo.jpg", size=(120, 40))
+
+        base64_image, _, _ = prepare_image(str(path))
+
+        assert Image.open(BytesIO(base64.b64decode(base64_image))).size == (120, 40)
+
+    def test_exif_stripped_and_orientation_applied(self, tmp_path):
+        """Test metadata is removed and the EXIF rotation is applied to the pixels."""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+        exif[0x010F] = "Secret Camera Co"
+        path = save_gradient_image(tmp_path / "rotated.jpg", size=(200, 100), exif=exif.tobytes())
+
+        base64_image, _, _ = prepare_image(str(path))
+
+        prepared = Image.open(BytesIO(base64.b64decode(base64_image)))
+        assert prepared.size == (100, 200)
+        assert not prepared.getexif()
+
+    def test_transparent_image_encoded_as_webp(self, tmp_path):
+        """Test images with an alpha channel keep it by using WebP."""
+        path = save_gradient_image(tmp_path / "logo.png", mode="RGBA")
+
+        _, mime_type, _ = prepare_image(str(path))
+
+        assert mime_type == "image/webp"
+
+    def test_hash_stable_across_lossless_reencoding(self, tmp_path):
+        """Test a losslessly re-encoded copy of an image without its metadata gets the same digest."""
+        exif = Image.Exif()
+        exif[0x010F] = "Secret Camera Co"
+        original = save_gradient_image(tmp_path / "original.png", size=(800, 600), exif=exif.tobytes())
+        copy = tmp_path / "copy.webp"
+        Image.open(original).save(copy, "WEBP", lossless=True)
+        different = tmp_path / "different.png"
+        Image.open(original).rotate(90, expand=True).save(different)
+
+        _, _, original_hash = prepare_image(str(original))
+        _, _, copy_hash = prepare_image(str(copy))
+        _, _, different_hash = prepare_image(str(different))
+
+        assert original_hash == copy_hash
+        assert original_hash != different_hash
+
+    def test_documents_with_same_layout_do_not_collide(self, tmp_path):
+        """Test documents that only differ in their text get different digests."""
+        hashes = []
+        for name, amount in [("Alice Smith", "$200.00"), ("Bobby Jones", "$900.00")]:
+            image = Image.new("RGB", (600, 400), "white")
+            draw = ImageDraw.Draw(image)
+            draw.rectangle((20, 20, 580, 60), fill="navy")
+            draw.text((40, 120), f"Bill to: {name}", fill="black")
+            draw.text((40, 160), f"Total: {amount}", fill="black")
+            path = tmp_path / f"{name}.png"
+            image.save(path)
+            hashes.append(prepare_image(str(path))[2])
+
+        assert hashes[0] != hashes[1]
+
+
 class TestProcessImagesAndText:
     """Test the process_images_and_text function."""
 
@@ -208,7 +296,7 @@ class TestOpenAIVisualizerTool:
         with pytest.raises(TypeError, match="You should provide at least"):
             tool.forward(None)
 
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     @patch("mxgo.scripts.visual_qa.encode_image")
     def test_forward_success(self, mock_encode, mock_post):
         """Test successful OpenAI API call."""
@@ -225,7 +313,7 @@ class TestOpenAIVisualizerTool:
         mock_encode.assert_called_once_with("test_image.jpg")
         mock_post.assert_called_once()
 
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     @patch("mxgo.scripts.visual_qa.encode_image")
     def test_forward_without_question(self, mock_encode, mock_post):
         """Test OpenAI tool without specific question."""
@@ -241,7 +329,7 @@ class TestOpenAIVisualizerTool:
         assert "You did not provide a particular question" in result
         assert "detailed caption for the image" in result
 
-    @patch("requests.post")
+    @patch("mxgo.http_client.post")
     @patch("mxgo.scripts.visual_qa.encode_image")
     def test_forward_api_error(self, mock_encode, mock_post):
         """Test OpenAI tool handling API errors."""
@@ -386,6 +474,53 @@ class TestAzureVisualizerTool:
                 # Should detect proper MIME type
                 assert "data:image/" in content["image_url"]["url"]
 
+    def test_forward_sends_preprocessed_image(self, tmp_path):
+        """Test a decodable image is downscaled before the first call."""
+        path = save_gradient_image(tmp_path / "scan.png", size=(3000, 3000))
+        mock_model = Mock(return_value=Mock(content="A scanned page"))
+
+        AzureVisualizerTool(model=mock_model).forward(str(path), "What is this?")
+
+        image_url = mock_model.call_args[0][0][0]["content"][1]["image_url"]["url"]
+        assert image_url.startswith("data:image/jpeg;base64,")
+        sent = Image.open(BytesIO(base64.b64decode(image_url.split(",", 1)[1])))
+        assert sent.size == (768, 768)
+
+    def test_repeated_image_answered_from_cache(self, tmp_path):
+        """Test the same image and question are only analysed once, even as a different file."""
+        first = save_gradient_image(tmp_path / "logo.png")
+        second = tmp_path / "logo_copy.webp"
+        Image.open(first).save(second, "WEBP", lossless=True)
+        mock_model = Mock(return_value=Mock(content="Company logo"))
+        tool = AzureVisualizerTool(model=mock_model)
+
+        assert tool.forward(str(first), "What is this?") == "Company logo"
+        assert tool.forward(str(second), "what is  this?") == "Company logo"
+        assert "Company logo" in tool.forward(str(second))
+
+        assert mock_model.call_count == 2
+
+    def test_answers_not_shared_across_models(self, tmp_path):
+        """Test a cached answer is only served for the model that gave it."""
+        path = save_gradient_image(tmp_path / "chart.png", size=(320, 240))
+        first_model = Mock(model_id="gpt-4o", return_value=Mock(content="A chart"))
+        second_model = Mock(model_id="gpt-4o-mini", return_value=Mock(content="A bar chart"))
+
+        AzureVisualizerTool(model=first_model).forward(str(path), "Describe")
+        output = AzureVisualizerTool(model=second_model).forward(str(path), "Describe")
+
+        assert output == "A bar chart"
+        second_model.assert_called_once()
+
+    def test_failed_analysis_not_cached(self, tmp_path):
+        """Test errors are not cached and the next call retries the model."""
+        path = save_gradient_image(tmp_path / "chart.png")
+        mock_model = Mock(side_effect=[Exception("API connection failed"), Mock(content="A chart")])
+        tool = AzureVisualizerTool(model=mock_model)
+
+        assert "Error processing image" in tool.forward(str(path), "Describe")
+        assert tool.forward(str(path), "Describe") == "A chart"
+
 
 class TestLegacyFunctions:
     """Test the legacy function-based tools for backward compatibility."""
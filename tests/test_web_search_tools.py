@@ -146,7 +146,7 @@ class TestBraveSearchTool:
                 tool.forward("test query")
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_success(self, mock_get):
         """Test successful Brave search execution."""
         mock_response = Mock()
@@ -180,7 +180,7 @@ class TestBraveSearchTool:
         assert call_args[1]["params"]["q"] == "test query"
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_with_custom_parameters(self, mock_get):
         """Test Brave search with custom parameters."""
         mock_response = Mock()
@@ -209,7 +209,7 @@ class TestBraveSearchTool:
         assert call_params["result_filter"] == "web,news"
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_no_results(self, mock_get):
         """Test Brave search when no results are returned."""
         mock_response = Mock()
@@ -226,7 +226,7 @@ class TestBraveSearchTool:
         assert "No results found for query: no results query" in content
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_http_error(self, mock_get):
         """Test Brave search HTTP error handling."""
         mock_response = Mock()
@@ -240,7 +240,7 @@ class TestBraveSearchTool:
             tool.forward("test query")
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_forward_request_exception(self, mock_get):
         """Test Brave search request exception handling."""
         mock_get.side_effect = requests.RequestException("Network error")
@@ -253,7 +253,7 @@ class TestBraveSearchTool:
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_api_key"})
     @patch("mxgo.tools.web_search.brave_search.logger")
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_logging_behavior(self, mock_get, mock_logger):
         """Test that appropriate logging occurs during search."""
         mock_response = Mock()
@@ -458,7 +458,7 @@ class TestIntegrationScenarios:
 
         with (
             patch("mxgo.tools.web_search.ddg_search.WebSearchTool", return_value=mock_ddg_instance),
-            patch("requests.get", return_value=mock_brave_response),
+            patch("mxgo.http_client.get", return_value=mock_brave_response),
             patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_key"}),
         ):
             ddg_tool = DDGSearchTool(context)
@@ -470,7 +470,7 @@ class TestIntegrationScenarios:
             assert "Brave Result" in content
 
     @patch.dict(os.environ, {"BRAVE_SEARCH_API_KEY": "test_key"})
-    @patch("requests.get")
+    @patch("mxgo.http_client.get")
     def test_error_resilience(self, mock_get):
         """Test error resilience across different search tools."""
         # Test that each tool handles various error scenarios